@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Compare on-disk size and load time of pickled vs compressed tensor bundles.
+
+Run:
+  python learning/src/benchmarks/bench_bundle_formats.py
+  python learning/src/benchmarks/bench_bundle_formats.py --bundle-path learning/data/<UUID>_bundle.pkl
+"""
+import argparse
+import pickle
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SRC_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SRC_ROOT))
+
+from components.bundle_io import (  # noqa: E402
+    DEFAULT_CODEC,
+    load_tensor_bundle,
+    read_compressed_bundle,
+    write_compressed_bundle,
+)
+from components.exporter import export_snapshot  # noqa: E402
+from components.node_index import NodeIdIndex  # noqa: E402
+
+LEARNING_ROOT = SRC_ROOT.parent
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark bundle serialization formats.")
+    parser.add_argument(
+        "--bundle-path",
+        default=None,
+        help="Bundle to benchmark (default: first *_bundle.pkl in learning/data/).",
+    )
+    parser.add_argument("--repeats", type=int, default=3, help="Timed repetitions.")
+    parser.add_argument("--codec", default=DEFAULT_CODEC, help="Compression codec.")
+    parser.add_argument("--level", type=int, default=3, help="Compression level.")
+    return parser.parse_args()
+
+
+def best_of(repeats: int, fn) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def load_pickle(path: Path):
+    with open(path, "rb") as handle:
+        return pickle.load(handle)
+
+
+def main() -> int:
+    args = parse_args()
+    if args.bundle_path:
+        bundle_path = Path(args.bundle_path)
+    else:
+        candidates = sorted((LEARNING_ROOT / "data").glob("*_bundle.pkl"))
+        if not candidates:
+            print("No bundle found in learning/data/; pass --bundle-path.", file=sys.stderr)
+            return 1
+        bundle_path = candidates[0]
+
+    bundle = load_tensor_bundle(bundle_path)
+    print(f"Bundle: {bundle_path}")
+    print(f"  Nodes: {bundle['x'].shape[0]}, Edges: {bundle['edge_index'].shape[1]}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pickle_path = Path(tmp) / "bundle.pkl"
+        compressed_path = Path(tmp) / "bundle.sbz"
+
+        pickle_write = best_of(args.repeats, lambda: export_snapshot(bundle, pickle_path))
+        pickle_read = best_of(args.repeats, lambda: load_pickle(pickle_path))
+        compressed_write = best_of(
+            args.repeats,
+            lambda: write_compressed_bundle(
+                bundle, compressed_path, codec=args.codec, level=args.level
+            ),
+        )
+        compressed_read = best_of(
+            args.repeats, lambda: read_compressed_bundle(compressed_path)
+        )
+        compact_read = best_of(
+            args.repeats, lambda: read_compressed_bundle(compressed_path, compact_ids=True)
+        )
+
+        pickle_size = pickle_path.stat().st_size
+        compressed_size = compressed_path.stat().st_size
+
+    print(f"\n{'format':<22}{'size (KB)':>12}{'write (ms)':>12}{'load (ms)':>12}")
+    print(
+        f"{'pickle':<22}{pickle_size / 1024:>12.1f}"
+        f"{pickle_write * 1000:>12.1f}{pickle_read * 1000:>12.1f}"
+    )
+    print(
+        f"{'compressed/' + args.codec:<22}{compressed_size / 1024:>12.1f}"
+        f"{compressed_write * 1000:>12.1f}{compressed_read * 1000:>12.1f}"
+    )
+    print(f"{'  + compact ids':<22}{'':>12}{'':>12}{compact_read * 1000:>12.1f}")
+    print(f"\nSize ratio: {pickle_size / max(compressed_size, 1):.2f}x smaller")
+
+    mapping = dict(bundle["node_mapping"])
+    index = NodeIdIndex.from_mapping(mapping)
+    dict_bytes = sys.getsizeof(mapping) + sum(sys.getsizeof(node_id) for node_id in mapping)
+    print(
+        f"node_mapping: dict {dict_bytes / 1024:.1f} KB, "
+        f"NodeIdIndex ({index.kind}) {index.nbytes / 1024:.1f} KB"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
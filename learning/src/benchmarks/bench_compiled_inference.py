@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Compare eager vs compiled GNN inference throughput.
+
+Run:
+  python learning/src/benchmarks/bench_compiled_inference.py
+  python learning/src/benchmarks/bench_compiled_inference.py --backends torchscript inductor
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import torch
+
+SRC_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SRC_ROOT))
+
+from components.bundle_io import load_tensor_bundle  # noqa: E402
+from components.compiled_inference import COMPILE_BACKENDS  # noqa: E402
+from components.gnn_model import create_gnn_model, generate_embeddings  # noqa: E402
+
+LEARNING_ROOT = SRC_ROOT.parent
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark eager vs compiled inference.")
+    parser.add_argument(
+        "--bundle-path",
+        default=None,
+        help="Bundle to benchmark (default: first *_bundle.pkl in learning/data/).",
+    )
+    parser.add_argument("--num-layers", type=int, default=2, choices=[1, 2, 3])
+    parser.add_argument("--hidden-channels", type=int, default=128)
+    parser.add_argument("--repeats", type=int, default=10, help="Timed repetitions.")
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        default=["torchscript"],
+        choices=COMPILE_BACKENDS,
+        help="Compiled backends to compare against eager.",
+    )
+    return parser.parse_args()
+
+
+def time_inference(model, x, edge_index, repeats: int):
+    """Warm up once, then return (best seconds per pass, embeddings)."""
+    embeddings = generate_embeddings(model, x, edge_index)
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        generate_embeddings(model, x, edge_index)
+        timings.append(time.perf_counter() - start)
+    return min(timings), embeddings
+
+
+def main() -> int:
+    args = parse_args()
+    if args.bundle_path:
+        bundle_path = Path(args.bundle_path)
+    else:
+        candidates = sorted((LEARNING_ROOT / "data").glob("*_bundle.pkl"))
+        if not candidates:
+            print("No bundle found in learning/data/; pass --bundle-path.", file=sys.stderr)
+            return 1
+        bundle_path = candidates[0]
+
+    bundle = load_tensor_bundle(bundle_path)
+    x, edge_index = bundle["x"], bundle["edge_index"]
+    num_nodes = x.shape[0]
+    print(f"Bundle: {bundle_path}")
+    print(f"  Nodes: {num_nodes}, Edges: {edge_index.shape[1]}, Layers: {args.num_layers}")
+
+    model_kwargs = dict(
+        in_channels=x.shape[1],
+        num_layers=args.num_layers,
+        hidden_channels=args.hidden_channels,
+    )
+    eager = create_gnn_model(**model_kwargs)
+    eager_s, reference = time_inference(eager, x, edge_index, args.repeats)
+    print(f"{'eager':>12}: {eager_s * 1000:8.2f} ms/pass  {num_nodes / eager_s:12.0f} nodes/s")
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for backend in args.backends:
+            start = time.perf_counter()
+            compiled = create_gnn_model(
+                **model_kwargs, compile_backend=backend, cache_dir=cache_dir
+            )
+            build_s = time.perf_counter() - start
+            compiled_s, embeddings = time_inference(compiled, x, edge_index, args.repeats)
+            max_diff = (embeddings - reference).abs().max().item()
+            print(
+                f"{backend:>12}: {compiled_s * 1000:8.2f} ms/pass  "
+                f"{num_nodes / compiled_s:12.0f} nodes/s  "
+                f"speedup {eager_s / compiled_s:5.2f}x  build {build_s:.2f}s  "
+                f"max|diff| {max_diff:.2e}"
+            )
+            if backend == "torchscript":
+                start = time.perf_counter()
+                create_gnn_model(**model_kwargs, compile_backend=backend, cache_dir=cache_dir)
+                print(f"{'':>12}  cached reload {1000 * (time.perf_counter() - start):.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Compare cold-start and warm latency of embedding queries.
+
+Cold: a fresh EmbeddingService per query, which reloads the bundle and rebuilds
+the model like gnn_feasibility_demo.py does. Warm: one resident service, with
+concurrent queries micro-batched.
+
+Run:
+  python learning/src/benchmarks/bench_embedding_server.py
+  python learning/src/benchmarks/bench_embedding_server.py --bundle-path learning/data/<UUID>_bundle.pkl
+"""
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import torch
+
+SRC_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SRC_ROOT))
+
+from components.bundle_io import load_tensor_bundle  # noqa: E402
+from components.embedding_service import EmbeddingService, ModelSpec  # noqa: E402
+from components.exporter import export_snapshot  # noqa: E402
+
+LEARNING_ROOT = SRC_ROOT.parent
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark cold vs warm embedding queries.")
+    parser.add_argument(
+        "--bundle-path",
+        default=None,
+        help="Bundle to query (default: first *_bundle.pkl in learning/data/, else synthetic).",
+    )
+    parser.add_argument("--queries", type=int, default=64, help="Warm queries to time.")
+    parser.add_argument("--cold-queries", type=int, default=3, help="Cold queries to time.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent warm clients.")
+    parser.add_argument("--ids-per-query", type=int, default=16, help="Node ids per embed query.")
+    parser.add_argument("--num-layers", type=int, default=2, choices=[1, 2, 3])
+    return parser.parse_args()
+
+
+def synthetic_bundle_path(directory: Path, num_nodes: int = 20000, num_edges: int = 80000) -> Path:
+    x = torch.zeros((num_nodes, 6), dtype=torch.float32)
+    x[torch.arange(num_nodes), torch.randint(0, 6, (num_nodes,))] = 1.0
+    bundle = {
+        "x": x,
+        "edge_index": torch.randint(0, num_nodes, (2, num_edges)),
+        "node_mapping": {f"node_{i}": i for i in range(num_nodes)},
+    }
+    return export_snapshot(bundle, directory / "synthetic_bundle.pkl")
+
+
+def summarize(label: str, timings) -> None:
+    timings = sorted(timings)
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    print(
+        f"{label:>6}: n={len(timings):<4} p50={1000 * statistics.median(timings):8.2f} ms "
+        f"p95={1000 * p95:8.2f} ms"
+    )
+
+
+def main() -> int:
+    args = parse_args()
+    spec = ModelSpec(num_layers=args.num_layers)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.bundle_path:
+            bundle_path = Path(args.bundle_path)
+        else:
+            candidates = sorted((LEARNING_ROOT / "data").glob("*_bundle.pkl"))
+            bundle_path = candidates[0] if candidates else synthetic_bundle_path(Path(tmp))
+        print(f"Bundle: {bundle_path}")
+
+        node_ids = list(load_tensor_bundle(bundle_path)["node_mapping"])
+        rng = random.Random(0)
+
+        def query_ids():
+            return rng.sample(node_ids, min(args.ids_per_query, len(node_ids)))
+
+        cold = []
+        for _ in range(args.cold_queries):
+            start = time.perf_counter()
+            EmbeddingService().embed(bundle_path, query_ids(), spec)
+            cold.append(time.perf_counter() - start)
+
+        service = EmbeddingService()
+        service.embed(bundle_path, query_ids(), spec)
+
+        def timed(ids):
+            start = time.perf_counter()
+            service.embed(bundle_path, ids, spec)
+            return time.perf_counter() - start
+
+        batches = [query_ids() for _ in range(args.queries)]
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            warm = list(pool.map(timed, batches))
+
+        summarize("cold", cold)
+        summarize("warm", warm)
+        print(f"Mean micro-batch size: {service.stats()['mean_batch_size']}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
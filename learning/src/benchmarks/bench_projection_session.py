@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Compare independent t-SNE projections of the 1/2/3-layer models with a
+ProjectionSession (cached kNN graphs, warm starts, process pool).
+
+Run:
+  python learning/src/benchmarks/bench_projection_session.py
+  python learning/src/benchmarks/bench_projection_session.py --bundle-path learning/data/<UUID>_bundle.pkl
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import torch
+
+SRC_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SRC_ROOT))
+
+from components.bundle_io import load_tensor_bundle  # noqa: E402
+from components.gnn_model import create_gnn_model, generate_embeddings  # noqa: E402
+from components.projection_session import ProjectionSession, align_layout  # noqa: E402
+
+LEARNING_ROOT = SRC_ROOT.parent
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark reusable t-SNE projection sessions.")
+    parser.add_argument(
+        "--bundle-path",
+        default=None,
+        help="Bundle to benchmark (default: first *_bundle.pkl in learning/data/).",
+    )
+    parser.add_argument("--perplexity", type=float, default=30.0)
+    parser.add_argument("--n-iter", type=int, default=1000, help="Iterations of a cold start.")
+    parser.add_argument("--warm-n-iter", type=int, default=400, help="Iterations of a warm start.")
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1, help="Processes for project_many."
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args()
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def displacement(layout: np.ndarray, reference: np.ndarray) -> float:
+    """Mean point displacement after Procrustes alignment, relative to the reference spread."""
+    aligned = align_layout(layout, reference)
+    spread = np.linalg.norm(reference - reference.mean(axis=0), axis=1).mean()
+    return float(np.linalg.norm(aligned - reference, axis=1).mean() / spread)
+
+
+def main() -> int:
+    args = parse_args()
+    if args.bundle_path:
+        bundle_path = Path(args.bundle_path)
+    else:
+        candidates = sorted((LEARNING_ROOT / "data").glob("*_bundle.pkl"))
+        if not candidates:
+            print("No bundle found in learning/data/; pass --bundle-path.", file=sys.stderr)
+            return 1
+        bundle_path = candidates[0]
+
+    bundle = load_tensor_bundle(bundle_path)
+    x, edge_index = bundle["x"], bundle["edge_index"]
+    print(f"Bundle: {bundle_path}")
+    print(f"  Nodes: {x.shape[0]}, Edges: {edge_index.shape[1]}")
+
+    embeddings = {}
+    for num_layers in (1, 2, 3):
+        torch.manual_seed(args.seed)
+        model = create_gnn_model(in_channels=x.shape[1], num_layers=num_layers)
+        embeddings[f"{num_layers}layer"] = generate_embeddings(model, x, edge_index).numpy()
+
+    settings = dict(
+        perplexity=args.perplexity,
+        n_iter=args.n_iter,
+        warm_n_iter=args.warm_n_iter,
+        random_state=args.seed,
+    )
+    cold = ProjectionSession(**settings)
+    _, cold_seconds = timed(
+        lambda: [cold.project(data, name=name, init="pca") for name, data in embeddings.items()]
+    )
+    session = ProjectionSession(**settings)
+    _, session_seconds = timed(lambda: session.project_many(embeddings, num_workers=1))
+    session.reset()
+    _, cached_seconds = timed(lambda: session.project_many(embeddings, num_workers=1))
+    parallel = ProjectionSession(**settings)
+    _, parallel_seconds = timed(lambda: parallel.project_many(embeddings, num_workers=args.workers))
+
+    print(f"\n{'run':<32}{'seconds':>10}")
+    print(f"{'independent (PCA init)':<32}{cold_seconds:>10.1f}")
+    print(f"{'session, sequential':<32}{session_seconds:>10.1f}")
+    print(f"{'session, cached kNN graphs':<32}{cached_seconds:>10.1f}")
+    print(f"{f'session, {args.workers} workers':<32}{parallel_seconds:>10.1f}")
+
+    reference = session.reference
+    print(f"\n{'variant':<10}{'KL cold':>10}{'KL warm':>10}{'shift cold':>12}{'shift warm':>12}")
+    for name in embeddings:
+        print(
+            f"{name:<10}{cold.kl_divergences[name]:>10.3f}{session.kl_divergences[name]:>10.3f}"
+            f"{displacement(cold.layouts[name], reference):>12.3f}"
+            f"{displacement(session.layouts[name], reference):>12.3f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
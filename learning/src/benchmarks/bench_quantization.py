@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Compare float32, dynamic int8 and bf16 GNN inference: throughput, size, accuracy.
+
+Run:
+  python learning/src/benchmarks/bench_quantization.py
+  python learning/src/benchmarks/bench_quantization.py --bundle-path learning/data/<UUID>_bundle.pkl
+"""
+import argparse
+import sys
+from pathlib import Path
+
+SRC_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SRC_ROOT))
+
+from components.bundle_io import load_tensor_bundle  # noqa: E402
+from components.gnn_model import create_gnn_model  # noqa: E402
+from components.quantization import QUANTIZATION_MODES, quantization_report  # noqa: E402
+
+LEARNING_ROOT = SRC_ROOT.parent
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark quantized inference.")
+    parser.add_argument(
+        "--bundle-path",
+        default=None,
+        help="Bundle to benchmark (default: first *_bundle.pkl in learning/data/).",
+    )
+    parser.add_argument("--num-layers", type=int, default=2, choices=[1, 2, 3])
+    parser.add_argument("--hidden-channels", type=int, default=128)
+    parser.add_argument("--repeats", type=int, default=10, help="Timed repetitions.")
+    parser.add_argument(
+        "--modes",
+        nargs="+",
+        default=list(QUANTIZATION_MODES),
+        choices=QUANTIZATION_MODES,
+        help="Reduced-precision modes to compare against float32.",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    if args.bundle_path:
+        bundle_path = Path(args.bundle_path)
+    else:
+        candidates = sorted((LEARNING_ROOT / "data").glob("*_bundle.pkl"))
+        if not candidates:
+            print("No bundle found in learning/data/; pass --bundle-path.", file=sys.stderr)
+            return 1
+        bundle_path = candidates[0]
+
+    bundle = load_tensor_bundle(bundle_path)
+    x, edge_index = bundle["x"], bundle["edge_index"]
+    print(f"Bundle: {bundle_path}")
+    print(f"  Nodes: {x.shape[0]}, Edges: {edge_index.shape[1]}, Layers: {args.num_layers}")
+
+    model = create_gnn_model(
+        in_channels=x.shape[1],
+        num_layers=args.num_layers,
+        hidden_channels=args.hidden_channels,
+    )
+    reports = quantization_report(
+        model, x, edge_index, bundle.get("edge_weight"), args.modes, args.repeats
+    )
+
+    baseline = reports[0]
+    print(
+        f"{'mode':>8} {'ms/pass':>9} {'nodes/s':>12} {'speedup':>8} "
+        f"{'bytes':>9} {'cos mean':>9} {'cos min':>9}"
+    )
+    for report in reports:
+        print(
+            f"{report.mode:>8} {report.seconds_per_pass * 1000:9.2f} "
+            f"{report.nodes_per_second:12.0f} "
+            f"{baseline.seconds_per_pass / report.seconds_per_pass:7.2f}x "
+            f"{report.model_bytes:9d} {report.cosine_mean:9.5f} {report.cosine_min:9.5f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Compare SAGE forward passes with random-walk (skip-gram) embeddings.
+
+Run:
+  python learning/src/benchmarks/bench_walk_embeddings.py
+  python learning/src/benchmarks/bench_walk_embeddings.py --bundle-path learning/data/<UUID>_bundle.pkl
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import torch
+
+SRC_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SRC_ROOT))
+
+from components.bundle_io import load_tensor_bundle  # noqa: E402
+from components.gnn_model import create_gnn_model, generate_embeddings  # noqa: E402
+from components.walk_embeddings import (  # noqa: E402
+    WalkConfig,
+    build_csr,
+    generate_walk_embeddings,
+    iter_walk_batches,
+)
+
+LEARNING_ROOT = SRC_ROOT.parent
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark SAGE vs random-walk embeddings.")
+    parser.add_argument(
+        "--bundle-path",
+        default=None,
+        help="Bundle to benchmark (default: first *_bundle.pkl in learning/data/).",
+    )
+    parser.add_argument("--repeats", type=int, default=3, help="Timed repetitions (best is kept).")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1], help="Thread counts to time.")
+    parser.add_argument("--walk-length", type=int, default=20)
+    parser.add_argument("--walks-per-node", type=int, default=10)
+    parser.add_argument("--epochs", type=int, default=1)
+    return parser.parse_args()
+
+
+def best_of(repeats: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> int:
+    args = parse_args()
+    if args.bundle_path:
+        bundle_path = Path(args.bundle_path)
+    else:
+        candidates = sorted((LEARNING_ROOT / "data").glob("*_bundle.pkl"))
+        if not candidates:
+            print("No bundle found in learning/data/; pass --bundle-path.", file=sys.stderr)
+            return 1
+        bundle_path = candidates[0]
+
+    bundle = load_tensor_bundle(bundle_path)
+    x, edge_index, edge_weight = bundle["x"], bundle["edge_index"], bundle.get("edge_weight")
+    num_nodes = x.shape[0]
+    config = WalkConfig(
+        walk_length=args.walk_length, walks_per_node=args.walks_per_node, epochs=args.epochs
+    )
+    print(f"Bundle: {bundle_path}")
+    print(f"  Nodes: {num_nodes}, Edges: {edge_index.shape[1]}")
+    print(f"  Walks: {config.walks_per_node}/node x {config.walk_length} steps, {config.epochs} epoch(s)")
+
+    previous_threads = torch.get_num_threads()
+    print(f"{'engine':>16} {'threads':>8} {'seconds':>9} {'nodes/s':>12}")
+    for threads in args.threads:
+        torch.set_num_threads(threads)
+        rows = []
+        for num_layers in (1, 2, 3):
+            model = create_gnn_model(in_channels=x.shape[1], num_layers=num_layers)
+            seconds = best_of(
+                args.repeats, lambda: generate_embeddings(model, x, edge_index, edge_weight)
+            )
+            rows.append((f"sage-{num_layers}layer", seconds))
+
+        rowptr, col = build_csr(edge_index, num_nodes, edge_weight)
+        rows.append(
+            ("walks only", best_of(args.repeats, lambda: list(iter_walk_batches(rowptr, col, config))))
+        )
+        rows.append(
+            (
+                "walk+skipgram",
+                best_of(
+                    args.repeats,
+                    lambda: generate_walk_embeddings(
+                        x, edge_index, edge_weight, config=config, num_threads=threads
+                    ),
+                ),
+            )
+        )
+        for name, seconds in rows:
+            print(f"{name:>16} {threads:8d} {seconds:9.3f} {num_nodes / seconds:12.0f}")
+    torch.set_num_threads(previous_threads)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
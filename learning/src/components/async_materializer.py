@@ -0,0 +1,311 @@
+import asyncio
+import itertools
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+import psycopg2
+from psycopg2.extras import RealDictCursor
+
+from .connection_pool import ConnectionPool
+from .materializer import (
+    DEFAULT_EDGES_TABLE,
+    DEFAULT_NODES_TABLE,
+    SnapshotFilter,
+    _assemble_snapshot,
+    _edge_filter,
+    _edge_from_row,
+    _edge_query,
+    _node_filter,
+    _node_from_row,
+    _node_query,
+)
+from .models import SnapshotEdge, SnapshotGraph, SnapshotNode
+
+DEFAULT_BATCH_SIZE = 5000
+DEFAULT_MAX_CONNECTIONS = 4
+
+T = TypeVar("T")
+
+_cursor_ids = itertools.count()
+
+
+class AsyncMaterializer:
+    """
+    Materialize snapshots from an asyncio service without blocking the loop.
+
+    psycopg2 is a blocking driver, so every database round trip runs on a
+    dedicated thread pool and the loop only awaits it. Rows are streamed with
+    server-side cursors in ``batch_size`` chunks, yielding back to the loop
+    between chunks. Concurrent materializations share at most
+    ``max_connections`` connections leased from a ``ConnectionPool`` (pass
+    ``pool`` to share one with synchronous callers); idle connections are
+    reused. ``snapshot_filter`` pushes the same predicates into the queries
+    as ``materialize_snapshot``'s filter options.
+
+    Cancelling a materialization (directly or through ``timeout``) cancels the
+    in-flight query with ``connection.cancel()`` and discards that connection.
+
+    Example:
+        async with AsyncMaterializer(max_connections=4) as loader:
+            snapshot = await loader.materialize(snapshot_id, timeout=30)
+    """
+
+    def __init__(
+        self,
+        dsn: Optional[str] = None,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        nodes_table: Optional[str] = None,
+        edges_table: Optional[str] = None,
+        pool: Optional[ConnectionPool] = None,
+    ):
+        if max_connections < 1:
+            raise ValueError("max_connections must be at least 1.")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1.")
+        self.dsn = dsn
+        self.max_connections = max_connections
+        self.batch_size = batch_size
+        self.nodes_table = nodes_table or DEFAULT_NODES_TABLE
+        self.edges_table = edges_table or DEFAULT_EDGES_TABLE
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_connections, thread_name_prefix="materializer"
+        )
+        self._owns_pool = pool is None
+        self._pool = pool or ConnectionPool(
+            dsn=dsn, min_size=0, max_size=max_connections
+        )
+        self._slots: Optional[asyncio.Semaphore] = None
+        # ids of leased connections whose query was cancelled mid-flight.
+        self._broken: Set[int] = set()
+        self._closed = False
+
+    async def __aenter__(self) -> "AsyncMaterializer":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def materialize(
+        self,
+        snapshot_id: Optional[str],
+        timeout: Optional[float] = None,
+        snapshot_filter: Optional[SnapshotFilter] = None,
+    ) -> SnapshotGraph:
+        """Materialize a snapshot; raises asyncio.TimeoutError after ``timeout`` seconds."""
+        if not snapshot_id:
+            raise ValueError("snapshot_id is required to scope the snapshot graph.")
+        return await asyncio.wait_for(self._materialize(snapshot_id, snapshot_filter), timeout)
+
+    async def stream_nodes(
+        self, snapshot_id: str, snapshot_filter: Optional[SnapshotFilter] = None
+    ) -> AsyncIterator[List[SnapshotNode]]:
+        """Yield a snapshot's nodes in id order, one batch at a time."""
+        async with self._connection() as conn:
+            query, params = self._node_query(snapshot_id, snapshot_filter)
+            async for batch in self._stream(conn, query, params, _node_from_row):
+                yield batch
+
+    async def stream_edges(
+        self, snapshot_id: str, snapshot_filter: Optional[SnapshotFilter] = None
+    ) -> AsyncIterator[List[SnapshotEdge]]:
+        """Yield a snapshot's edges in (fromId, toId, kind) order, one batch at a time."""
+        async with self._connection() as conn:
+            query, params = self._edge_query(snapshot_id, snapshot_filter)
+            async for batch in self._stream(conn, query, params, _edge_from_row):
+                yield batch
+
+    async def close(self) -> None:
+        """Stop the worker threads and close the pool if this loader created it."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._owns_pool:
+            await self._run(self._pool.close)
+        self._executor.shutdown(wait=False)
+
+    async def _materialize(
+        self, snapshot_id: str, snapshot_filter: Optional[SnapshotFilter] = None
+    ) -> SnapshotGraph:
+        nodes: List[SnapshotNode] = []
+        edges: List[SnapshotEdge] = []
+        async with self._connection() as conn:
+            node_query, node_params = self._node_query(snapshot_id, snapshot_filter)
+            async for batch in self._stream(conn, node_query, node_params, _node_from_row):
+                nodes.extend(batch)
+            edge_query, edge_params = self._edge_query(snapshot_id, snapshot_filter)
+            async for batch in self._stream(conn, edge_query, edge_params, _edge_from_row):
+                edges.extend(batch)
+
+        # Graph construction is CPU-bound; keep it off the event loop too.
+        return await self._run(_assemble_snapshot, nodes, edges)
+
+    def _node_query(
+        self, snapshot_id: str, snapshot_filter: Optional[SnapshotFilter]
+    ) -> Tuple[Any, Tuple[Any, ...]]:
+        where, params = _node_filter(snapshot_filter)
+        return _node_query(self.nodes_table, where), (snapshot_id, *params)
+
+    def _edge_query(
+        self, snapshot_id: str, snapshot_filter: Optional[SnapshotFilter]
+    ) -> Tuple[Any, Tuple[Any, ...]]:
+        where, params = _edge_filter(snapshot_filter, self.nodes_table, snapshot_id)
+        return _edge_query(self.edges_table, where), (snapshot_id, *params)
+
+    async def _stream(
+        self,
+        conn: psycopg2.extensions.connection,
+        query,
+        params: Tuple[Any, ...],
+        convert: Callable[[dict], T],
+    ) -> AsyncIterator[List[T]]:
+        """Run query on a server-side cursor and yield converted row batches."""
+        name = f"materializer_{next(_cursor_ids)}"
+        cursor = await self._run_on(
+            conn, _open_cursor, conn, name, query, params, self.batch_size
+        )
+        try:
+            while True:
+                batch = await self._run_on(
+                    conn, _fetch_batch, cursor, self.batch_size, convert
+                )
+                if not batch:
+                    break
+                yield batch
+        finally:
+            if id(conn) not in self._broken:
+                try:
+                    await self._run_on(conn, cursor.close)
+                except psycopg2.Error:
+                    # Aborted transaction; the connection is discarded on release.
+                    pass
+
+    def _connection(self) -> "_PooledConnection":
+        if self._closed:
+            raise RuntimeError("AsyncMaterializer is closed.")
+        if self._slots is None:
+            # Created lazily so the semaphore binds to the running loop.
+            self._slots = asyncio.Semaphore(self.max_connections)
+        return _PooledConnection(self)
+
+    async def _acquire(self) -> psycopg2.extensions.connection:
+        await self._slots.acquire()
+        try:
+            future: Future = self._executor.submit(self._pool.acquire)
+            try:
+                return await asyncio.wrap_future(future)
+            except asyncio.CancelledError:
+                future.add_done_callback(self._release_result)
+                raise
+        except BaseException:
+            self._slots.release()
+            raise
+
+    async def _release(self, conn: psycopg2.extensions.connection) -> None:
+        try:
+            if id(conn) in self._broken:
+                # Discarded by the cancelled worker thread once it returns.
+                self._broken.discard(id(conn))
+            elif self._closed:
+                self._pool.release(conn)
+            else:
+                # The pool rolls back the read transaction that held the cursors.
+                await self._run(self._pool.release, conn)
+        finally:
+            self._slots.release()
+
+    def _release_result(self, future: Future) -> None:
+        if not future.cancelled() and future.exception() is None:
+            self._pool.release(future.result())
+
+    async def _run(self, fn: Callable[..., T], *args) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    async def _run_on(
+        self,
+        conn: psycopg2.extensions.connection,
+        fn: Callable[..., T],
+        *args,
+    ) -> T:
+        """Run a blocking call that uses conn; cancel the query if the caller is cancelled."""
+        future: Future = self._executor.submit(fn, *args)
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # The worker thread is still inside libpq; ask the server to abort
+            # the statement and drop the connection once the thread returns.
+            self._broken.add(id(conn))
+            if not future.done():
+                conn.cancel()
+            future.add_done_callback(
+                lambda _: self._pool.release(conn, discard=True)
+            )
+            raise
+
+
+class _PooledConnection:
+    """Async context manager that leases one connection from the pool."""
+
+    def __init__(self, owner: AsyncMaterializer):
+        self._owner = owner
+        self._conn: Optional[psycopg2.extensions.connection] = None
+
+    async def __aenter__(self) -> psycopg2.extensions.connection:
+        self._conn = await self._owner._acquire()
+        return self._conn
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self._owner._release(self._conn)
+
+
+def _open_cursor(
+    conn: psycopg2.extensions.connection,
+    name: str,
+    query,
+    params: Tuple[Any, ...],
+    batch_size: int,
+):
+    cursor = conn.cursor(name=name, cursor_factory=RealDictCursor)
+    cursor.itersize = batch_size
+    cursor.execute(query, params)
+    return cursor
+
+
+def _fetch_batch(cursor, batch_size: int, convert: Callable[[dict], T]) -> List[T]:
+    return [convert(row) for row in cursor.fetchmany(batch_size)]
+
+
+async def materialize_snapshot_async(
+    snapshot_id: Optional[str],
+    dsn: Optional[str] = None,
+    nodes_table: Optional[str] = None,
+    edges_table: Optional[str] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    timeout: Optional[float] = None,
+    node_types: Optional[Sequence[str]] = None,
+    edge_kinds: Optional[Sequence[str]] = None,
+    file_path_prefixes: Optional[Sequence[str]] = None,
+) -> SnapshotGraph:
+    """One-off async counterpart of ``materialize_snapshot``, with the same filter options."""
+    snapshot_filter = SnapshotFilter.from_options(node_types, edge_kinds, file_path_prefixes)
+    async with AsyncMaterializer(
+        dsn=dsn,
+        max_connections=1,
+        batch_size=batch_size,
+        nodes_table=nodes_table,
+        edges_table=edges_table,
+    ) as loader:
+        return await loader.materialize(
+            snapshot_id, timeout=timeout, snapshot_filter=snapshot_filter
+        )
@@ -0,0 +1,566 @@
+import json
+import os
+import pickle
+import struct
+import zlib
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import torch
+
+from .exporter import TensorBundle
+from .fingerprints import SnapshotFingerprint
+from .node_index import NodeIdIndex, split_id_lines
+from .partitioning import MANIFEST_FILENAME, load_shard_manifest
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+MAGIC = b"STRBNDL1"
+FORMAT_VERSION = 1
+DEFAULT_CHUNK_SIZE = 1 << 16
+DEFAULT_CODEC = "zstd" if zstandard is not None else "zlib"
+
+# File header: magic, codec id, padding. Footer: metadata offset, magic.
+_FILE_HEADER = struct.Struct("<8sB7x")
+_FOOTER = struct.Struct("<Q8s")
+# Frame header: tag, encoding, dtype code, count, payload length.
+_FRAME_HEADER = struct.Struct("<BBBxQQ")
+
+_CODECS = {"zlib": 1, "zstd": 2}
+_CODEC_NAMES = {value: key for key, value in _CODECS.items()}
+
+TAG_X = 1
+TAG_EDGES = 2
+TAG_NODE_IDS = 3
+TAG_EDGE_WEIGHT = 4
+TAG_EDGE_COUNT = 5
+TAG_EDGE_KIND = 6
+TAG_META = 255
+
+# Optional per-edge tensors, stored column-aligned with edge_index.
+EDGE_ATTR_TAGS = {
+    "edge_weight": TAG_EDGE_WEIGHT,
+    "edge_count": TAG_EDGE_COUNT,
+    "edge_kind": TAG_EDGE_KIND,
+}
+
+# JSON-serializable bundle entries kept in compressed metadata and manifests.
+BUNDLE_METADATA_KEYS = ("edge_kinds", "stats", "fingerprint", "export_options")
+
+ENCODING_RAW = 0
+ENCODING_DELTA_SRC = 1
+
+_DTYPES = {0: np.float32, 1: np.int32, 2: np.int64, 3: np.float64}
+_DTYPE_CODES = {np.dtype(value): key for key, value in _DTYPES.items()}
+_DTYPE_UTF8 = 255
+
+_INT32_MAX = np.iinfo(np.int32).max
+
+
+class CompressedBundleWriter:
+    """
+    Stream a TensorBundle to disk as independently compressed chunks.
+
+    Feature rows, edge chunks and node ids can be written in any order and in
+    any number of calls; only the chunk being written is held in memory.
+    Edge indices are downcast to int32 when they fit and sorted source rows are
+    delta-encoded. Call ``close`` (or use as a context manager) to finalize.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        codec: Optional[str] = None,
+        level: int = 3,
+    ):
+        codec = codec or DEFAULT_CODEC
+        if codec not in _CODECS:
+            raise ValueError(f"codec must be one of {sorted(_CODECS)}, got {codec!r}")
+        if codec == "zstd" and zstandard is None:
+            raise ValueError("codec 'zstd' requires the zstandard package.")
+
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.codec = codec
+        self._compress = _make_compressor(codec, level)
+        self._handle: Optional[BinaryIO] = open(self.path, "wb")
+        self._handle.write(_FILE_HEADER.pack(MAGIC, _CODECS[codec]))
+
+        self.num_nodes = 0
+        self.num_features: Optional[int] = None
+        self.x_dtype: Optional[str] = None
+        self.num_edges = 0
+        self.edge_dtype: Optional[str] = None
+        self.num_node_ids = 0
+        self.edge_attrs: Dict[str, Dict[str, Any]] = {}
+        self.edges_sorted = True
+        self._last_src: Optional[int] = None
+
+    def write_x(self, rows: torch.Tensor) -> None:
+        """Append feature rows."""
+        array = _to_numpy(rows)
+        if array.ndim == 1:
+            array = array.reshape(-1, 1)
+        if self.num_features is None:
+            self.num_features = int(array.shape[1])
+            self.x_dtype = str(array.dtype)
+        elif array.shape[1] != self.num_features or str(array.dtype) != self.x_dtype:
+            raise ValueError("All feature chunks must share width and dtype.")
+        self._write_frame(TAG_X, ENCODING_RAW, _dtype_code(array.dtype), array.shape[0], array)
+        self.num_nodes += int(array.shape[0])
+
+    def write_edges(self, edge_index: torch.Tensor) -> None:
+        """Append a [2, n] chunk of edge columns."""
+        array = _to_numpy(edge_index)
+        if array.ndim != 2 or array.shape[0] != 2:
+            raise ValueError("edge chunks must have shape [2, n].")
+        if self.edge_dtype is None:
+            self.edge_dtype = str(array.dtype)
+        elif str(array.dtype) != self.edge_dtype:
+            raise ValueError("All edge chunks must share a dtype.")
+        count = int(array.shape[1])
+        if count == 0:
+            return
+
+        src, dst = array[0], array[1]
+        index_dtype = np.int32 if _fits_int32(array) else np.int64
+        src_sorted = bool(np.all(src[1:] >= src[:-1]))
+        if src_sorted:
+            # Sources of sorted edge lists repeat a lot; deltas compress far better.
+            payload_src = np.diff(src, prepend=src.dtype.type(0)).astype(index_dtype)
+            encoding = ENCODING_DELTA_SRC
+        else:
+            payload_src = src.astype(index_dtype, copy=False)
+            encoding = ENCODING_RAW
+
+        if not src_sorted or (self._last_src is not None and int(src[0]) < self._last_src):
+            self.edges_sorted = False
+        self._last_src = int(src[-1])
+
+        payload = payload_src.tobytes() + dst.astype(index_dtype, copy=False).tobytes()
+        self._write_frame(TAG_EDGES, encoding, _dtype_code(np.dtype(index_dtype)), count, payload)
+        self.num_edges += count
+
+    def write_edge_attr(self, name: str, values: torch.Tensor) -> None:
+        """Append values of an optional per-edge tensor (edge_weight, edge_count, edge_kind)."""
+        if name not in EDGE_ATTR_TAGS:
+            raise ValueError(f"edge attribute must be one of {sorted(EDGE_ATTR_TAGS)}")
+        array = _to_numpy(values).reshape(-1)
+        if array.size == 0:
+            return
+        if np.issubdtype(array.dtype, np.integer) and _fits_int32(array):
+            array = array.astype(np.int32, copy=False)
+        dtype_name = str(values.dtype).replace("torch.", "")
+        info = self.edge_attrs.setdefault(name, {"count": 0, "dtype": dtype_name})
+        self._write_frame(
+            EDGE_ATTR_TAGS[name], ENCODING_RAW, _dtype_code(array.dtype), array.size, array
+        )
+        info["count"] += int(array.size)
+
+    def write_node_ids(self, node_ids: Sequence[str]) -> None:
+        """Append node ids; the i-th id written owns row i of x."""
+        if not node_ids:
+            return
+        for node_id in node_ids:
+            if "\n" in node_id:
+                raise ValueError("node ids must not contain newlines.")
+        payload = "\n".join(node_ids).encode("utf-8")
+        self._write_frame(TAG_NODE_IDS, ENCODING_RAW, _DTYPE_UTF8, len(node_ids), payload)
+        self.num_node_ids += len(node_ids)
+
+    def close(self, extra: Optional[Dict[str, Any]] = None) -> Path:
+        """Write metadata and the footer, then close the file."""
+        if self._handle is None:
+            return self.path
+        if self.num_node_ids and self.num_node_ids != self.num_nodes:
+            raise ValueError(
+                f"Wrote {self.num_node_ids} node ids for {self.num_nodes} feature rows."
+            )
+        for name, info in self.edge_attrs.items():
+            if info["count"] != self.num_edges:
+                raise ValueError(
+                    f"Wrote {info['count']} {name} values for {self.num_edges} edges."
+                )
+        meta = {
+            "format_version": FORMAT_VERSION,
+            "codec": self.codec,
+            "num_nodes": self.num_nodes,
+            "num_features": self.num_features or 0,
+            "x_dtype": self.x_dtype or "float32",
+            "num_edges": self.num_edges,
+            "edge_dtype": self.edge_dtype or "int64",
+            "edges_sorted": self.edges_sorted,
+            "has_node_ids": self.num_node_ids > 0,
+            "edge_attrs": {name: info["dtype"] for name, info in self.edge_attrs.items()},
+            "extra": extra or {},
+        }
+        meta_offset = self._handle.tell()
+        payload = json.dumps(meta, sort_keys=True).encode("utf-8")
+        self._handle.write(
+            _FRAME_HEADER.pack(TAG_META, ENCODING_RAW, _DTYPE_UTF8, 1, len(payload))
+        )
+        self._handle.write(payload)
+        self._handle.write(_FOOTER.pack(meta_offset, MAGIC))
+        self._handle.close()
+        self._handle = None
+        return self.path
+
+    def abort(self) -> None:
+        """Close and delete a partially written file."""
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+        if self.path.exists():
+            os.remove(self.path)
+
+    def __enter__(self) -> "CompressedBundleWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def _write_frame(
+        self, tag: int, encoding: int, dtype_code: int, count: int, data: Any
+    ) -> None:
+        if self._handle is None:
+            raise ValueError("Writer is closed.")
+        raw = data if isinstance(data, bytes) else np.ascontiguousarray(data).tobytes()
+        payload = self._compress(raw)
+        self._handle.write(_FRAME_HEADER.pack(tag, encoding, dtype_code, count, len(payload)))
+        self._handle.write(payload)
+
+
+class CompressedBundleReader:
+    """Read a compressed bundle chunk by chunk."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        if not self.path.exists():
+            raise FileNotFoundError(f"Bundle file not found: {self.path}")
+        self._handle: Optional[BinaryIO] = open(self.path, "rb")
+        magic, codec_id = _FILE_HEADER.unpack(self._handle.read(_FILE_HEADER.size))
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"Not a compressed bundle: {self.path}")
+        self.codec = _CODEC_NAMES.get(codec_id)
+        if self.codec is None:
+            self.close()
+            raise ValueError(f"Unknown codec id {codec_id} in {self.path}")
+        self._decompress = _make_decompressor(self.codec)
+
+        self._handle.seek(-_FOOTER.size, os.SEEK_END)
+        self._meta_offset, footer_magic = _FOOTER.unpack(self._handle.read(_FOOTER.size))
+        if footer_magic != MAGIC:
+            self.close()
+            raise ValueError(f"Truncated compressed bundle: {self.path}")
+        self._handle.seek(self._meta_offset)
+        _, _, _, _, length = _FRAME_HEADER.unpack(self._handle.read(_FRAME_HEADER.size))
+        self.meta: Dict[str, Any] = json.loads(self._handle.read(length).decode("utf-8"))
+
+    @property
+    def num_nodes(self) -> int:
+        return int(self.meta["num_nodes"])
+
+    @property
+    def num_edges(self) -> int:
+        return int(self.meta["num_edges"])
+
+    @property
+    def edge_dtype(self) -> str:
+        """dtype edge_index was written with; bundles predating the field read back as int64."""
+        return self.meta.get("edge_dtype", "int64")
+
+    def iter_x_chunks(self) -> Iterator[torch.Tensor]:
+        """Yield feature row chunks in file order."""
+        width = int(self.meta["num_features"])
+        for _, dtype_code, count, raw in self._iter_frames(TAG_X):
+            array = np.frombuffer(raw, dtype=_DTYPES[dtype_code]).reshape(count, width)
+            yield torch.from_numpy(array.copy())
+
+    def iter_edge_chunks(self) -> Iterator[torch.Tensor]:
+        """Yield [2, n] int64 edge chunks in file order."""
+        for encoding, dtype_code, count, raw in self._iter_frames(TAG_EDGES):
+            yield torch.from_numpy(_decode_edges(raw, encoding, dtype_code, count))
+
+    def iter_node_id_chunks(self) -> Iterator[List[str]]:
+        """Yield lists of node ids in row order."""
+        for _, _, _, raw in self._iter_frames(TAG_NODE_IDS):
+            yield raw.decode("utf-8").split("\n")
+
+    def read(self, compact_ids: bool = False) -> TensorBundle:
+        """
+        Load the whole bundle, filling preallocated tensors chunk by chunk.
+
+        With ``compact_ids`` the node ids become a ``NodeIdIndex`` parsed
+        straight from the id frames, without building Python strings.
+        """
+        num_nodes = self.num_nodes
+        width = int(self.meta["num_features"])
+        x = torch.empty((num_nodes, width), dtype=_torch_dtype(self.meta["x_dtype"]))
+        edge_index = torch.empty((2, self.num_edges), dtype=_torch_dtype(self.edge_dtype))
+        x_view = x.numpy()
+        edge_view = edge_index.numpy()
+        node_to_idx: Dict[str, int] = {}
+        id_chunks: List[np.ndarray] = []
+        row = 0
+        id_row = 0
+        column = 0
+        attr_names = {tag: name for name, tag in EDGE_ATTR_TAGS.items()}
+        edge_attrs = {
+            name: torch.empty(self.num_edges, dtype=_torch_dtype(dtype_name))
+            for name, dtype_name in self.meta.get("edge_attrs", {}).items()
+        }
+        attr_offsets = {name: 0 for name in edge_attrs}
+
+        for tag, encoding, dtype_code, count, raw in self._iter_frames(None):
+            if tag == TAG_X:
+                chunk = np.frombuffer(raw, dtype=_DTYPES[dtype_code]).reshape(count, width)
+                x_view[row : row + count] = chunk
+                row += count
+            elif tag == TAG_EDGES:
+                edge_view[:, column : column + count] = _decode_edges(
+                    raw, encoding, dtype_code, count
+                )
+                column += count
+            elif tag == TAG_NODE_IDS and compact_ids:
+                id_chunks.append(split_id_lines(raw, count))
+            elif tag == TAG_NODE_IDS:
+                node_to_idx.update(zip(raw.decode("utf-8").split("\n"), range(id_row, id_row + count)))
+                id_row += count
+            elif tag in attr_names and attr_names[tag] in edge_attrs:
+                name = attr_names[tag]
+                start = attr_offsets[name]
+                edge_attrs[name].numpy()[start : start + count] = np.frombuffer(
+                    raw, dtype=_DTYPES[dtype_code]
+                )
+                attr_offsets[name] = start + count
+
+        node_mapping: Mapping[str, int]
+        if compact_ids:
+            width = max((chunk.dtype.itemsize for chunk in id_chunks), default=1)
+            node_mapping = NodeIdIndex.from_ids(
+                np.concatenate([chunk.astype(f"S{width}") for chunk in id_chunks])
+                if id_chunks
+                else np.empty(0, dtype="S1")
+            )
+        else:
+            node_mapping = node_to_idx
+        bundle: TensorBundle = {
+            "x": x,
+            "edge_index": edge_index,
+            "node_mapping": node_mapping,
+        }
+        for name, values in edge_attrs.items():
+            bundle[name] = values  # type: ignore[literal-required]
+        if "edge_kinds" in self.meta.get("extra", {}):
+            bundle["edge_kinds"] = list(self.meta["extra"]["edge_kinds"])
+        for name in ("stats", "fingerprint", "export_options"):
+            if name in self.meta.get("extra", {}):
+                bundle[name] = self.meta["extra"][name]  # type: ignore[literal-required]
+        return bundle
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+    def __enter__(self) -> "CompressedBundleReader":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def _iter_frames(
+        self, wanted_tag: Optional[int]
+    ) -> Iterator[Tuple[Any, ...]]:
+        """Walk frames between the header and metadata, decompressing matches only."""
+        if self._handle is None:
+            raise ValueError("Reader is closed.")
+        offset = _FILE_HEADER.size
+        while offset < self._meta_offset:
+            self._handle.seek(offset)
+            tag, encoding, dtype_code, count, length = _FRAME_HEADER.unpack(
+                self._handle.read(_FRAME_HEADER.size)
+            )
+            offset += _FRAME_HEADER.size + length
+            if wanted_tag is not None and tag != wanted_tag:
+                continue
+            raw = self._decompress(self._handle.read(length))
+            if wanted_tag is None:
+                yield tag, encoding, dtype_code, count, raw
+            else:
+                yield encoding, dtype_code, count, raw
+
+
+def write_compressed_bundle(
+    bundle: TensorBundle,
+    output_path: Union[str, Path],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    codec: Optional[str] = None,
+    level: int = 3,
+) -> Path:
+    """Persist a TensorBundle in the chunked compressed format."""
+    x = bundle["x"]
+    edge_index = bundle["edge_index"]
+    with CompressedBundleWriter(output_path, codec=codec, level=level) as writer:
+        for start in range(0, x.shape[0], chunk_size):
+            writer.write_x(x[start : start + chunk_size])
+        for start in range(0, edge_index.shape[1], chunk_size):
+            writer.write_edges(edge_index[:, start : start + chunk_size])
+        for name in EDGE_ATTR_TAGS:
+            values = bundle.get(name)
+            if values is None:
+                continue
+            for start in range(0, values.shape[0], chunk_size):
+                writer.write_edge_attr(name, values[start : start + chunk_size])
+        ordered_ids = _ids_in_index_order(bundle["node_mapping"])
+        for start in range(0, len(ordered_ids), chunk_size):
+            writer.write_node_ids(ordered_ids[start : start + chunk_size])
+        extra: Dict[str, Any] = {}
+        if "edge_kinds" in bundle:
+            extra["edge_kinds"] = list(bundle["edge_kinds"])
+        for name in ("stats", "fingerprint", "export_options"):
+            if name in bundle:
+                extra[name] = bundle[name]  # type: ignore[literal-required]
+        writer.close(extra=extra or None)
+    return Path(output_path)
+
+
+def read_compressed_bundle(path: Union[str, Path], compact_ids: bool = False) -> TensorBundle:
+    """Load a bundle written by ``write_compressed_bundle``."""
+    with CompressedBundleReader(path) as reader:
+        return reader.read(compact_ids=compact_ids)
+
+
+def is_compressed_bundle(path: Union[str, Path]) -> bool:
+    """Check the magic bytes without reading the payload."""
+    with open(path, "rb") as handle:
+        return handle.read(len(MAGIC)) == MAGIC
+
+
+def load_tensor_bundle(bundle_path: Union[str, Path], compact_ids: bool = False) -> TensorBundle:
+    """
+    Load a TensorBundle from a pickle or compressed bundle file.
+
+    ``compact_ids`` returns "node_mapping" as a ``NodeIdIndex`` (see
+    ``components.node_index``) instead of a dict. Pickles that already hold
+    one load it as is.
+    """
+    path = Path(bundle_path)
+    if not path.exists():
+        raise FileNotFoundError(f"Bundle file not found: {bundle_path}")
+
+    if is_compressed_bundle(path):
+        bundle = read_compressed_bundle(path, compact_ids=compact_ids)
+    else:
+        with open(path, "rb") as f:
+            bundle = pickle.load(f)
+
+    # Validate bundle structure
+    if not isinstance(bundle, dict):
+        raise ValueError("Bundle must be a dictionary")
+
+    required_keys = {"x", "edge_index", "node_mapping"}
+    if not required_keys.issubset(bundle.keys()):
+        raise ValueError(f"Bundle missing required keys: {required_keys - bundle.keys()}")
+
+    if compact_ids and not isinstance(bundle["node_mapping"], NodeIdIndex):
+        bundle["node_mapping"] = NodeIdIndex.from_mapping(bundle["node_mapping"])
+    return bundle
+
+
+def read_bundle_metadata(bundle_path: Union[str, Path]) -> Dict[str, Any]:
+    """
+    Return the non-tensor entries ("edge_kinds", "stats", "fingerprint",
+    "export_options") stored with an exported bundle.
+
+    Compressed bundles and shard directories are answered from their metadata
+    without touching tensor data; pickles must be loaded in full. Returns an
+    empty dict when the bundle is missing.
+    """
+    path = Path(bundle_path)
+    if path.is_dir():
+        if not (path / MANIFEST_FILENAME).exists():
+            return {}
+        payload = load_shard_manifest(path)
+    elif not path.exists():
+        return {}
+    elif is_compressed_bundle(path):
+        with CompressedBundleReader(path) as reader:
+            payload = reader.meta.get("extra", {})
+    else:
+        payload = load_tensor_bundle(path)
+    return {name: payload[name] for name in BUNDLE_METADATA_KEYS if name in payload}
+
+
+def read_bundle_fingerprint(bundle_path: Union[str, Path]) -> Optional[SnapshotFingerprint]:
+    """
+    Return the snapshot fingerprint stored with an exported bundle, or None
+    when the bundle is missing or predates fingerprints.
+    """
+    payload = read_bundle_metadata(bundle_path).get("fingerprint")
+    return SnapshotFingerprint.from_dict(payload) if payload else None
+
+
+def _ids_in_index_order(node_mapping: Mapping[str, int]) -> List[str]:
+    if isinstance(node_mapping, NodeIdIndex):
+        return node_mapping.ids()
+    ordered: List[Optional[str]] = [None] * len(node_mapping)
+    for node_id, index in node_mapping.items():
+        ordered[index] = str(node_id)
+    if any(node_id is None for node_id in ordered):
+        raise ValueError("node_mapping indices must be exactly 0..N-1.")
+    return ordered  # type: ignore[return-value]
+
+
+def _decode_edges(raw: bytes, encoding: int, dtype_code: int, count: int) -> np.ndarray:
+    values = np.frombuffer(raw, dtype=_DTYPES[dtype_code])
+    decoded = np.empty((2, count), dtype=np.int64)
+    if encoding == ENCODING_DELTA_SRC:
+        np.cumsum(values[:count], dtype=np.int64, out=decoded[0])
+    else:
+        decoded[0] = values[:count]
+    decoded[1] = values[count:]
+    return decoded
+
+
+def _to_numpy(tensor: torch.Tensor) -> np.ndarray:
+    return tensor.detach().cpu().contiguous().numpy()
+
+
+def _fits_int32(array: np.ndarray) -> bool:
+    if array.size == 0:
+        return True
+    return int(array.max()) <= _INT32_MAX and int(array.min()) >= -_INT32_MAX
+
+
+def _dtype_code(dtype: np.dtype) -> int:
+    try:
+        return _DTYPE_CODES[np.dtype(dtype)]
+    except KeyError:
+        raise ValueError(f"Unsupported dtype for compressed bundles: {dtype}") from None
+
+
+def _torch_dtype(name: str) -> torch.dtype:
+    return torch.from_numpy(np.empty(0, dtype=np.dtype(name))).dtype
+
+
+def _make_compressor(codec: str, level: int):
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=level).compress
+    return lambda data: zlib.compress(data, level)
+
+
+def _make_decompressor(codec: str):
+    if codec == "zstd":
+        if zstandard is None:
+            raise ValueError("Reading zstd bundles requires the zstandard package.")
+        return zstandard.ZstdDecompressor().decompress
+    return zlib.decompress
@@ -0,0 +1,345 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import matplotlib.pyplot as plt
+import numpy as np
+import psycopg2
+import torch
+from psycopg2 import sql
+from psycopg2.extras import RealDictCursor
+from sklearn.cluster import MiniBatchKMeans
+
+from .materializer import DEFAULT_NODES_TABLE, _connect
+from .tsne_viz import compute_tsne_projection, create_scatter_plot
+
+if TYPE_CHECKING:
+    from .connection_pool import ConnectionPool
+
+FUNCTION_KINDS = ("Function",)
+
+Groups = Tuple[torch.Tensor, List[str]]
+
+
+@dataclass
+class NodeHierarchy:
+    """Per-node file path, kind and AST parent, keyed by node id."""
+    file_path: Dict[str, Optional[str]] = field(default_factory=dict)
+    kind: Dict[str, Optional[str]] = field(default_factory=dict)
+    parent: Dict[str, Optional[str]] = field(default_factory=dict)
+
+    @classmethod
+    def from_nodes(cls, nodes: Iterable) -> "NodeHierarchy":
+        """
+        Read file paths and kinds from SnapshotNode records.
+
+        Materialized nodes carry no parent ids; use ``fetch_node_hierarchy``
+        to group by enclosing function.
+        """
+        hierarchy = cls()
+        for node in nodes:
+            properties = getattr(node, "properties", None) or {}
+            node_id = str(node.id)
+            hierarchy.file_path[node_id] = properties.get("filePath")
+            hierarchy.kind[node_id] = node.kind
+            hierarchy.parent[node_id] = properties.get("parentId")
+        return hierarchy
+
+
+@dataclass
+class CoarseGraph:
+    """
+    Super-nodes pooled from node embeddings.
+
+    ``nodes`` are the global rows covered (all rows at the top level, one
+    cluster's members after ``drill_down``); ``assignment[i]`` is the
+    super-node of ``nodes[i]``. ``edge_index``/``edge_weight`` count the
+    edges between super-nodes when node edges were given.
+    """
+    embeddings: torch.Tensor
+    sizes: torch.Tensor
+    names: List[str]
+    assignment: torch.Tensor
+    nodes: torch.Tensor
+    edge_index: Optional[torch.Tensor] = None
+    edge_weight: Optional[torch.Tensor] = None
+
+    @property
+    def num_clusters(self) -> int:
+        return int(self.sizes.numel())
+
+    def members(self, cluster: int) -> torch.Tensor:
+        """Global rows of the nodes pooled into ``cluster``."""
+        return self.nodes[self.assignment == cluster]
+
+    def cluster_of(self, name: str) -> int:
+        return self.names.index(name)
+
+    def pool_labels(self, labels: Union[np.ndarray, torch.Tensor]) -> np.ndarray:
+        """Most common per-node label of every super-node (ties pick the lowest)."""
+        labels = np.asarray(labels)[self.nodes.numpy()].astype(np.int64)
+        num_labels = int(labels.max()) + 1 if labels.size else 1
+        counts = np.bincount(
+            self.assignment.numpy() * num_labels + labels,
+            minlength=self.num_clusters * num_labels,
+        ).reshape(self.num_clusters, num_labels)
+        return counts.argmax(axis=1)
+
+    def drill_down(
+        self,
+        cluster: int,
+        embeddings: torch.Tensor,
+        groups: Optional[Groups] = None,
+        edge_index: Optional[torch.Tensor] = None,
+        edge_weight: Optional[torch.Tensor] = None,
+    ) -> "CoarseGraph":
+        """
+        Expand one super-node.
+
+        Without ``groups`` every member becomes its own point. With a finer
+        grouping over all rows (e.g. functions inside a file cluster), the
+        members are pooled by it instead, giving the next level down.
+        """
+        members = self.members(cluster)
+        if groups is None:
+            assignment = torch.arange(members.numel())
+            names = [str(int(row)) for row in members]
+        else:
+            assignment, names = groups[0][members], groups[1]
+        return coarsen(embeddings, assignment, names, edge_index, edge_weight, nodes=members)
+
+
+def coarsen(
+    embeddings: torch.Tensor,
+    assignment: torch.Tensor,
+    names: Optional[Sequence[str]] = None,
+    edge_index: Optional[torch.Tensor] = None,
+    edge_weight: Optional[torch.Tensor] = None,
+    nodes: Optional[torch.Tensor] = None,
+) -> CoarseGraph:
+    """
+    Mean-pool node embeddings into super-nodes.
+
+    ``assignment`` gives a group id per row of ``nodes`` (default: all rows
+    of ``embeddings``); ids that no node uses are dropped and the rest are
+    renumbered in ascending order, keeping ``names`` aligned. Edges with both
+    endpoints covered become weighted super-node edges; edges inside one
+    super-node are dropped.
+    """
+    num_nodes = embeddings.shape[0]
+    nodes = torch.arange(num_nodes) if nodes is None else nodes.long()
+    assignment = assignment.long()
+    if assignment.numel() != nodes.numel():
+        raise ValueError(
+            f"assignment has {assignment.numel()} entries for {nodes.numel()} nodes."
+        )
+
+    used, assignment = torch.unique(assignment, return_inverse=True)
+    num_clusters = used.numel()
+    if names is None:
+        names = [str(int(group)) for group in used]
+    else:
+        names = [names[int(group)] for group in used]
+
+    values = embeddings[nodes].float()
+    sizes = torch.bincount(assignment, minlength=num_clusters)
+    pooled = torch.zeros((num_clusters, values.shape[1]), dtype=values.dtype)
+    pooled.index_add_(0, assignment, values)
+    pooled /= sizes.clamp(min=1).to(values.dtype).view(-1, 1)
+
+    coarse = CoarseGraph(pooled, sizes, names, assignment, nodes)
+    if edge_index is not None:
+        cluster_of_row = torch.full((num_nodes,), -1, dtype=torch.long)
+        cluster_of_row[nodes] = assignment
+        src = cluster_of_row[edge_index[0]]
+        dst = cluster_of_row[edge_index[1]]
+        keep = (src >= 0) & (dst >= 0) & (src != dst)
+        if edge_weight is not None:
+            weight = edge_weight[keep].float()
+        else:
+            weight = torch.ones(int(keep.sum()))
+        keys, inverse = torch.unique(
+            src[keep] * num_clusters + dst[keep], return_inverse=True
+        )
+        coarse.edge_index = torch.stack([keys // num_clusters, keys % num_clusters])
+        coarse.edge_weight = torch.zeros(keys.numel()).index_add_(0, inverse, weight)
+    return coarse
+
+
+def groups_by_file(node_to_idx: Mapping[str, int], hierarchy: NodeHierarchy) -> Groups:
+    """One group per file path; nodes without a file share the "" group."""
+    rows, files = _rows_and(node_to_idx, hierarchy.file_path)
+    names = sorted({path or "" for path in files})
+    group_of = {name: group for group, name in enumerate(names)}
+    assignment = torch.empty(len(node_to_idx), dtype=torch.long)
+    assignment[torch.tensor(rows, dtype=torch.long)] = torch.tensor(
+        [group_of[path or ""] for path in files], dtype=torch.long
+    )
+    return assignment, names
+
+
+def groups_by_function(
+    node_to_idx: Mapping[str, int],
+    hierarchy: NodeHierarchy,
+    function_kinds: Sequence[str] = FUNCTION_KINDS,
+) -> Groups:
+    """
+    Group nodes under their innermost enclosing function.
+
+    A function node belongs to its own group. Nodes outside every function
+    (imports, module-level statements) are grouped by file. Names are
+    ``"<file>#<function id>"`` and ``"<file>"``.
+    """
+    num_nodes = len(node_to_idx)
+    rows, parents = _rows_and(node_to_idx, hierarchy.parent)
+    # Row num_nodes is a sentinel "no function" parent that points at itself.
+    parent = torch.full((num_nodes + 1,), num_nodes, dtype=torch.long)
+    parent[torch.tensor(rows, dtype=torch.long)] = torch.tensor(
+        [node_to_idx.get(p, num_nodes) if p is not None else num_nodes for p in parents],
+        dtype=torch.long,
+    )
+    _, kinds = _rows_and(node_to_idx, hierarchy.kind)
+    is_function = torch.zeros(num_nodes + 1, dtype=torch.bool)
+    is_function[torch.tensor(rows, dtype=torch.long)] = torch.tensor(
+        [kind in function_kinds for kind in kinds], dtype=torch.bool
+    )
+    is_function[num_nodes] = True
+
+    # Pointer jumping: owner converges to the nearest function ancestor (or
+    # the sentinel) in O(log depth) vectorized steps.
+    owner = torch.where(is_function, torch.arange(num_nodes + 1), parent)
+    while True:
+        jumped = owner[owner]
+        if torch.equal(jumped, owner):
+            break
+        owner = jumped
+    owner = owner[:num_nodes]
+
+    file_groups, file_names = groups_by_file(node_to_idx, hierarchy)
+    ids = _ids_by_row(node_to_idx)
+    # A parent cycle without a function leaves owner on a non-function node.
+    in_function = (owner < num_nodes) & is_function[owner]
+    function_rows = torch.unique(owner[in_function])
+    names = file_names + [
+        f"{file_names[int(file_groups[row])]}#{ids[int(row)]}" for row in function_rows
+    ]
+    group_of_function = torch.full((num_nodes,), -1, dtype=torch.long)
+    group_of_function[function_rows] = len(file_names) + torch.arange(function_rows.numel())
+    assignment = torch.where(
+        in_function, group_of_function[owner.clamp(max=num_nodes - 1)], file_groups
+    )
+    return assignment, names
+
+
+def groups_by_kmeans(
+    embeddings: torch.Tensor,
+    num_clusters: int,
+    batch_size: int = 4096,
+    seed: int = 42,
+) -> Groups:
+    """Cluster embeddings with mini-batch k-means (one pass over the data per iteration)."""
+    num_clusters = min(num_clusters, embeddings.shape[0])
+    kmeans = MiniBatchKMeans(
+        n_clusters=num_clusters, batch_size=batch_size, random_state=seed, n_init=3
+    )
+    labels = kmeans.fit_predict(embeddings.detach().cpu().float().numpy())
+    return torch.from_numpy(labels.astype(np.int64)), [f"cluster {i}" for i in range(num_clusters)]
+
+
+def fetch_node_hierarchy(
+    snapshot_id: str,
+    dsn: Optional[str] = None,
+    nodes_table: Optional[str] = None,
+    pool: Optional["ConnectionPool"] = None,
+) -> NodeHierarchy:
+    """Load id, type, parentId and filePath of every node in a snapshot."""
+    query = sql.SQL(
+        "SELECT {id}, {type}, {parent}, {file} FROM {table} WHERE {snapshot} = %s"
+    ).format(
+        id=sql.Identifier("id"),
+        type=sql.Identifier("type"),
+        parent=sql.Identifier("parentId"),
+        file=sql.Identifier("filePath"),
+        table=sql.Identifier(nodes_table or DEFAULT_NODES_TABLE),
+        snapshot=sql.Identifier("snapshotId"),
+    )
+
+    def run(conn: psycopg2.extensions.connection) -> NodeHierarchy:
+        hierarchy = NodeHierarchy()
+        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            cursor.execute(query, (snapshot_id,))
+            for row in cursor.fetchall():
+                node_id = str(row["id"])
+                parent = row.get("parentId")
+                hierarchy.file_path[node_id] = row.get("filePath")
+                hierarchy.kind[node_id] = row.get("type")
+                hierarchy.parent[node_id] = str(parent) if parent is not None else None
+        return hierarchy
+
+    if pool is not None:
+        with pool.connection() as conn:
+            return run(conn)
+    conn = _connect(dsn)
+    try:
+        return run(conn)
+    finally:
+        conn.close()
+
+
+def visualize_coarse_graph(
+    coarse: CoarseGraph,
+    labels: Optional[np.ndarray] = None,
+    title: str = "t-SNE Projection of Coarsened Embeddings",
+    save_path: Optional[Union[str, Path]] = None,
+    show: bool = False,
+    alpha: float = 0.6,
+    max_point_size: int = 400,
+    **tsne_kwargs,
+) -> Tuple[np.ndarray, plt.Figure]:
+    """
+    Project super-nodes with t-SNE; point area grows with cluster size.
+
+    ``labels`` are per-node labels, pooled to each super-node's majority.
+    """
+    projection = compute_tsne_projection(coarse.embeddings, **tsne_kwargs)
+    sizes = coarse.sizes.float()
+    point_sizes = (10 + (max_point_size - 10) * (sizes / sizes.max()).sqrt()).numpy()
+    fig = create_scatter_plot(
+        projection,
+        labels=coarse.pool_labels(labels) if labels is not None else None,
+        title=title,
+        save_path=save_path,
+        alpha=alpha,
+        s=point_sizes,
+    )
+    if show:
+        plt.show()
+    return projection, fig
+
+
+def _rows_and(
+    node_to_idx: Mapping[str, int], values: Mapping[str, Optional[str]]
+) -> Tuple[List[int], List[Optional[str]]]:
+    rows: List[int] = []
+    found: List[Optional[str]] = []
+    for node_id, row in node_to_idx.items():
+        rows.append(row)
+        found.append(values.get(node_id))
+    return rows, found
+
+
+def _ids_by_row(node_to_idx: Mapping[str, int]) -> List[str]:
+    ids = [""] * len(node_to_idx)
+    for node_id, row in node_to_idx.items():
+        ids[row] = node_id
+    return ids
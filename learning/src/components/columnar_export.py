@@ -0,0 +1,412 @@
+import itertools
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Union
+
+import numpy as np
+import psycopg2
+from psycopg2 import sql
+from psycopg2.extras import RealDictCursor
+
+from .materializer import DEFAULT_EDGES_TABLE, DEFAULT_NODES_TABLE, _connect, _stable_json
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    pq = None
+
+if TYPE_CHECKING:
+    from .connection_pool import ConnectionPool
+
+PARQUET = "parquet"
+ARROW = "arrow"
+FORMAT_SUFFIXES = {PARQUET: ".parquet", ARROW: ".arrow"}
+DEFAULT_ROW_GROUP_SIZE = 65536
+
+NODE_DICTIONARY_COLUMNS = ("kind", "label", "filePath")
+EDGE_DICTIONARY_COLUMNS = ("kind", "filePath")
+
+_cursor_ids = itertools.count()
+
+
+@dataclass(frozen=True)
+class ColumnarExport:
+    """Paths and row counts of a columnar snapshot export."""
+    nodes_path: Path
+    edges_path: Path
+    num_nodes: int
+    num_edges: int
+
+
+@dataclass
+class ColumnArrays:
+    """
+    NumPy views of selected columns.
+
+    Dictionary-encoded columns hold int32 codes into ``dictionaries[name]``;
+    ``decode`` turns them back into strings.
+    """
+    arrays: Dict[str, np.ndarray]
+    dictionaries: Dict[str, List[str]]
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.arrays[name]
+
+    def decode(self, name: str) -> np.ndarray:
+        vocabulary = np.asarray(self.dictionaries[name], dtype=object)
+        return vocabulary[self.arrays[name]]
+
+
+def node_schema() -> "pa.Schema":
+    _require_pyarrow()
+    return pa.schema(
+        [
+            pa.field("index", pa.int64(), nullable=False),
+            pa.field("id", pa.string(), nullable=False),
+            pa.field("kind", _dictionary_type(), nullable=False),
+            pa.field("label", _dictionary_type(), nullable=False),
+            pa.field("filePath", _dictionary_type(), nullable=False),
+            pa.field("data", pa.string()),
+            pa.field("location", pa.string()),
+        ]
+    )
+
+
+def edge_schema() -> "pa.Schema":
+    _require_pyarrow()
+    return pa.schema(
+        [
+            pa.field("src", pa.int64(), nullable=False),
+            pa.field("dst", pa.int64(), nullable=False),
+            pa.field("fromId", pa.string(), nullable=False),
+            pa.field("toId", pa.string(), nullable=False),
+            pa.field("kind", _dictionary_type(), nullable=False),
+            pa.field("filePath", _dictionary_type(), nullable=False),
+            pa.field("id", pa.string()),
+            pa.field("version", pa.int64()),
+        ]
+    )
+
+
+def export_snapshot_columnar(
+    snapshot_id: str,
+    output_dir: Union[str, Path],
+    output_format: str = PARQUET,
+    dsn: Optional[str] = None,
+    nodes_table: Optional[str] = None,
+    edges_table: Optional[str] = None,
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+    pool: Optional["ConnectionPool"] = None,
+) -> ColumnarExport:
+    """
+    Stream a snapshot from SQL into columnar ``nodes`` and ``edges`` files.
+
+    Rows are read through server-side cursors and written one row group (or
+    record batch) of ``row_group_size`` rows at a time, so memory holds one
+    batch plus the id-to-index map. ``output_format`` is "parquet" (zstd row
+    groups) or "arrow" (uncompressed IPC stream, readable through a memory
+    map without copies).
+
+    Nodes are written in ``id`` byte order, so their ``index`` column equals
+    ``create_node_mapping``; edges carry matching ``src``/``dst`` indices
+    (-1 for dangling endpoints). kind, label and filePath are
+    dictionary-encoded with missing values stored as "". data and location
+    are JSON strings.
+    """
+    _require_pyarrow()
+    if output_format not in FORMAT_SUFFIXES:
+        raise ValueError(
+            f"output_format must be one of {sorted(FORMAT_SUFFIXES)}, got {output_format!r}"
+        )
+    if row_group_size < 1:
+        raise ValueError("row_group_size must be positive.")
+    nodes_table = nodes_table or DEFAULT_NODES_TABLE
+    edges_table = edges_table or DEFAULT_EDGES_TABLE
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    suffix = FORMAT_SUFFIXES[output_format]
+    nodes_path = output_dir / f"nodes{suffix}"
+    edges_path = output_dir / f"edges{suffix}"
+
+    def run(conn: psycopg2.extensions.connection) -> ColumnarExport:
+        id_to_index: Dict[str, int] = {}
+        vocabularies = {name: _Vocabulary() for name in NODE_DICTIONARY_COLUMNS}
+        with _TableWriter(nodes_path, node_schema(), output_format) as writer:
+            batches = _stream_batches(conn, _columnar_node_query(nodes_table), snapshot_id, row_group_size)
+            for rows in batches:
+                writer.write(_node_batch(rows, id_to_index, vocabularies))
+
+        num_edges = 0
+        vocabularies = {name: _Vocabulary() for name in EDGE_DICTIONARY_COLUMNS}
+        with _TableWriter(edges_path, edge_schema(), output_format) as writer:
+            batches = _stream_batches(conn, _columnar_edge_query(edges_table), snapshot_id, row_group_size)
+            for rows in batches:
+                writer.write(_edge_batch(rows, id_to_index, vocabularies))
+                num_edges += len(rows)
+        return ColumnarExport(nodes_path, edges_path, len(id_to_index), num_edges)
+
+    if pool is not None:
+        with pool.connection() as conn:
+            return run(conn)
+    conn = _connect(dsn)
+    try:
+        return run(conn)
+    finally:
+        conn.close()
+
+
+def read_columnar_table(path: Union[str, Path], columns: Optional[Sequence[str]] = None) -> "pa.Table":
+    """
+    Load selected columns of a nodes/edges file as an Arrow table.
+
+    Arrow files are memory-mapped, so the table references the file pages
+    directly; Parquet row groups are decoded for the requested columns only.
+    """
+    _require_pyarrow()
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Columnar file not found: {path}")
+    if path.suffix == FORMAT_SUFFIXES[PARQUET]:
+        return pq.read_table(path, columns=list(columns) if columns else None, memory_map=True)
+    table = pa.ipc.open_stream(pa.memory_map(str(path), "r")).read_all()
+    return table.select(list(columns)) if columns else table
+
+
+def iter_columns(path: Union[str, Path], columns: Sequence[str]) -> Iterator[ColumnArrays]:
+    """
+    Yield ColumnArrays per row group (Parquet) or record batch (Arrow).
+
+    For Arrow files every array is a zero-copy view of the memory-mapped
+    file; string columns such as ``id`` become object arrays.
+    """
+    _require_pyarrow()
+    path = Path(path)
+    if path.suffix == FORMAT_SUFFIXES[PARQUET]:
+        parquet_file = pq.ParquetFile(path, memory_map=True)
+        for i in range(parquet_file.num_row_groups):
+            yield _to_column_arrays(parquet_file.read_row_group(i, columns=list(columns)))
+        return
+    for batch in pa.ipc.open_stream(pa.memory_map(str(path), "r")):
+        yield _to_column_arrays(pa.Table.from_batches([batch]).select(list(columns)))
+
+
+def read_columns(path: Union[str, Path], columns: Sequence[str]) -> ColumnArrays:
+    """
+    Load selected columns into NumPy.
+
+    Single-chunk Arrow columns come back as zero-copy views; several batches
+    or Parquet row groups are concatenated once, with dictionary codes
+    remapped onto one shared dictionary.
+    """
+    return _to_column_arrays(read_columnar_table(path, columns))
+
+
+class _Vocabulary:
+    """Grow a dictionary across batches so codes stay stable for the whole file."""
+
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def encode(self, values: Iterable[Optional[str]]) -> "pa.DictionaryArray":
+        codes = []
+        for value in values:
+            key = "" if value is None else str(value)
+            code = self.codes.get(key)
+            if code is None:
+                code = self.codes[key] = len(self.values)
+                self.values.append(key)
+            codes.append(code)
+        return pa.DictionaryArray.from_arrays(
+            pa.array(codes, type=pa.int32()), pa.array(self.values, type=pa.string())
+        )
+
+
+class _TableWriter:
+    """Append record batches to a Parquet file or an Arrow IPC stream, atomically."""
+
+    def __init__(self, path: Path, schema: "pa.Schema", output_format: str):
+        self.path = path
+        self.output_format = output_format
+        self._tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp{path.suffix}")
+        self._sink = None
+        if output_format == PARQUET:
+            self._writer = pq.ParquetWriter(str(self._tmp_path), schema, compression="zstd")
+        else:
+            self._sink = pa.OSFile(str(self._tmp_path), "wb")
+            # Dictionaries only grow, so later batches ship as deltas.
+            options = pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+            self._writer = pa.ipc.new_stream(self._sink, schema, options=options)
+
+    def write(self, batch: "pa.RecordBatch") -> None:
+        if self.output_format == PARQUET:
+            self._writer.write_table(pa.Table.from_batches([batch]), row_group_size=batch.num_rows)
+        else:
+            self._writer.write_batch(batch)
+
+    def __enter__(self) -> "_TableWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+        if exc_type is not None:
+            self._tmp_path.unlink(missing_ok=True)
+            return
+        self._tmp_path.replace(self.path)
+
+
+def _dictionary_type() -> "pa.DataType":
+    return pa.dictionary(pa.int32(), pa.string())
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise ImportError("pyarrow is required for columnar export. Install it with `pip install pyarrow`.")
+
+
+def _node_batch(
+    rows: List[Mapping[str, Any]],
+    id_to_index: Dict[str, int],
+    vocabularies: Dict[str, _Vocabulary],
+) -> "pa.RecordBatch":
+    start = len(id_to_index)
+    ids = [str(row["id"]) for row in rows]
+    for offset, node_id in enumerate(ids):
+        id_to_index[node_id] = start + offset
+    return pa.RecordBatch.from_arrays(
+        [
+            pa.array(np.arange(start, start + len(rows), dtype=np.int64)),
+            pa.array(ids, type=pa.string()),
+            vocabularies["kind"].encode(row.get("type") for row in rows),
+            vocabularies["label"].encode(row.get("originalType") for row in rows),
+            vocabularies["filePath"].encode(row.get("filePath") for row in rows),
+            pa.array([_json_or_none(row.get("data")) for row in rows], type=pa.string()),
+            pa.array([_json_or_none(row.get("location")) for row in rows], type=pa.string()),
+        ],
+        schema=node_schema(),
+    )
+
+
+def _edge_batch(
+    rows: List[Mapping[str, Any]],
+    id_to_index: Dict[str, int],
+    vocabularies: Dict[str, _Vocabulary],
+) -> "pa.RecordBatch":
+    sources = [str(row["fromId"]) for row in rows]
+    targets = [str(row["toId"]) for row in rows]
+    return pa.RecordBatch.from_arrays(
+        [
+            pa.array([id_to_index.get(node_id, -1) for node_id in sources], type=pa.int64()),
+            pa.array([id_to_index.get(node_id, -1) for node_id in targets], type=pa.int64()),
+            pa.array(sources, type=pa.string()),
+            pa.array(targets, type=pa.string()),
+            vocabularies["kind"].encode(row.get("kind") for row in rows),
+            vocabularies["filePath"].encode(row.get("filePath") for row in rows),
+            pa.array([_str_or_none(row.get("id")) for row in rows], type=pa.string()),
+            pa.array([row.get("version") for row in rows], type=pa.int64()),
+        ],
+        schema=edge_schema(),
+    )
+
+
+def _to_column_arrays(table: "pa.Table") -> ColumnArrays:
+    arrays: Dict[str, np.ndarray] = {}
+    dictionaries: Dict[str, List[str]] = {}
+    for name in table.column_names:
+        column = table.column(name)
+        if pa.types.is_dictionary(column.type):
+            if not _shares_dictionary_prefix(column):
+                column = pa.Table.from_arrays([column], [name]).unify_dictionaries().column(0)
+            chunks = column.chunks
+            dictionaries[name] = chunks[-1].dictionary.to_pylist() if chunks else []
+            arrays[name] = _concat([chunk.indices for chunk in chunks], np.int32)
+        else:
+            arrays[name] = _concat(column.chunks, None)
+    return ColumnArrays(arrays, dictionaries)
+
+
+def _shares_dictionary_prefix(column: "pa.ChunkedArray") -> bool:
+    """True when every chunk's dictionary is a prefix of the last one (IPC deltas)."""
+    if not column.chunks:
+        return True
+    last = column.chunks[-1].dictionary
+    return all(
+        last.slice(0, len(chunk.dictionary)).equals(chunk.dictionary) for chunk in column.chunks
+    )
+
+
+def _concat(chunks: Sequence["pa.Array"], empty_dtype: Optional[type]) -> np.ndarray:
+    # to_numpy returns views for null-free primitive arrays.
+    views = [chunk.to_numpy(zero_copy_only=False) for chunk in chunks]
+    if len(views) == 1:
+        return views[0]
+    if not views:
+        return np.empty(0, dtype=empty_dtype or object)
+    return np.concatenate(views)
+
+
+def _stream_batches(
+    conn: psycopg2.extensions.connection,
+    query: sql.Composed,
+    snapshot_id: str,
+    batch_size: int,
+) -> Iterator[List[Mapping[str, Any]]]:
+    """Yield lists of rows from a server-side cursor."""
+    cursor = conn.cursor(name=f"columnar_export_{next(_cursor_ids)}", cursor_factory=RealDictCursor)
+    cursor.itersize = batch_size
+    try:
+        cursor.execute(query, (snapshot_id,))
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            yield rows
+    finally:
+        cursor.close()
+
+
+def _columnar_node_query(table: str) -> sql.Composed:
+    # COLLATE "C" matches the Python string order used by create_node_mapping;
+    # id is a uuid, which only collates once cast to text.
+    return sql.SQL(
+        "SELECT {fields} FROM {table} WHERE {snapshot} = %s ORDER BY {id}::text COLLATE \"C\""
+    ).format(
+        fields=sql.SQL(", ").join(
+            map(sql.Identifier, ["id", "type", "originalType", "filePath", "data", "location"])
+        ),
+        table=sql.Identifier(table),
+        snapshot=sql.Identifier("snapshotId"),
+        id=sql.Identifier("id"),
+    )
+
+
+def _columnar_edge_query(table: str) -> sql.Composed:
+    return sql.SQL(
+        "SELECT {fields} FROM {table} WHERE {snapshot} = %s ORDER BY {order}"
+    ).format(
+        fields=sql.SQL(", ").join(
+            map(sql.Identifier, ["id", "fromId", "toId", "kind", "filePath", "version"])
+        ),
+        table=sql.Identifier(table),
+        snapshot=sql.Identifier("snapshotId"),
+        order=sql.SQL(", ").join(
+            [
+                sql.SQL("{}::text COLLATE \"C\"").format(sql.Identifier("fromId")),
+                sql.SQL("{}::text COLLATE \"C\"").format(sql.Identifier("toId")),
+                sql.SQL("{} COLLATE \"C\"").format(sql.Identifier("kind")),
+            ]
+        ),
+    )
+
+
+def _json_or_none(value: Any) -> Optional[str]:
+    return None if value is None else _stable_json(value)
+
+
+def _str_or_none(value: Any) -> Optional[str]:
+    return None if value is None else str(value)
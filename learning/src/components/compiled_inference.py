@@ -0,0 +1,164 @@
+import hashlib
+from pathlib import Path
+from typing import List, Optional, Union
+
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+from torch_geometric.nn import SAGEConv
+
+COMPILE_BACKENDS = ("torchscript", "inductor")
+
+
+class StaticSAGE(nn.Module):
+    """
+    Plain-torch inference replica of a stack of (Weighted)SAGEConv layers.
+
+    Aggregation is a weighted mean computed with ``index_add_`` and the
+    normalization is shared across layers, so the module only depends on torch
+    and can be scripted, frozen and reloaded without torch_geometric. Layers
+    are separated by ReLU, matching SimpleGNN/TwoLayerGNN/ThreeLayerGNN.
+    """
+
+    num_hops: int
+    out_channels: int
+
+    def __init__(
+        self,
+        lin_l: List[nn.Linear],
+        lin_r: List[Optional[nn.Linear]],
+        normalize: List[bool],
+    ):
+        super().__init__()
+        self.lin_l = nn.ModuleList(lin_l)
+        self.lin_r = nn.ModuleList(
+            [lin if lin is not None else nn.Identity() for lin in lin_r]
+        )
+        self.root_weight = [lin is not None for lin in lin_r]
+        self.normalize = normalize
+        self.num_hops = len(lin_l)
+        self.out_channels = lin_l[-1].out_features
+
+    def forward(
+        self,
+        x: torch.Tensor,
+        edge_index: torch.Tensor,
+        edge_weight: Optional[torch.Tensor] = None
+    ) -> torch.Tensor:
+        src = edge_index[0]
+        dst = edge_index[1]
+        num_nodes = x.size(0)
+        if edge_weight is None:
+            weight = torch.ones(src.numel(), dtype=x.dtype, device=x.device)
+        else:
+            weight = edge_weight.to(x.dtype)
+        total = torch.zeros(num_nodes, dtype=x.dtype, device=x.device)
+        total.index_add_(0, dst, weight)
+        scale = (1.0 / total.clamp(min=1e-12)).view(-1, 1)
+        weight = weight.view(-1, 1)
+
+        layer = 0
+        last = len(self.lin_l) - 1
+        for lin_l, lin_r in zip(self.lin_l, self.lin_r):
+            # Accumulate in the input precision even if the linear layers run
+            # in reduced precision (see quantization.AutocastInference).
+            agg = torch.zeros(num_nodes, x.size(1), dtype=weight.dtype, device=x.device)
+            agg.index_add_(0, dst, x[src].to(weight.dtype) * weight)
+            out = lin_l(agg * scale)
+            if self.root_weight[layer]:
+                out = out + lin_r(x)
+            if self.normalize[layer]:
+                out = F.normalize(out, p=2.0, dim=-1)
+            if layer < last:
+                out = torch.relu(out)
+            x = out
+            layer += 1
+        return x
+
+
+def to_static_sage(model: nn.Module) -> StaticSAGE:
+    """Copy the SAGEConv weights of a GNN model into a StaticSAGE replica."""
+    convs = [module for module in model.modules() if isinstance(module, SAGEConv)]
+    if not convs:
+        raise ValueError("Model has no SAGEConv layers to compile.")
+
+    lin_l: List[nn.Linear] = []
+    lin_r: List[Optional[nn.Linear]] = []
+    normalize: List[bool] = []
+    for conv in convs:
+        if conv.aggr != "mean" or getattr(conv, "project", False):
+            raise ValueError("Only mean-aggregation SAGEConv without projection is supported.")
+        lin_l.append(_as_linear(conv.lin_l))
+        lin_r.append(_as_linear(conv.lin_r) if conv.root_weight else None)
+        normalize.append(bool(conv.normalize))
+
+    static = StaticSAGE(lin_l, lin_r, normalize)
+    return static.eval()
+
+
+def compile_for_inference(
+    model: nn.Module,
+    backend: str = "torchscript",
+    cache_dir: Optional[Union[str, Path]] = None,
+) -> nn.Module:
+    """
+    Build a compiled inference module with the same outputs as model.
+
+    ``torchscript`` scripts and freezes a StaticSAGE replica; with
+    ``cache_dir`` the artifact is saved under a hash of the weights and
+    reloaded on later calls via ``load_compiled``. ``inductor`` wraps the
+    replica in ``torch.compile`` (compiled lazily on first call; inductor keeps
+    its own on-disk cache).
+    """
+    if backend not in COMPILE_BACKENDS:
+        raise ValueError(f"backend must be one of {COMPILE_BACKENDS}, got {backend!r}")
+
+    if backend == "inductor":
+        return torch.compile(to_static_sage(model), dynamic=True)
+
+    cache_path = None
+    if cache_dir is not None:
+        cache_path = Path(cache_dir) / f"sage-{model_fingerprint(model)}.pt"
+        if cache_path.exists():
+            return load_compiled(cache_path)
+
+    scripted = torch.jit.freeze(
+        torch.jit.script(to_static_sage(model)),
+        preserved_attrs=["num_hops", "out_channels"],
+    )
+    if cache_path is not None:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(".tmp")
+        torch.jit.save(scripted, str(tmp_path))
+        tmp_path.replace(cache_path)
+    return scripted
+
+
+def load_compiled(path: Union[str, Path]) -> torch.jit.ScriptModule:
+    """Load a TorchScript artifact written by compile_for_inference."""
+    module = torch.jit.load(str(path), map_location="cpu")
+    module.eval()
+    return module
+
+
+def model_fingerprint(model: nn.Module) -> str:
+    """Hash the architecture and weights so cached artifacts track the model."""
+    digest = hashlib.sha256()
+    digest.update(type(model).__name__.encode("utf-8"))
+    for name, tensor in sorted(model.state_dict().items()):
+        digest.update(name.encode("utf-8"))
+        digest.update(str(tuple(tensor.shape)).encode("utf-8"))
+        digest.update(tensor.detach().cpu().contiguous().numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+
+def _as_linear(layer: nn.Module) -> nn.Linear:
+    """Copy a torch_geometric Linear (or nn.Linear) into a fresh nn.Linear."""
+    weight = layer.weight.detach()
+    bias = layer.bias.detach() if layer.bias is not None else None
+    linear = nn.Linear(weight.shape[1], weight.shape[0], bias=bias is not None)
+    with torch.no_grad():
+        linear.weight.copy_(weight)
+        if bias is not None:
+            linear.bias.copy_(bias)
+    return linear
@@ -0,0 +1,272 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, Iterator, Optional, Tuple
+
+import psycopg2
+
+from . import materializer
+
+Connection = psycopg2.extensions.connection
+
+
+@dataclass(frozen=True)
+class PoolStats:
+    """Point-in-time counters for a ConnectionPool."""
+    acquisitions: int
+    reused: int
+    created: int
+    discarded: int
+    failed_health_checks: int
+    expired: int
+    total_wait_s: float
+    max_wait_s: float
+    idle: int
+    in_use: int
+
+    @property
+    def reuse_ratio(self) -> float:
+        """Fraction of acquisitions served by an existing connection."""
+        return self.reused / self.acquisitions if self.acquisitions else 0.0
+
+    @property
+    def mean_wait_s(self) -> float:
+        """Average time callers spent waiting in acquire()."""
+        return self.total_wait_s / self.acquisitions if self.acquisitions else 0.0
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes available within the acquire timeout."""
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of psycopg2 connections for repeated materializations.
+
+    Connections are created through ``materializer._connect`` so the
+    ``?schema=`` DSN translation and search_path setup happen once per pooled
+    connection rather than once per snapshot. Returned connections are rolled
+    back; broken or closed ones are dropped.
+
+    There is no background reaper: ``idle_timeout`` is enforced whenever
+    acquire() or release() runs, so a pool nobody touches keeps its idle
+    connections open until the next call or close().
+
+    Args:
+        dsn: Connection string (default: DATABASE_URL / DB_* env vars)
+        min_size: Connections kept open even when idle
+        max_size: Upper bound on open connections; acquire() blocks beyond it
+        idle_timeout: Seconds an idle connection above ``min_size`` is kept
+        health_check_after: Idle seconds after which a connection is probed
+            with ``SELECT 1`` before being handed out (None disables probing)
+        connect: Optional factory overriding ``materializer._connect``
+    """
+
+    def __init__(
+        self,
+        dsn: Optional[str] = None,
+        min_size: int = 1,
+        max_size: int = 4,
+        idle_timeout: float = 300.0,
+        health_check_after: Optional[float] = 30.0,
+        connect: Optional[Callable[[], Connection]] = None,
+    ):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1.")
+        if not 0 <= min_size <= max_size:
+            raise ValueError("min_size must be between 0 and max_size.")
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.health_check_after = health_check_after
+        self._connect_fn = connect
+
+        self._cond = threading.Condition()
+        # (connection, monotonic time it was returned), most recent on the right.
+        self._idle: Deque[Tuple[Connection, float]] = deque()
+        self._in_use: Dict[int, Connection] = {}
+        self._opening = 0
+        self._closed = False
+        self._counters = {
+            "acquisitions": 0,
+            "reused": 0,
+            "created": 0,
+            "discarded": 0,
+            "failed_health_checks": 0,
+            "expired": 0,
+        }
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+        for _ in range(min_size):
+            conn = self._open()
+            with self._cond:
+                self._idle.append((conn, time.monotonic()))
+
+    def __enter__(self) -> "ConnectionPool":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Iterator[Connection]:
+        """Lease a connection for the duration of a with-block."""
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        except BaseException:
+            self.release(conn, discard=_is_broken(conn))
+            raise
+        self.release(conn)
+
+    def acquire(self, timeout: Optional[float] = None) -> Connection:
+        """Return an idle connection, open a new one, or wait for one to be released."""
+        start = time.monotonic()
+        deadline = None if timeout is None else start + timeout
+
+        while True:
+            candidate: Optional[Tuple[Connection, float]] = None
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("ConnectionPool is closed.")
+                    self._expire_idle_locked()
+                    if self._idle:
+                        candidate = self._idle.pop()
+                        # Count it as leased while it is probed outside the lock.
+                        self._in_use[id(candidate[0])] = candidate[0]
+                        break
+                    if len(self._in_use) + self._opening < self.max_size:
+                        self._opening += 1
+                        break
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise PoolTimeout(
+                            f"No connection available within {timeout} seconds."
+                        )
+                    self._cond.wait(remaining)
+
+            if candidate is None:
+                try:
+                    conn = self._open()
+                finally:
+                    with self._cond:
+                        self._opening -= 1
+                reused = False
+            else:
+                conn, returned_at = candidate
+                if not self._healthy(conn, returned_at):
+                    continue
+                reused = True
+
+            waited = time.monotonic() - start
+            with self._cond:
+                self._in_use[id(conn)] = conn
+                self._counters["acquisitions"] += 1
+                self._counters["reused"] += int(reused)
+                self._total_wait += waited
+                self._max_wait = max(self._max_wait, waited)
+            return conn
+
+    def release(self, conn: Connection, discard: bool = False) -> None:
+        """Return a leased connection; discarded or broken connections are closed."""
+        if not discard:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                discard = True
+        discard = discard or _is_broken(conn)
+
+        with self._cond:
+            self._in_use.pop(id(conn), None)
+            self._expire_idle_locked()
+            if discard or self._closed:
+                self._counters["discarded"] += int(discard)
+                to_close: Optional[Connection] = conn
+            else:
+                self._idle.append((conn, time.monotonic()))
+                to_close = None
+            self._cond.notify()
+        if to_close is not None:
+            _close_quietly(to_close)
+
+    def stats(self) -> PoolStats:
+        """Snapshot the pool counters, including wait time and reuse ratio inputs."""
+        with self._cond:
+            return PoolStats(
+                total_wait_s=self._total_wait,
+                max_wait_s=self._max_wait,
+                idle=len(self._idle),
+                in_use=len(self._in_use),
+                **self._counters,
+            )
+
+    def close(self) -> None:
+        """Close idle connections; leased connections are closed when released."""
+        with self._cond:
+            self._closed = True
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            self._cond.notify_all()
+        for conn in idle:
+            _close_quietly(conn)
+
+    def _open(self) -> Connection:
+        if self._connect_fn is not None:
+            conn = self._connect_fn()
+        else:
+            conn = materializer._connect(self.dsn)
+        with self._cond:
+            self._counters["created"] += 1
+        return conn
+
+    def _healthy(self, conn: Connection, returned_at: float) -> bool:
+        """Probe a reused connection; drop it (outside the lock) if it is dead."""
+        healthy = not _is_broken(conn)
+        if (
+            healthy
+            and self.health_check_after is not None
+            and time.monotonic() - returned_at >= self.health_check_after
+        ):
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                conn.rollback()
+            except psycopg2.Error:
+                healthy = False
+        if not healthy:
+            with self._cond:
+                self._in_use.pop(id(conn), None)
+                self._counters["failed_health_checks"] += 1
+                self._counters["discarded"] += 1
+                self._cond.notify()
+            _close_quietly(conn)
+        return healthy
+
+    def _expire_idle_locked(self) -> None:
+        """Close connections idle past idle_timeout, keeping min_size open."""
+        now = time.monotonic()
+        # The oldest idle connections sit on the left.
+        while (
+            self._idle
+            and len(self._idle) + len(self._in_use) > self.min_size
+            and now - self._idle[0][1] > self.idle_timeout
+        ):
+            conn, _ = self._idle.popleft()
+            self._counters["expired"] += 1
+            _close_quietly(conn)
+
+
+def _is_broken(conn: Connection) -> bool:
+    return bool(conn.closed)
+
+
+def _close_quietly(conn: Connection) -> None:
+    try:
+        conn.close()
+    except psycopg2.Error:
+        pass
@@ -0,0 +1,440 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Generic, List, Optional, Sequence, Tuple, TypeVar, Union
+
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+
+from .bundle_io import load_tensor_bundle
+from .gnn_model import create_gnn_model, generate_embeddings
+from .parallel_embeddings import infer_num_hops
+from .partitioning import induced_edges
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+@dataclass(frozen=True)
+class ModelSpec:
+    """Hyperparameters identifying one resident model instance."""
+    num_layers: int = 1
+    hidden_channels: int = 128
+    out_channels: int = 64
+    seed: int = 42
+
+
+@dataclass
+class ResidentBundle:
+    """A loaded bundle plus the derived structures kept warm between requests."""
+    path: str
+    x: torch.Tensor
+    edge_index: torch.Tensor
+    edge_weight: Optional[torch.Tensor]
+    node_mapping: Dict[str, int]
+    index_to_id: List[str]
+    # Incoming-edge CSR: in-neighbours of node i are col[rowptr[i]:rowptr[i + 1]].
+    rowptr: torch.Tensor
+    col: torch.Tensor
+    load_seconds: float
+    # Full-graph embeddings (raw and L2-normalized) per model, built on the
+    # first top-k query.
+    embeddings: Dict[ModelSpec, torch.Tensor] = field(default_factory=dict)
+    normalized: Dict[ModelSpec, torch.Tensor] = field(default_factory=dict)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def num_nodes(self) -> int:
+        return int(self.x.shape[0])
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Coalesce concurrent submit() calls into one batched function call.
+
+    The first caller into an empty batch waits up to ``max_wait_s`` for others
+    to join, then runs ``fn`` on every pending item. A batch reaching
+    ``max_batch`` items runs immediately on the thread that filled it.
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[List[T]], Sequence[R]],
+        max_batch: int = 64,
+        max_wait_s: float = 0.005,
+    ):
+        self.fn = fn
+        self.max_batch = max_batch
+        self.max_wait_s = max_wait_s
+        self.batches = 0
+        self.items = 0
+        self._lock = threading.Lock()
+        self._pending: List[Tuple[T, Future]] = []
+
+    def submit(self, item: T) -> R:
+        """Add item to the current batch and block until its result is ready."""
+        future: Future = Future()
+        with self._lock:
+            self._pending.append((item, future))
+            leader = len(self._pending) == 1
+            batch = self._take_locked() if len(self._pending) >= self.max_batch else None
+
+        if batch is not None:
+            self._run(batch)
+        elif leader:
+            time.sleep(self.max_wait_s)
+            with self._lock:
+                batch = self._take_locked()
+            if batch:
+                self._run(batch)
+        return future.result()
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.items / self.batches if self.batches else 0.0
+
+    def _take_locked(self) -> List[Tuple[T, Future]]:
+        batch, self._pending = self._pending, []
+        if batch:
+            self.batches += 1
+            self.items += len(batch)
+        return batch
+
+    def _run(self, batch: List[Tuple[T, Future]]) -> None:
+        try:
+            results = self.fn([item for item, _ in batch])
+        except BaseException as exc:
+            for _, future in batch:
+                future.set_exception(exc)
+            return
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+
+class LatencyTracker:
+    """Record request latencies split by whether the request hit a cold cache."""
+
+    def __init__(self, window: int = 1024):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples: Dict[str, List[float]] = {"cold": [], "warm": []}
+
+    def record(self, seconds: float, cold: bool) -> None:
+        with self._lock:
+            samples = self._samples["cold" if cold else "warm"]
+            samples.append(seconds)
+            if len(samples) > self.window:
+                del samples[0]
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Count, p50 and p95 latency in milliseconds for cold and warm requests."""
+        with self._lock:
+            snapshot = {name: sorted(values) for name, values in self._samples.items()}
+        report = {}
+        for name, values in snapshot.items():
+            if not values:
+                report[name] = {"count": 0}
+                continue
+            report[name] = {
+                "count": len(values),
+                "p50_ms": 1000 * values[len(values) // 2],
+                "p95_ms": 1000 * values[min(len(values) - 1, int(len(values) * 0.95))],
+            }
+        return report
+
+
+class EmbeddingService:
+    """
+    Keep bundles, their adjacency and models resident to answer queries warm.
+
+    Bundles and models live in separate LRU caches. "Embed these node ids"
+    requests for the same bundle and model are micro-batched: the union of
+    requested nodes is embedded in one forward pass over its receptive field
+    (exact for the requested rows). "Top-k similar" requests are batched into
+    one similarity matmul against cached full-graph embeddings.
+    """
+
+    def __init__(
+        self,
+        max_bundles: int = 4,
+        max_models: int = 8,
+        max_batch: int = 64,
+        max_wait_s: float = 0.005,
+    ):
+        self.max_bundles = max_bundles
+        self.max_models = max_models
+        self.max_batch = max_batch
+        self.max_wait_s = max_wait_s
+        self.latency = LatencyTracker()
+
+        self._lock = threading.RLock()
+        self._bundles: "OrderedDict[str, ResidentBundle]" = OrderedDict()
+        self._models: "OrderedDict[Tuple[int, ModelSpec], nn.Module]" = OrderedDict()
+        # Serializes model builds, which reseed the global RNG, without holding _lock.
+        self._build_lock = threading.Lock()
+        self._batchers: Dict[Tuple[str, str, ModelSpec], MicroBatcher] = {}
+        # One lock per bundle being loaded; entries are dropped once the load ends.
+        self._path_locks: Dict[str, threading.Lock] = {}
+
+    def embed(
+        self,
+        bundle_path: Union[str, Path],
+        node_ids: Sequence[str],
+        spec: ModelSpec = ModelSpec(),
+    ) -> Dict[str, List[float]]:
+        """Return embeddings for the requested node ids."""
+        start = time.perf_counter()
+        bundle, model, cold = self._resident(bundle_path, spec)
+        indices = _lookup(bundle, node_ids)
+        if spec in bundle.embeddings:
+            rows = bundle.embeddings[spec][indices]
+        else:
+            batcher = self._batcher(bundle, "embed", spec, model)
+            rows = batcher.submit(indices)
+        result = {node_id: row.tolist() for node_id, row in zip(node_ids, rows)}
+        self.latency.record(time.perf_counter() - start, cold)
+        return result
+
+    def similar(
+        self,
+        bundle_path: Union[str, Path],
+        node_id: str,
+        k: int = 10,
+        spec: ModelSpec = ModelSpec(),
+    ) -> List[Tuple[str, float]]:
+        """Return the k most cosine-similar nodes to node_id (excluding itself)."""
+        start = time.perf_counter()
+        bundle, model, cold = self._resident(bundle_path, spec)
+        index = int(_lookup(bundle, [node_id])[0])
+        cold = cold or spec not in bundle.normalized
+        self._full_embeddings(bundle, model, spec)
+        batcher = self._batcher(bundle, "similar", spec, model)
+        scores, neighbours = batcher.submit((index, k))
+        result = [
+            (bundle.index_to_id[int(j)], float(score))
+            for j, score in zip(neighbours, scores)
+        ]
+        self.latency.record(time.perf_counter() - start, cold)
+        return result
+
+    def stats(self, bundle_path: Optional[Union[str, Path]] = None) -> Dict[str, Any]:
+        """Describe one bundle, or the service caches and latencies when no path is given."""
+        if bundle_path is None:
+            with self._lock:
+                bundles = list(self._bundles)
+                models = len(self._models)
+                batching = {
+                    f"{op}:{Path(path).name}": batcher.mean_batch_size
+                    for (path, op, _), batcher in self._batchers.items()
+                }
+            return {
+                "resident_bundles": bundles,
+                "resident_models": models,
+                "mean_batch_size": batching,
+                "latency": self.latency.summary(),
+            }
+
+        bundle = self._bundle(bundle_path)[0]
+        in_degree = bundle.rowptr[1:] - bundle.rowptr[:-1]
+        out_degree = torch.bincount(bundle.edge_index[0], minlength=bundle.num_nodes)
+        return {
+            "path": bundle.path,
+            "num_nodes": bundle.num_nodes,
+            "num_edges": int(bundle.edge_index.shape[1]),
+            "num_features": int(bundle.x.shape[1]),
+            "weighted": bundle.edge_weight is not None,
+            "isolated_nodes": int(((in_degree == 0) & (out_degree == 0)).sum()),
+            "max_in_degree": int(in_degree.max()) if bundle.num_nodes else 0,
+            "max_out_degree": int(out_degree.max()) if bundle.num_nodes else 0,
+            "load_seconds": bundle.load_seconds,
+        }
+
+    def _resident(
+        self, bundle_path: Union[str, Path], spec: ModelSpec
+    ) -> Tuple[ResidentBundle, nn.Module, bool]:
+        bundle, bundle_cold = self._bundle(bundle_path)
+        model, model_cold = self._model(int(bundle.x.shape[1]), spec)
+        return bundle, model, bundle_cold or model_cold
+
+    def _bundle(self, bundle_path: Union[str, Path]) -> Tuple[ResidentBundle, bool]:
+        path = str(Path(bundle_path).resolve())
+        with self._lock:
+            if path in self._bundles:
+                self._bundles.move_to_end(path)
+                return self._bundles[path], False
+            path_lock = self._path_locks.setdefault(path, threading.Lock())
+
+        # Load outside the service lock so other bundles stay servable.
+        try:
+            with path_lock:
+                with self._lock:
+                    if path in self._bundles:
+                        self._bundles.move_to_end(path)
+                        return self._bundles[path], False
+                bundle = _load_resident(path)
+                with self._lock:
+                    self._bundles[path] = bundle
+                    while len(self._bundles) > self.max_bundles:
+                        evicted, _ = self._bundles.popitem(last=False)
+                        self._batchers = {
+                            key: batcher
+                            for key, batcher in self._batchers.items()
+                            if key[0] != evicted
+                        }
+        finally:
+            with self._lock:
+                if self._path_locks.get(path) is path_lock:
+                    del self._path_locks[path]
+        return bundle, True
+
+    def _model(self, in_channels: int, spec: ModelSpec) -> Tuple[nn.Module, bool]:
+        key = (in_channels, spec)
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                return self._models[key], False
+        with self._build_lock:
+            with self._lock:
+                if key in self._models:
+                    self._models.move_to_end(key)
+                    return self._models[key], False
+            # The model seeds the global RNG at init; fork it so callers' RNG state is kept.
+            with torch.random.fork_rng(devices=[]):
+                model = create_gnn_model(
+                    in_channels=in_channels,
+                    out_channels=spec.out_channels,
+                    seed=spec.seed,
+                    eval_mode=True,
+                    num_layers=spec.num_layers,
+                    hidden_channels=spec.hidden_channels,
+                )
+            with self._lock:
+                self._models[key] = model
+                while len(self._models) > self.max_models:
+                    self._models.popitem(last=False)
+        return model, True
+
+    def _batcher(
+        self, bundle: ResidentBundle, op: str, spec: ModelSpec, model: nn.Module
+    ) -> MicroBatcher:
+        key = (bundle.path, op, spec)
+        with self._lock:
+            batcher = self._batchers.get(key)
+            if batcher is None:
+                if op == "embed":
+                    fn = lambda batch: _embed_batch(bundle, model, batch)  # noqa: E731
+                else:
+                    fn = lambda batch: _similar_batch(bundle.normalized[spec], batch)  # noqa: E731
+                batcher = MicroBatcher(fn, self.max_batch, self.max_wait_s)
+                self._batchers[key] = batcher
+        return batcher
+
+    def _full_embeddings(
+        self, bundle: ResidentBundle, model: nn.Module, spec: ModelSpec
+    ) -> torch.Tensor:
+        with bundle.lock:
+            if spec not in bundle.normalized:
+                embeddings = generate_embeddings(
+                    model, bundle.x, bundle.edge_index, bundle.edge_weight
+                )
+                bundle.embeddings[spec] = embeddings
+                bundle.normalized[spec] = F.normalize(embeddings, p=2.0, dim=1)
+        return bundle.normalized[spec]
+
+
+def _load_resident(path: str) -> ResidentBundle:
+    start = time.perf_counter()
+    bundle = load_tensor_bundle(path)
+    edge_index = bundle["edge_index"].long()
+    num_nodes = int(bundle["x"].shape[0])
+
+    order = torch.argsort(edge_index[1], stable=True)
+    col = edge_index[0][order]
+    rowptr = torch.zeros(num_nodes + 1, dtype=torch.long)
+    rowptr[1:] = torch.cumsum(torch.bincount(edge_index[1], minlength=num_nodes), dim=0)
+
+    index_to_id = [""] * num_nodes
+    for node_id, index in bundle["node_mapping"].items():
+        index_to_id[index] = node_id
+
+    return ResidentBundle(
+        path=path,
+        x=bundle["x"],
+        edge_index=edge_index,
+        edge_weight=bundle.get("edge_weight"),
+        node_mapping=bundle["node_mapping"],
+        index_to_id=index_to_id,
+        rowptr=rowptr,
+        col=col,
+        load_seconds=time.perf_counter() - start,
+    )
+
+
+def _lookup(bundle: ResidentBundle, node_ids: Sequence[str]) -> torch.Tensor:
+    missing = [node_id for node_id in node_ids if node_id not in bundle.node_mapping]
+    if missing:
+        raise KeyError(f"Unknown node ids: {missing[:5]}")
+    return torch.tensor([bundle.node_mapping[node_id] for node_id in node_ids], dtype=torch.long)
+
+
+def _in_neighbours(bundle: ResidentBundle, nodes: torch.Tensor) -> torch.Tensor:
+    """Gather the in-neighbours of nodes from the resident CSR."""
+    starts = bundle.rowptr[nodes]
+    counts = bundle.rowptr[nodes + 1] - starts
+    total = int(counts.sum())
+    if total == 0:
+        return torch.empty(0, dtype=torch.long)
+    offsets = torch.repeat_interleave(starts - (torch.cumsum(counts, 0) - counts), counts)
+    return bundle.col[offsets + torch.arange(total)]
+
+
+def _embed_batch(
+    bundle: ResidentBundle, model: nn.Module, batch: List[torch.Tensor]
+) -> List[torch.Tensor]:
+    """Embed the union of requested rows with one pass over their receptive field."""
+    seeds = torch.unique(torch.cat(batch))
+    mask = torch.zeros(bundle.num_nodes, dtype=torch.bool)
+    mask[seeds] = True
+    frontier = seeds
+    for _ in range(infer_num_hops(model)):
+        neighbours = _in_neighbours(bundle, frontier)
+        frontier = torch.unique(neighbours[~mask[neighbours]])
+        if frontier.numel() == 0:
+            break
+        mask[frontier] = True
+
+    others = torch.nonzero(mask, as_tuple=False).view(-1)
+    others = others[~torch.isin(others, seeds)]
+    global_ids = torch.cat([seeds, others])
+    local_edge_index, keep = induced_edges(
+        bundle.edge_index, mask, global_ids, bundle.num_nodes
+    )
+    edge_weight = bundle.edge_weight[keep] if bundle.edge_weight is not None else None
+    embeddings = generate_embeddings(
+        model, bundle.x[global_ids], local_edge_index, edge_weight
+    )
+
+    # seeds is sorted, so each request's rows are found by binary search.
+    return [embeddings[torch.searchsorted(seeds, indices)] for indices in batch]
+
+
+def _similar_batch(
+    normalized: torch.Tensor, batch: List[Tuple[int, int]]
+) -> List[Tuple[List[float], List[int]]]:
+    """Answer several top-k queries with one similarity matmul."""
+    queries = torch.tensor([index for index, _ in batch], dtype=torch.long)
+    max_k = min(max(k for _, k in batch) + 1, normalized.shape[0])
+    scores = normalized[queries] @ normalized.T
+    top_scores, top_indices = torch.topk(scores, max_k, dim=1)
+
+    results = []
+    for row, (index, k) in enumerate(batch):
+        keep = top_indices[row] != index
+        results.append(
+            (top_scores[row][keep][:k].tolist(), top_indices[row][keep][:k].tolist())
+        )
+    return results
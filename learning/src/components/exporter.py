@@ -1,16 +1,26 @@
 import pickle
 from pathlib import Path
-from typing import Dict, TypedDict, Union
+from typing import Any, Dict, List, Mapping, Optional, Tuple, TypedDict, Union
 
 import torch
 
 from .models import SnapshotGraph
 
 
-class TensorBundle(TypedDict):
+class _TensorBundleRequired(TypedDict):
     x: torch.Tensor
     edge_index: torch.Tensor
-    node_mapping: Dict[str, int]
+    node_mapping: Mapping[str, int]
+
+
+class TensorBundle(_TensorBundleRequired, total=False):
+    edge_weight: torch.Tensor
+    edge_count: torch.Tensor
+    edge_kind: torch.Tensor
+    edge_kinds: List[str]
+    stats: Dict[str, Any]
+    fingerprint: Dict[str, Any]
+    export_options: str
 
 
 Exportable = Union[SnapshotGraph, TensorBundle]
@@ -35,6 +45,47 @@ def create_edge_index(graph, node_to_idx: Dict[str, int]) -> torch.Tensor:
     return torch.tensor([source_indices, target_indices], dtype=torch.long)
 
 
+def create_edge_kind_index(graph) -> Tuple[torch.Tensor, List[str]]:
+    """Encode edge kinds as ids aligned with create_edge_index columns."""
+    kinds = [kind or "" for _, _, kind in graph.edges(data="kind")]
+    vocabulary = sorted(set(kinds))
+    kind_to_id = {kind: i for i, kind in enumerate(vocabulary)}
+    edge_kind = torch.tensor([kind_to_id[kind] for kind in kinds], dtype=torch.long)
+    return edge_kind, vocabulary
+
+
+def coalesce_edge_index(
+    edge_index: torch.Tensor,
+    num_nodes: int,
+    edge_kind: Optional[torch.Tensor] = None,
+) -> Tuple[torch.Tensor, torch.Tensor, Optional[torch.Tensor]]:
+    """
+    Merge duplicate (src, dst[, kind]) columns with a vectorized sort-and-unique.
+
+    Returns the coalesced edge_index (sorted by src, dst, kind), the
+    multiplicity of each remaining column and, when kinds are given, the kind
+    of each remaining column.
+    """
+    if edge_index.shape[1] == 0:
+        empty = torch.empty(0, dtype=torch.long)
+        return edge_index, empty, (empty if edge_kind is not None else None)
+
+    key = edge_index[0].long() * num_nodes + edge_index[1].long()
+    num_kinds = 0
+    if edge_kind is not None:
+        num_kinds = int(edge_kind.max().item()) + 1
+        key = key * num_kinds + edge_kind.long()
+
+    unique_keys, edge_count = torch.unique(key, sorted=True, return_counts=True)
+
+    kinds = None
+    if edge_kind is not None:
+        kinds = unique_keys % num_kinds
+        unique_keys = unique_keys // num_kinds
+    coalesced = torch.stack([unique_keys // num_nodes, unique_keys % num_nodes])
+    return coalesced, edge_count, kinds
+
+
 def export_snapshot(data: Exportable, output_path: Union[str, Path]) -> Path:
     """Persist a payload to disk, creating the destination directory."""
     path = Path(output_path)
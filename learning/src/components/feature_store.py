@@ -0,0 +1,261 @@
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import torch
+
+from .node_features import kind_bucket_columns, validate_node_set
+
+DEFAULT_FEATURE_ROOT = Path(__file__).resolve().parents[2] / "data" / "features"
+
+FeatureRef = Union[str, Tuple[str, int]]
+
+
+@dataclass(frozen=True)
+class FeatureSpec:
+    """
+    A named, versioned node feature.
+
+    ``compute`` receives a batch of SnapshotNode objects in node_mapping order
+    and returns a float32 array of shape [len(batch), width]. Bump ``version``
+    whenever the computation changes so cached columns are not reused.
+    """
+    name: str
+    version: int
+    width: int
+    compute: Callable[[Sequence], np.ndarray]
+
+
+FEATURES: Dict[str, Dict[int, FeatureSpec]] = {}
+
+
+def register_feature(spec: FeatureSpec) -> FeatureSpec:
+    """Make a feature available to FeatureStore by name and version."""
+    FEATURES.setdefault(spec.name, {})[spec.version] = spec
+    return spec
+
+
+def get_feature_spec(name: str, version: Optional[int] = None) -> FeatureSpec:
+    """Look up a registered feature; ``version=None`` picks the latest."""
+    versions = FEATURES.get(name)
+    if not versions:
+        raise KeyError(f"Unknown feature {name!r}.")
+    if version is None:
+        version = max(versions)
+    if version not in versions:
+        raise KeyError(f"Feature {name!r} has no version {version}.")
+    return versions[version]
+
+
+register_feature(FeatureSpec("kind_bucket", 1, 6, kind_bucket_columns))
+
+
+def mapping_fingerprint(node_to_idx: Dict[str, int]) -> str:
+    """Hash node ids in row order so cached columns can be checked for alignment."""
+    digest = hashlib.sha256()
+    ordered: Iterable[str] = node_to_idx
+    # Mappings built by enumerating ids are already in row order; only sort the others.
+    if any(idx != i for i, idx in enumerate(node_to_idx.values())):
+        ordered = sorted(node_to_idx, key=node_to_idx.__getitem__)
+    for node_id in ordered:
+        digest.update(str(node_id).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class FeatureStore:
+    """
+    On-disk cache of node feature columns keyed by (snapshot, feature, version).
+
+    Each column is a ``.npy`` file whose rows follow ``node_mapping``, next to
+    a small JSON sidecar recording its width and a fingerprint of the mapping.
+    Cached columns are opened as read-only memory maps. Missing or misaligned
+    columns are computed in batches of ``batch_size`` nodes and written
+    straight into a memory-mapped file. Filtered exports have their own node
+    mapping, so their columns live in a separate directory per
+    ``filter_key`` (``SnapshotFilter.digest()``).
+    """
+
+    def __init__(
+        self,
+        root: Optional[Union[str, Path]] = None,
+        batch_size: int = 65536,
+    ):
+        self.root = Path(root) if root is not None else DEFAULT_FEATURE_ROOT
+        self.batch_size = batch_size
+
+    def column_path(
+        self, snapshot_id: str, name: str, version: int, filter_key: Optional[str] = None
+    ) -> Path:
+        return self._snapshot_dir(snapshot_id, filter_key) / name / f"v{version}.npy"
+
+    def has(
+        self,
+        snapshot_id: str,
+        feature: FeatureRef,
+        node_to_idx: Dict[str, int],
+        filter_key: Optional[str] = None,
+    ) -> bool:
+        """True if the column is cached and aligned with node_to_idx."""
+        spec = _resolve(feature)
+        meta = self._read_meta(
+            snapshot_id, spec, node_to_idx, mapping_fingerprint(node_to_idx), filter_key
+        )
+        return meta is not None
+
+    def versions(self, snapshot_id: str, name: str, filter_key: Optional[str] = None) -> List[int]:
+        """Versions of a feature cached for a snapshot."""
+        directory = self._snapshot_dir(snapshot_id, filter_key) / name
+        return sorted(
+            int(path.stem[1:])
+            for path in directory.glob("v*.npy")
+            if path.stem[1:].isdigit()
+        )
+
+    def get(
+        self,
+        snapshot_id: str,
+        feature: FeatureRef,
+        node_to_idx: Dict[str, int],
+        nodes: Optional[Iterable] = None,
+        mapping_digest: Optional[str] = None,
+        filter_key: Optional[str] = None,
+    ) -> np.ndarray:
+        """
+        Return one feature column as a read-only [num_nodes, width] memmap.
+
+        ``nodes`` is only needed when the column is not cached yet; without
+        it a missing column raises KeyError. ``mapping_digest`` is
+        ``mapping_fingerprint(node_to_idx)`` when the caller already has it;
+        otherwise it is computed here.
+        """
+        spec = _resolve(feature)
+        path = self.column_path(snapshot_id, spec.name, spec.version, filter_key)
+        if mapping_digest is None:
+            mapping_digest = mapping_fingerprint(node_to_idx)
+        if self._read_meta(snapshot_id, spec, node_to_idx, mapping_digest, filter_key) is None:
+            if nodes is None:
+                raise KeyError(
+                    f"Feature {spec.name!r} v{spec.version} is not cached for snapshot "
+                    f"{snapshot_id}; pass nodes to compute it."
+                )
+            self._compute(snapshot_id, spec, node_to_idx, nodes, mapping_digest, filter_key)
+        return np.load(path, mmap_mode="r")
+
+    def assemble(
+        self,
+        snapshot_id: str,
+        features: Sequence[FeatureRef],
+        node_to_idx: Dict[str, int],
+        nodes: Optional[Iterable] = None,
+        filter_key: Optional[str] = None,
+        mapping_digest: Optional[str] = None,
+    ) -> torch.Tensor:
+        """
+        Concatenate feature columns (computing missing ones) into x.
+
+        The mapping is hashed once per call; pass ``mapping_digest`` to reuse
+        a digest the caller already holds.
+        """
+        if not features:
+            raise ValueError("At least one feature is required.")
+        node_list = list(nodes) if nodes is not None else None
+        if mapping_digest is None:
+            mapping_digest = mapping_fingerprint(node_to_idx)
+        columns = [
+            self.get(snapshot_id, feature, node_to_idx, node_list, mapping_digest, filter_key)
+            for feature in features
+        ]
+        x = np.concatenate(columns, axis=1) if len(columns) > 1 else np.array(columns[0])
+        return torch.from_numpy(x)
+
+    def _snapshot_dir(self, snapshot_id: str, filter_key: Optional[str]) -> Path:
+        directory = self.root / str(snapshot_id)
+        return directory / "_filters" / filter_key if filter_key else directory
+
+    def _compute(
+        self,
+        snapshot_id: str,
+        spec: FeatureSpec,
+        node_to_idx: Dict[str, int],
+        nodes: Iterable,
+        mapping_digest: str,
+        filter_key: Optional[str] = None,
+    ) -> None:
+        node_list = list(nodes)
+        validate_node_set(node_list, node_to_idx)
+        ordered = sorted(node_list, key=lambda node: node_to_idx[str(node.id)])
+
+        path = self.column_path(snapshot_id, spec.name, spec.version, filter_key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npy")
+        column = np.lib.format.open_memmap(
+            tmp_path, mode="w+", dtype=np.float32, shape=(len(ordered), spec.width)
+        )
+        try:
+            for start in range(0, len(ordered), self.batch_size):
+                batch = ordered[start:start + self.batch_size]
+                values = np.asarray(spec.compute(batch), dtype=np.float32)
+                if values.shape != (len(batch), spec.width):
+                    raise ValueError(
+                        f"Feature {spec.name!r} v{spec.version} returned shape "
+                        f"{values.shape}, expected {(len(batch), spec.width)}."
+                    )
+                column[start:start + len(batch)] = values
+            column.flush()
+        except BaseException:
+            del column
+            tmp_path.unlink(missing_ok=True)
+            raise
+        del column
+
+        # Drop the old sidecar first so a crash between the two renames leaves
+        # a column without metadata (recomputed) rather than stale metadata.
+        meta_path = path.with_suffix(".json")
+        meta_path.unlink(missing_ok=True)
+        tmp_path.replace(path)
+        meta = {
+            "name": spec.name,
+            "version": spec.version,
+            "width": spec.width,
+            "num_nodes": len(ordered),
+            "mapping_fingerprint": mapping_digest,
+        }
+        tmp_meta_path = meta_path.with_name(f"{path.stem}.{os.getpid()}.tmp.json")
+        tmp_meta_path.write_text(json.dumps(meta, indent=2, sort_keys=True))
+        tmp_meta_path.replace(meta_path)
+
+    def _read_meta(
+        self,
+        snapshot_id: str,
+        spec: FeatureSpec,
+        node_to_idx: Dict[str, int],
+        mapping_digest: str,
+        filter_key: Optional[str] = None,
+    ) -> Optional[Dict]:
+        path = self.column_path(snapshot_id, spec.name, spec.version, filter_key)
+        meta_path = path.with_suffix(".json")
+        if not path.exists() or not meta_path.exists():
+            return None
+        try:
+            meta = json.loads(meta_path.read_text())
+        except (OSError, json.JSONDecodeError):
+            return None
+        if (
+            meta.get("width") != spec.width
+            or meta.get("num_nodes") != len(node_to_idx)
+            or meta.get("mapping_fingerprint") != mapping_digest
+        ):
+            return None
+        return meta
+
+
+def _resolve(feature: FeatureRef) -> FeatureSpec:
+    if isinstance(feature, str):
+        return get_feature_spec(feature)
+    name, version = feature
+    return get_feature_spec(name, version)
@@ -0,0 +1,268 @@
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Mapping, Optional, Set
+
+import psycopg2
+from psycopg2 import sql
+from psycopg2.extras import RealDictCursor
+
+from .models import SnapshotEdge, SnapshotNode
+
+if TYPE_CHECKING:
+    from .connection_pool import ConnectionPool
+
+FINGERPRINT_VERSION = 1
+_FIELD_SEPARATOR = "\x1f"
+# Row digests are md5 (available in stock Postgres) split into two 60-bit
+# halves; summing them per file gives an order-independent multiset hash that
+# Postgres can aggregate as numeric without loading rows.
+_HALF_HEX = 15
+
+
+@dataclass(frozen=True)
+class SnapshotFingerprint:
+    """Per-file content digests and their Merkle root for one snapshot."""
+    root: str
+    files: Mapping[str, str]
+    version: int = FINGERPRINT_VERSION
+
+    def changed_files(self, other: "SnapshotFingerprint") -> Set[str]:
+        """Files added, removed or modified between the two fingerprints."""
+        paths = set(self.files) | set(other.files)
+        return {path for path in paths if self.files.get(path) != other.files.get(path)}
+
+    def matches(self, other: Optional["SnapshotFingerprint"]) -> bool:
+        return other is not None and self.version == other.version and self.root == other.root
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"version": self.version, "root": self.root, "files": dict(self.files)}
+
+    @classmethod
+    def from_dict(cls, payload: Mapping[str, Any]) -> "SnapshotFingerprint":
+        return cls(
+            root=payload["root"],
+            files=dict(payload["files"]),
+            version=int(payload.get("version", FINGERPRINT_VERSION)),
+        )
+
+
+@dataclass
+class _FileAccumulator:
+    nodes: int = 0
+    node_sums: List[int] = field(default_factory=lambda: [0, 0])
+    edges: int = 0
+    edge_sums: List[int] = field(default_factory=lambda: [0, 0])
+
+    def digest(self, path: str) -> str:
+        payload = json.dumps(
+            [path, self.nodes, self.node_sums, self.edges, self.edge_sums],
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class FingerprintBuilder:
+    """
+    Accumulate a SnapshotFingerprint in one streaming pass over records.
+
+    Rows can arrive in any order and in any number of batches; only one
+    accumulator per file is kept. Node digests cover id, type, originalType,
+    filePath, data and location; edge digests cover fromId, toId, kind and
+    filePath. Row ids of edges, snapshot ids and timestamps are excluded, so
+    identical content in two snapshots yields the same fingerprint.
+    """
+
+    def __init__(self):
+        self._files: Dict[str, _FileAccumulator] = {}
+
+    def add_node(self, node: SnapshotNode) -> None:
+        properties = node.properties or {}
+        self._add(
+            properties.get("filePath"),
+            [node.id, node.kind, node.label, properties.get("filePath"),
+             _jsonb_text(properties.get("data")), _jsonb_text(properties.get("location"))],
+            edge=False,
+        )
+
+    def add_edge(self, edge: SnapshotEdge) -> None:
+        properties = edge.properties or {}
+        self._add(
+            properties.get("filePath"),
+            [edge.source, edge.target, edge.kind, properties.get("filePath")],
+            edge=True,
+        )
+
+    def update(self, nodes: Iterable[SnapshotNode] = (), edges: Iterable[SnapshotEdge] = ()) -> None:
+        for node in nodes:
+            self.add_node(node)
+        for edge in edges:
+            self.add_edge(edge)
+
+    def build(self) -> SnapshotFingerprint:
+        files = {path: acc.digest(path) for path, acc in self._files.items()}
+        return SnapshotFingerprint(root=merkle_root(files), files=files)
+
+    def _add(self, file_path: Optional[str], fields: List[Any], edge: bool) -> None:
+        text = _FIELD_SEPARATOR.join("" if value is None else str(value) for value in fields)
+        high, low = _row_halves(text)
+        accumulator = self._files.setdefault(file_path or "", _FileAccumulator())
+        if edge:
+            accumulator.edges += 1
+            accumulator.edge_sums[0] += high
+            accumulator.edge_sums[1] += low
+        else:
+            accumulator.nodes += 1
+            accumulator.node_sums[0] += high
+            accumulator.node_sums[1] += low
+
+
+def fingerprint_snapshot(
+    nodes: Iterable[SnapshotNode], edges: Iterable[SnapshotEdge]
+) -> SnapshotFingerprint:
+    """Fingerprint in-memory snapshot records."""
+    builder = FingerprintBuilder()
+    builder.update(nodes, edges)
+    return builder.build()
+
+
+def merkle_root(file_digests: Mapping[str, str]) -> str:
+    """Binary Merkle root over (path, digest) leaves in path order."""
+    level = [
+        hashlib.sha256(b"\x00" + path.encode("utf-8") + b"\x00" + digest.encode("ascii")).digest()
+        for path, digest in sorted(file_digests.items())
+    ]
+    if not level:
+        return hashlib.sha256(b"").hexdigest()
+    while len(level) > 1:
+        paired = []
+        for i in range(0, len(level) - 1, 2):
+            paired.append(hashlib.sha256(b"\x01" + level[i] + level[i + 1]).digest())
+        if len(level) % 2:
+            paired.append(level[-1])
+        level = paired
+    return level[0].hex()
+
+
+def fetch_snapshot_fingerprint(
+    snapshot_id: str,
+    dsn: Optional[str] = None,
+    nodes_table: Optional[str] = None,
+    edges_table: Optional[str] = None,
+    pool: Optional["ConnectionPool"] = None,
+) -> SnapshotFingerprint:
+    """
+    Compute a snapshot's fingerprint inside Postgres.
+
+    Each row is hashed with md5 over the same canonical text as
+    FingerprintBuilder, and the hashes are summed per file with GROUP BY.
+    Only one row per file crosses the wire. JSON columns are canonicalized
+    with ``::jsonb::text``. Numbers written with redundant digits (1.50) can
+    differ from Python's rendering, but AST payloads do not use them.
+    """
+    from .materializer import DEFAULT_EDGES_TABLE, DEFAULT_NODES_TABLE, _connect
+
+    nodes_table = nodes_table or DEFAULT_NODES_TABLE
+    edges_table = edges_table or DEFAULT_EDGES_TABLE
+
+    def run(conn: psycopg2.extensions.connection) -> SnapshotFingerprint:
+        files: Dict[str, _FileAccumulator] = {}
+        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            cursor.execute(_node_fingerprint_query(nodes_table), (snapshot_id,))
+            for row in cursor.fetchall():
+                accumulator = files.setdefault(row["file_path"] or "", _FileAccumulator())
+                accumulator.nodes = int(row["rows"])
+                accumulator.node_sums = [int(row["high"]), int(row["low"])]
+        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            cursor.execute(_edge_fingerprint_query(edges_table), (snapshot_id,))
+            for row in cursor.fetchall():
+                accumulator = files.setdefault(row["file_path"] or "", _FileAccumulator())
+                accumulator.edges = int(row["rows"])
+                accumulator.edge_sums = [int(row["high"]), int(row["low"])]
+        digests = {path: acc.digest(path) for path, acc in files.items()}
+        return SnapshotFingerprint(root=merkle_root(digests), files=digests)
+
+    if pool is not None:
+        with pool.connection() as conn:
+            return run(conn)
+    conn = _connect(dsn)
+    try:
+        return run(conn)
+    finally:
+        conn.close()
+
+
+def _node_fingerprint_query(table: str) -> sql.Composed:
+    return _fingerprint_query(
+        table,
+        [
+            sql.SQL("{}::text").format(sql.Identifier("id")),
+            sql.SQL("{}::text").format(sql.Identifier("type")),
+            sql.SQL("{}::text").format(sql.Identifier("originalType")),
+            sql.SQL("{}::text").format(sql.Identifier("filePath")),
+            _jsonb_sql("data"),
+            _jsonb_sql("location"),
+        ],
+    )
+
+
+def _edge_fingerprint_query(table: str) -> sql.Composed:
+    return _fingerprint_query(
+        table,
+        [
+            sql.SQL("{}::text").format(sql.Identifier("fromId")),
+            sql.SQL("{}::text").format(sql.Identifier("toId")),
+            sql.SQL("{}::text").format(sql.Identifier("kind")),
+            sql.SQL("{}::text").format(sql.Identifier("filePath")),
+        ],
+    )
+
+
+def _fingerprint_query(table: str, fields: List[sql.Composable]) -> sql.Composed:
+    half = sql.SQL("(('x' || substr(h, {start}, {length}))::bit(60)::bigint)::numeric")
+    return sql.SQL(
+        "SELECT file_path, COUNT(*) AS rows, SUM({high}) AS high, SUM({low}) AS low "
+        "FROM (SELECT {file} AS file_path, md5(concat_ws({sep}, {fields})) AS h "
+        "FROM {table} WHERE {snapshot} = %s) AS t GROUP BY file_path"
+    ).format(
+        high=half.format(start=sql.Literal(1), length=sql.Literal(_HALF_HEX)),
+        low=half.format(start=sql.Literal(1 + _HALF_HEX), length=sql.Literal(_HALF_HEX)),
+        file=sql.Identifier("filePath"),
+        sep=sql.Literal(_FIELD_SEPARATOR),
+        fields=sql.SQL(", ").join(
+            sql.SQL("COALESCE({}, '')").format(field_sql) for field_sql in fields
+        ),
+        table=sql.Identifier(table),
+        snapshot=sql.Identifier("snapshotId"),
+    )
+
+
+def _jsonb_sql(column: str) -> sql.Composed:
+    # SQL NULL and JSON null both render as '' (psycopg2 returns None for both).
+    return sql.SQL("NULLIF({}::jsonb::text, 'null')").format(sql.Identifier(column))
+
+
+def _row_halves(text: str) -> List[int]:
+    digest = hashlib.md5(text.encode("utf-8")).hexdigest()
+    return [int(digest[:_HALF_HEX], 16), int(digest[_HALF_HEX:2 * _HALF_HEX], 16)]
+
+
+def _jsonb_text(value: Any) -> Optional[str]:
+    """Render a JSON value the way Postgres prints jsonb."""
+    if value is None:
+        return None
+    return _jsonb_render(value)
+
+
+def _jsonb_render(value: Any) -> str:
+    if isinstance(value, Mapping):
+        # jsonb orders object keys by byte length, then bytewise.
+        keys = sorted(value, key=lambda key: (len(str(key).encode("utf-8")), str(key).encode("utf-8")))
+        items = ", ".join(
+            f"{json.dumps(str(key), ensure_ascii=False)}: {_jsonb_render(value[key])}"
+            for key in keys
+        )
+        return "{" + items + "}"
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(_jsonb_render(item) for item in value) + "]"
+    return json.dumps(value, ensure_ascii=False, default=str)
@@ -1,8 +1,64 @@
-from typing import Optional
+from pathlib import Path
+from typing import Optional, Union
 
 import torch
 import torch.nn as nn
+import torch.nn.functional as F
 from torch_geometric.nn import SAGEConv
+from torch_geometric.typing import OptPairTensor, OptTensor
+
+from .compiled_inference import compile_for_inference
+from .quantization import quantize_for_inference
+
+
+class WeightedSAGEConv(SAGEConv):
+    """
+    SAGEConv that optionally accepts per-edge weights.
+
+    Without ``edge_weight`` this is exactly SAGEConv (mean aggregation). With
+    ``edge_weight`` the neighbourhood mean becomes a weighted mean,
+    ``sum(w_ij * x_j) / sum(w_ij)``, so running on a coalesced edge_index whose
+    weights are edge multiplicities gives the same output as running on the
+    original multigraph. Parameters and initialization match SAGEConv.
+    """
+
+    # PyG generates ``propagate`` from this signature; without it the parent's
+    # ``(x,)`` signature is inherited and ``edge_weight`` is rejected.
+    propagate_type = {"x": OptPairTensor, "edge_weight": OptTensor}
+
+    def forward(
+        self,
+        x: torch.Tensor,
+        edge_index: torch.Tensor,
+        edge_weight: Optional[torch.Tensor] = None
+    ) -> torch.Tensor:
+        out = self.propagate(edge_index, x=(x, x), edge_weight=edge_weight, size=None)
+
+        if edge_weight is not None:
+            # The mean aggregator divided by the edge count; rescale so the
+            # result is divided by the total edge weight instead.
+            target = edge_index[1]
+            count = torch.zeros(x.size(0), dtype=x.dtype, device=x.device)
+            count.scatter_add_(0, target, torch.ones_like(edge_weight, dtype=x.dtype))
+            total = torch.zeros(x.size(0), dtype=x.dtype, device=x.device)
+            total.scatter_add_(0, target, edge_weight.to(x.dtype))
+            out = out * (count / total.clamp(min=1e-12)).view(-1, 1)
+
+        out = self.lin_l(out)
+        if self.root_weight:
+            out = out + self.lin_r(x)
+        if self.normalize:
+            out = F.normalize(out, p=2.0, dim=-1)
+        return out
+
+    def message(
+        self,
+        x_j: torch.Tensor,
+        edge_weight: Optional[torch.Tensor]
+    ) -> torch.Tensor:
+        if edge_weight is None:
+            return x_j
+        return x_j * edge_weight.view(-1, 1)
 
 
 class SimpleGNN(nn.Module):
@@ -31,12 +87,13 @@ class SimpleGNN(nn.Module):
             torch.manual_seed(seed)
 
         # Single SAGEConv layer for proof of concept
-        self.conv = SAGEConv(in_channels, out_channels)
+        self.conv = WeightedSAGEConv(in_channels, out_channels)
 
     def forward(
         self,
         x: torch.Tensor,
-        edge_index: torch.Tensor
+        edge_index: torch.Tensor,
+        edge_weight: Optional[torch.Tensor] = None
     ) -> torch.Tensor:
         """
         Forward pass through the GNN.
@@ -44,13 +101,14 @@ class SimpleGNN(nn.Module):
         Args:
             x: Node feature matrix of shape [N, in_channels]
             edge_index: Graph connectivity in COO format [2, E]
+            edge_weight: Optional edge multiplicities [E] for coalesced graphs
 
         Returns:
             Node embeddings of shape [N, out_channels]
         """
         # Apply SAGEConv layer
         # SAGEConv handles nodes without edges gracefully by using only the node's own features
-        x = self.conv(x, edge_index)
+        x = self.conv(x, edge_index, edge_weight)
 
         # No activation function for proof of concept (embeddings can be raw)
         # In production, you might add ReLU or other activations
@@ -85,13 +143,14 @@ class TwoLayerGNN(nn.Module):
             torch.manual_seed(seed)
 
         # Two SAGEConv layers
-        self.conv1 = SAGEConv(in_channels, hidden_channels)
-        self.conv2 = SAGEConv(hidden_channels, out_channels)
+        self.conv1 = WeightedSAGEConv(in_channels, hidden_channels)
+        self.conv2 = WeightedSAGEConv(hidden_channels, out_channels)
 
     def forward(
         self,
         x: torch.Tensor,
-        edge_index: torch.Tensor
+        edge_index: torch.Tensor,
+        edge_weight: Optional[torch.Tensor] = None
     ) -> torch.Tensor:
         """
         Forward pass through the GNN.
@@ -99,16 +158,17 @@ class TwoLayerGNN(nn.Module):
         Args:
             x: Node feature matrix of shape [N, in_channels]
             edge_index: Graph connectivity in COO format [2, E]
+            edge_weight: Optional edge multiplicities [E] for coalesced graphs
 
         Returns:
             Node embeddings of shape [N, out_channels]
         """
         # First layer with ReLU activation
-        x = self.conv1(x, edge_index)
+        x = self.conv1(x, edge_index, edge_weight)
         x = torch.relu(x)
 
         # Second layer (no activation for final embeddings)
-        x = self.conv2(x, edge_index)
+        x = self.conv2(x, edge_index, edge_weight)
 
         return x
 
@@ -141,14 +201,15 @@ class ThreeLayerGNN(nn.Module):
             torch.manual_seed(seed)
 
         # Three SAGEConv layers
-        self.conv1 = SAGEConv(in_channels, hidden_channels)
-        self.conv2 = SAGEConv(hidden_channels, hidden_channels)
-        self.conv3 = SAGEConv(hidden_channels, out_channels)
+        self.conv1 = WeightedSAGEConv(in_channels, hidden_channels)
+        self.conv2 = WeightedSAGEConv(hidden_channels, hidden_channels)
+        self.conv3 = WeightedSAGEConv(hidden_channels, out_channels)
 
     def forward(
         self,
         x: torch.Tensor,
-        edge_index: torch.Tensor
+        edge_index: torch.Tensor,
+        edge_weight: Optional[torch.Tensor] = None
     ) -> torch.Tensor:
         """
         Forward pass through the GNN.
@@ -156,20 +217,21 @@ class ThreeLayerGNN(nn.Module):
         Args:
             x: Node feature matrix of shape [N, in_channels]
             edge_index: Graph connectivity in COO format [2, E]
+            edge_weight: Optional edge multiplicities [E] for coalesced graphs
 
         Returns:
             Node embeddings of shape [N, out_channels]
         """
         # First layer with ReLU activation
-        x = self.conv1(x, edge_index)
+        x = self.conv1(x, edge_index, edge_weight)
         x = torch.relu(x)
 
         # Second layer with ReLU activation
-        x = self.conv2(x, edge_index)
+        x = self.conv2(x, edge_index, edge_weight)
         x = torch.relu(x)
 
         # Third layer (no activation for final embeddings)
-        x = self.conv3(x, edge_index)
+        x = self.conv3(x, edge_index, edge_weight)
 
         return x
 
@@ -180,7 +242,10 @@ def create_gnn_model(
     seed: int = 42,
     eval_mode: bool = True,
     num_layers: int = 1,
-    hidden_channels: int = 128
+    hidden_channels: int = 128,
+    compile_backend: Optional[str] = None,
+    cache_dir: Optional[Union[str, Path]] = None,
+    quantization: Optional[str] = None
 ) -> nn.Module:
     """
     Factory function to create and initialize a GNN model.
@@ -192,10 +257,19 @@ def create_gnn_model(
         eval_mode: If True, set model to eval mode (default: True)
         num_layers: Number of GNN layers (1, 2, or 3, default: 1)
         hidden_channels: Hidden layer dimension for multi-layer models (default: 128)
+        compile_backend: If set ("torchscript" or "inductor"), return a compiled
+            inference module with the same outputs instead of the eager model
+        cache_dir: Directory for cached TorchScript artifacts (torchscript only)
+        quantization: If set ("int8" or "bf16"), return a reduced-precision
+            inference module (dynamic int8 linear layers or bf16 autocast)
 
     Returns:
-        Initialized GNN model (SimpleGNN, TwoLayerGNN, or ThreeLayerGNN)
+        Initialized GNN model (SimpleGNN, TwoLayerGNN, or ThreeLayerGNN), or its
+        compiled / quantized inference module when requested
     """
+    if compile_backend is not None and quantization is not None:
+        raise ValueError("compile_backend and quantization cannot be combined.")
+
     if num_layers == 1:
         model = SimpleGNN(in_channels, out_channels, seed)
     elif num_layers == 2:
@@ -208,13 +282,19 @@ def create_gnn_model(
     if eval_mode:
         model.eval()
 
+    if compile_backend is not None:
+        return compile_for_inference(model, compile_backend, cache_dir)
+    if quantization is not None:
+        return quantize_for_inference(model, quantization)
+
     return model
 
 
 def generate_embeddings(
     model: nn.Module,
     x: torch.Tensor,
-    edge_index: torch.Tensor
+    edge_index: torch.Tensor,
+    edge_weight: Optional[torch.Tensor] = None
 ) -> torch.Tensor:
     """
     Generate node embeddings using the GNN model.
@@ -223,11 +303,15 @@ def generate_embeddings(
         model: Trained or initialized GNN model (SimpleGNN or TwoLayerGNN)
         x: Node feature matrix [N, 6]
         edge_index: Graph connectivity [2, E]
+        edge_weight: Optional edge multiplicities [E] for coalesced graphs
 
     Returns:
         Node embeddings [N, 64]
     """
     model.eval()
     with torch.no_grad():
-        embeddings = model(x, edge_index)
+        if edge_weight is None:
+            embeddings = model(x, edge_index)
+        else:
+            embeddings = model(x, edge_index, edge_weight)
     return embeddings
@@ -0,0 +1,211 @@
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import torch
+
+DEGREE_PERCENTILES = (0.5, 0.9, 0.99)
+
+
+def degree_summary(degree: torch.Tensor) -> Dict[str, Any]:
+    """
+    Summarize a degree vector.
+
+    ``histogram`` counts nodes per power-of-two bucket: entry k holds nodes
+    with degree in [2**(k-1), 2**k), and entry 0 holds degree 0.
+    """
+    if degree.numel() == 0:
+        return {"min": 0, "max": 0, "mean": 0.0, "percentiles": {}, "histogram": []}
+    values = degree.to(torch.float64)
+    # torch.quantile caps its input size; nearest-rank on a sort has no limit.
+    ordered = torch.sort(degree).values
+    ranks = [round(q * (degree.numel() - 1)) for q in DEGREE_PERCENTILES]
+    quantiles = ordered[ranks].tolist()
+    buckets = torch.zeros_like(degree)
+    nonzero = degree > 0
+    buckets[nonzero] = torch.floor(torch.log2(values[nonzero])).to(torch.long) + 1
+    return {
+        "min": int(degree.min()),
+        "max": int(degree.max()),
+        "mean": float(values.mean()),
+        "percentiles": {
+            f"p{int(q * 100)}": float(value) for q, value in zip(DEGREE_PERCENTILES, quantiles)
+        },
+        "histogram": torch.bincount(buckets).tolist(),
+    }
+
+
+def weakly_connected_components(edge_index: torch.Tensor, num_nodes: int) -> torch.Tensor:
+    """
+    Label weakly connected components by min-label propagation.
+
+    Each round hooks both endpoints of every edge, and their current labels,
+    onto the smaller of the two labels with ``scatter_reduce``. It then
+    shortcuts label chains by pointer jumping. The result gives each node the
+    smallest node index in its component. The number of rounds grows with the
+    logarithm of the component diameter in practice, and each round is a few
+    O(E) tensor ops.
+    """
+    labels = torch.arange(num_nodes, dtype=torch.long)
+    if edge_index.shape[1] == 0:
+        return labels
+    src, dst = edge_index[0].long(), edge_index[1].long()
+    while True:
+        previous = labels
+        low = torch.minimum(labels[src], labels[dst])
+        labels = labels.scatter_reduce(0, src, low, reduce="amin")
+        labels = labels.scatter_reduce(0, dst, low, reduce="amin")
+        labels = labels.scatter_reduce(0, previous[src], low, reduce="amin")
+        labels = labels.scatter_reduce(0, previous[dst], low, reduce="amin")
+        labels = _shortcut(labels)
+        if torch.equal(labels, previous):
+            return labels
+
+
+def strongly_connected_components(edge_index: torch.Tensor, num_nodes: int) -> torch.Tensor:
+    """
+    Label strongly connected components with the forward-backward colouring scheme.
+
+    Each round first trims, in one pass, nodes with no remaining in- or
+    out-edges as singletons. It then propagates the maximum node index forward
+    along edges, which colours every node with the largest index that reaches
+    it.
+    Each colour root then propagates backward within its colour, and the
+    nodes it reaches form its SCC. Every step is a bincount or a
+    scatter_reduce over the remaining edges. Labels are the largest node
+    index in each component.
+    """
+    labels = torch.full((num_nodes,), -1, dtype=torch.long)
+    src, dst = edge_index[0].long(), edge_index[1].long()
+    keep = src != dst
+    src, dst = src[keep], dst[keep]
+    nodes = torch.arange(num_nodes, dtype=torch.long)
+
+    while True:
+        active = labels < 0
+        if not bool(active.any()):
+            return labels
+        live = active[src] & active[dst]
+        src, dst = src[live], dst[live]
+
+        # Trim: a node without in- or out-edges inside the active set is its own SCC.
+        in_degree = torch.bincount(dst, minlength=num_nodes)
+        out_degree = torch.bincount(src, minlength=num_nodes)
+        trivial = active & ((in_degree == 0) | (out_degree == 0))
+        labels[trivial] = nodes[trivial]
+        active = active & ~trivial
+        if not bool(active.any()):
+            return labels
+        live = active[src] & active[dst]
+        src, dst = src[live], dst[live]
+
+        colour = torch.where(active, nodes, torch.full_like(nodes, -1))
+        while True:
+            grown = colour.scatter_reduce(0, dst, colour[src], reduce="amax")
+            if torch.equal(grown, colour):
+                break
+            colour = grown
+
+        reached = active & (colour == nodes)
+        same_colour = colour[src] == colour[dst]
+        back_src, back_dst = dst[same_colour], src[same_colour]
+        while True:
+            grown = reached.clone()
+            grown[back_dst[reached[back_src]]] = True
+            if torch.equal(grown, reached):
+                break
+            reached = grown
+        labels[reached] = colour[reached]
+
+
+def component_summary(labels: torch.Tensor, top_k: int = 10) -> Dict[str, Any]:
+    """Count components and report the sizes of the largest ones."""
+    if labels.numel() == 0:
+        return {"count": 0, "largest": 0, "singletons": 0, "top_sizes": []}
+    sizes = torch.bincount(labels)
+    sizes = sizes[sizes > 0]
+    top = torch.topk(sizes, min(top_k, sizes.numel())).values
+    return {
+        "count": int(sizes.numel()),
+        "largest": int(top[0]),
+        "singletons": int((sizes == 1).sum()),
+        "top_sizes": top.tolist(),
+    }
+
+
+def edge_kind_counts(
+    edge_kind: torch.Tensor,
+    edge_kinds: Sequence[str],
+    edge_count: Optional[torch.Tensor] = None,
+) -> Dict[str, int]:
+    """Edges per kind; with ``edge_count`` coalesced columns count their multiplicity."""
+    weights = edge_count.to(torch.float64) if edge_count is not None else None
+    counts = torch.bincount(edge_kind.long(), weights=weights, minlength=len(edge_kinds))
+    return {kind: int(count) for kind, count in zip(edge_kinds, counts.tolist())}
+
+
+def file_node_counts(nodes: Iterable) -> Dict[str, int]:
+    """Nodes per ``filePath`` property, most populated files first."""
+    counts = Counter(
+        str((getattr(node, "properties", None) or {}).get("filePath") or "")
+        for node in nodes
+    )
+    return dict(sorted(counts.items(), key=lambda item: (-item[1], item[0])))
+
+
+def compute_graph_stats(
+    edge_index: torch.Tensor,
+    num_nodes: int,
+    edge_kind: Optional[torch.Tensor] = None,
+    edge_kinds: Optional[List[str]] = None,
+    edge_count: Optional[torch.Tensor] = None,
+    nodes: Optional[Iterable] = None,
+    include_scc: bool = True,
+    top_k: int = 10,
+) -> Dict[str, Any]:
+    """
+    Summarize a graph directly from its edge_index.
+
+    Degrees count original edges when ``edge_count`` (coalesced multiplicity)
+    is given. Per-kind counts need ``edge_kind``/``edge_kinds`` and per-file
+    counts need the snapshot ``nodes``. The result is plain JSON-serializable
+    data so it can be embedded in bundles and manifests.
+    """
+    src, dst = edge_index[0].long(), edge_index[1].long()
+    weights = edge_count.to(torch.float64) if edge_count is not None else None
+    out_degree = torch.bincount(src, weights=weights, minlength=num_nodes).long()
+    in_degree = torch.bincount(dst, weights=weights, minlength=num_nodes).long()
+    total_degree = out_degree + in_degree
+
+    stats: Dict[str, Any] = {
+        "num_nodes": int(num_nodes),
+        "num_edges": int(weights.sum()) if weights is not None else int(src.numel()),
+        "num_edge_columns": int(src.numel()),
+        "self_loops": int((src == dst).sum()),
+        "orphans": int((total_degree == 0).sum()),
+        "degree": {
+            "in": degree_summary(in_degree),
+            "out": degree_summary(out_degree),
+            "total": degree_summary(total_degree),
+        },
+        "weak_components": component_summary(
+            weakly_connected_components(edge_index, num_nodes), top_k
+        ),
+    }
+    if include_scc:
+        stats["strong_components"] = component_summary(
+            strongly_connected_components(edge_index, num_nodes), top_k
+        )
+    if edge_kind is not None and edge_kinds is not None:
+        stats["edge_kinds"] = edge_kind_counts(edge_kind, edge_kinds, edge_count)
+    if nodes is not None:
+        stats["files"] = file_node_counts(nodes)
+    return stats
+
+
+def _shortcut(labels: torch.Tensor) -> torch.Tensor:
+    """Pointer-jump until every label points at a root (labels[r] == r)."""
+    while True:
+        jumped = labels[labels]
+        if torch.equal(jumped, labels):
+            return labels
+        labels = jumped
@@ -0,0 +1,178 @@
+from typing import Iterable, Optional, Tuple, Union
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+from .exporter import TensorBundle
+from .gnn_model import generate_embeddings
+from .parallel_embeddings import infer_num_hops
+from .partitioning import induced_edges, propagate_mask, receptive_field_mask
+from .snapshot_diff import SnapshotDiff, diff_bundles, sorted_membership, sorted_node_ids, to_numpy
+
+ChangedNodes = Union[SnapshotDiff, Iterable[str]]
+
+
+def affected_node_mask(
+    old_bundle: TensorBundle,
+    new_bundle: TensorBundle,
+    changed: Optional[ChangedNodes] = None,
+    num_hops: int = 1,
+) -> torch.Tensor:
+    """
+    Mark nodes of ``new_bundle`` whose ``num_hops``-layer embedding can differ.
+
+    ``changed`` is a ``SnapshotDiff`` (default: ``diff_bundles(old, new)``) or
+    a set of node ids whose features or outgoing edges changed, such as every
+    node in the changed files. A changed node's output moves at layer 0 and
+    spreads along outgoing edges for ``num_hops`` steps. An added or removed
+    edge only changes its target's aggregation, so it spreads ``num_hops - 1``
+    steps from the target. Added nodes are always affected.
+    """
+    return _affected_mask(
+        old_bundle,
+        new_bundle,
+        changed,
+        num_hops,
+        sorted_node_ids(old_bundle["node_mapping"]),
+        sorted_node_ids(new_bundle["node_mapping"]),
+    )
+
+
+def _affected_mask(
+    old_bundle: TensorBundle,
+    new_bundle: TensorBundle,
+    changed: Optional[ChangedNodes],
+    num_hops: int,
+    old_sorted: Tuple[np.ndarray, np.ndarray],
+    new_sorted: Tuple[np.ndarray, np.ndarray],
+) -> torch.Tensor:
+    if changed is None:
+        changed = diff_bundles(old_bundle, new_bundle)
+    old_ids, old_rows = old_sorted
+    new_ids, new_rows = new_sorted
+    num_nodes = int(new_bundle["x"].shape[0])
+
+    if isinstance(changed, SnapshotDiff):
+        node_ids = [change.node_id for change in changed.nodes]
+        target_ids = [change.target for change in changed.edges]
+    else:
+        node_ids = [str(node_id) for node_id in changed]
+        # Plain id sets carry no edge changes; any old edge leaving a changed
+        # node may be gone, so its target is treated as an edge change.
+        old_index_to_id = np.empty(len(old_rows), dtype=old_ids.dtype)
+        old_index_to_id[old_rows] = old_ids
+        source_changed = np.zeros(len(old_rows), dtype=bool)
+        source_changed[old_rows[sorted_membership(old_ids, _sorted_np(node_ids))]] = True
+        old_edge_index = to_numpy(old_bundle["edge_index"]).astype(np.int64, copy=False)
+        targets = old_edge_index[1][source_changed[old_edge_index[0]]]
+        target_ids = old_index_to_id[targets].tolist()
+
+    edge_index = new_bundle["edge_index"]
+    node_seeds = _seed_mask(node_ids, new_ids, new_rows, num_nodes)
+    added_ids = new_ids[~sorted_membership(new_ids, old_ids)]
+    node_seeds |= _seed_mask(added_ids, new_ids, new_rows, num_nodes)
+    edge_seeds = _seed_mask(target_ids, new_ids, new_rows, num_nodes)
+    affected = propagate_mask(node_seeds, edge_index[0], edge_index[1], num_hops)
+    if num_hops > 0:
+        affected |= propagate_mask(edge_seeds, edge_index[0], edge_index[1], num_hops - 1)
+    return affected
+
+
+def refresh_embeddings(
+    model: nn.Module,
+    old_embeddings: torch.Tensor,
+    old_bundle: TensorBundle,
+    new_bundle: TensorBundle,
+    changed: Optional[ChangedNodes] = None,
+    num_hops: Optional[int] = None,
+) -> torch.Tensor:
+    """
+    Update embeddings for a new snapshot by recomputing only affected nodes.
+
+    Rows of nodes outside ``affected_node_mask`` are copied from
+    ``old_embeddings`` (aligned with the old ``node_mapping``) by node id.
+    Affected rows are recomputed on the subgraph induced by their
+    ``num_hops`` incoming receptive field, which gives the same rows as
+    ``generate_embeddings`` on the whole new graph. ``old_embeddings`` must
+    come from the same model.
+
+    Args:
+        model: GNN model that produced ``old_embeddings``
+        old_embeddings: Embeddings of the old bundle [N_old, out_channels]
+        old_bundle: Bundle the old embeddings were computed from
+        new_bundle: Bundle to produce embeddings for
+        changed: ``SnapshotDiff`` or node ids with changed content
+            (default: ``diff_bundles(old_bundle, new_bundle)``)
+        num_hops: Receptive field (default: number of message-passing layers)
+
+    Returns:
+        Node embeddings [N_new, out_channels], aligned with the new ``node_mapping``
+    """
+    old_count = len(old_bundle["node_mapping"])
+    if old_embeddings.shape[0] != old_count:
+        raise ValueError(
+            f"old_embeddings has {old_embeddings.shape[0]} rows but the old bundle "
+            f"has {old_count} nodes."
+        )
+    num_hops = infer_num_hops(model) if num_hops is None else num_hops
+    old_sorted = sorted_node_ids(old_bundle["node_mapping"])
+    new_sorted = sorted_node_ids(new_bundle["node_mapping"])
+    affected = _affected_mask(old_bundle, new_bundle, changed, num_hops, old_sorted, new_sorted)
+
+    x = new_bundle["x"]
+    edge_index = new_bundle["edge_index"]
+    edge_weight = new_bundle.get("edge_weight")
+    num_nodes = int(x.shape[0])
+    embeddings = torch.empty(
+        (num_nodes, old_embeddings.shape[1]), dtype=old_embeddings.dtype
+    )
+
+    carried = torch.nonzero(~affected, as_tuple=False).view(-1)
+    if carried.numel():
+        old_rows = _old_rows(old_sorted, new_sorted)[carried]
+        if bool((old_rows < 0).any()):
+            raise ValueError("Unaffected nodes are missing from the old bundle.")
+        embeddings[carried] = old_embeddings[old_rows]
+
+    if bool(affected.any()):
+        field = receptive_field_mask(edge_index, affected, num_hops)
+        global_ids = torch.nonzero(field, as_tuple=False).view(-1)
+        local_edge_index, keep = induced_edges(edge_index, field, global_ids, num_nodes)
+        local = generate_embeddings(
+            model,
+            x[global_ids],
+            local_edge_index,
+            edge_weight[keep] if edge_weight is not None else None,
+        )
+        owned = affected[global_ids]
+        embeddings[global_ids[owned]] = local[owned].to(embeddings.dtype)
+    return embeddings
+
+
+def _sorted_np(ids: Iterable[str]) -> np.ndarray:
+    return np.unique(np.array(list(ids), dtype=str))
+
+
+def _seed_mask(
+    node_ids: Iterable[str], new_ids: np.ndarray, new_rows: np.ndarray, num_nodes: int
+) -> torch.Tensor:
+    """Boolean mask over new bundle rows for the ids that exist in it."""
+    mask = torch.zeros(num_nodes, dtype=torch.bool)
+    ids = _sorted_np(node_ids)
+    if len(ids) and len(new_ids):
+        present = ids[sorted_membership(ids, new_ids)]
+        mask[torch.from_numpy(new_rows[np.searchsorted(new_ids, present)])] = True
+    return mask
+
+
+def _old_rows(
+    old_sorted: Tuple[np.ndarray, np.ndarray], new_sorted: Tuple[np.ndarray, np.ndarray]
+) -> torch.Tensor:
+    """Old bundle row of every new bundle row by node id (-1 for new nodes)."""
+    old_ids, old_rows = old_sorted
+    new_ids, new_rows = new_sorted
+    rows = np.full(len(new_rows), -1, dtype=np.int64)
+    present = sorted_membership(new_ids, old_ids)
+    rows[new_rows[present]] = old_rows[np.searchsorted(old_ids, new_ids[present])]
+    return torch.from_numpy(rows)
@@ -1,7 +1,11 @@
+import hashlib
+import itertools
 import json
+import logging
 import os
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Iterator, List, Mapping, Optional, Sequence, Tuple
 from urllib.parse import parse_qsl, quote, urlencode, urlsplit, urlunsplit
 
 import networkx as nx
@@ -9,11 +13,19 @@ import psycopg2
 from psycopg2 import sql
 from psycopg2.extras import RealDictCursor
 
+from .fingerprints import fingerprint_snapshot
+from .memory_planner import STREAMING, SnapshotCounts, plan_materialize
 from .models import SnapshotEdge, SnapshotGraph, SnapshotNode
 
+if TYPE_CHECKING:
+    from .connection_pool import ConnectionPool
+
 DEFAULT_NODES_TABLE = "AstNode"
 DEFAULT_EDGES_TABLE = "GraphEdge"
 
+logger = logging.getLogger(__name__)
+_cursor_ids = itertools.count()
+
 
 def _dsn_with_schema_options(dsn: str) -> str:
     """Translate ?schema=... into libpq options for search_path."""
@@ -90,111 +102,305 @@ def _stable_json(value: Any) -> str:
         return repr(value)
 
 
-def _fetch_nodes(
-    conn: psycopg2.extensions.connection,
-    table: str,
+NODE_COLUMNS = [
+    "id",
+    "type",
+    "originalType",
+    "filePath",
+    "data",
+    "location",
+    "snapshotId",
+    "createdAt",
+    "updatedAt",
+]
+EDGE_COLUMNS = [
+    "id",
+    "fromId",
+    "toId",
+    "kind",
+    "filePath",
+    "snapshotId",
+    "version",
+    "createdAt",
+]
+
+
+@dataclass(frozen=True)
+class SnapshotFilter:
+    """
+    Row predicates pushed into the snapshot queries; empty fields do not
+    filter. Nodes must match every node predicate. Edges must match
+    ``edge_kinds`` and, when nodes are filtered, have both endpoints among
+    the kept nodes, so the result is an induced subgraph.
+    """
+    node_types: Tuple[str, ...] = ()
+    edge_kinds: Tuple[str, ...] = ()
+    file_path_prefixes: Tuple[str, ...] = ()
+
+    def __post_init__(self) -> None:
+        for name in ("node_types", "edge_kinds", "file_path_prefixes"):
+            value = getattr(self, name) or ()
+            object.__setattr__(self, name, (value,) if isinstance(value, str) else tuple(value))
+
+    @classmethod
+    def from_options(
+        cls,
+        node_types: Optional[Sequence[str]] = None,
+        edge_kinds: Optional[Sequence[str]] = None,
+        file_path_prefixes: Optional[Sequence[str]] = None,
+    ) -> Optional["SnapshotFilter"]:
+        """A filter for the given options, or None when none is set."""
+        snapshot_filter = cls(node_types or (), edge_kinds or (), file_path_prefixes or ())
+        return None if snapshot_filter.is_empty else snapshot_filter
+
+    @property
+    def filters_nodes(self) -> bool:
+        return bool(self.node_types or self.file_path_prefixes)
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.filters_nodes or self.edge_kinds)
+
+    def digest(self) -> str:
+        """Short stable hash of the predicates, for keying per-filter caches."""
+        payload = json.dumps(
+            [sorted(self.node_types), sorted(self.edge_kinds), sorted(self.file_path_prefixes)],
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _node_filter(snapshot_filter: Optional[SnapshotFilter]) -> Tuple[sql.Composable, List[Any]]:
+    """Node predicates as an ``AND ...`` suffix for the snapshot WHERE clause, with their parameters."""
+    terms: List[sql.Composable] = []
+    params: List[Any] = []
+    if snapshot_filter is not None and snapshot_filter.node_types:
+        terms.append(sql.SQL("{} = ANY(%s)").format(sql.Identifier("type")))
+        params.append(list(snapshot_filter.node_types))
+    if snapshot_filter is not None and snapshot_filter.file_path_prefixes:
+        terms.append(sql.SQL("{} LIKE ANY(%s)").format(sql.Identifier("filePath")))
+        params.append([_like_prefix(prefix) for prefix in snapshot_filter.file_path_prefixes])
+    return _and_terms(terms), params
+
+
+def _edge_filter(
+    snapshot_filter: Optional[SnapshotFilter],
+    nodes_table: str,
     snapshot_id: str,
-) -> List[SnapshotNode]:
-    """Load nodes from SQL with a stable ordering."""
-    node_columns = [
-        "id",
-        "type",
-        "originalType",
-        "filePath",
-        "data",
-        "location",
-        "snapshotId",
-        "createdAt",
-        "updatedAt",
-    ]
-    query = sql.SQL(
-        "SELECT {fields} FROM {table} WHERE {snapshot_col} = %s ORDER BY {order}"
+) -> Tuple[sql.Composable, List[Any]]:
+    """Edge predicates as an ``AND ...`` suffix, restricting endpoints to the filtered nodes."""
+    terms: List[sql.Composable] = []
+    params: List[Any] = []
+    if snapshot_filter is not None and snapshot_filter.edge_kinds:
+        terms.append(sql.SQL("{} = ANY(%s)").format(sql.Identifier("kind")))
+        params.append(list(snapshot_filter.edge_kinds))
+    if snapshot_filter is not None and snapshot_filter.filters_nodes:
+        node_where, node_params = _node_filter(snapshot_filter)
+        kept_ids = sql.SQL("SELECT {id} FROM {table} WHERE {snapshot_col} = %s{where}").format(
+            id=sql.Identifier("id"),
+            table=sql.Identifier(nodes_table),
+            snapshot_col=sql.Identifier("snapshotId"),
+            where=node_where,
+        )
+        for column in ("fromId", "toId"):
+            terms.append(sql.SQL("{} IN ({})").format(sql.Identifier(column), kept_ids))
+            params.extend([snapshot_id, *node_params])
+    return _and_terms(terms), params
+
+
+def _and_terms(terms: List[sql.Composable]) -> sql.Composable:
+    if not terms:
+        return sql.SQL("")
+    return sql.SQL(" AND ") + sql.SQL(" AND ").join(terms)
+
+
+def _like_prefix(prefix: str) -> str:
+    """LIKE pattern matching ``prefix`` literally, followed by anything."""
+    return prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def _snapshot_query(
+    table: str,
+    columns: List[str],
+    order: List[str],
+    where: sql.Composable = sql.SQL(""),
+) -> sql.Composed:
+    """Build a snapshot-scoped SELECT with a stable ordering and optional extra predicates."""
+    return sql.SQL(
+        "SELECT {fields} FROM {table} WHERE {snapshot_col} = %s{where} ORDER BY {order}"
     ).format(
-        fields=sql.SQL(", ").join(map(sql.Identifier, node_columns)),
+        fields=sql.SQL(", ").join(map(sql.Identifier, columns)),
         table=sql.Identifier(table),
         snapshot_col=sql.Identifier("snapshotId"),
-        order=sql.SQL(", ").join(map(sql.Identifier, ["id"])),
+        where=where,
+        order=sql.SQL(", ").join(map(sql.Identifier, order)),
+    )
+
+
+def _node_query(table: str, where: sql.Composable = sql.SQL("")) -> sql.Composed:
+    """Query for all nodes of a snapshot ordered by id."""
+    return _snapshot_query(table, NODE_COLUMNS, ["id"], where)
+
+
+def _edge_query(table: str, where: sql.Composable = sql.SQL("")) -> sql.Composed:
+    """Query for all edges of a snapshot ordered by endpoints and kind."""
+    return _snapshot_query(table, EDGE_COLUMNS, ["fromId", "toId", "kind"], where)
+
+
+def _count_query(
+    nodes_table: str,
+    edges_table: str,
+    node_where: sql.Composable = sql.SQL(""),
+    edge_where: sql.Composable = sql.SQL(""),
+) -> sql.Composed:
+    """Count a snapshot's nodes and edges in one SELECT."""
+    return sql.SQL(
+        "SELECT (SELECT COUNT(*) FROM {nodes} WHERE {snapshot} = %s{node_where}) AS nodes, "
+        "(SELECT COUNT(*) FROM {edges} WHERE {snapshot} = %s{edge_where}) AS edges"
+    ).format(
+        nodes=sql.Identifier(nodes_table),
+        edges=sql.Identifier(edges_table),
+        snapshot=sql.Identifier("snapshotId"),
+        node_where=node_where,
+        edge_where=edge_where,
     )
 
+
+def count_snapshot_rows(
+    conn: psycopg2.extensions.connection,
+    nodes_table: str,
+    edges_table: str,
+    snapshot_id: str,
+    snapshot_filter: Optional[SnapshotFilter] = None,
+) -> SnapshotCounts:
+    """Row counts of a snapshot on an open connection, after ``snapshot_filter``."""
+    node_where, node_params = _node_filter(snapshot_filter)
+    edge_where, edge_params = _edge_filter(snapshot_filter, nodes_table, snapshot_id)
+    query = _count_query(nodes_table, edges_table, node_where, edge_where)
     with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-        cursor.execute(query, (snapshot_id,))
-        rows = cursor.fetchall()
-
-    nodes: List[SnapshotNode] = []
-    for row in rows:
-        node_id = str(row["id"])
-        properties = {
-            "filePath": row.get("filePath"),
-            "data": row.get("data"),
-            "location": row.get("location"),
-            "snapshotId": row.get("snapshotId"),
-            "createdAt": row.get("createdAt").isoformat()
-            if row.get("createdAt")
-            else None,
-            "updatedAt": row.get("updatedAt").isoformat()
-            if row.get("updatedAt")
-            else None,
-        }
-        nodes.append(
-            SnapshotNode(
-                id=node_id,
-                kind=row.get("type"),
-                label=row.get("originalType"),
-                properties=_canonicalize(properties),
-            )
-        )
-    return nodes
+        cursor.execute(query, (snapshot_id, *node_params, snapshot_id, *edge_params))
+        row = cursor.fetchone()
+    return SnapshotCounts(num_nodes=int(row["nodes"]), num_edges=int(row["edges"]))
+
+
+def fetch_snapshot_counts(
+    snapshot_id: str,
+    dsn: Optional[str] = None,
+    nodes_table: Optional[str] = None,
+    edges_table: Optional[str] = None,
+    pool: Optional["ConnectionPool"] = None,
+    snapshot_filter: Optional[SnapshotFilter] = None,
+) -> SnapshotCounts:
+    """
+    Count a snapshot's nodes and edges with one round trip over the
+    snapshotId indexes, after the same ``snapshot_filter`` predicates the
+    fetch queries use.
+    """
+    nodes_table = nodes_table or DEFAULT_NODES_TABLE
+    edges_table = edges_table or DEFAULT_EDGES_TABLE
+    if pool is not None:
+        with pool.connection() as conn:
+            return count_snapshot_rows(conn, nodes_table, edges_table, snapshot_id, snapshot_filter)
+    conn = _connect(dsn)
+    try:
+        return count_snapshot_rows(conn, nodes_table, edges_table, snapshot_id, snapshot_filter)
+    finally:
+        conn.close()
+
+
+def _node_from_row(row: Mapping[str, Any]) -> SnapshotNode:
+    """Convert a node row into an immutable SnapshotNode."""
+    properties = {
+        "filePath": row.get("filePath"),
+        "data": row.get("data"),
+        "location": row.get("location"),
+        "snapshotId": row.get("snapshotId"),
+        "createdAt": row.get("createdAt").isoformat()
+        if row.get("createdAt")
+        else None,
+        "updatedAt": row.get("updatedAt").isoformat()
+        if row.get("updatedAt")
+        else None,
+    }
+    return SnapshotNode(
+        id=str(row["id"]),
+        kind=row.get("type"),
+        label=row.get("originalType"),
+        properties=_canonicalize(properties),
+    )
+
+
+def _edge_from_row(row: Mapping[str, Any]) -> SnapshotEdge:
+    """Convert an edge row into an immutable SnapshotEdge."""
+    properties = {
+        "id": row.get("id"),
+        "filePath": row.get("filePath"),
+        "snapshotId": row.get("snapshotId"),
+        "version": row.get("version"),
+        "createdAt": row.get("createdAt").isoformat()
+        if row.get("createdAt")
+        else None,
+    }
+    return SnapshotEdge(
+        source=str(row["fromId"]),
+        target=str(row["toId"]),
+        kind=row.get("kind"),
+        properties=_canonicalize(properties),
+    )
+
+
+def _fetch_nodes(
+    conn: psycopg2.extensions.connection,
+    table: str,
+    snapshot_id: str,
+    batch_size: Optional[int] = None,
+    snapshot_filter: Optional[SnapshotFilter] = None,
+) -> List[SnapshotNode]:
+    """Load nodes from SQL with a stable ordering."""
+    where, params = _node_filter(snapshot_filter)
+    rows = _fetch_rows(conn, _node_query(table, where), (snapshot_id, *params), batch_size)
+    return [_node_from_row(row) for row in rows]
 
 
 def _fetch_edges(
     conn: psycopg2.extensions.connection,
     table: str,
     snapshot_id: str,
+    batch_size: Optional[int] = None,
+    snapshot_filter: Optional[SnapshotFilter] = None,
+    nodes_table: str = DEFAULT_NODES_TABLE,
 ) -> List[SnapshotEdge]:
     """Load edges from SQL with a stable ordering."""
-    edge_columns = [
-        "id",
-        "fromId",
-        "toId",
-        "kind",
-        "filePath",
-        "snapshotId",
-        "version",
-        "createdAt",
-    ]
-    query = sql.SQL(
-        "SELECT {fields} FROM {table} WHERE {snapshot_col} = %s ORDER BY {order}"
-    ).format(
-        fields=sql.SQL(", ").join(map(sql.Identifier, edge_columns)),
-        table=sql.Identifier(table),
-        snapshot_col=sql.Identifier("snapshotId"),
-        order=sql.SQL(", ").join(map(sql.Identifier, ["fromId", "toId", "kind"])),
-    )
+    where, params = _edge_filter(snapshot_filter, nodes_table, snapshot_id)
+    rows = _fetch_rows(conn, _edge_query(table, where), (snapshot_id, *params), batch_size)
+    return [_edge_from_row(row) for row in rows]
 
-    with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-        cursor.execute(query, (snapshot_id,))
-        rows = cursor.fetchall()
-
-    edges: List[SnapshotEdge] = []
-    for row in rows:
-        properties = {
-            "id": row.get("id"),
-            "filePath": row.get("filePath"),
-            "snapshotId": row.get("snapshotId"),
-            "version": row.get("version"),
-            "createdAt": row.get("createdAt").isoformat()
-            if row.get("createdAt")
-            else None,
-        }
-        edges.append(
-            SnapshotEdge(
-                source=str(row["fromId"]),
-                target=str(row["toId"]),
-                kind=row.get("kind"),
-                properties=_canonicalize(properties),
-            )
-        )
-    return edges
+
+def _fetch_rows(
+    conn: psycopg2.extensions.connection,
+    query: sql.Composed,
+    params: Tuple[Any, ...],
+    batch_size: Optional[int],
+) -> Iterator[Mapping[str, Any]]:
+    """
+    Yield the rows of a snapshot query. With ``batch_size`` they come from a
+    server-side cursor, so only one batch of raw rows is alive at a time.
+    """
+    if batch_size is None:
+        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+        yield from rows
+        return
+
+    with conn.cursor(name=f"materialize_{next(_cursor_ids)}", cursor_factory=RealDictCursor) as cursor:
+        cursor.itersize = batch_size
+        cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            yield from rows
 
 
 def _edge_sort_key(edge: SnapshotEdge) -> Tuple[str, str, str, str]:
@@ -238,20 +444,70 @@ def materialize_snapshot(
     dsn: Optional[str] = None,
     nodes_table: Optional[str] = None,
     edges_table: Optional[str] = None,
+    pool: Optional["ConnectionPool"] = None,
+    memory_budget: Optional[int] = None,
+    node_types: Optional[Sequence[str]] = None,
+    edge_kinds: Optional[Sequence[str]] = None,
+    file_path_prefixes: Optional[Sequence[str]] = None,
 ) -> SnapshotGraph:
-    """Materialize a frozen snapshot graph from SQL storage."""
+    """
+    Materialize a frozen snapshot graph from SQL storage.
+
+    With ``pool`` the connection is leased from a ConnectionPool and returned
+    afterwards instead of being opened and closed for this call (``dsn`` is
+    then ignored).
+
+    With ``memory_budget`` (bytes), the snapshot's rows are counted first
+    and ``components.memory_planner`` estimates the peak of each fetch
+    strategy. If ``fetchall`` does not fit, rows are converted one
+    server-side batch at a time. If even that does not fit,
+    MemoryBudgetExceeded is raised before any rows are fetched. The chosen
+    plan is logged. The budget only picks the fetch mode: the returned
+    SnapshotGraph still holds every record, so exporters that must stay
+    within it use the streaming or sharded paths of run_export_pipeline.
+
+    ``node_types``, ``edge_kinds`` and ``file_path_prefixes`` are pushed
+    into the SQL ``WHERE`` clauses (see SnapshotFilter), so excluded rows are
+    never sent. When nodes are filtered, only edges between kept nodes are
+    loaded. Records, graph and fingerprint all describe the filtered set.
+    """
     if not snapshot_id:
         raise ValueError("snapshot_id is required to scope the snapshot graph.")
     nodes_table = nodes_table or DEFAULT_NODES_TABLE
     edges_table = edges_table or DEFAULT_EDGES_TABLE
+    snapshot_filter = SnapshotFilter.from_options(node_types, edge_kinds, file_path_prefixes)
+
+    def fetch(conn: psycopg2.extensions.connection) -> Tuple[List[SnapshotNode], List[SnapshotEdge]]:
+        batch_size = None
+        if memory_budget is not None:
+            counts = count_snapshot_rows(conn, nodes_table, edges_table, snapshot_id, snapshot_filter)
+            plan = plan_materialize(counts, memory_budget)
+            logger.info("Materialize plan for snapshot %s: %s", snapshot_id, plan.describe())
+            if plan.strategy == STREAMING:
+                batch_size = plan.batch_size
+        nodes = _fetch_nodes(conn, nodes_table, snapshot_id, batch_size, snapshot_filter)
+        edges = _fetch_edges(conn, edges_table, snapshot_id, batch_size, snapshot_filter, nodes_table)
+        return nodes, edges
+
+    if pool is not None:
+        with pool.connection() as conn:
+            nodes, edges = fetch(conn)
+        return _assemble_snapshot(nodes, edges)
 
     conn = _connect(dsn)
     try:
-        nodes = _fetch_nodes(conn, nodes_table, snapshot_id)
-        edges = _fetch_edges(conn, edges_table, snapshot_id)
+        nodes, edges = fetch(conn)
     finally:
         conn.close()
 
+    return _assemble_snapshot(nodes, edges)
+
+
+def _assemble_snapshot(
+    nodes: List[SnapshotNode],
+    edges: List[SnapshotEdge],
+) -> SnapshotGraph:
+    """Wrap loaded records and their frozen graph into a SnapshotGraph."""
     # Freeze to guarantee immutability for downstream ML workflows.
     frozen_graph = _build_frozen_graph(nodes, edges)
     created_at = datetime.now(timezone.utc).isoformat()
@@ -261,4 +517,5 @@ def materialize_snapshot(
         edges=tuple(edges),
         created_at=created_at,
         source="sql",
+        fingerprint=fingerprint_snapshot(nodes, edges),
     )
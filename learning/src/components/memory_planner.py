@@ -0,0 +1,311 @@
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Union
+
+IN_MEMORY = "in_memory"
+STREAMING = "streaming"
+SHARDED = "sharded"
+COMPRESSED = "compressed"
+
+# Rows per fetch batch and batches in flight; the pipelined export uses the same defaults.
+DEFAULT_BATCH_SIZE = 5000
+DEFAULT_QUEUE_SIZE = 4
+
+MiB = 1 << 20
+GiB = 1 << 30
+
+_SIZE_UNITS = {"": 1, "k": 1 << 10, "m": MiB, "g": GiB, "t": 1 << 40}
+_SIZE_PATTERN = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([kmgt]?)(?:i?b)?\s*$", re.IGNORECASE)
+
+
+class MemoryBudgetExceeded(MemoryError):
+    """Raised before any rows are fetched when no strategy fits the budget."""
+
+
+@dataclass(frozen=True)
+class SnapshotCounts:
+    """Row counts of one snapshot."""
+    num_nodes: int
+    num_edges: int
+
+
+@dataclass(frozen=True)
+class MemoryModel:
+    """
+    Bytes held per unit of work, measured with tracemalloc on AST-like rows
+    (short JSON ``data`` and ``location``, UUID ids). Snapshots with large
+    ``data`` payloads need larger row and record sizes.
+    """
+    base_bytes: int = 512 * MiB  # interpreter with torch, networkx and psycopg2 imported
+    node_row_bytes: int = 1700  # RealDictRow as returned by the driver
+    edge_row_bytes: int = 820
+    node_record_bytes: int = 1400  # SnapshotNode with canonicalized properties
+    edge_record_bytes: int = 380
+    graph_node_bytes: int = 380  # frozen MultiDiGraph entries; attributes are shared with the records
+    graph_edge_bytes: int = 490
+    node_id_bytes: int = 140  # node_mapping entry including its id string
+    compact_id_bytes: int = 16
+    pickle_memo_bytes: int = 64  # pickle memo entry per mapping key
+
+
+@dataclass
+class ExecutionPlan:
+    """
+    Strategy chosen for a snapshot and the estimates behind it.
+
+    ``estimates`` maps every considered strategy to its stages, in execution
+    order, and the bytes alive at the end of each stage. The strategy is the
+    first one, in order of preference, whose peak fits ``memory_budget``.
+    """
+    strategy: str
+    memory_budget: int
+    counts: SnapshotCounts
+    estimates: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    batch_size: int = DEFAULT_BATCH_SIZE
+
+    def peak(self, strategy: Optional[str] = None) -> int:
+        return max(self.estimates[strategy or self.strategy].values())
+
+    def describe(self) -> str:
+        others = ", ".join(
+            f"{name} {format_size(self.peak(name))}" for name in self.estimates if name != self.strategy
+        )
+        return (
+            f"{self.counts.num_nodes} nodes, {self.counts.num_edges} edges, "
+            f"budget {format_size(self.memory_budget)}: {self.strategy} "
+            f"(peak {format_size(self.peak())}" + (f"; {others}" if others else "") + ")"
+        )
+
+
+def parse_memory_size(value: Union[str, int]) -> int:
+    """Parse "4GiB", "512M" or a plain byte count."""
+    if isinstance(value, int):
+        return value
+    match = _SIZE_PATTERN.match(value)
+    if match is None:
+        raise ValueError(f"Invalid memory size {value!r}; expected e.g. 512MiB or 4G.")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2).lower()])
+
+
+def format_size(num_bytes: int) -> str:
+    if num_bytes >= GiB:
+        return f"{num_bytes / GiB:.1f} GiB"
+    return f"{num_bytes / MiB:.0f} MiB"
+
+
+def estimate_materialize(
+    counts: SnapshotCounts,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    model: Optional[MemoryModel] = None,
+) -> Dict[str, Dict[str, int]]:
+    """
+    Stage estimates for ``materialize_snapshot``.
+
+    in_memory fetches each table with ``fetchall``, so every raw row is alive
+    next to its record; streaming converts rows one server-side batch at a
+    time. Both end with every record and the frozen graph in memory.
+    """
+    model = model or MemoryModel()
+    nodes, edges = counts.num_nodes, counts.num_edges
+    node_records = nodes * model.node_record_bytes
+    records = node_records + edges * model.edge_record_bytes
+    graph = records + nodes * model.graph_node_bytes + edges * model.graph_edge_bytes
+    node_batch = min(batch_size, nodes) * model.node_row_bytes
+    edge_batch = min(batch_size, edges) * model.edge_row_bytes
+    return {
+        IN_MEMORY: _with_base(
+            model,
+            {
+                "fetch_nodes": nodes * (model.node_row_bytes + model.node_record_bytes),
+                "fetch_edges": node_records + edges * (model.edge_row_bytes + model.edge_record_bytes),
+                "graph": graph,
+            },
+        ),
+        STREAMING: _with_base(
+            model,
+            {
+                "fetch_nodes": node_records + node_batch,
+                "fetch_edges": records + edge_batch,
+                "graph": graph,
+            },
+        ),
+    }
+
+
+def plan_materialize(
+    counts: SnapshotCounts,
+    memory_budget: int,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    model: Optional[MemoryModel] = None,
+) -> ExecutionPlan:
+    """Pick ``fetchall`` (in_memory) or batched server-side fetching (streaming)."""
+    return _choose(counts, memory_budget, estimate_materialize(counts, batch_size, model), batch_size)
+
+
+def estimate_export(
+    counts: SnapshotCounts,
+    num_partitions: Optional[int] = None,
+    output_format: str = "pickle",
+    include_edge_kinds: bool = False,
+    coalesce_edges: bool = False,
+    include_stats: bool = False,
+    keep_nodes: bool = False,
+    compact_ids: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    model: Optional[MemoryModel] = None,
+) -> Dict[str, Dict[str, int]]:
+    """
+    Stage estimates for ``run_export_pipeline`` under each strategy.
+
+    - in_memory: materialize_snapshot, then tensors from the NetworkX graph.
+      Records and graph stay alive until the bundle is written.
+    - streaming: the pipelined path. Only ``queue_size`` row batches are in
+      flight; node records are kept only with ``keep_nodes``.
+    - sharded: streaming into a sharded bundle. Partitioning needs the full
+      tensors, but shards are pickled one at a time.
+    - compressed: streaming into the chunked compressed format, written
+      while rows arrive, so no serialized copy of a whole tensor is ever
+      made. Only listed when another ``output_format`` was requested.
+
+    ``keep_nodes`` is what run_export_pipeline needs for statistics,
+    partitioning or a feature store.
+    """
+    model = model or MemoryModel()
+    nodes, edges = counts.num_nodes, counts.num_edges
+    x_bytes = nodes * 6 * 4
+    edge_bytes = edges * 2 * 8
+    kind_bytes = edges * 8 if include_edge_kinds or include_stats else 0
+    mapping = nodes * model.node_id_bytes
+    tensors = mapping + x_bytes + edge_bytes + kind_bytes
+
+    # Extra peaks of the optional steps that run on the finished tensors.
+    post = 0
+    if include_stats:
+        post = max(post, edges * 32 + nodes * 32)
+    if coalesce_edges:
+        # Sorted keys and the unique/count outputs next to the original columns.
+        post = max(post, edges * 44)
+    if compact_ids:
+        post = max(post, nodes * (model.compact_id_bytes + 16))
+
+    def write(output: str) -> int:
+        if output == "pickle":
+            # A pickled tensor is serialized into one bytes object.
+            return max(x_bytes, edge_bytes, kind_bytes) + nodes * model.pickle_memo_bytes
+        if output == SHARDED:
+            # Partition ids, plus the largest shard (owned rows and halo) and its serialized copy.
+            shard = 2 * (x_bytes + edge_bytes) // max(num_partitions or 1, 1)
+            return nodes * 8 + 2 * shard
+        return nodes * 8  # ids listed in row order
+
+    node_records = nodes * model.node_record_bytes
+    records = node_records + edges * model.edge_record_bytes
+    graph = records + nodes * model.graph_node_bytes + edges * model.graph_edge_bytes
+    in_memory_fetch = estimate_materialize(counts, batch_size, model)[IN_MEMORY]
+    in_memory_output = SHARDED if num_partitions else output_format
+
+    in_flight = (queue_size + 2) * max(
+        min(batch_size, nodes) * model.node_row_bytes, min(batch_size, edges) * model.edge_row_bytes
+    )
+    kept = node_records if keep_nodes or num_partitions else 0
+    # Edge chunks hold index columns and kind codes until they are concatenated.
+    streamed = kept + mapping + x_bytes + edges * (2 * 8 + 8)
+    collected = streamed + edge_bytes + edges * 8
+
+    def streaming(output: str) -> Dict[str, int]:
+        return _with_base(
+            model,
+            {
+                "fetch": streamed + in_flight,
+                "collect": collected,
+                "post": kept + tensors + post,
+                "write": kept + tensors + write(output),
+            },
+        )
+
+    estimates = {
+        IN_MEMORY: {
+            **in_memory_fetch,
+            "tensors": model.base_bytes + graph + tensors,
+            "post": model.base_bytes + graph + tensors + post,
+            "write": model.base_bytes + graph + tensors + write(in_memory_output),
+        }
+    }
+    if num_partitions:
+        estimates[SHARDED] = streaming(SHARDED)
+    else:
+        estimates[STREAMING] = streaming(output_format)
+        if output_format != "compressed":
+            estimates[COMPRESSED] = streaming("compressed")
+    return estimates
+
+
+def plan_export(
+    counts: SnapshotCounts,
+    memory_budget: int,
+    pipelined: bool = False,
+    num_partitions: Optional[int] = None,
+    output_format: str = "pickle",
+    include_edge_kinds: bool = False,
+    coalesce_edges: bool = False,
+    include_stats: bool = False,
+    keep_nodes: bool = False,
+    compact_ids: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    model: Optional[MemoryModel] = None,
+    allow_format_change: bool = False,
+) -> ExecutionPlan:
+    """
+    Pick the first strategy, in the order in_memory, streaming/sharded,
+    compressed, whose estimated peak fits ``memory_budget``. in_memory is
+    skipped when ``pipelined`` was already requested. compressed changes the
+    output format, so it is only chosen with ``allow_format_change``.
+
+    Raises MemoryBudgetExceeded when none fits; the message says so when
+    compressed output would have fit.
+    """
+    estimates = estimate_export(
+        counts,
+        num_partitions=num_partitions,
+        output_format=output_format,
+        include_edge_kinds=include_edge_kinds,
+        coalesce_edges=coalesce_edges,
+        include_stats=include_stats,
+        keep_nodes=keep_nodes,
+        compact_ids=compact_ids,
+        batch_size=batch_size,
+        model=model,
+    )
+    if pipelined:
+        del estimates[IN_MEMORY]
+    compressed = None if allow_format_change else estimates.pop(COMPRESSED, None)
+    try:
+        return _choose(counts, memory_budget, estimates, batch_size)
+    except MemoryBudgetExceeded as exc:
+        if compressed is not None and max(compressed.values()) <= memory_budget:
+            raise MemoryBudgetExceeded(
+                f"{exc} Compressed output would fit (peak {format_size(max(compressed.values()))}); "
+                'request output_format="compressed" or pass allow_format_change=True.'
+            ) from None
+        raise
+
+
+def _choose(
+    counts: SnapshotCounts,
+    memory_budget: int,
+    estimates: Dict[str, Dict[str, int]],
+    batch_size: int,
+) -> ExecutionPlan:
+    candidates: List[str] = list(estimates)
+    for strategy in candidates:
+        plan = ExecutionPlan(strategy, memory_budget, counts, estimates, batch_size)
+        if plan.peak() <= memory_budget:
+            return plan
+    cheapest = min(candidates, key=lambda name: max(estimates[name].values()))
+    plan = ExecutionPlan(cheapest, memory_budget, counts, estimates, batch_size)
+    raise MemoryBudgetExceeded(f"No strategy fits the memory budget. {plan.describe()}")
+
+
+def _with_base(model: MemoryModel, stages: Dict[str, int]) -> Dict[str, int]:
+    return {stage: model.base_bytes + value for stage, value in stages.items()}
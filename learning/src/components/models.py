@@ -1,5 +1,8 @@
 from dataclasses import dataclass, field
-from typing import Any, Mapping, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Mapping, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .fingerprints import SnapshotFingerprint
 
 
 @dataclass(frozen=True)
@@ -28,3 +31,4 @@ class SnapshotGraph:
     edges: Tuple[SnapshotEdge, ...]
     created_at: str
     source: Optional[str] = None
+    fingerprint: Optional["SnapshotFingerprint"] = None
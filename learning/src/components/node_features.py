@@ -1,5 +1,6 @@
 from typing import Dict, Iterable, Sequence
 
+import numpy as np
 import torch
 
 KIND_TO_BUCKET = {
@@ -37,7 +38,7 @@ def create_feature_matrix_v1(
     - Column 5 (Other): Unknown or any kind not listed above (including None)
     """
     node_list = list(nodes)
-    _validate_node_set(node_list, node_to_idx)
+    validate_node_set(node_list, node_to_idx)
 
     x = torch.zeros((len(node_to_idx), 6), dtype=torch.float32)
     for node in node_list:
@@ -51,7 +52,30 @@ def create_feature_matrix_v1(
     return x
 
 
-def _validate_node_set(nodes: Sequence, node_to_idx: Dict[str, int]) -> None:
+def kind_bucket_columns(nodes: Sequence) -> np.ndarray:
+    """
+    Batched form of create_feature_matrix_v1 for the feature store.
+
+    Returns a float32 array of shape [len(nodes), 6] whose rows follow the
+    order of ``nodes``.
+    """
+    buckets = np.fromiter(
+        (
+            KIND_TO_BUCKET.get(
+                str(node.kind) if getattr(node, "kind", None) is not None else "UNKNOWN", 5
+            )
+            for node in nodes
+        ),
+        dtype=np.int64,
+        count=len(nodes),
+    )
+    columns = np.zeros((len(nodes), 6), dtype=np.float32)
+    columns[np.arange(len(nodes)), buckets] = 1.0
+    return columns
+
+
+def validate_node_set(nodes: Sequence, node_to_idx: Dict[str, int]) -> None:
+    """Raise ValueError unless ``nodes`` and ``node_to_idx`` cover the same ids."""
     node_ids = {str(node.id) for node in nodes}
     mapping_ids = {str(node_id) for node_id in node_to_idx.keys()}
     if node_ids == mapping_ids:
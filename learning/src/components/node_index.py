@@ -0,0 +1,267 @@
+from collections.abc import ItemsView, Mapping, ValuesView
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+UUID = "uuid"
+UTF8 = "utf8"
+
+_HEX = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+_NIBBLES = np.full(256, 255, dtype=np.uint8)
+_NIBBLES[_HEX] = np.arange(16, dtype=np.uint8)
+_HYPHENS = [8, 13, 18, 23]
+_HEX_COLUMNS = [column for column in range(36) if column not in _HYPHENS]
+
+
+class NodeIdIndex(Mapping):
+    """
+    Compact, read-only ``node id -> row`` mapping for large bundles.
+
+    Canonical lowercase UUID ids (the ``@db.Uuid`` columns) are stored as a
+    sorted ``S16`` array of their 16 raw bytes. Any other ids are stored as a
+    sorted array of fixed-width UTF-8 bytes. Byte order equals Python string
+    order for both, so exported bundles, whose rows already follow sorted
+    ids, need no separate row array. id -> row is a binary search and
+    row -> id is an array lookup.
+
+    The index behaves like the ``Dict[str, int]`` it replaces: lookups,
+    ``in``, ``len``, and iteration in row order. ``lookup`` and ``ids_at``
+    are the vectorized forms for many ids at once.
+    """
+
+    def __init__(self, keys: np.ndarray, rows: Optional[np.ndarray], kind: str):
+        # Use from_ids / from_mapping; keys must already be sorted and unique.
+        self.kind = kind
+        self._keys = keys
+        self._rows = rows
+        self._by_row: Optional[np.ndarray] = None if rows is not None else keys
+
+    @classmethod
+    def from_ids(cls, node_ids: Union[Sequence[str], np.ndarray]) -> "NodeIdIndex":
+        """
+        Build an index where ``node_ids[i]`` owns row i.
+
+        Accepts strings or an ``S`` array of UTF-8 encoded ids.
+        """
+        encoded = _encode(node_ids)
+        kind, (keys, valid) = UUID, _pack_uuids(encoded)
+        if not bool(valid.all()):
+            kind, keys = UTF8, encoded
+        if len(keys) < 2 or bool(np.all(keys[1:] > keys[:-1])):
+            return cls(keys, None, kind)
+
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        if bool(np.any(keys[1:] == keys[:-1])):
+            duplicate = _decode(keys[1:][keys[1:] == keys[:-1]][:1], kind)[0]
+            raise ValueError(f"Duplicate node id {str(duplicate)!r}.")
+        rows = order.astype(np.int32 if len(order) <= np.iinfo(np.int32).max else np.int64)
+        return cls(keys, rows, kind)
+
+    @classmethod
+    def from_mapping(cls, node_mapping: "Mapping[str, int]") -> "NodeIdIndex":
+        """Build an index from a mapping whose values are exactly 0..N-1."""
+        if isinstance(node_mapping, NodeIdIndex):
+            return node_mapping
+        ordered: List[Optional[str]] = [None] * len(node_mapping)
+        for node_id, index in node_mapping.items():
+            ordered[index] = str(node_id)
+        if any(node_id is None for node_id in ordered):
+            raise ValueError("node_mapping indices must be exactly 0..N-1.")
+        return cls.from_ids(ordered)  # type: ignore[arg-type]
+
+    def __getitem__(self, node_id: str) -> int:
+        position = self._position(node_id)
+        if position < 0:
+            raise KeyError(node_id)
+        return int(self._rows[position]) if self._rows is not None else position
+
+    def __contains__(self, node_id: object) -> bool:
+        return isinstance(node_id, str) and self._position(node_id) >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.ids())
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, NodeIdIndex):
+            return (
+                self.kind == other.kind
+                and np.array_equal(self._keys, other._keys)
+                and np.array_equal(self._row_order(), other._row_order())
+            )
+        if not isinstance(other, Mapping) or len(other) != len(self):
+            return False
+        return all(other.get(node_id) == row for row, node_id in enumerate(self.ids()))
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"NodeIdIndex({len(self)} {self.kind} ids, {self.nbytes} bytes)"
+
+    def __reduce__(self):
+        return (NodeIdIndex, (self._keys, self._rows, self.kind))
+
+    def items(self) -> ItemsView:
+        return _IndexItems(self)
+
+    def values(self) -> ValuesView:
+        return _IndexValues(self)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the key and row arrays."""
+        total = self._keys.nbytes + (self._rows.nbytes if self._rows is not None else 0)
+        if self._by_row is not None and self._by_row is not self._keys:
+            total += self._by_row.nbytes
+        return total
+
+    def lookup(self, node_ids: Iterable[str], default: Optional[int] = None) -> np.ndarray:
+        """
+        Rows of many ids at once, as an int64 array.
+
+        Unknown ids raise ``KeyError`` unless ``default`` is given, in which
+        case they map to ``default``.
+        """
+        ids = node_ids if isinstance(node_ids, np.ndarray) else list(node_ids)
+        if len(ids) == 0:
+            return np.empty(0, dtype=np.int64)
+        encoded = _encode(ids)
+        if self.kind == UUID:
+            keys, valid = _pack_uuids(encoded)
+        else:
+            keys, valid = encoded, np.ones(len(encoded), dtype=bool)
+        rows = np.full(len(encoded), -1, dtype=np.int64)
+        found = np.zeros(len(encoded), dtype=bool)
+        if len(self._keys):
+            positions = np.minimum(np.searchsorted(self._keys, keys), len(self._keys) - 1)
+            found = valid & (self._keys[positions] == keys)
+            hits = positions[found]
+            rows[found] = self._rows[hits] if self._rows is not None else hits
+        if not bool(found.all()):
+            if default is None:
+                missing = [str(node_id) for node_id in np.asarray(ids)[~found][:5]]
+                raise KeyError(f"Unknown node ids: {missing}")
+            rows[~found] = default
+        return rows
+
+    def ids(self) -> List[str]:
+        """All ids in row order."""
+        return _decode(self._ids_by_row(), self.kind).tolist()
+
+    def ids_at(self, indices: Union[Sequence[int], np.ndarray]) -> List[str]:
+        """Ids owning the given rows."""
+        return _decode(self._ids_by_row()[np.asarray(indices, dtype=np.int64)], self.kind).tolist()
+
+    def sorted_ids(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Ids in sorted order as a str array, and their rows."""
+        rows = self._rows if self._rows is not None else np.arange(len(self._keys))
+        return _decode(self._keys, self.kind), rows.astype(np.int64)
+
+    def to_dict(self) -> "dict[str, int]":
+        return {node_id: row for row, node_id in enumerate(self.ids())}
+
+    def _ids_by_row(self) -> np.ndarray:
+        if self._by_row is None:
+            self._by_row = self._keys[self._row_order()]
+        return self._by_row
+
+    def _row_order(self) -> np.ndarray:
+        """Positions in ``_keys`` of rows 0..N-1."""
+        if self._rows is None:
+            return np.arange(len(self._keys))
+        order = np.empty(len(self._rows), dtype=np.int64)
+        order[self._rows] = np.arange(len(self._rows))
+        return order
+
+    def _position(self, node_id: str) -> int:
+        if self.kind == UUID:
+            key = _pack_uuid(node_id)
+            if key is None:
+                return -1
+        else:
+            key = node_id.encode("utf-8")
+            if len(key) > self._keys.dtype.itemsize:
+                return -1
+        position = int(np.searchsorted(self._keys, key))
+        if position < len(self._keys) and self._keys[position] == key.rstrip(b"\0"):
+            return position
+        return -1
+
+
+class _IndexItems(ItemsView):
+    def __iter__(self):
+        return zip(self._mapping.ids(), range(len(self._mapping)))
+
+
+class _IndexValues(ValuesView):
+    def __iter__(self):
+        return iter(range(len(self._mapping)))
+
+
+def split_id_lines(raw: bytes, count: int) -> np.ndarray:
+    """
+    Split ``count`` newline-separated UTF-8 ids into an ``S`` array.
+
+    Fixed-width ids (such as UUIDs) are sliced out of the buffer with one
+    reshape instead of a Python split.
+    """
+    if count == 0:
+        return np.empty(0, dtype="S1")
+    width, remainder = divmod(len(raw) + 1, count)
+    if remainder == 0 and width > 1:
+        lines = np.frombuffer(raw + b"\n", dtype=np.uint8).reshape(count, width)
+        if bool(np.all(lines[:, -1] == ord("\n"))):
+            return np.ascontiguousarray(lines[:, :-1]).view(f"S{width - 1}").reshape(-1)
+    return np.array(raw.split(b"\n"), dtype=bytes)
+
+
+def _encode(node_ids: Union[Sequence[str], np.ndarray]) -> np.ndarray:
+    if isinstance(node_ids, np.ndarray) and node_ids.dtype.kind == "S":
+        return node_ids
+    text = node_ids if isinstance(node_ids, np.ndarray) else np.array(node_ids, dtype=str)
+    if len(text) == 0:
+        return np.empty(0, dtype="S1")
+    try:
+        return text.astype(bytes)
+    except UnicodeEncodeError:
+        return np.char.encode(text, "utf-8")
+
+
+def _pack_uuids(text: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Encoded ids to 16-byte UUID keys, plus a mask of the canonical UUIDs.
+
+    Keys of non-UUID ids are meaningless and must be ignored via the mask.
+    """
+    valid = np.char.str_len(text) == 36
+    chars = np.ascontiguousarray(text.astype("S36", copy=False)).view(np.uint8).reshape(-1, 36)
+    valid &= np.all(chars[:, _HYPHENS] == ord("-"), axis=1)
+    nibbles = _NIBBLES[chars[:, _HEX_COLUMNS]]
+    valid &= ~np.any(nibbles == 255, axis=1)
+    packed = (nibbles[:, 0::2] << 4) | (nibbles[:, 1::2] & 0x0F)
+    return np.ascontiguousarray(packed).view("S16").reshape(-1), valid
+
+
+def _pack_uuid(node_id: str) -> Optional[bytes]:
+    if len(node_id) != 36 or any(node_id[i] != "-" for i in _HYPHENS) or node_id != node_id.lower():
+        return None
+    try:
+        return bytes.fromhex(node_id.replace("-", ""))
+    except ValueError:
+        return None
+
+
+def _decode(keys: np.ndarray, kind: str) -> np.ndarray:
+    """Stored keys back to a str array."""
+    if kind == UTF8:
+        return np.char.decode(keys, "utf-8")
+    raw = np.ascontiguousarray(keys).view(np.uint8).reshape(-1, 16)
+    nibbles = np.empty((len(raw), 32), dtype=np.uint8)
+    nibbles[:, 0::2] = raw >> 4
+    nibbles[:, 1::2] = raw & 0x0F
+    chars = np.full((len(raw), 36), ord("-"), dtype=np.uint8)
+    chars[:, _HEX_COLUMNS] = _HEX[nibbles]
+    return chars.view("S36").reshape(-1).astype("U36")
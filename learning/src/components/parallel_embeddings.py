@@ -0,0 +1,241 @@
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Set, Tuple, Union
+
+import torch
+import torch.nn as nn
+from torch_geometric.nn import MessagePassing
+
+from .gnn_model import generate_embeddings
+from .partitioning import (
+    extract_partition,
+    load_shard,
+    load_shard_manifest,
+    partition_edge_cut,
+)
+
+# Model held by each worker process; set once by the pool initializer.
+_WORKER_MODEL: Optional[nn.Module] = None
+
+
+def infer_num_hops(model: nn.Module) -> int:
+    """Count message-passing layers, i.e. the model's receptive field in hops."""
+    hops = sum(1 for module in model.modules() if isinstance(module, MessagePassing))
+    # Compiled inference modules carry no MessagePassing layers but record their depth.
+    return hops or int(getattr(model, "num_hops", 0))
+
+
+def generate_embeddings_parallel(
+    model: nn.Module,
+    x: torch.Tensor,
+    edge_index: torch.Tensor,
+    edge_weight: Optional[torch.Tensor] = None,
+    parts: Optional[torch.Tensor] = None,
+    num_partitions: Optional[int] = None,
+    num_workers: Optional[int] = None,
+    threads_per_worker: Optional[int] = None,
+    num_hops: Optional[int] = None,
+    mp_context: str = "spawn",
+) -> torch.Tensor:
+    """
+    Generate node embeddings partition by partition in a process pool.
+
+    Each partition is extracted with a halo out to the model depth, so owned
+    rows match the full-graph ``generate_embeddings`` output. Results are
+    stitched back into one ``[N, out_channels]`` matrix in global index order
+    (aligned with ``node_mapping``).
+
+    Args:
+        model: GNN model to run (weights are shipped to every worker once)
+        x: Node feature matrix [N, in_channels]
+        edge_index: Graph connectivity [2, E]
+        edge_weight: Optional edge multiplicities [E] for coalesced graphs
+        parts: Optional precomputed partition id per node
+        num_partitions: Partitions to create when ``parts`` is not given
+            (default: one per worker)
+        num_workers: Worker processes (default: min(partitions, CPU count))
+        threads_per_worker: Intra-op threads pinned in each worker
+            (default: CPU count divided evenly across workers)
+        num_hops: Halo depth (default: number of message-passing layers)
+        mp_context: Multiprocessing start method (default: "spawn")
+
+    Returns:
+        Node embeddings [N, out_channels]
+    """
+    num_nodes = x.shape[0]
+    num_hops = infer_num_hops(model) if num_hops is None else num_hops
+    cpu_count = os.cpu_count() or 1
+
+    if parts is None:
+        num_parts = num_partitions or num_workers or cpu_count
+        parts = partition_edge_cut(edge_index, num_nodes, num_parts)
+    num_parts = int(parts.max().item()) + 1 if parts.numel() else 0
+    workers, threads = _resolve_workers(num_parts, num_workers, threads_per_worker)
+
+    def tasks() -> Iterator[Tuple]:
+        for part in range(num_parts):
+            shard = extract_partition(
+                x, edge_index, parts, part, num_hops, edge_weight=edge_weight
+            )
+            if shard["num_owned"]:
+                yield (
+                    shard["x"],
+                    shard["edge_index"],
+                    shard["global_ids"][: shard["num_owned"]],
+                    shard.get("edge_weight"),
+                )
+
+    return _run_partitions(
+        model, tasks(), _embed_partition, num_nodes, workers, threads, mp_context
+    )
+
+
+def generate_embeddings_from_shards(
+    model: nn.Module,
+    shard_dir: Union[str, Path],
+    num_workers: Optional[int] = None,
+    threads_per_worker: Optional[int] = None,
+    mp_context: str = "spawn",
+) -> torch.Tensor:
+    """
+    Generate embeddings for a sharded bundle written by ``export_sharded_bundle``.
+
+    Workers load their own shard from disk, so the parent process never holds
+    more than the stitched embedding matrix.
+    """
+    manifest = load_shard_manifest(shard_dir)
+    model_hops = infer_num_hops(model)
+    if manifest["num_hops"] < model_hops:
+        raise ValueError(
+            f"Shards were written with a {manifest['num_hops']}-hop halo but the "
+            f"model needs {model_hops} hops for exact embeddings."
+        )
+
+    workers, threads = _resolve_workers(
+        manifest["num_parts"], num_workers, threads_per_worker
+    )
+    tasks = (
+        (str(shard_dir), entry["part"])
+        for entry in manifest["shards"]
+        if entry["num_owned"]
+    )
+    return _run_partitions(
+        model,
+        tasks,
+        _embed_shard_file,
+        manifest["num_nodes"],
+        workers,
+        threads,
+        mp_context,
+    )
+
+
+def _resolve_workers(
+    num_parts: int,
+    num_workers: Optional[int],
+    threads_per_worker: Optional[int],
+) -> Tuple[int, int]:
+    cpu_count = os.cpu_count() or 1
+    workers = max(1, min(num_workers or cpu_count, max(num_parts, 1)))
+    threads = threads_per_worker or max(1, cpu_count // workers)
+    return workers, threads
+
+
+def _run_partitions(
+    model: nn.Module,
+    tasks: Iterator[Tuple],
+    worker_fn,
+    num_nodes: int,
+    num_workers: int,
+    threads_per_worker: int,
+    mp_context: str,
+) -> torch.Tensor:
+    """Run worker_fn over tasks and scatter (global_ids, rows) results into one matrix."""
+    output: Optional[torch.Tensor] = None
+
+    def stitch(result: Tuple[torch.Tensor, torch.Tensor]) -> None:
+        nonlocal output
+        global_ids, rows = result
+        if output is None:
+            output = torch.zeros((num_nodes, rows.shape[1]), dtype=rows.dtype)
+        output[global_ids] = rows
+
+    if num_workers == 1:
+        # Run on the caller's model in-process; the worker globals are for pool processes only.
+        previous_threads = torch.get_num_threads()
+        torch.set_num_threads(threads_per_worker)
+        try:
+            for task in tasks:
+                stitch(worker_fn(*task, model=model))
+        finally:
+            torch.set_num_threads(previous_threads)
+    else:
+        context = multiprocessing.get_context(mp_context)
+        with ProcessPoolExecutor(
+            max_workers=num_workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(model, threads_per_worker),
+        ) as executor:
+            # Keep a bounded number of partitions in flight so the parent never
+            # materializes every shard at once.
+            pending: Set[Future] = set()
+            for task in tasks:
+                if len(pending) >= 2 * num_workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        stitch(future.result())
+                pending.add(executor.submit(worker_fn, *task))
+            for future in pending:
+                stitch(future.result())
+
+    if output is None:
+        out_channels = _output_channels(model)
+        output = torch.zeros((num_nodes, out_channels), dtype=torch.float32)
+    return output
+
+
+def _init_worker(model: nn.Module, num_threads: int) -> None:
+    global _WORKER_MODEL
+    torch.set_num_threads(num_threads)
+    _WORKER_MODEL = model
+    _WORKER_MODEL.eval()
+
+
+def _embed_partition(
+    x: torch.Tensor,
+    edge_index: torch.Tensor,
+    owned_ids: torch.Tensor,
+    edge_weight: Optional[torch.Tensor] = None,
+    model: Optional[nn.Module] = None,
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """Embed one partition with ``model``, or the pool worker's model when None."""
+    model = model if model is not None else _WORKER_MODEL
+    embeddings = generate_embeddings(model, x, edge_index, edge_weight)
+    return owned_ids, embeddings[: owned_ids.numel()].clone()
+
+
+def _embed_shard_file(
+    shard_dir: str, part: int, model: Optional[nn.Module] = None
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    shard = load_shard(shard_dir, part)
+    owned_ids = shard["global_ids"][: shard["num_owned"]]
+    return _embed_partition(
+        shard["x"], shard["edge_index"], owned_ids, shard.get("edge_weight"), model
+    )
+
+
+def _output_channels(model: nn.Module) -> int:
+    """Best-effort output width for graphs with no owned nodes at all."""
+    layers: Dict[str, MessagePassing] = {
+        name: module
+        for name, module in model.named_modules()
+        if isinstance(module, MessagePassing)
+    }
+    if not layers:
+        if hasattr(model, "out_channels"):
+            return int(getattr(model, "out_channels"))
+        raise ValueError("Model has no message-passing layers.")
+    return int(getattr(list(layers.values())[-1], "out_channels"))
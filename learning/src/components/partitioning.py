@@ -0,0 +1,369 @@
+import heapq
+import json
+import math
+import pickle
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, TypedDict, Union
+
+import torch
+
+from .exporter import TensorBundle
+
+MANIFEST_FILENAME = "manifest.json"
+NODE_MAPPING_FILENAME = "node_mapping.pkl"
+SHARD_FORMAT_VERSION = 1
+PARTITION_STRATEGIES = ("file", "edge_cut")
+
+
+class _PartitionShardRequired(TypedDict):
+    x: torch.Tensor
+    edge_index: torch.Tensor
+    global_ids: torch.Tensor
+    halo_nodes: torch.Tensor
+    num_owned: int
+
+
+class PartitionShard(_PartitionShardRequired, total=False):
+    edge_weight: torch.Tensor
+
+
+def partition_by_file(
+    nodes: Iterable, node_to_idx: Dict[str, int], num_parts: int
+) -> torch.Tensor:
+    """Assign whole files to partitions, balancing node counts greedily."""
+    _validate_num_parts(num_parts)
+    file_members: Dict[str, List[int]] = {}
+    for node in nodes:
+        properties = getattr(node, "properties", None) or {}
+        file_path = str(properties.get("filePath") or "")
+        file_members.setdefault(file_path, []).append(node_to_idx[str(node.id)])
+
+    parts = torch.full((len(node_to_idx),), -1, dtype=torch.long)
+    # Largest file first onto the lightest partition keeps shards within one
+    # file's worth of nodes of each other.
+    loads = [(0, part) for part in range(num_parts)]
+    ordered = sorted(file_members.items(), key=lambda item: (-len(item[1]), item[0]))
+    for _, members in ordered:
+        load, part = heapq.heappop(loads)
+        parts[torch.tensor(members, dtype=torch.long)] = part
+        heapq.heappush(loads, (load + len(members), part))
+
+    if bool((parts < 0).any()):
+        raise ValueError("nodes must cover every id in node_to_idx to partition by file.")
+    return parts
+
+
+def partition_edge_cut(
+    edge_index: torch.Tensor,
+    num_nodes: int,
+    num_parts: int,
+    refinement_rounds: int = 8,
+    imbalance: float = 1.05,
+) -> torch.Tensor:
+    """
+    Balanced edge-cut partitioning without external graph libraries.
+
+    Nodes are chunked along a BFS order of the undirected graph (so neighbours
+    land in the same chunk), then refined with capacity-bounded label
+    propagation that moves nodes towards the partition holding most of their
+    neighbours.
+    """
+    _validate_num_parts(num_parts)
+    if num_nodes == 0:
+        return torch.empty(0, dtype=torch.long)
+
+    rowptr, col = _undirected_csr(edge_index, num_nodes)
+    order = _bfs_order(rowptr, col, num_nodes)
+    chunk = math.ceil(num_nodes / num_parts)
+    capacity = max(chunk, math.ceil(imbalance * num_nodes / num_parts))
+
+    parts = torch.empty(num_nodes, dtype=torch.long)
+    parts[order] = torch.arange(num_nodes, dtype=torch.long) // chunk
+
+    row = torch.repeat_interleave(torch.arange(num_nodes, dtype=torch.long), rowptr.diff())
+    for _ in range(refinement_rounds):
+        if _refine_partition(parts, row, col, num_parts, capacity) == 0:
+            break
+    return parts
+
+
+def create_partitions(
+    strategy: str,
+    num_parts: int,
+    node_to_idx: Dict[str, int],
+    edge_index: torch.Tensor,
+    nodes: Optional[Iterable] = None,
+) -> torch.Tensor:
+    """Dispatch to a partitioning strategy and return a per-node partition id."""
+    if strategy == "file":
+        if nodes is None:
+            raise ValueError("File-based partitioning requires the snapshot nodes.")
+        return partition_by_file(nodes, node_to_idx, num_parts)
+    if strategy == "edge_cut":
+        return partition_edge_cut(edge_index, len(node_to_idx), num_parts)
+    raise ValueError(
+        f"partition strategy must be one of {PARTITION_STRATEGIES}, got {strategy!r}"
+    )
+
+
+def receptive_field_mask(
+    edge_index: torch.Tensor, seed_mask: torch.Tensor, num_hops: int
+) -> torch.Tensor:
+    """Mark nodes whose features reach the seeds within num_hops message-passing steps."""
+    return propagate_mask(seed_mask, edge_index[1], edge_index[0], num_hops)
+
+
+def extract_partition(
+    x: torch.Tensor,
+    edge_index: torch.Tensor,
+    parts: torch.Tensor,
+    part: int,
+    num_hops: int = 1,
+    edge_weight: Optional[torch.Tensor] = None,
+) -> PartitionShard:
+    """
+    Cut one partition out of the global graph, including its halo.
+
+    Local ids place owned nodes first (``[0, num_owned)``) followed by halo
+    nodes. The halo covers the ``num_hops`` incoming neighbourhood, so a
+    ``num_hops``-layer model produces exact outputs for the owned rows.
+    """
+    owned_mask = parts == part
+    field = receptive_field_mask(edge_index, owned_mask, num_hops)
+    owned = torch.nonzero(owned_mask, as_tuple=False).view(-1)
+    halo = torch.nonzero(field & ~owned_mask, as_tuple=False).view(-1)
+    global_ids = torch.cat([owned, halo])
+
+    local_edge_index, keep = induced_edges(edge_index, field, global_ids, x.shape[0])
+    shard: PartitionShard = {
+        "x": x[global_ids],
+        "edge_index": local_edge_index,
+        "global_ids": global_ids,
+        "halo_nodes": halo,
+        "num_owned": int(owned.numel()),
+    }
+    if edge_weight is not None:
+        shard["edge_weight"] = edge_weight[keep]
+    return shard
+
+
+def export_sharded_bundle(
+    bundle: TensorBundle,
+    parts: torch.Tensor,
+    output_dir: Union[str, Path],
+    num_parts: int,
+    num_hops: int = 1,
+    strategy: Optional[str] = None,
+) -> Path:
+    """
+    Write one pickle per partition plus a JSON manifest describing the shards.
+
+    ``num_parts`` is the count requested from the partitioner, so partitions
+    left empty still get a (node-less) shard and the manifest matches it.
+    """
+    _validate_num_parts(num_parts)
+    if parts.numel() and int(parts.max().item()) >= num_parts:
+        raise ValueError(
+            f"parts assigns partition {int(parts.max().item())}, expected ids below {num_parts}"
+        )
+    path = Path(output_dir)
+    path.mkdir(parents=True, exist_ok=True)
+
+    x = bundle["x"]
+    edge_index = bundle["edge_index"]
+
+    shard_entries: List[Dict[str, Any]] = []
+    for part in range(num_parts):
+        shard = extract_partition(
+            x, edge_index, parts, part, num_hops, edge_weight=bundle.get("edge_weight")
+        )
+        filename = f"part-{part:05d}.pkl"
+        with open(path / filename, "wb") as handle:
+            pickle.dump(shard, handle)
+        shard_entries.append(
+            {
+                "part": part,
+                "file": filename,
+                "num_owned": shard["num_owned"],
+                "num_halo": int(shard["halo_nodes"].numel()),
+                "num_edges": int(shard["edge_index"].shape[1]),
+            }
+        )
+
+    with open(path / NODE_MAPPING_FILENAME, "wb") as handle:
+        pickle.dump(bundle["node_mapping"], handle)
+
+    src, dst = edge_index[0], edge_index[1]
+    edge_cut = int((parts[src] != parts[dst]).sum().item()) if src.numel() else 0
+    manifest = {
+        "format_version": SHARD_FORMAT_VERSION,
+        "strategy": strategy,
+        "num_nodes": int(x.shape[0]),
+        "num_edges": int(edge_index.shape[1]),
+        "num_features": int(x.shape[1]) if x.dim() > 1 else 1,
+        "num_parts": num_parts,
+        "num_hops": num_hops,
+        "edge_cut": edge_cut,
+        "node_mapping": NODE_MAPPING_FILENAME,
+        "shards": shard_entries,
+    }
+    for name in ("stats", "fingerprint", "export_options"):
+        if name in bundle:
+            manifest[name] = bundle[name]  # type: ignore[literal-required]
+    with open(path / MANIFEST_FILENAME, "w", encoding="utf-8") as handle:
+        json.dump(manifest, handle, indent=2, sort_keys=True)
+    return path
+
+
+def load_shard_manifest(shard_dir: Union[str, Path]) -> Dict[str, Any]:
+    """Read the manifest of a sharded bundle."""
+    path = Path(shard_dir) / MANIFEST_FILENAME
+    if not path.exists():
+        raise FileNotFoundError(f"Shard manifest not found: {path}")
+    with open(path, "r", encoding="utf-8") as handle:
+        manifest = json.load(handle)
+    if manifest.get("format_version") != SHARD_FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported shard format version: {manifest.get('format_version')}"
+        )
+    return manifest
+
+
+def load_shard(
+    shard_dir: Union[str, Path],
+    part: int,
+    manifest: Optional[Dict[str, Any]] = None,
+) -> PartitionShard:
+    """Load a single partition without touching the other shards."""
+    manifest = manifest or load_shard_manifest(shard_dir)
+    entries = {entry["part"]: entry for entry in manifest["shards"]}
+    if part not in entries:
+        raise KeyError(f"Partition {part} not present in shard manifest.")
+    with open(Path(shard_dir) / entries[part]["file"], "rb") as handle:
+        return pickle.load(handle)
+
+
+def iter_shards(shard_dir: Union[str, Path]) -> Iterator[Tuple[int, PartitionShard]]:
+    """Yield (part, shard) pairs one at a time to keep memory bounded."""
+    manifest = load_shard_manifest(shard_dir)
+    for entry in manifest["shards"]:
+        yield entry["part"], load_shard(shard_dir, entry["part"], manifest)
+
+
+def load_shard_node_mapping(shard_dir: Union[str, Path]) -> Dict[str, int]:
+    """Load the global node-id-to-index mapping shared by all shards."""
+    manifest = load_shard_manifest(shard_dir)
+    with open(Path(shard_dir) / manifest["node_mapping"], "rb") as handle:
+        return pickle.load(handle)
+
+
+def propagate_mask(
+    mask: torch.Tensor, frm: torch.Tensor, to: torch.Tensor, num_hops: int
+) -> torch.Tensor:
+    """Grow a node mask along (frm -> to) pairs for up to num_hops steps."""
+    mask = mask.clone()
+    for _ in range(num_hops):
+        grown = mask.clone()
+        grown[to[mask[frm]]] = True
+        if torch.equal(grown, mask):
+            break
+        mask = grown
+    return mask
+
+
+def induced_edges(
+    edge_index: torch.Tensor,
+    node_mask: torch.Tensor,
+    global_ids: torch.Tensor,
+    num_nodes: int,
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """Relabel edges with both endpoints in node_mask into local ids."""
+    local = torch.full((num_nodes,), -1, dtype=torch.long)
+    local[global_ids] = torch.arange(global_ids.numel(), dtype=torch.long)
+    src, dst = edge_index[0], edge_index[1]
+    keep = node_mask[src] & node_mask[dst]
+    local_edge_index = torch.stack([local[src[keep]], local[dst[keep]]])
+    return local_edge_index, keep
+
+
+def _validate_num_parts(num_parts: int) -> None:
+    if num_parts < 1:
+        raise ValueError(f"num_parts must be at least 1, got {num_parts}")
+
+
+def _undirected_csr(
+    edge_index: torch.Tensor, num_nodes: int
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """Build a symmetric CSR (rowptr, col) without self-loops."""
+    src, dst = edge_index[0], edge_index[1]
+    keep = src != dst
+    row = torch.cat([src[keep], dst[keep]])
+    col = torch.cat([dst[keep], src[keep]])
+    perm = torch.argsort(row, stable=True)
+    row, col = row[perm], col[perm]
+    rowptr = torch.zeros(num_nodes + 1, dtype=torch.long)
+    rowptr[1:] = torch.cumsum(torch.bincount(row, minlength=num_nodes), dim=0)
+    return rowptr, col
+
+
+def _bfs_order(rowptr: torch.Tensor, col: torch.Tensor, num_nodes: int) -> torch.Tensor:
+    """Visit every component breadth-first, starting from the lowest index."""
+    rowptr_list = rowptr.tolist()
+    col_list = col.tolist()
+    visited = bytearray(num_nodes)
+    order: List[int] = []
+    for start in range(num_nodes):
+        if visited[start]:
+            continue
+        visited[start] = 1
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            order.append(node)
+            for neighbor in col_list[rowptr_list[node] : rowptr_list[node + 1]]:
+                if not visited[neighbor]:
+                    visited[neighbor] = 1
+                    queue.append(neighbor)
+    return torch.tensor(order, dtype=torch.long)
+
+
+def _refine_partition(
+    parts: torch.Tensor,
+    row: torch.Tensor,
+    col: torch.Tensor,
+    num_parts: int,
+    capacity: int,
+) -> int:
+    """Move nodes towards their majority neighbour partition; returns moves made."""
+    num_nodes = parts.numel()
+    counts = torch.zeros((num_nodes, num_parts), dtype=torch.int32)
+    counts.index_put_(
+        (row, parts[col]), torch.ones(row.numel(), dtype=torch.int32), accumulate=True
+    )
+    current = counts.gather(1, parts.view(-1, 1)).view(-1)
+    best_count, best_part = counts.max(dim=1)
+    gain = best_count - current
+    candidates = torch.nonzero((gain > 0) & (best_part != parts), as_tuple=False).view(-1)
+    if candidates.numel() == 0:
+        return 0
+
+    # Highest gain first; stable sort keeps ties in node order for determinism.
+    candidates = candidates[torch.argsort(gain[candidates], descending=True, stable=True)]
+    targets = best_part[candidates]
+    room = (capacity - torch.bincount(parts, minlength=num_parts)).clamp(min=0)
+    accepted = candidates[_rank_within_groups(targets, num_parts) < room[targets]]
+    parts[accepted] = best_part[accepted]
+    return int(accepted.numel())
+
+
+def _rank_within_groups(groups: torch.Tensor, num_groups: int) -> torch.Tensor:
+    """Position of each element among earlier elements of the same group."""
+    perm = torch.argsort(groups, stable=True)
+    sorted_groups = groups[perm]
+    sizes = torch.bincount(sorted_groups, minlength=num_groups)
+    starts = torch.cumsum(sizes, dim=0) - sizes
+    ranks_sorted = torch.arange(groups.numel(), dtype=torch.long) - starts[sorted_groups]
+    ranks = torch.empty_like(ranks_sorted)
+    ranks[perm] = ranks_sorted
+    return ranks
@@ -0,0 +1,342 @@
+import itertools
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+import psycopg2
+import torch
+from psycopg2 import sql
+from psycopg2.extras import RealDictCursor
+
+from .bundle_io import CompressedBundleWriter
+from .fingerprints import FingerprintBuilder, SnapshotFingerprint
+from .materializer import (
+    DEFAULT_EDGES_TABLE,
+    DEFAULT_NODES_TABLE,
+    EDGE_COLUMNS,
+    NODE_COLUMNS,
+    SnapshotFilter,
+    _connect,
+    _edge_filter,
+    _edge_from_row,
+    _node_filter,
+    _node_from_row,
+)
+from .memory_planner import DEFAULT_BATCH_SIZE, DEFAULT_QUEUE_SIZE
+from .models import SnapshotNode
+from .node_features import kind_bucket_columns
+
+if TYPE_CHECKING:
+    from .connection_pool import ConnectionPool
+
+
+_NODES = "nodes"
+_EDGES = "edges"
+_DONE = "done"
+_ERROR = "error"
+
+_cursor_ids = itertools.count()
+
+
+class _Cancelled(Exception):
+    """Raised inside a stage when a downstream stage has failed."""
+
+
+@dataclass
+class StreamedSnapshot:
+    """Tensors built by ``stream_snapshot_tensors``, ready to become a TensorBundle."""
+    x: torch.Tensor
+    edge_index: torch.Tensor
+    node_mapping: Dict[str, int]
+    edge_kind: torch.Tensor
+    edge_kinds: List[str]
+    fingerprint: SnapshotFingerprint
+    nodes: Optional[List[SnapshotNode]] = None
+    stage_seconds: Dict[str, float] = field(default_factory=dict)
+
+
+def stream_snapshot_tensors(
+    snapshot_id: str,
+    dsn: Optional[str] = None,
+    nodes_table: Optional[str] = None,
+    edges_table: Optional[str] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    writer: Optional[CompressedBundleWriter] = None,
+    keep_nodes: bool = False,
+    write_edge_kinds: bool = False,
+    pool: Optional["ConnectionPool"] = None,
+    snapshot_filter: Optional[SnapshotFilter] = None,
+) -> StreamedSnapshot:
+    """
+    Build x, edge_index and edge kinds while rows are still arriving.
+
+    Three stages run concurrently and hand batches over bounded queues of
+    ``queue_size`` batches, so memory stays bounded when one stage is slower:
+
+    - fetch: server-side cursors read nodes in id byte order, then edges
+      ordered by (fromId, toId, kind). This is the order in which the
+      materialized graph enumerates them.
+    - transform: node batches become kind-bucket feature rows and fingerprint
+      updates; edge batches become index columns and kind codes.
+    - collect (calling thread): gathers chunks and, with a ``writer``,
+      appends them to the compressed bundle while the database is still
+      sending rows. The writer is left open so the caller can add metadata.
+
+    The result matches create_node_mapping, create_edge_index,
+    create_edge_kind_index and create_feature_matrix_v1 on the materialized
+    snapshot. ``stage_seconds`` records the busy time of each stage.
+    ``keep_nodes`` retains the SnapshotNode records for statistics,
+    partitioning or a feature store. ``write_edge_kinds`` also writes the
+    final edge_kind ids to ``writer``. ``snapshot_filter`` is pushed into
+    both queries, as in materialize_snapshot.
+    """
+    if batch_size < 1 or queue_size < 1:
+        raise ValueError("batch_size and queue_size must be positive.")
+    nodes_table = nodes_table or DEFAULT_NODES_TABLE
+    edges_table = edges_table or DEFAULT_EDGES_TABLE
+
+    rows_queue: "queue.Queue[Tuple[str, Any]]" = queue.Queue(maxsize=queue_size)
+    chunks_queue: "queue.Queue[Tuple[str, Any]]" = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    stage_seconds = {"fetch": 0.0, "transform": 0.0, "collect": 0.0}
+    transform = _Transform(keep_nodes)
+
+    node_where, node_params = _node_filter(snapshot_filter)
+    edge_where, edge_params = _edge_filter(snapshot_filter, nodes_table, snapshot_id)
+    queries = (
+        (_NODES, _pipelined_node_query(nodes_table, node_where), (snapshot_id, *node_params)),
+        (_EDGES, _pipelined_edge_query(edges_table, edge_where), (snapshot_id, *edge_params)),
+    )
+
+    def fetch() -> None:
+        def read(conn: psycopg2.extensions.connection) -> None:
+            for kind, query, params in queries:
+                for rows in _timed(_stream_batches(conn, query, params, batch_size), stage_seconds, "fetch"):
+                    _put(rows_queue, (kind, rows), stop)
+
+        if pool is not None:
+            with pool.connection() as conn:
+                read(conn)
+            return
+        conn = _connect(dsn)
+        try:
+            read(conn)
+        finally:
+            conn.close()
+
+    def transform_rows() -> None:
+        for kind, rows in _drain(rows_queue, stop):
+            started = time.perf_counter()
+            chunk = transform.nodes(rows) if kind == _NODES else transform.edges(rows)
+            stage_seconds["transform"] += time.perf_counter() - started
+            _put(chunks_queue, (kind, chunk), stop)
+
+    threads = [
+        threading.Thread(target=_run_stage, args=(fetch, rows_queue, stop), name="export-fetch", daemon=True),
+        threading.Thread(
+            target=_run_stage, args=(transform_rows, chunks_queue, stop), name="export-transform", daemon=True
+        ),
+    ]
+    for thread in threads:
+        thread.start()
+
+    x_chunks: List[torch.Tensor] = []
+    edge_chunks: List[torch.Tensor] = []
+    kind_chunks: List[np.ndarray] = []
+    try:
+        for kind, chunk in _drain(chunks_queue, stop):
+            started = time.perf_counter()
+            if kind == _NODES:
+                x_chunk, ids = chunk
+                x_chunks.append(x_chunk)
+                if writer is not None:
+                    writer.write_x(x_chunk)
+                    writer.write_node_ids(ids)
+            else:
+                edge_chunk, kind_codes = chunk
+                edge_chunks.append(edge_chunk)
+                kind_chunks.append(kind_codes)
+                if writer is not None:
+                    writer.write_edges(edge_chunk)
+            stage_seconds["collect"] += time.perf_counter() - started
+    except BaseException:
+        stop.set()
+        raise
+    finally:
+        for thread in threads:
+            thread.join()
+
+    edge_kind, edge_kinds = transform.final_edge_kinds(kind_chunks)
+    if writer is not None and write_edge_kinds:
+        for start in range(0, edge_kind.shape[0], batch_size):
+            writer.write_edge_attr("edge_kind", edge_kind[start : start + batch_size])
+    return StreamedSnapshot(
+        x=torch.cat(x_chunks) if x_chunks else torch.zeros((0, 6), dtype=torch.float32),
+        edge_index=(
+            torch.cat(edge_chunks, dim=1) if edge_chunks else torch.empty((2, 0), dtype=torch.long)
+        ),
+        node_mapping=transform.node_to_idx,
+        edge_kind=edge_kind,
+        edge_kinds=edge_kinds,
+        fingerprint=transform.fingerprint.build(),
+        nodes=transform.kept_nodes,
+        stage_seconds=stage_seconds,
+    )
+
+
+class _Transform:
+    """Row-batch to tensor-chunk conversion; runs on the transform thread only."""
+
+    def __init__(self, keep_nodes: bool):
+        self.node_to_idx: Dict[str, int] = {}
+        self.fingerprint = FingerprintBuilder()
+        self.kept_nodes: Optional[List[SnapshotNode]] = [] if keep_nodes else None
+        self._kind_codes: Dict[str, int] = {}
+        self._last_id: Optional[str] = None
+
+    def nodes(self, rows: List[Mapping[str, Any]]) -> Tuple[torch.Tensor, List[str]]:
+        nodes = [_node_from_row(row) for row in rows]
+        ids = [node.id for node in nodes]
+        for node_id in ids:
+            # Row position is the node index only if ids arrive in sorted order.
+            if self._last_id is not None and node_id <= self._last_id:
+                raise ValueError(f"Node ids must arrive strictly sorted; got {node_id!r} after {self._last_id!r}.")
+            self._last_id = node_id
+            self.node_to_idx[node_id] = len(self.node_to_idx)
+        for node in nodes:
+            self.fingerprint.add_node(node)
+        if self.kept_nodes is not None:
+            self.kept_nodes.extend(nodes)
+        return torch.from_numpy(kind_bucket_columns(nodes)), ids
+
+    def edges(self, rows: List[Mapping[str, Any]]) -> Tuple[torch.Tensor, np.ndarray]:
+        index = np.empty((2, len(rows)), dtype=np.int64)
+        codes = np.empty(len(rows), dtype=np.int64)
+        for i, row in enumerate(rows):
+            edge = _edge_from_row(row)
+            self.fingerprint.add_edge(edge)
+            try:
+                index[0, i] = self.node_to_idx[edge.source]
+                index[1, i] = self.node_to_idx[edge.target]
+            except KeyError as exc:
+                raise ValueError(f"Edge references node {exc.args[0]!r} missing from the snapshot.") from None
+            codes[i] = self._kind_codes.setdefault(edge.kind or "", len(self._kind_codes))
+        return torch.from_numpy(index), codes
+
+    def final_edge_kinds(self, kind_chunks: List[np.ndarray]) -> Tuple[torch.Tensor, List[str]]:
+        """Remap arrival-order kind codes onto the sorted vocabulary of create_edge_kind_index."""
+        vocabulary = sorted(self._kind_codes)
+        remap = np.empty(len(self._kind_codes), dtype=np.int64)
+        for kind, code in self._kind_codes.items():
+            remap[code] = vocabulary.index(kind)
+        codes = np.concatenate(kind_chunks) if kind_chunks else np.empty(0, dtype=np.int64)
+        return torch.from_numpy(remap[codes]), vocabulary
+
+
+def _run_stage(body: Callable[[], None], out_queue: "queue.Queue", stop: threading.Event) -> None:
+    """Run a stage and always tell the next stage how it ended."""
+    try:
+        body()
+    except _Cancelled:
+        return
+    except BaseException as exc:  # forwarded and re-raised by the consumer
+        _put(out_queue, (_ERROR, exc), stop, force=True)
+        return
+    _put(out_queue, (_DONE, None), stop, force=True)
+
+
+def _put(
+    target: "queue.Queue", item: Tuple[str, Any], stop: threading.Event, force: bool = False
+) -> None:
+    """Block on a full queue, giving up once a downstream stage has failed."""
+    while not stop.is_set():
+        try:
+            target.put(item, timeout=0.1)
+            return
+        except queue.Full:
+            continue
+    if not force:
+        raise _Cancelled()
+
+
+def _drain(source: "queue.Queue", stop: threading.Event):
+    """Yield items until the producer finishes; re-raise its error."""
+    while True:
+        try:
+            kind, payload = source.get(timeout=0.1)
+        except queue.Empty:
+            if stop.is_set():
+                raise _Cancelled()
+            continue
+        if kind == _DONE:
+            return
+        if kind == _ERROR:
+            raise payload
+        yield kind, payload
+
+
+def _timed(batches, stage_seconds: Dict[str, float], stage: str):
+    """Attribute the time spent waiting on the database to ``stage``."""
+    iterator = iter(batches)
+    while True:
+        started = time.perf_counter()
+        try:
+            rows = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            stage_seconds[stage] += time.perf_counter() - started
+        yield rows
+
+
+def _stream_batches(
+    conn: psycopg2.extensions.connection,
+    query: sql.Composed,
+    params: Tuple[Any, ...],
+    batch_size: int,
+):
+    cursor = conn.cursor(name=f"pipelined_export_{next(_cursor_ids)}", cursor_factory=RealDictCursor)
+    cursor.itersize = batch_size
+    try:
+        cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            yield rows
+    finally:
+        cursor.close()
+
+
+def _pipelined_node_query(table: str, where: sql.Composable = sql.SQL("")) -> sql.Composed:
+    # COLLATE "C" is byte order, which equals the Python order of create_node_mapping.
+    # The uuid id column has no collation, so it is collated as text.
+    return sql.SQL(
+        "SELECT {fields} FROM {table} WHERE {snapshot} = %s{where} ORDER BY {id}::text COLLATE \"C\""
+    ).format(
+        fields=sql.SQL(", ").join(map(sql.Identifier, NODE_COLUMNS)),
+        table=sql.Identifier(table),
+        snapshot=sql.Identifier("snapshotId"),
+        where=where,
+        id=sql.Identifier("id"),
+    )
+
+
+def _pipelined_edge_query(table: str, where: sql.Composable = sql.SQL("")) -> sql.Composed:
+    # The frozen graph yields edges grouped by source, then target, then kind ("" for NULL).
+    return sql.SQL(
+        "SELECT {fields} FROM {table} WHERE {snapshot} = %s{where} "
+        "ORDER BY {src}::text COLLATE \"C\", {dst}::text COLLATE \"C\", COALESCE({kind}, '') COLLATE \"C\""
+    ).format(
+        fields=sql.SQL(", ").join(map(sql.Identifier, EDGE_COLUMNS)),
+        table=sql.Identifier(table),
+        snapshot=sql.Identifier("snapshotId"),
+        where=where,
+        src=sql.Identifier("fromId"),
+        dst=sql.Identifier("toId"),
+        kind=sql.Identifier("kind"),
+    )
@@ -0,0 +1,305 @@
+import hashlib
+import multiprocessing
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Mapping, Optional, Tuple, Union
+
+import numpy as np
+import torch
+from scipy.linalg import orthogonal_procrustes
+from scipy.sparse import csr_matrix
+from sklearn.decomposition import PCA
+from sklearn.manifold import TSNE
+from sklearn.neighbors import NearestNeighbors
+
+from .tsne_viz import _TSNE_ITER_ARG
+
+# sklearn always runs a 250-iteration exploration phase; max_iter may not go lower.
+MIN_ITERATIONS = 250
+# Cold starts rescale PCA like sklearn's init="pca" (PC1 std 1e-4).
+_INIT_STD = 1e-4
+
+Embeddings = Union[torch.Tensor, np.ndarray]
+# (init layout, layout to align the result to or None)
+_Start = Tuple[np.ndarray, Optional[np.ndarray]]
+
+
+class ProjectionSession:
+    """
+    t-SNE projections that share work across calls.
+
+    kNN graphs are cached per embedding matrix (keyed by content), so
+    projecting the same embeddings again (another seed, a smaller
+    perplexity, a warm restart) skips the neighbour search. The first
+    projection starts from PCA and becomes the session's ``reference``.
+    Later projections with the same number of rows start from the
+    reference layout itself, at full scale and without early exaggeration
+    (which would scramble it), so they only refine it for ``warm_n_iter``
+    iterations. A final Procrustes fit removes any remaining rotation or
+    drift, so plots of different model variants line up.
+    ``project_many`` runs independent projections in worker processes.
+    """
+
+    def __init__(
+        self,
+        perplexity: float = 30.0,
+        n_iter: int = 1000,
+        warm_n_iter: int = 400,
+        random_state: int = 42,
+        n_jobs: Optional[int] = None,
+        align: bool = True,
+        max_cached_graphs: int = 8,
+    ):
+        if min(n_iter, warm_n_iter) < MIN_ITERATIONS:
+            raise ValueError(f"t-SNE needs at least {MIN_ITERATIONS} iterations.")
+        self.perplexity = perplexity
+        self.n_iter = n_iter
+        self.warm_n_iter = warm_n_iter
+        self.random_state = random_state
+        self.n_jobs = n_jobs
+        self.align = align
+        self.max_cached_graphs = max_cached_graphs
+        self.reference: Optional[np.ndarray] = None
+        self.layouts: Dict[str, np.ndarray] = {}
+        self.kl_divergences: Dict[str, float] = {}
+        # Wall-clock seconds per named projection, kNN search included.
+        self.seconds: Dict[str, float] = {}
+        self.graph_hits = 0
+        self.graph_misses = 0
+        self._graphs: "OrderedDict[str, csr_matrix]" = OrderedDict()
+
+    def neighbor_graph(self, embeddings: Embeddings) -> csr_matrix:
+        """Cached kNN distance graph of ``embeddings`` (self loops included)."""
+        data = _as_array(embeddings)
+        graph = self._cached_graph(data)
+        if graph is None:
+            graph = _neighbor_graph(data, _num_neighbors(len(data), self.perplexity), self.n_jobs)
+            self._remember(_fingerprint(data), graph)
+        return graph
+
+    def project(
+        self,
+        embeddings: Embeddings,
+        name: Optional[str] = None,
+        init: Union[None, str, np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Project embeddings to 2D.
+
+        ``init`` is None (start from the reference when the row count
+        matches, else PCA), ``"pca"`` (always start cold), or a layout to
+        start from and align to. The first projection becomes the
+        reference. Projections are stored in ``layouts`` under ``name``.
+        """
+        started = time.perf_counter()
+        data = _as_array(embeddings)
+        graph = self.neighbor_graph(data)
+        start, anchor = self._start(data, init)
+        layout, kl_divergence = _fit(data, graph, start, self._params(anchor is not None))
+        return self._finish(layout, kl_divergence, time.perf_counter() - started, anchor, name)
+
+    def project_many(
+        self,
+        embeddings: Mapping[str, Embeddings],
+        reference: Optional[str] = None,
+        num_workers: Optional[int] = None,
+        mp_context: str = "spawn",
+    ) -> Dict[str, np.ndarray]:
+        """
+        Project several embedding matrices, e.g. one per model variant.
+
+        Without a usable session reference, ``reference`` (default: the
+        first entry) is projected first in this process. The remaining
+        projections only depend on that layout and run in a process pool of
+        ``num_workers`` (default: CPU count). Returns layouts by name.
+        """
+        arrays = {name: _as_array(value) for name, value in embeddings.items()}
+        if not arrays:
+            return {}
+        first = reference if reference is not None else next(iter(arrays))
+        pending = list(arrays)
+        if self.reference is None or len(self.reference) != len(arrays[first]):
+            self.project(arrays[first], name=first)
+            pending.remove(first)
+
+        tasks = []
+        for name in pending:
+            data = arrays[name]
+            start, anchor = self._start(data, None)
+            params = self._params(anchor is not None)
+            tasks.append((name, anchor, (data, self._cached_graph(data), start, params)))
+
+        workers = max(1, min(num_workers or os.cpu_count() or 1, len(tasks)))
+        if workers == 1:
+            results = [_fit_task(*task) for _, _, task in tasks]
+        else:
+            context = multiprocessing.get_context(mp_context)
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+                futures = [executor.submit(_fit_task, *task) for _, _, task in tasks]
+                results = [future.result() for future in futures]
+
+        for (name, anchor, task), (layout, kl_divergence, seconds, graph) in zip(tasks, results):
+            data, cached = task[0], task[1]
+            if cached is None:
+                self._remember(_fingerprint(data), graph)
+            self._finish(layout, kl_divergence, seconds, anchor, name)
+        return {name: self.layouts[name] for name in arrays}
+
+    def reset(self) -> None:
+        """Forget the reference layout and stored layouts; keep cached graphs."""
+        self.reference = None
+        self.layouts.clear()
+        self.kl_divergences.clear()
+        self.seconds.clear()
+
+    def _start(self, data: np.ndarray, init: Union[None, str, np.ndarray]) -> _Start:
+        if isinstance(init, np.ndarray):
+            anchor = np.asarray(init, dtype=np.float32)
+        elif init is None and self.reference is not None and len(self.reference) == len(data):
+            anchor = self.reference
+        elif init is None or init == "pca":
+            pca = PCA(n_components=2, random_state=self.random_state)
+            return _rescale(pca.fit_transform(data)), None
+        else:
+            raise ValueError(f"Unknown init {init!r}; expected None, 'pca' or a layout array.")
+        if anchor.shape != (len(data), 2):
+            raise ValueError(f"init layout has shape {anchor.shape}, expected ({len(data)}, 2).")
+        return anchor, anchor
+
+    def _params(self, warm: bool) -> dict:
+        return {
+            "perplexity": self.perplexity,
+            "n_iter": self.warm_n_iter if warm else self.n_iter,
+            "early_exaggeration": 1.0 if warm else 12.0,
+            "random_state": self.random_state,
+            "n_jobs": self.n_jobs,
+        }
+
+    def _finish(
+        self,
+        layout: np.ndarray,
+        kl_divergence: float,
+        seconds: float,
+        anchor: Optional[np.ndarray],
+        name: Optional[str],
+    ) -> np.ndarray:
+        if anchor is not None and self.align:
+            layout = align_layout(layout, anchor)
+        if self.reference is None:
+            self.reference = layout
+        if name is not None:
+            self.layouts[name] = layout
+            self.kl_divergences[name] = kl_divergence
+            self.seconds[name] = seconds
+        return layout
+
+    def _cached_graph(self, data: np.ndarray) -> Optional[csr_matrix]:
+        key = _fingerprint(data)
+        graph = self._graphs.get(key)
+        # A graph built for a larger perplexity holds enough neighbours for a smaller one.
+        if graph is None or _graph_neighbors(graph) < _num_neighbors(len(data), self.perplexity):
+            self.graph_misses += 1
+            return None
+        self.graph_hits += 1
+        self._graphs.move_to_end(key)
+        return graph
+
+    def _remember(self, key: str, graph: csr_matrix) -> None:
+        self._graphs[key] = graph
+        self._graphs.move_to_end(key)
+        while len(self._graphs) > self.max_cached_graphs:
+            self._graphs.popitem(last=False)
+
+
+def align_layout(layout: np.ndarray, reference: np.ndarray) -> np.ndarray:
+    """
+    Move ``layout`` onto ``reference`` (same rows) by Procrustes analysis.
+
+    Only translation, rotation/reflection and one uniform scale are
+    applied, so relative distances within the layout are preserved.
+    """
+    centered = layout - layout.mean(axis=0)
+    target = reference - reference.mean(axis=0)
+    rotation, singular_sum = orthogonal_procrustes(centered, target)
+    norm = float((centered ** 2).sum())
+    scale = singular_sum / norm if norm > 0 else 1.0
+    return (scale * centered @ rotation + reference.mean(axis=0)).astype(np.float32)
+
+
+def _fit_task(
+    data: np.ndarray,
+    graph: Optional[csr_matrix],
+    start: np.ndarray,
+    params: dict,
+) -> Tuple[np.ndarray, float, float, csr_matrix]:
+    """Worker entry point; also returns the graph so the parent can cache it."""
+    started = time.perf_counter()
+    if graph is None:
+        num_neighbors = _num_neighbors(len(data), params["perplexity"])
+        graph = _neighbor_graph(data, num_neighbors, params["n_jobs"])
+    layout, kl_divergence = _fit(data, graph, start, params)
+    return layout, kl_divergence, time.perf_counter() - started, graph
+
+
+def _fit(
+    data: np.ndarray, graph: csr_matrix, start: np.ndarray, params: dict
+) -> Tuple[np.ndarray, float]:
+    num_samples = len(data)
+    if num_samples < 2:
+        raise ValueError(
+            f"t-SNE requires at least 2 samples, got {num_samples}. "
+            "Cannot create visualization for a single node."
+        )
+    # sklearn squares the precomputed distances, exactly as for metric="euclidean".
+    tsne = TSNE(
+        n_components=2,
+        perplexity=_effective_perplexity(num_samples, params["perplexity"]),
+        metric="precomputed",
+        init=start,
+        early_exaggeration=params["early_exaggeration"],
+        random_state=params["random_state"],
+        n_jobs=params["n_jobs"],
+        **{_TSNE_ITER_ARG: params["n_iter"]},
+    )
+    layout = tsne.fit_transform(graph)
+    return layout.astype(np.float32), float(tsne.kl_divergence_)
+
+
+def _neighbor_graph(data: np.ndarray, num_neighbors: int, n_jobs: Optional[int]) -> csr_matrix:
+    # Query with the data itself so every row stores its own zero distance,
+    # which sklearn drops again when it reads a precomputed training graph.
+    knn = NearestNeighbors(n_neighbors=min(num_neighbors + 1, len(data)), n_jobs=n_jobs)
+    knn.fit(data)
+    return knn.kneighbors_graph(data, mode="distance")
+
+
+def _graph_neighbors(graph: csr_matrix) -> int:
+    return int(np.diff(graph.indptr).min()) - 1 if graph.shape[0] else 0
+
+
+def _effective_perplexity(num_samples: int, perplexity: float) -> float:
+    # Matches compute_tsne_projection.
+    return min(perplexity, max(5, num_samples - 1))
+
+
+def _num_neighbors(num_samples: int, perplexity: float) -> int:
+    return min(num_samples - 1, int(3.0 * _effective_perplexity(num_samples, perplexity) + 1))
+
+
+def _rescale(layout: np.ndarray) -> np.ndarray:
+    layout = np.asarray(layout).astype(np.float32, copy=False)
+    std = np.std(layout[:, 0])
+    return layout / std * _INIT_STD if std > 0 else layout
+
+
+def _as_array(embeddings: Embeddings) -> np.ndarray:
+    if isinstance(embeddings, torch.Tensor):
+        embeddings = embeddings.detach().cpu().numpy()
+    return np.ascontiguousarray(embeddings, dtype=np.float32)
+
+
+def _fingerprint(data: np.ndarray) -> str:
+    digest = hashlib.blake2b(data.view(np.uint8), digest_size=16).hexdigest()
+    return f"{data.shape[0]}x{data.shape[1]}:{digest}"
@@ -0,0 +1,138 @@
+import io
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+
+from .compiled_inference import StaticSAGE, to_static_sage
+
+QUANTIZATION_MODES = ("int8", "bf16")
+
+
+class AutocastInference(nn.Module):
+    """Run a module under CPU bfloat16 autocast and return float32 outputs."""
+
+    def __init__(self, module: StaticSAGE, dtype: torch.dtype = torch.bfloat16):
+        super().__init__()
+        self.module = module
+        self.dtype = dtype
+        self.num_hops = module.num_hops
+        self.out_channels = module.out_channels
+
+    def forward(
+        self,
+        x: torch.Tensor,
+        edge_index: torch.Tensor,
+        edge_weight: Optional[torch.Tensor] = None
+    ) -> torch.Tensor:
+        with torch.autocast(device_type="cpu", dtype=self.dtype):
+            out = self.module(x, edge_index, edge_weight)
+        return out.float()
+
+
+@dataclass(frozen=True)
+class InferenceReport:
+    """Throughput, size and accuracy of one inference mode against float32."""
+    mode: str
+    seconds_per_pass: float
+    nodes_per_second: float
+    model_bytes: int
+    cosine_mean: float
+    cosine_min: float
+    max_abs_diff: float
+
+
+def quantize_for_inference(model: nn.Module, mode: str = "int8") -> nn.Module:
+    """
+    Build a reduced-precision inference module for a SAGE model.
+
+    The SAGEConv weights are copied into a StaticSAGE replica whose linear
+    layers are plain ``nn.Linear``. ``int8`` applies dynamic int8 quantization
+    to those layers (weights stored as int8, activations quantized per
+    batch); ``bf16`` runs them under bfloat16 autocast. Neighbour aggregation
+    stays in float32 in both modes.
+    """
+    if mode not in QUANTIZATION_MODES:
+        raise ValueError(f"mode must be one of {QUANTIZATION_MODES}, got {mode!r}")
+
+    static = to_static_sage(model)
+    if mode == "bf16":
+        return AutocastInference(static).eval()
+
+    quantized = torch.ao.quantization.quantize_dynamic(
+        static, {nn.Linear}, dtype=torch.qint8
+    )
+    return quantized.eval()
+
+
+def compare_embeddings(reference: torch.Tensor, candidate: torch.Tensor) -> Dict[str, float]:
+    """Per-node cosine similarity and max absolute difference against reference."""
+    cosine = F.cosine_similarity(reference, candidate.float(), dim=1)
+    return {
+        "cosine_mean": float(cosine.mean()) if cosine.numel() else 1.0,
+        "cosine_min": float(cosine.min()) if cosine.numel() else 1.0,
+        "max_abs_diff": float((reference - candidate.float()).abs().max())
+        if reference.numel()
+        else 0.0,
+    }
+
+
+def model_size_bytes(model: nn.Module) -> int:
+    """Serialized state_dict size, which includes packed int8 weights."""
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell()
+
+
+def quantization_report(
+    model: nn.Module,
+    x: torch.Tensor,
+    edge_index: torch.Tensor,
+    edge_weight: Optional[torch.Tensor] = None,
+    modes: Sequence[str] = QUANTIZATION_MODES,
+    repeats: int = 5,
+) -> List[InferenceReport]:
+    """Compare float32 inference against each reduced-precision mode."""
+    candidates: Dict[str, nn.Module] = {"float32": model}
+    for mode in modes:
+        candidates[mode] = quantize_for_inference(model, mode)
+
+    reference: Optional[torch.Tensor] = None
+    reports: List[InferenceReport] = []
+    for mode, module in candidates.items():
+        seconds, embeddings = _time_inference(module, x, edge_index, edge_weight, repeats)
+        if reference is None:
+            reference = embeddings
+        metrics = compare_embeddings(reference, embeddings)
+        reports.append(
+            InferenceReport(
+                mode=mode,
+                seconds_per_pass=seconds,
+                nodes_per_second=x.shape[0] / seconds if seconds else float("inf"),
+                model_bytes=model_size_bytes(module),
+                **metrics,
+            )
+        )
+    return reports
+
+
+def _time_inference(
+    module: nn.Module,
+    x: torch.Tensor,
+    edge_index: torch.Tensor,
+    edge_weight: Optional[torch.Tensor],
+    repeats: int,
+):
+    """Warm up once, then return (best seconds per pass, embeddings)."""
+    module.eval()
+    with torch.no_grad():
+        embeddings = module(x, edge_index, edge_weight)
+        best = float("inf")
+        for _ in range(max(repeats, 1)):
+            start = time.perf_counter()
+            module(x, edge_index, edge_weight)
+            best = min(best, time.perf_counter() - start)
+    return best, embeddings.float()
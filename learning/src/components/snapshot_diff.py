@@ -0,0 +1,409 @@
+import itertools
+from dataclasses import dataclass, field
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+import numpy as np
+import psycopg2
+from psycopg2 import sql
+from psycopg2.extras import RealDictCursor
+
+from .exporter import TensorBundle
+from .materializer import DEFAULT_EDGES_TABLE, DEFAULT_NODES_TABLE, _connect, _stable_json
+from .node_index import NodeIdIndex
+
+if TYPE_CHECKING:
+    from .connection_pool import ConnectionPool
+
+ADDED = "added"
+REMOVED = "removed"
+CHANGED = "changed"
+
+DEFAULT_BATCH_SIZE = 5000
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+_cursor_ids = itertools.count()
+
+
+@dataclass(frozen=True)
+class NodeChange:
+    """A node that was added, removed or whose content changed."""
+    node_id: str
+    status: str
+    file_path: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class EdgeChange:
+    """An edge key whose multiplicity differs between the two snapshots."""
+    source: str
+    target: str
+    kind: str
+    status: str
+    before: int
+    after: int
+    file_path: Optional[str] = None
+
+
+@dataclass
+class SnapshotDiff:
+    """Node and edge changes from snapshot A to B, with per-file counts."""
+    nodes: List[NodeChange] = field(default_factory=list)
+    edges: List[EdgeChange] = field(default_factory=list)
+    files: Dict[str, Dict[str, int]] = field(default_factory=dict)
+
+    def add_node(self, change: NodeChange) -> None:
+        self.nodes.append(change)
+        self._count(change.file_path, f"nodes_{change.status}")
+
+    def add_edge(self, change: EdgeChange) -> None:
+        self.edges.append(change)
+        self._count(change.file_path, f"edges_{change.status}")
+
+    def summary(self) -> Dict[str, int]:
+        counts = {
+            f"{kind}_{status}": 0
+            for kind in ("nodes", "edges")
+            for status in (ADDED, REMOVED, CHANGED)
+        }
+        for change in self.nodes:
+            counts[f"nodes_{change.status}"] += 1
+        for change in self.edges:
+            counts[f"edges_{change.status}"] += 1
+        return counts
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.nodes and not self.edges
+
+    def _count(self, file_path: Optional[str], key: str) -> None:
+        per_file = self.files.setdefault(file_path or "", {})
+        per_file[key] = per_file.get(key, 0) + 1
+
+
+def merge_join(
+    left: Iterable[Tuple[K, V]],
+    right: Iterable[Tuple[K, V]],
+) -> Iterator[Tuple[K, Optional[V], Optional[V]]]:
+    """
+    Full outer join of two key-sorted (key, value) streams.
+
+    Yields (key, left_value, right_value) with None on the missing side.
+    Both inputs must be sorted by key with unique keys; the join holds one
+    item per side, so it runs in linear time and constant memory.
+    """
+    left_iter, right_iter = iter(left), iter(right)
+    sentinel = object()
+    a = next(left_iter, sentinel)
+    b = next(right_iter, sentinel)
+    previous = None
+    while a is not sentinel or b is not sentinel:
+        if b is sentinel or (a is not sentinel and a[0] < b[0]):
+            key, item = a[0], (a[0], a[1], None)
+            a = next(left_iter, sentinel)
+        elif a is sentinel or b[0] < a[0]:
+            key, item = b[0], (b[0], None, b[1])
+            b = next(right_iter, sentinel)
+        else:
+            key, item = a[0], (a[0], a[1], b[1])
+            a = next(left_iter, sentinel)
+            b = next(right_iter, sentinel)
+        if previous is not None and not previous < key:
+            raise ValueError("merge_join inputs must be sorted by unique keys.")
+        previous = key
+        yield item
+
+
+def diff_node_streams(
+    left: Iterable[Tuple[str, Tuple[Optional[str], str]]],
+    right: Iterable[Tuple[str, Tuple[Optional[str], str]]],
+) -> Iterator[NodeChange]:
+    """Diff id-sorted (node_id, (file_path, content)) streams."""
+    for node_id, before, after in merge_join(left, right):
+        if before is None:
+            yield NodeChange(node_id, ADDED, after[0])
+        elif after is None:
+            yield NodeChange(node_id, REMOVED, before[0])
+        elif before[1] != after[1]:
+            yield NodeChange(node_id, CHANGED, after[0])
+
+
+def diff_edge_streams(
+    left: Iterable[Tuple[Tuple[str, str, str], Tuple[Optional[str], int]]],
+    right: Iterable[Tuple[Tuple[str, str, str], Tuple[Optional[str], int]]],
+) -> Iterator[EdgeChange]:
+    """Diff (src, dst, kind)-sorted ((src, dst, kind), (file_path, count)) streams."""
+    for (source, target, kind), before, after in merge_join(left, right):
+        count_before = before[1] if before is not None else 0
+        count_after = after[1] if after is not None else 0
+        if count_before == count_after:
+            continue
+        if count_before == 0:
+            status = ADDED
+        elif count_after == 0:
+            status = REMOVED
+        else:
+            status = CHANGED
+        file_path = (after or before)[0]
+        yield EdgeChange(source, target, kind, status, count_before, count_after, file_path)
+
+
+def diff_snapshots_sql(
+    snapshot_a: str,
+    snapshot_b: str,
+    dsn: Optional[str] = None,
+    nodes_table: Optional[str] = None,
+    edges_table: Optional[str] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    pool: Optional["ConnectionPool"] = None,
+) -> SnapshotDiff:
+    """
+    Diff two snapshots inside the database without materializing either.
+
+    Nodes and grouped edges of both snapshots are read through four
+    server-side cursors in byte order (uuid columns cast to text, then
+    ``COLLATE "C"``, which matches Python string ordering) and merge-joined in ``batch_size`` chunks. Node content
+    compares type, originalType, filePath, data and location; edges compare
+    their multiplicity per (fromId, toId, kind).
+    """
+    nodes_table = nodes_table or DEFAULT_NODES_TABLE
+    edges_table = edges_table or DEFAULT_EDGES_TABLE
+
+    def run(conn: psycopg2.extensions.connection) -> SnapshotDiff:
+        diff = SnapshotDiff()
+        node_query = _diff_node_query(nodes_table)
+        edge_query = _diff_edge_query(edges_table)
+        node_changes = diff_node_streams(
+            _stream_rows(conn, node_query, snapshot_a, batch_size, _node_entry),
+            _stream_rows(conn, node_query, snapshot_b, batch_size, _node_entry),
+        )
+        for change in node_changes:
+            diff.add_node(change)
+        edge_changes = diff_edge_streams(
+            _stream_rows(conn, edge_query, snapshot_a, batch_size, _edge_entry),
+            _stream_rows(conn, edge_query, snapshot_b, batch_size, _edge_entry),
+        )
+        for change in edge_changes:
+            diff.add_edge(change)
+        return diff
+
+    if pool is not None:
+        with pool.connection() as conn:
+            return run(conn)
+    conn = _connect(dsn)
+    try:
+        return run(conn)
+    finally:
+        conn.close()
+
+
+def diff_bundles(
+    bundle_a: TensorBundle,
+    bundle_b: TensorBundle,
+    node_files: Optional[Mapping[str, str]] = None,
+) -> SnapshotDiff:
+    """
+    Diff two tensor bundles by node id, feature row and edge multiplicity.
+
+    Node ids of both bundles are placed in one sorted id space (pipeline
+    exports are already in id order, so the sort check is a single pass).
+    Edges become integer (src, dst, kind) keys over that space, and both
+    sides are aligned with vectorized searchsorted/unique. A node counts as
+    changed when its feature row differs. Edges of coalesced bundles count
+    their ``edge_count``; edge kinds are compared when both bundles include
+    them. ``node_files`` (node id -> file path) enables
+    per-file summaries, because bundles do not carry file paths.
+    """
+    ids_a, rows_a = sorted_node_ids(bundle_a["node_mapping"])
+    ids_b, rows_b = sorted_node_ids(bundle_b["node_mapping"])
+    universe = np.union1d(ids_a, ids_b)
+
+    def file_of(node_id: str) -> Optional[str]:
+        return node_files.get(node_id) if node_files is not None else None
+
+    diff = SnapshotDiff()
+    in_b = sorted_membership(ids_a, ids_b)
+    in_a = sorted_membership(ids_b, ids_a)
+    x_a = to_numpy(bundle_a["x"])[rows_a[in_b]]
+    x_b = to_numpy(bundle_b["x"])[rows_b[in_a]]
+    changed = np.zeros(len(universe), dtype=bool)
+    shared = np.searchsorted(universe, ids_a[in_b])
+    if x_a.shape[1:] == x_b.shape[1:]:
+        changed[shared] = np.any(x_a != x_b, axis=tuple(range(1, x_a.ndim)))
+    else:
+        changed[shared] = True
+    removed = np.zeros(len(universe), dtype=bool)
+    removed[np.searchsorted(universe, ids_a[~in_b])] = True
+    added = np.zeros(len(universe), dtype=bool)
+    added[np.searchsorted(universe, ids_b[~in_a])] = True
+    for position in np.flatnonzero(added | removed | changed):
+        node_id = str(universe[position])
+        status = ADDED if added[position] else REMOVED if removed[position] else CHANGED
+        diff.add_node(NodeChange(node_id, status, file_of(node_id)))
+
+    # Kinds only take part in edge keys when both bundles carry them.
+    kinds: List[str] = []
+    if "edge_kind" in bundle_a and "edge_kind" in bundle_b:
+        kinds = sorted(set(bundle_a["edge_kinds"]) | set(bundle_b["edge_kinds"]))
+    keys_a, counts_a = _edge_keys(bundle_a, universe, kinds)
+    keys_b, counts_b = _edge_keys(bundle_b, universe, kinds)
+    keys = np.union1d(keys_a, keys_b)
+    before = np.zeros(len(keys), dtype=np.int64)
+    after = np.zeros(len(keys), dtype=np.int64)
+    before[np.searchsorted(keys, keys_a)] = counts_a
+    after[np.searchsorted(keys, keys_b)] = counts_b
+    num_ids, num_kinds = len(universe), max(len(kinds), 1)
+    for position in np.flatnonzero(before != after):
+        key = int(keys[position])
+        pair, kind_id = divmod(key, num_kinds)
+        src, dst = divmod(pair, num_ids)
+        count_before, count_after = int(before[position]), int(after[position])
+        status = ADDED if count_before == 0 else REMOVED if count_after == 0 else CHANGED
+        source = str(universe[src])
+        diff.add_edge(
+            EdgeChange(
+                source,
+                str(universe[dst]),
+                kinds[kind_id] if kinds else "",
+                status,
+                count_before,
+                count_after,
+                file_of(source),
+            )
+        )
+    return diff
+
+
+def _diff_node_query(table: str) -> sql.Composed:
+    return sql.SQL(
+        "SELECT {id}, {type}, {original}, {file}, {data}, {location} FROM {table} "
+        "WHERE {snapshot} = %s ORDER BY {id}::text COLLATE \"C\""
+    ).format(
+        id=sql.Identifier("id"),
+        type=sql.Identifier("type"),
+        original=sql.Identifier("originalType"),
+        file=sql.Identifier("filePath"),
+        data=sql.Identifier("data"),
+        location=sql.Identifier("location"),
+        table=sql.Identifier(table),
+        snapshot=sql.Identifier("snapshotId"),
+    )
+
+
+def _diff_edge_query(table: str) -> sql.Composed:
+    return sql.SQL(
+        "SELECT {src} AS src, {dst} AS dst, COALESCE({kind}, '') AS kind, "
+        "MIN({file}) AS file_path, COUNT(*) AS count FROM {table} "
+        "WHERE {snapshot} = %s GROUP BY 1, 2, 3 "
+        "ORDER BY {src}::text COLLATE \"C\", {dst}::text COLLATE \"C\", "
+        "COALESCE({kind}, '') COLLATE \"C\""
+    ).format(
+        src=sql.Identifier("fromId"),
+        dst=sql.Identifier("toId"),
+        kind=sql.Identifier("kind"),
+        file=sql.Identifier("filePath"),
+        table=sql.Identifier(table),
+        snapshot=sql.Identifier("snapshotId"),
+    )
+
+
+def _node_entry(row: Mapping[str, Any]) -> Tuple[str, Tuple[Optional[str], str]]:
+    content = _stable_json(
+        [row.get("type"), row.get("originalType"), row.get("filePath"),
+         row.get("data"), row.get("location")]
+    )
+    return str(row["id"]), (row.get("filePath"), content)
+
+
+def _edge_entry(row: Mapping[str, Any]) -> Tuple[Tuple[str, str, str], Tuple[Optional[str], int]]:
+    key = (str(row["src"]), str(row["dst"]), str(row["kind"] or ""))
+    return key, (row.get("file_path"), int(row["count"]))
+
+
+def _stream_rows(
+    conn: psycopg2.extensions.connection,
+    query: sql.Composed,
+    snapshot_id: str,
+    batch_size: int,
+    convert: Callable[[Mapping[str, Any]], Tuple[Any, Any]],
+) -> Iterator[Tuple[Any, Any]]:
+    """Yield converted rows from a server-side cursor, batch_size rows at a time."""
+    cursor = conn.cursor(name=f"snapshot_diff_{next(_cursor_ids)}", cursor_factory=RealDictCursor)
+    cursor.itersize = batch_size
+    try:
+        cursor.execute(query, (snapshot_id,))
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            for row in rows:
+                yield convert(row)
+    finally:
+        cursor.close()
+
+
+def sorted_node_ids(node_mapping: Mapping[str, int]) -> Tuple[np.ndarray, np.ndarray]:
+    """Node ids in sorted order and their bundle rows."""
+    if isinstance(node_mapping, NodeIdIndex):
+        return node_mapping.sorted_ids()
+    ids = np.array([str(node_id) for node_id in node_mapping], dtype=str)
+    rows = np.fromiter(node_mapping.values(), dtype=np.int64, count=len(node_mapping))
+    if len(ids) > 1 and not bool(np.all(ids[1:] > ids[:-1])):
+        order = np.argsort(ids, kind="stable")
+        ids, rows = ids[order], rows[order]
+    return ids, rows
+
+
+def sorted_membership(ids: np.ndarray, sorted_other: np.ndarray) -> np.ndarray:
+    """Boolean mask of the ``ids`` present in the sorted array ``sorted_other``."""
+    if len(sorted_other) == 0:
+        return np.zeros(len(ids), dtype=bool)
+    positions = np.minimum(np.searchsorted(sorted_other, ids), len(sorted_other) - 1)
+    return sorted_other[positions] == ids
+
+
+def _edge_keys(
+    bundle: TensorBundle, universe: np.ndarray, kinds: List[str]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Unique (src, dst, kind) keys over the shared id space, with multiplicities."""
+    edge_index = to_numpy(bundle["edge_index"]).astype(np.int64, copy=False)
+    if edge_index.shape[1] == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    ids, rows = sorted_node_ids(bundle["node_mapping"])
+    rank = np.empty(len(rows), dtype=np.int64)
+    rank[rows] = np.searchsorted(universe, ids)
+    num_kinds = max(len(kinds), 1)
+    kind_ids = np.zeros(edge_index.shape[1], dtype=np.int64)
+    if kinds:
+        local = np.array([kinds.index(kind) for kind in bundle["edge_kinds"]], dtype=np.int64)
+        kind_ids = local[to_numpy(bundle["edge_kind"]).astype(np.int64)]
+    keys = (rank[edge_index[0]] * len(universe) + rank[edge_index[1]]) * num_kinds + kind_ids
+    weights = (
+        to_numpy(bundle["edge_count"]).astype(np.int64)
+        if "edge_count" in bundle
+        else np.ones(len(keys), dtype=np.int64)
+    )
+    order = np.argsort(keys, kind="stable")
+    keys, weights = keys[order], weights[order]
+    unique, starts = np.unique(keys, return_index=True)
+    return unique, np.add.reduceat(weights, starts)
+
+
+def to_numpy(tensor: Any) -> np.ndarray:
+    """A tensor or array-like as a NumPy array, sharing memory where possible."""
+    if hasattr(tensor, "detach"):
+        return tensor.detach().cpu().numpy()
+    return np.asarray(tensor)
@@ -0,0 +1,337 @@
+import hashlib
+import itertools
+import json
+import time
+import warnings
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+import matplotlib.pyplot as plt
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+from .compiled_inference import StaticSAGE, to_static_sage
+from .gnn_model import create_gnn_model
+from .projection_session import ProjectionSession
+
+
+@dataclass(frozen=True)
+class SweepConfig:
+    """One model configuration of a sweep."""
+    num_layers: int = 1
+    hidden_channels: int = 128
+    seed: int = 42
+    out_channels: int = 64
+
+    @property
+    def label(self) -> str:
+        if self.num_layers == 1:
+            return f"{self.num_layers}layer-s{self.seed}"
+        return f"{self.num_layers}layer-h{self.hidden_channels}-s{self.seed}"
+
+    def config_hash(self, bundle_digest: str) -> str:
+        """Key of this config's embeddings for one bundle."""
+        payload = json.dumps({"bundle": bundle_digest, **asdict(self)}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class SweepRun:
+    """Timings and outputs of one (model config, perplexity) pair."""
+    config: SweepConfig
+    perplexity: float
+    embed_seconds: float
+    embeddings_cached: bool
+    projection_seconds: float
+    kl_divergence: float
+
+    def to_dict(self) -> Dict:
+        return {
+            "label": self.config.label,
+            **asdict(self.config),
+            "perplexity": self.perplexity,
+            "embed_seconds": self.embed_seconds,
+            "embeddings_cached": self.embeddings_cached,
+            "projection_seconds": self.projection_seconds,
+            "kl_divergence": self.kl_divergence,
+        }
+
+
+@dataclass
+class SweepReport:
+    """Everything one sweep produced, plus the shared setup cost."""
+    num_nodes: int
+    num_edges: int
+    bundle_digest: str
+    adjacency_seconds: float
+    total_seconds: float
+    runs: List[SweepRun] = field(default_factory=list)
+    layouts: Dict[str, np.ndarray] = field(default_factory=dict, repr=False)
+
+    def to_dict(self) -> Dict:
+        return {
+            "num_nodes": self.num_nodes,
+            "num_edges": self.num_edges,
+            "bundle_digest": self.bundle_digest,
+            "adjacency_seconds": self.adjacency_seconds,
+            "total_seconds": self.total_seconds,
+            "runs": [run.to_dict() for run in self.runs],
+        }
+
+    def to_markdown(self) -> str:
+        lines = [
+            f"# Sweep report ({self.num_nodes} nodes, {self.num_edges} edges)",
+            "",
+            f"Adjacency built once in {self.adjacency_seconds:.3f} s; "
+            f"sweep total {self.total_seconds:.1f} s.",
+            "",
+            "| Config | Perplexity | Embed (s) | Projection (s) | KL divergence |",
+            "|--------|------------|-----------|----------------|---------------|",
+        ]
+        for run in self.runs:
+            embed = "cached" if run.embeddings_cached else f"{run.embed_seconds:.3f}"
+            lines.append(
+                f"| {run.config.label} | {run.perplexity:g} | {embed} "
+                f"| {run.projection_seconds:.1f} | {run.kl_divergence:.3f} |"
+            )
+        return "\n".join(lines) + "\n"
+
+
+class EmbeddingCache:
+    """
+    Embeddings keyed by config hash, kept in memory and, with ``root``, as
+    ``<hash>.pt`` files so later sweeps over the same bundle skip them.
+    """
+
+    def __init__(self, root: Optional[Union[str, Path]] = None):
+        self.root = Path(root) if root is not None else None
+        self._memory: Dict[str, torch.Tensor] = {}
+
+    def get(self, key: str) -> Optional[torch.Tensor]:
+        if key in self._memory:
+            return self._memory[key]
+        path = self._path(key)
+        if path is not None and path.exists():
+            self._memory[key] = torch.load(path)
+            return self._memory[key]
+        return None
+
+    def put(self, key: str, embeddings: torch.Tensor) -> None:
+        self._memory[key] = embeddings
+        path = self._path(key)
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(".tmp")
+            torch.save(embeddings, tmp_path)
+            tmp_path.replace(path)
+
+    def _path(self, key: str) -> Optional[Path]:
+        return self.root / f"{key}.pt" if self.root is not None else None
+
+
+def sweep_grid(
+    num_layers: Sequence[int] = (1,),
+    hidden_channels: Sequence[int] = (128,),
+    seeds: Sequence[int] = (42,),
+) -> List[SweepConfig]:
+    """Cartesian product of the values; 1-layer models ignore hidden_channels."""
+    configs: List[SweepConfig] = []
+    for layers, hidden, seed in itertools.product(num_layers, hidden_channels, seeds):
+        config = SweepConfig(layers, hidden if layers > 1 else hidden_channels[0], seed)
+        if config not in configs:
+            configs.append(config)
+    return configs
+
+
+def bundle_digest(
+    x: torch.Tensor,
+    edge_index: torch.Tensor,
+    edge_weight: Optional[torch.Tensor] = None,
+) -> str:
+    """Hash of the tensors that determine embeddings."""
+    digest = hashlib.sha256()
+    for tensor in (x, edge_index, edge_weight):
+        if tensor is None:
+            digest.update(b"none")
+            continue
+        array = tensor.detach().cpu().contiguous().numpy()
+        digest.update(f"{array.dtype}{array.shape}".encode("utf-8"))
+        digest.update(array.tobytes())
+    return digest.hexdigest()[:16]
+
+
+def mean_adjacency(
+    edge_index: torch.Tensor,
+    num_nodes: int,
+    edge_weight: Optional[torch.Tensor] = None,
+) -> torch.Tensor:
+    """
+    Sparse CSR operator ``A`` with ``A @ x`` equal to the (weighted) mean over
+    in-neighbours that every SAGE layer computes.
+
+    Duplicate edges add up, as in the multigraph mean.
+    """
+    src, dst = edge_index[0], edge_index[1]
+    weight = torch.ones(src.numel()) if edge_weight is None else edge_weight.float()
+    total = torch.zeros(num_nodes).index_add_(0, dst, weight)
+    values = weight / total.clamp(min=1e-12)[dst]
+    adjacency = torch.sparse_coo_tensor(
+        torch.stack([dst, src]), values, (num_nodes, num_nodes), check_invariants=False
+    ).coalesce()
+    with warnings.catch_warnings():
+        # CSR matmul beats COO and the per-edge gather on large graphs.
+        warnings.filterwarnings("ignore", message="Sparse CSR tensor support is in beta")
+        return adjacency.to_sparse_csr()
+
+
+def embed_with_adjacency(
+    model: Union[torch.nn.Module, StaticSAGE],
+    x: torch.Tensor,
+    adjacency: torch.Tensor,
+) -> torch.Tensor:
+    """Run a GNN model with a precomputed ``mean_adjacency`` operator."""
+    static = model if isinstance(model, StaticSAGE) else to_static_sage(model)
+    last = static.num_hops - 1
+    with torch.no_grad():
+        for layer, (lin_l, lin_r) in enumerate(zip(static.lin_l, static.lin_r)):
+            out = lin_l(torch.sparse.mm(adjacency, x))
+            if static.root_weight[layer]:
+                out = out + lin_r(x)
+            if static.normalize[layer]:
+                out = F.normalize(out, p=2.0, dim=-1)
+            if layer < last:
+                out = torch.relu(out)
+            x = out
+    return x
+
+
+def run_sweep(
+    x: torch.Tensor,
+    edge_index: torch.Tensor,
+    configs: Sequence[SweepConfig],
+    perplexities: Sequence[float] = (30.0,),
+    edge_weight: Optional[torch.Tensor] = None,
+    n_iter: int = 1000,
+    warm_n_iter: int = 400,
+    num_workers: Optional[int] = None,
+    cache: Optional[EmbeddingCache] = None,
+    random_state: int = 42,
+) -> SweepReport:
+    """
+    Embed and project every (config, perplexity) pair of one loaded bundle.
+
+    The mean-aggregation adjacency is built once and shared by all models.
+    Embeddings come from ``cache`` when their config hash is present. All
+    projections go through one ProjectionSession, so they share an
+    orientation, and perplexities run from largest to smallest, so each kNN
+    graph is searched once. Each perplexity's projections run in a process
+    pool of ``num_workers``.
+    """
+    started = time.perf_counter()
+    cache = cache if cache is not None else EmbeddingCache()
+    num_nodes = x.shape[0]
+    digest = bundle_digest(x, edge_index, edge_weight)
+
+    adjacency_started = time.perf_counter()
+    adjacency = mean_adjacency(edge_index, num_nodes, edge_weight)
+    adjacency_seconds = time.perf_counter() - adjacency_started
+
+    embeddings: Dict[SweepConfig, torch.Tensor] = {}
+    embed_seconds: Dict[SweepConfig, float] = {}
+    cached: Dict[SweepConfig, bool] = {}
+    for config in configs:
+        key = config.config_hash(digest)
+        embed_started = time.perf_counter()
+        result = cache.get(key)
+        cached[config] = result is not None
+        if result is None:
+            model = create_gnn_model(
+                in_channels=x.shape[1],
+                out_channels=config.out_channels,
+                seed=config.seed,
+                num_layers=config.num_layers,
+                hidden_channels=config.hidden_channels,
+            )
+            result = embed_with_adjacency(model, x.float(), adjacency)
+            cache.put(key, result)
+        embeddings[config] = result
+        embed_seconds[config] = time.perf_counter() - embed_started
+
+    session = ProjectionSession(
+        perplexity=max(perplexities),
+        n_iter=n_iter,
+        warm_n_iter=warm_n_iter,
+        random_state=random_state,
+    )
+    report = SweepReport(num_nodes, int(edge_index.shape[1]), digest, adjacency_seconds, 0.0)
+    for perplexity in sorted(perplexities, reverse=True):
+        session.perplexity = perplexity
+        names = {_run_name(config, perplexity): config for config in configs}
+        layouts = session.project_many(
+            {name: embeddings[config] for name, config in names.items()}, num_workers=num_workers
+        )
+        for name, config in names.items():
+            report.layouts[name] = layouts[name]
+            report.runs.append(
+                SweepRun(
+                    config=config,
+                    perplexity=perplexity,
+                    embed_seconds=embed_seconds[config],
+                    embeddings_cached=cached[config],
+                    projection_seconds=session.seconds[name],
+                    kl_divergence=session.kl_divergences[name],
+                )
+            )
+    report.total_seconds = time.perf_counter() - started
+    return report
+
+
+def write_sweep_report(
+    report: SweepReport,
+    output_dir: Union[str, Path],
+    labels: Optional[np.ndarray] = None,
+    alpha: float = 0.4,
+    point_size: int = 5,
+) -> Dict[str, Path]:
+    """
+    Write ``sweep_report.json``, ``sweep_report.md`` and one grid figure
+    ``sweep_comparison.png`` (a row per config, a column per perplexity).
+    """
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    paths = {
+        "json": output_path / "sweep_report.json",
+        "markdown": output_path / "sweep_report.md",
+        "figure": output_path / "sweep_comparison.png",
+    }
+    paths["json"].write_text(json.dumps(report.to_dict(), indent=2))
+    paths["markdown"].write_text(report.to_markdown())
+
+    configs = list(dict.fromkeys(run.config for run in report.runs))
+    perplexities = sorted({run.perplexity for run in report.runs}, reverse=True)
+    fig, axes = plt.subplots(
+        len(configs), len(perplexities),
+        figsize=(4 * len(perplexities), 4 * len(configs)),
+        squeeze=False,
+    )
+    for run in report.runs:
+        ax = axes[configs.index(run.config), perplexities.index(run.perplexity)]
+        layout = report.layouts[_run_name(run.config, run.perplexity)]
+        ax.scatter(
+            layout[:, 0], layout[:, 1],
+            c=labels, cmap="tab10" if labels is not None else None,
+            alpha=alpha, s=point_size,
+        )
+        ax.set_title(f"{run.config.label}, perplexity {run.perplexity:g}", fontsize=10)
+        ax.set_xticks([])
+        ax.set_yticks([])
+    fig.tight_layout()
+    fig.savefig(paths["figure"], dpi=150, bbox_inches="tight")
+    plt.close(fig)
+    return paths
+
+
+def _run_name(config: SweepConfig, perplexity: float) -> str:
+    return f"{config.label}/p{perplexity:g}"
@@ -0,0 +1,266 @@
+import json
+import math
+import os
+import socket
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+try:
+    from threadpoolctl import threadpool_limits
+except ImportError:  # pragma: no cover - threadpoolctl ships with scikit-learn
+    threadpool_limits = None
+
+from .gnn_model import create_gnn_model, generate_embeddings
+from .parallel_embeddings import generate_embeddings_parallel
+from .tsne_viz import compute_tsne_projection
+
+TUNING_PATH_ENV = "STRUCTURA_THREAD_TUNING"
+DEFAULT_TUNING_PATH = Path.home() / ".cache" / "structura" / "thread_tuning.json"
+
+# Keep the BLAS/OpenMP limit alive for the whole process once applied.
+_ACTIVE_LIMITS: List[Any] = []
+
+
+@dataclass(frozen=True)
+class ThreadConfig:
+    """Thread and chunking settings for CPU inference and t-SNE on one host."""
+    intra_op_threads: int
+    inter_op_threads: int
+    tsne_n_jobs: int
+    chunk_size: Optional[int] = None
+    cpus: Optional[List[int]] = None
+
+
+def available_cpus() -> List[int]:
+    """CPUs this process may run on (respects cgroup / taskset affinity)."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def host_key() -> str:
+    """Identify the host and its visible CPU budget for per-host configs."""
+    return f"{socket.gethostname()}:{os.cpu_count() or 1}:{len(available_cpus())}"
+
+
+def tuning_path(path: Optional[Union[str, Path]] = None) -> Path:
+    if path is not None:
+        return Path(path)
+    return Path(os.getenv(TUNING_PATH_ENV, DEFAULT_TUNING_PATH))
+
+
+def load_tuned_config(path: Optional[Union[str, Path]] = None) -> Optional[ThreadConfig]:
+    """Return the stored configuration for this host, if any."""
+    store = _read_store(tuning_path(path))
+    entry = store.get(host_key())
+    if entry is None:
+        return None
+    return ThreadConfig(**entry["config"])
+
+
+def save_tuned_config(
+    config: ThreadConfig,
+    path: Optional[Union[str, Path]] = None,
+    details: Optional[Dict[str, Any]] = None,
+) -> Path:
+    """Persist config for this host, keeping entries for other hosts."""
+    target = tuning_path(path)
+    store = _read_store(target)
+    store[host_key()] = {
+        "config": asdict(config),
+        "tuned_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "details": details or {},
+    }
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(store, indent=2, sort_keys=True))
+    tmp_path.replace(target)
+    return target
+
+
+def apply_thread_config(config: ThreadConfig) -> None:
+    """Pin CPUs and cap torch, OpenMP and BLAS thread pools for this process."""
+    if config.cpus and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, config.cpus)
+    torch.set_num_threads(config.intra_op_threads)
+    try:
+        torch.set_num_interop_threads(config.inter_op_threads)
+    except RuntimeError:
+        # Only settable before the first inter-op parallel work in the process.
+        pass
+    # Inherited by worker processes (parallel embeddings, sklearn/joblib).
+    os.environ["OMP_NUM_THREADS"] = str(config.intra_op_threads)
+    if threadpool_limits is not None:
+        _ACTIVE_LIMITS.clear()
+        _ACTIVE_LIMITS.append(threadpool_limits(limits=config.intra_op_threads))
+
+
+def apply_tuned_config(path: Optional[Union[str, Path]] = None) -> Optional[ThreadConfig]:
+    """Apply this host's stored configuration; returns it, or None if untuned."""
+    config = load_tuned_config(path)
+    if config is not None:
+        apply_thread_config(config)
+    return config
+
+
+def autotune(
+    x: torch.Tensor,
+    edge_index: torch.Tensor,
+    model: Optional[nn.Module] = None,
+    thread_candidates: Optional[Sequence[int]] = None,
+    chunk_candidates: Sequence[Optional[int]] = (None, 65536, 16384),
+    tsne_sample: int = 2000,
+    repeats: int = 2,
+    cpus: Optional[List[int]] = None,
+) -> Dict[str, Any]:
+    """
+    Benchmark embedding and t-SNE settings on a bundle and pick the fastest.
+
+    Embeddings are timed for every intra-op thread count and chunk size
+    (``None`` means one full-graph pass; otherwise nodes are processed in
+    in-process partitions of about ``chunk_size`` nodes). The full-graph pass
+    is always timed, and chunk sizes not below the node count are skipped
+    since they would repeat it. t-SNE is timed for
+    every ``n_jobs`` value on a subsample of the embeddings. Only thread
+    counts within the CPU budget (``cpus``, default: this process's affinity)
+    are tried, with the process pinned to ``cpus`` for the whole benchmark
+    and its previous affinity restored afterwards. Inter-op threads are fixed at 1: the SAGE models have no
+    independent ops to overlap, and torch allows setting the inter-op pool
+    only once per process, so it cannot be benchmarked in-process.
+    Returns the chosen ThreadConfig plus all timings.
+    """
+    previous_cpus = available_cpus()
+    cpus = sorted(cpus) if cpus else previous_cpus
+    pinned = cpus != previous_cpus
+    if pinned and not hasattr(os, "sched_setaffinity"):
+        raise ValueError("Pinning cpus needs os.sched_setaffinity, which this platform lacks.")
+    budget = len(cpus)
+    if thread_candidates is None:
+        thread_candidates = _powers_of_two(budget)
+    thread_candidates = [t for t in thread_candidates if 1 <= t <= budget] or [1]
+    chunk_candidates = [None] + [c for c in chunk_candidates if c is not None and c < x.shape[0]]
+    model = model or create_gnn_model(in_channels=x.shape[1], num_layers=2)
+    previous_threads = torch.get_num_threads()
+
+    embedding_timings: Dict[str, float] = {}
+    if pinned:
+        os.sched_setaffinity(0, cpus)
+    try:
+        best_embed = None
+        for threads in thread_candidates:
+            torch.set_num_threads(threads)
+            for chunk_size in chunk_candidates:
+                seconds = _best_of(repeats, lambda: _embed(model, x, edge_index, chunk_size))
+                embedding_timings[f"threads={threads},chunk={chunk_size}"] = seconds
+                if best_embed is None or seconds < best_embed[0]:
+                    best_embed = (seconds, threads, chunk_size)
+        _, intra_threads, chunk_size = best_embed
+
+        torch.set_num_threads(intra_threads)
+        embeddings = generate_embeddings(model, x, edge_index)
+        sample = _subsample(embeddings, tsne_sample)
+
+        tsne_timings: Dict[str, float] = {}
+        best_tsne = None
+        for n_jobs in thread_candidates:
+            seconds = _best_of(
+                1,
+                lambda: compute_tsne_projection(
+                    sample, perplexity=min(30, len(sample) - 1), n_iter=250, n_jobs=n_jobs
+                ),
+            )
+            tsne_timings[f"n_jobs={n_jobs}"] = seconds
+            if best_tsne is None or seconds < best_tsne[0]:
+                best_tsne = (seconds, n_jobs)
+    finally:
+        torch.set_num_threads(previous_threads)
+        if pinned:
+            os.sched_setaffinity(0, previous_cpus)
+
+    config = ThreadConfig(
+        intra_op_threads=intra_threads,
+        inter_op_threads=1,
+        tsne_n_jobs=best_tsne[1],
+        chunk_size=chunk_size,
+        cpus=cpus if pinned else None,
+    )
+    return {
+        "config": config,
+        "embedding_timings": embedding_timings,
+        "tsne_timings": tsne_timings,
+        "num_nodes": int(x.shape[0]),
+        "num_edges": int(edge_index.shape[1]),
+    }
+
+
+def generate_embeddings_tuned(
+    model: nn.Module,
+    x: torch.Tensor,
+    edge_index: torch.Tensor,
+    edge_weight: Optional[torch.Tensor] = None,
+    config: Optional[ThreadConfig] = None,
+) -> torch.Tensor:
+    """generate_embeddings honouring a tuned chunk size (full graph when unset)."""
+    chunk_size = config.chunk_size if config is not None else None
+    return _embed(model, x, edge_index, chunk_size, edge_weight)
+
+
+def _embed(
+    model: nn.Module,
+    x: torch.Tensor,
+    edge_index: torch.Tensor,
+    chunk_size: Optional[int],
+    edge_weight: Optional[torch.Tensor] = None,
+) -> torch.Tensor:
+    if chunk_size is None or chunk_size >= x.shape[0]:
+        return generate_embeddings(model, x, edge_index, edge_weight)
+    return generate_embeddings_parallel(
+        model,
+        x,
+        edge_index,
+        edge_weight=edge_weight,
+        num_partitions=math.ceil(x.shape[0] / chunk_size),
+        num_workers=1,
+        threads_per_worker=torch.get_num_threads(),
+    )
+
+
+def _best_of(repeats: int, fn) -> float:
+    best = float("inf")
+    for _ in range(max(repeats, 1)):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _powers_of_two(limit: int) -> List[int]:
+    values = [1]
+    while values[-1] * 2 <= limit:
+        values.append(values[-1] * 2)
+    if values[-1] != limit:
+        values.append(limit)
+    return values
+
+
+def _subsample(embeddings: torch.Tensor, size: int) -> np.ndarray:
+    array = embeddings.cpu().numpy()
+    if array.shape[0] <= size:
+        return array
+    indices = np.random.default_rng(0).choice(array.shape[0], size, replace=False)
+    return array[indices]
+
+
+def _read_store(path: Path) -> Dict[str, Any]:
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text())
+    except (OSError, json.JSONDecodeError):
+        return {}
@@ -1,3 +1,4 @@
+import inspect
 from pathlib import Path
 from typing import Optional, Tuple, Union
 
@@ -6,13 +7,17 @@ import numpy as np
 import torch
 from sklearn.manifold import TSNE
 
+# scikit-learn 1.5 renamed n_iter to max_iter and 1.7 removed the old name.
+_TSNE_ITER_ARG = "max_iter" if "max_iter" in inspect.signature(TSNE).parameters else "n_iter"
+
 
 def compute_tsne_projection(
     embeddings: Union[torch.Tensor, np.ndarray],
     n_components: int = 2,
     random_state: int = 42,
     perplexity: float = 30.0,
-    n_iter: int = 1000
+    n_iter: int = 1000,
+    n_jobs: Optional[int] = None
 ) -> np.ndarray:
     """
     Project high-dimensional embeddings to 2D using t-SNE.
@@ -24,6 +29,7 @@ def compute_tsne_projection(
         perplexity: t-SNE perplexity parameter (default: 30.0)
                    Should be lower than the number of nodes
         n_iter: Number of iterations for optimization (default: 1000)
+        n_jobs: Parallel jobs for the neighbour search (default: None = sklearn default)
 
     Returns:
         2D projection of shape [N, 2]
@@ -47,7 +53,8 @@ def compute_tsne_projection(
         n_components=n_components,
         random_state=random_state,
         perplexity=effective_perplexity,
-        n_iter=n_iter
+        n_jobs=n_jobs,
+        **{_TSNE_ITER_ARG: n_iter},
     )
 
     projection = tsne.fit_transform(embeddings)
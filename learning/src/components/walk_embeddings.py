@@ -0,0 +1,206 @@
+from dataclasses import dataclass
+from typing import Iterator, Optional, Tuple
+
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+
+try:
+    from torch_cluster import random_walk as _cluster_random_walk
+except ImportError:  # pragma: no cover - optional dependency
+    _cluster_random_walk = None
+
+
+@dataclass(frozen=True)
+class WalkConfig:
+    """
+    Random-walk (DeepWalk / node2vec) embedding settings.
+
+    ``p`` and ``q`` are node2vec's return and in-out parameters; p = q = 1 is
+    DeepWalk's uniform walk. Each epoch starts ``walks_per_node`` walks of
+    ``walk_length`` steps from every node, ``batch_size`` start nodes at a
+    time, and trains skip-gram with ``num_negative`` negative walks per
+    positive pair, where positives are walk positions less than
+    ``context_size`` apart.
+    """
+    embedding_dim: int = 64
+    walk_length: int = 20
+    context_size: int = 10
+    walks_per_node: int = 10
+    num_negative: int = 1
+    p: float = 1.0
+    q: float = 1.0
+    epochs: int = 1
+    batch_size: int = 256
+    lr: float = 0.01
+    undirected: bool = True
+
+
+def random_walks(
+    rowptr: torch.Tensor,
+    col: torch.Tensor,
+    start: torch.Tensor,
+    walk_length: int,
+    p: float = 1.0,
+    q: float = 1.0,
+    generator: Optional[torch.Generator] = None,
+) -> torch.Tensor:
+    """
+    Sample one walk of ``walk_length`` steps from each start node.
+
+    Uses ``torch_cluster.random_walk`` when it is installed. Without it,
+    uniform walks (p = q = 1) are sampled with a vectorized CSR lookup, one
+    step for all walks at a time. Nodes without neighbours repeat
+    themselves, as in torch_cluster. Returns a [len(start), walk_length + 1]
+    tensor of node indices.
+    """
+    if _cluster_random_walk is not None:
+        row = torch.repeat_interleave(torch.arange(rowptr.numel() - 1), rowptr.diff())
+        return _cluster_random_walk(
+            row, col, start, walk_length, p, q, num_nodes=rowptr.numel() - 1
+        )
+    if p != 1.0 or q != 1.0:
+        raise ImportError("Biased node2vec walks (p or q != 1) require torch_cluster.")
+
+    walks = torch.empty((start.numel(), walk_length + 1), dtype=torch.long)
+    walks[:, 0] = current = start
+    if col.numel() == 0:
+        walks[:, 1:] = start.view(-1, 1)
+        return walks
+    degree = rowptr.diff()
+    for step in range(1, walk_length + 1):
+        deg = degree[current]
+        offset = torch.minimum((torch.rand(current.numel(), generator=generator) * deg).long(), deg - 1)
+        position = (rowptr[current] + offset.clamp(min=0)).clamp(max=col.numel() - 1)
+        current = torch.where(deg > 0, col[position], current)
+        walks[:, step] = current
+    return walks
+
+
+class SkipGram(nn.Module):
+    """
+    Node embedding table trained with negative-sampling skip-gram.
+
+    Every pair of walk positions less than ``context_size`` apart is a
+    positive pair. Each walk is also contrasted with its own row of random
+    negative nodes. Both score sets come from one batched matmul per walk
+    batch rather than from per-window gathers.
+    """
+
+    def __init__(self, num_nodes: int, embedding_dim: int, walk_length: int, context_size: int):
+        super().__init__()
+        self.embedding = nn.Embedding(num_nodes, embedding_dim, sparse=True)
+        position = torch.arange(walk_length)
+        distance = position.view(1, -1) - position.view(-1, 1)
+        self.register_buffer("context_mask", (distance > 0) & (distance < context_size), persistent=False)
+
+    def loss(self, walks: torch.Tensor, negatives: torch.Tensor) -> torch.Tensor:
+        h_walk = self.embedding(walks)
+        pos_score = torch.bmm(h_walk, h_walk.transpose(1, 2))[:, self.context_mask]
+        neg_score = torch.bmm(h_walk, self.embedding(negatives).transpose(1, 2))
+        return -F.logsigmoid(pos_score).mean() - F.logsigmoid(-neg_score).mean()
+
+
+def build_csr(
+    edge_index: torch.Tensor,
+    num_nodes: int,
+    edge_weight: Optional[torch.Tensor] = None,
+    undirected: bool = True,
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """
+    Sorted CSR adjacency (rowptr, col) for walk sampling.
+
+    Integer multiplicities in ``edge_weight`` (coalesced bundles) are expanded
+    back into parallel edges, so walks see the same neighbour distribution as
+    on the original multigraph.
+    """
+    src, dst = edge_index[0].long(), edge_index[1].long()
+    if edge_weight is not None:
+        repeats = edge_weight.round().long().clamp(min=0)
+        src, dst = src.repeat_interleave(repeats), dst.repeat_interleave(repeats)
+    if undirected:
+        src, dst = torch.cat([src, dst]), torch.cat([dst, src])
+    order = torch.argsort(src * max(num_nodes, 1) + dst)
+    src, col = src[order], dst[order]
+    rowptr = torch.zeros(num_nodes + 1, dtype=torch.long)
+    rowptr[1:] = torch.cumsum(torch.bincount(src, minlength=num_nodes), dim=0)
+    return rowptr, col
+
+
+def iter_walk_batches(
+    rowptr: torch.Tensor,
+    col: torch.Tensor,
+    config: WalkConfig,
+    generator: Optional[torch.Generator] = None,
+) -> Iterator[Tuple[torch.Tensor, torch.Tensor]]:
+    """
+    Yield (walks, negatives) for one epoch, ``batch_size`` start nodes at a time.
+
+    walks is [batch * walks_per_node, walk_length]; negatives holds
+    ``num_negative * context_size`` uniformly drawn nodes per walk.
+    """
+    num_nodes = rowptr.numel() - 1
+    for batch in torch.randperm(num_nodes, generator=generator).split(config.batch_size):
+        start = batch.repeat(config.walks_per_node)
+        walks = random_walks(rowptr, col, start, config.walk_length - 1, config.p, config.q, generator)
+        negatives = torch.randint(
+            num_nodes, (walks.size(0), config.num_negative * config.context_size), generator=generator
+        )
+        yield walks, negatives
+
+
+def generate_walk_embeddings(
+    x: torch.Tensor,
+    edge_index: torch.Tensor,
+    edge_weight: Optional[torch.Tensor] = None,
+    config: Optional[WalkConfig] = None,
+    num_threads: Optional[int] = None,
+    seed: int = 42,
+) -> torch.Tensor:
+    """
+    Structural node embeddings from random walks and skip-gram.
+
+    A drop-in alternative to ``generate_embeddings``: takes the same bundle
+    tensors and returns a float32 [N, embedding_dim] tensor (64 by default)
+    whose rows follow ``node_mapping``. Only the graph structure is used;
+    ``x`` supplies the node count. Training runs on CPU using
+    ``num_threads`` intra-op threads (default: the current setting).
+    """
+    config = config or WalkConfig()
+    if config.context_size > config.walk_length:
+        raise ValueError("context_size must not exceed walk_length.")
+    num_nodes = x.shape[0]
+    if num_nodes == 0:
+        return torch.zeros((0, config.embedding_dim), dtype=torch.float32)
+
+    previous_threads = torch.get_num_threads()
+    if num_threads:
+        torch.set_num_threads(num_threads)
+    try:
+        # The embedding init and torch_cluster's walks draw from the global
+        # RNG; seed it inside a fork so the caller's RNG state is restored.
+        with torch.random.fork_rng(devices=[]):
+            torch.manual_seed(seed)
+            return _train_walk_embeddings(edge_index, edge_weight, config, num_nodes, seed)
+    finally:
+        torch.set_num_threads(previous_threads)
+
+
+def _train_walk_embeddings(
+    edge_index: torch.Tensor,
+    edge_weight: Optional[torch.Tensor],
+    config: WalkConfig,
+    num_nodes: int,
+    seed: int,
+) -> torch.Tensor:
+    generator = torch.Generator().manual_seed(seed)
+    rowptr, col = build_csr(edge_index, num_nodes, edge_weight, config.undirected)
+    model = SkipGram(num_nodes, config.embedding_dim, config.walk_length, config.context_size)
+    optimizer = torch.optim.SparseAdam(list(model.parameters()), lr=config.lr)
+    model.train()
+    for _ in range(config.epochs):
+        for walks, negatives in iter_walk_batches(rowptr, col, config, generator):
+            optimizer.zero_grad()
+            model.loss(walks, negatives).backward()
+            optimizer.step()
+    return model.embedding.weight.detach().clone()
@@ -13,10 +13,9 @@ Usage:
 """
 
 import argparse
-import pickle
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Sequence
 
 import numpy as np
 import torch
@@ -24,29 +23,16 @@ import torch
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from components.exporter import TensorBundle
+from components.bundle_io import load_tensor_bundle
+from components.coarsening import coarsen, groups_by_kmeans, visualize_coarse_graph
+from components.exporter import TensorBundle, coalesce_edge_index
 from components.gnn_model import create_gnn_model, generate_embeddings
+from components.graph_stats import compute_graph_stats
+from components.quantization import compare_embeddings, model_size_bytes
+from components.sweep import EmbeddingCache, run_sweep, sweep_grid, write_sweep_report
+from components.thread_tuning import ThreadConfig, apply_tuned_config, generate_embeddings_tuned
 from components.tsne_viz import visualize_embeddings
-
-
-def load_tensor_bundle(bundle_path: str) -> TensorBundle:
-    """Load a TensorBundle from a pickle file."""
-    path = Path(bundle_path)
-    if not path.exists():
-        raise FileNotFoundError(f"Bundle file not found: {bundle_path}")
-
-    with open(path, "rb") as f:
-        bundle = pickle.load(f)
-
-    # Validate bundle structure
-    if not isinstance(bundle, dict):
-        raise ValueError("Bundle must be a dictionary")
-
-    required_keys = {"x", "edge_index", "node_mapping"}
-    if not required_keys.issubset(bundle.keys()):
-        raise ValueError(f"Bundle missing required keys: {required_keys - bundle.keys()}")
-
-    return bundle
+from components.walk_embeddings import generate_walk_embeddings
 
 
 def create_synthetic_bundle(num_nodes: int = 100, num_edges: int = 200) -> TensorBundle:
@@ -95,13 +81,18 @@ def run_feasibility_demo(
     perplexity: Optional[float] = None,
     alpha: float = 0.4,
     point_size: int = 20,
-    subsample_size: Optional[int] = None
+    subsample_size: Optional[int] = None,
+    coalesce_edges: bool = False,
+    quantization: Optional[str] = None,
+    thread_config: Optional[ThreadConfig] = None,
+    engine: str = "sage",
+    coarsen_clusters: Optional[int] = None
 ):
     """
     Run the complete GNN feasibility demonstration.
 
     Args:
-        bundle_path: Path to a TensorBundle pickle file (if None, creates synthetic data)
+        bundle_path: Path to a TensorBundle pickle or compressed bundle (if None, creates synthetic data)
         output_dir: Directory to save output visualizations
         seed: Random seed for reproducibility
         num_layers: Number of GNN layers (1, 2, or 3, default: 1)
@@ -110,6 +101,11 @@ def run_feasibility_demo(
         alpha: Point transparency (0-1, default: 0.4)
         point_size: Size of scatter plot points (default: 20)
         subsample_size: Number of nodes to subsample for visualization (None = use all)
+        coalesce_edges: Merge duplicate edges into weighted edges before inference
+        quantization: Reduced-precision inference mode ("int8" or "bf16", None = float32)
+        thread_config: Tuned thread settings (chunk size, t-SNE n_jobs); None = defaults
+        engine: Embedding engine, "sage" (GNN forward pass) or "walk" (random-walk skip-gram)
+        coarsen_clusters: Also plot k-means super-nodes of all embeddings (None = skip)
     """
     print("=" * 60)
     print("GNN Feasibility Proof - Structura Project")
@@ -127,23 +123,38 @@ def run_feasibility_demo(
     x = bundle["x"]
     edge_index = bundle["edge_index"]
     node_mapping = bundle["node_mapping"]
+    edge_weight = bundle.get("edge_weight")
 
     num_nodes = x.shape[0]
     num_edges = edge_index.shape[1]
     print(f"  Nodes: {num_nodes}, Edges: {num_edges}")
+    if coalesce_edges and edge_weight is None:
+        edge_index, edge_count, _ = coalesce_edge_index(edge_index, num_nodes)
+        edge_weight = edge_count.to(torch.float32)
+        print(f"  Coalesced duplicate edges: {num_edges} → {edge_index.shape[1]}")
     print(f"  Node features shape: {x.shape}")
     print(f"  Edge index shape: {edge_index.shape}")
 
-    # Check for orphan nodes (for demonstration)
-    connected_nodes = torch.unique(edge_index)
-    num_orphans = num_nodes - len(connected_nodes)
+    # Graph statistics (exported bundles may already carry them)
+    stats = bundle.get("stats") or compute_graph_stats(edge_index, num_nodes, include_scc=False)
+    num_orphans = stats["orphans"]
+    degree = stats["degree"]["total"]
+    print(
+        f"  Degree: mean {degree['mean']:.2f}, max {degree['max']}; "
+        f"weak components: {stats['weak_components']['count']} "
+        f"(largest {stats['weak_components']['largest']})"
+    )
     if num_orphans > 0:
         print(f"  ⚠ Found {num_orphans} orphan node(s) with no edges")
         print(f"  ✓ SAGEConv handles orphans gracefully using self-features")
 
     # Step 2: Initialize GNN model
     print("\n[2/4] Initializing GNN model...")
-    model = create_gnn_model(
+    if engine == "walk":
+        if quantization:
+            raise ValueError("Quantization applies to the SAGE engine only.")
+        print("  Engine: random-walk skip-gram (no GNN model, structure only)")
+    model = None if engine == "walk" else create_gnn_model(
         in_channels=6,
         out_channels=64,
         seed=seed,
@@ -151,22 +162,48 @@ def run_feasibility_demo(
         num_layers=num_layers,
         hidden_channels=hidden_channels
     )
-    print(f"  Model: {model.__class__.__name__}")
-    print(f"  Number of layers: {num_layers}")
-    if num_layers == 1:
-        print(f"  Architecture: 6 → 64")
-    elif num_layers == 2:
-        print(f"  Architecture: 6 → {hidden_channels} → 64")
-    elif num_layers == 3:
-        print(f"  Architecture: 6 → {hidden_channels} → {hidden_channels} → 64")
-    print(f"  Random seed: {seed} (for reproducibility)")
-    print(f"  Mode: eval")
+    if model is not None:
+        print(f"  Model: {model.__class__.__name__}")
+        print(f"  Number of layers: {num_layers}")
+        if num_layers == 1:
+            print(f"  Architecture: 6 → 64")
+        elif num_layers == 2:
+            print(f"  Architecture: 6 → {hidden_channels} → 64")
+        elif num_layers == 3:
+            print(f"  Architecture: 6 → {hidden_channels} → {hidden_channels} → 64")
+        print(f"  Random seed: {seed} (for reproducibility)")
+        print(f"  Mode: eval")
+    if quantization:
+        float_model = model
+        model = create_gnn_model(
+            in_channels=6,
+            out_channels=64,
+            seed=seed,
+            num_layers=num_layers,
+            hidden_channels=hidden_channels,
+            quantization=quantization
+        )
+        print(f"  Quantization: {quantization}")
+        print(f"  Model size: {model_size_bytes(float_model)} → {model_size_bytes(model)} bytes")
 
     # Step 3: Generate embeddings
     print("\n[3/4] Generating node embeddings...")
-    embeddings = generate_embeddings(model, x, edge_index)
+    if engine == "walk":
+        num_threads = thread_config.intra_op_threads if thread_config else None
+        embeddings = generate_walk_embeddings(
+            x, edge_index, edge_weight, num_threads=num_threads, seed=seed
+        )
+    else:
+        embeddings = generate_embeddings_tuned(model, x, edge_index, edge_weight, thread_config)
     print(f"  Embeddings shape: {embeddings.shape}")
     print(f"  Expected shape: [{num_nodes}, 64] ✓")
+    if quantization:
+        reference = generate_embeddings(float_model, x, edge_index, edge_weight)
+        accuracy = compare_embeddings(reference, embeddings)
+        print(
+            f"  Cosine similarity vs float32: mean {accuracy['cosine_mean']:.4f}, "
+            f"min {accuracy['cosine_min']:.4f}"
+        )
 
     # Step 4: t-SNE visualization
     print("\n[4/4] Creating t-SNE visualization...")
@@ -197,29 +234,54 @@ def run_feasibility_demo(
     print(f"  t-SNE perplexity: {effective_perplexity}")
     print(f"  Point transparency (alpha): {alpha}")
     print(f"  Point size: {point_size}")
+    tsne_n_jobs = thread_config.tsne_n_jobs if thread_config else None
 
     # Create output directory with layer-specific filename
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
-    save_path = output_path / f"tsne_embeddings_{num_layers}layer.png"
+    if engine == "walk":
+        save_path = output_path / "tsne_embeddings_walk.png"
+        title = "t-SNE Projection of Random-Walk Embeddings"
+    else:
+        save_path = output_path / f"tsne_embeddings_{num_layers}layer.png"
+        title = f"t-SNE Projection of GNN Embeddings ({num_layers}-Layer SAGEConv)"
 
     # Visualize
-    layer_suffix = f"{num_layers}-Layer" if num_layers > 1 else "1-Layer"
     projection, fig = visualize_embeddings(
         embeddings_viz,
         labels=labels_viz,
-        title=f"t-SNE Projection of GNN Embeddings ({layer_suffix} SAGEConv)",
+        title=title,
         save_path=save_path,
         show=False,  # Don't block in script mode
         perplexity=effective_perplexity,
         random_state=seed,
         alpha=alpha,
-        point_size=point_size
+        point_size=point_size,
+        n_jobs=tsne_n_jobs
     )
 
     print(f"  t-SNE projection shape: {projection.shape}")
     print(f"  Visualization saved to: {save_path}")
 
+    if coarsen_clusters:
+        coarse = coarsen(
+            embeddings, *groups_by_kmeans(embeddings, coarsen_clusters, seed=seed),
+            edge_index=edge_index, edge_weight=edge_weight
+        )
+        coarse_path = save_path.with_name(save_path.stem + "_coarse.png")
+        visualize_coarse_graph(
+            coarse,
+            labels=labels,
+            title=f"{title}, {coarse.num_clusters} Clusters",
+            save_path=coarse_path,
+            perplexity=min(effective_perplexity, coarse.num_clusters - 1),
+            random_state=seed,
+            alpha=alpha,
+            n_jobs=tsne_n_jobs
+        )
+        print(f"  Coarsened {num_nodes} nodes into {coarse.num_clusters} super-nodes")
+        print(f"  Coarsened visualization saved to: {coarse_path}")
+
     print("\n" + "=" * 60)
     print("✓ Feasibility proof complete!")
     print("=" * 60)
@@ -234,6 +296,63 @@ def run_feasibility_demo(
     print(f"  3. Experiment with different model architectures")
 
 
+def run_sweep_demo(
+    bundle_path: Optional[str] = None,
+    output_dir: str = "output",
+    seed: int = 42,
+    num_layers: Sequence[int] = (1, 2, 3),
+    hidden_channels: Sequence[int] = (128,),
+    perplexities: Optional[Sequence[float]] = None,
+    alpha: float = 0.4,
+    num_workers: Optional[int] = None,
+    cache_dir: Optional[str] = None
+):
+    """
+    Compare a grid of model configurations on one loaded bundle.
+
+    The bundle is loaded and its adjacency built once; every combination of
+    num_layers x hidden_channels is embedded (reusing cached embeddings from
+    cache_dir) and projected at every perplexity, with projections running in
+    a process pool. Writes sweep_report.json/.md and sweep_comparison.png.
+    """
+    print("=" * 60)
+    print("GNN Configuration Sweep - Structura Project")
+    print("=" * 60)
+
+    if bundle_path:
+        bundle = load_tensor_bundle(bundle_path)
+        print(f"  Loaded bundle from: {bundle_path}")
+    else:
+        bundle = create_synthetic_bundle(num_nodes=100, num_edges=300)
+        print("  Created synthetic bundle")
+    x = bundle["x"]
+    num_nodes = x.shape[0]
+    if perplexities is None:
+        perplexities = [min(30, num_nodes - 1)]
+    configs = sweep_grid(num_layers, hidden_channels, [seed])
+    print(f"  Nodes: {num_nodes}, Edges: {bundle['edge_index'].shape[1]}")
+    print(f"  Configs: {', '.join(config.label for config in configs)}")
+    print(f"  Perplexities: {', '.join(f'{p:g}' for p in perplexities)}")
+
+    report = run_sweep(
+        x,
+        bundle["edge_index"],
+        configs,
+        perplexities=perplexities,
+        edge_weight=bundle.get("edge_weight"),
+        num_workers=num_workers,
+        cache=EmbeddingCache(cache_dir),
+        random_state=seed
+    )
+    paths = write_sweep_report(report, output_dir, labels=extract_node_labels(bundle), alpha=alpha)
+
+    print()
+    print(report.to_markdown())
+    print(f"  Report: {paths['markdown']}")
+    print(f"  Figure: {paths['figure']}")
+    return report
+
+
 def main():
     """Command-line interface for the feasibility demo."""
     parser = argparse.ArgumentParser(
@@ -249,6 +368,9 @@ Examples:
 
   # Custom output directory
   python gnn_feasibility_demo.py --output-dir results/
+
+  # Compare 1-3 layers at two perplexities in one run
+  python gnn_feasibility_demo.py --sweep --num-layers 1 2 3 --perplexity 15 30
         """
     )
 
@@ -256,7 +378,7 @@ Examples:
         "--bundle-path",
         type=str,
         default=None,
-        help="Path to TensorBundle pickle file (if not provided, uses synthetic data)"
+        help="Path to TensorBundle pickle or compressed bundle (if not provided, uses synthetic data)"
     )
 
     parser.add_argument(
@@ -276,21 +398,24 @@ Examples:
     parser.add_argument(
         "--num-layers",
         type=int,
-        default=1,
+        nargs="+",
+        default=None,
         choices=[1, 2, 3],
-        help="Number of GNN layers (default: 1)"
+        help="Number of GNN layers (default: 1; with --sweep, several values and default 1 2 3)"
     )
 
     parser.add_argument(
         "--hidden-channels",
         type=int,
-        default=128,
+        nargs="+",
+        default=[128],
         help="Hidden layer dimension for multi-layer models (default: 128)"
     )
 
     parser.add_argument(
         "--perplexity",
         type=float,
+        nargs="+",
         default=None,
         help="t-SNE perplexity parameter (default: auto-adjust based on graph size)"
     )
@@ -316,19 +441,105 @@ Examples:
         help="Number of nodes to subsample for visualization (default: use all nodes)"
     )
 
+    parser.add_argument(
+        "--coalesce-edges",
+        action="store_true",
+        help="Merge duplicate edges into weighted edges before inference"
+    )
+
+    parser.add_argument(
+        "--quantization",
+        type=str,
+        default=None,
+        choices=["int8", "bf16"],
+        help="Reduced-precision inference mode (default: float32)"
+    )
+
+    parser.add_argument(
+        "--engine",
+        type=str,
+        default="sage",
+        choices=["sage", "walk"],
+        help="Embedding engine: GNN forward pass or random-walk skip-gram (default: sage)"
+    )
+
+    parser.add_argument(
+        "--coarsen-clusters",
+        type=int,
+        default=None,
+        help="Also plot this many k-means super-nodes of all embeddings (default: off)"
+    )
+
+    parser.add_argument(
+        "--sweep",
+        action="store_true",
+        help="Run every combination of --num-layers/--hidden-channels/--perplexity "
+             "on one loaded bundle and write a single comparison report"
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes for sweep projections (default: CPU count)"
+    )
+
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=None,
+        help="Directory caching sweep embeddings by config hash (default: memory only)"
+    )
+
+    parser.add_argument(
+        "--no-thread-tuning",
+        action="store_true",
+        help="Ignore the tuned thread config for this host (see pipeline/tune_threads.py)"
+    )
+
     args = parser.parse_args()
+    if not args.sweep:
+        for name in ("num_layers", "hidden_channels", "perplexity"):
+            values = getattr(args, name)
+            if values is not None and len(values) > 1:
+                parser.error(f"--{name.replace('_', '-')} takes one value unless --sweep is given")
+
+    thread_config = None if args.no_thread_tuning else apply_tuned_config()
+    if thread_config is not None:
+        print(
+            f"Using tuned threads: intra-op {thread_config.intra_op_threads}, "
+            f"t-SNE n_jobs {thread_config.tsne_n_jobs}, chunk {thread_config.chunk_size}"
+        )
 
     try:
+        if args.sweep:
+            run_sweep_demo(
+                bundle_path=args.bundle_path,
+                output_dir=args.output_dir,
+                seed=args.seed,
+                num_layers=args.num_layers or [1, 2, 3],
+                hidden_channels=args.hidden_channels,
+                perplexities=args.perplexity,
+                alpha=args.alpha,
+                num_workers=args.workers,
+                cache_dir=args.cache_dir
+            )
+            return
         run_feasibility_demo(
             bundle_path=args.bundle_path,
             output_dir=args.output_dir,
             seed=args.seed,
-            num_layers=args.num_layers,
-            hidden_channels=args.hidden_channels,
-            perplexity=args.perplexity,
+            num_layers=args.num_layers[0] if args.num_layers else 1,
+            hidden_channels=args.hidden_channels[0],
+            perplexity=args.perplexity[0] if args.perplexity else None,
             alpha=args.alpha,
             point_size=args.point_size,
-            subsample_size=args.subsample
+            subsample_size=args.subsample,
+            coalesce_edges=args.coalesce_edges,
+            quantization=args.quantization,
+            thread_config=thread_config,
+            engine=args.engine,
+            coarsen_clusters=args.coarsen_clusters
         )
     except Exception as e:
         print(f"\n❌ Error: {e}", file=sys.stderr)
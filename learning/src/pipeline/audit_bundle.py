@@ -1,69 +1,306 @@
+#!/usr/bin/env python3
+"""
+Audit tensor bundles chunk by chunk.
+
+Run:
+  python learning/src/pipeline/audit_bundle.py learning/data/<UUID>_bundle.pkl
+  python learning/src/pipeline/audit_bundle.py learning/data/ --workers 4
+"""
 import argparse
 import pickle
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional, Union
 
+import numpy as np
 import torch
 
-# This is our "Contract" - we need to see if the data matches these keys!
-KIND_TO_BUCKET = {
-    "Module": 0,
-    "Block": 0,
-    "Function": 1,
-    "Conditional": 1,
-    "Loop": 1,
-    "Return": 1,
-    "Variable": 2,
-    "Parameter": 2,
-    "Assignment": 2,
-    "Literal": 2,
-    "Call": 3,
-    "MemberExpression": 3,
-    "Identifier": 3,
-    "ExpressionStatement": 4,
-    "Import": 4,
-    "Unknown": 5,
-}
-
-def audit_bundle(bundle_path: Path) -> None:
-    if not bundle_path.exists():
-        raise FileNotFoundError(f"Bundle file not found: {bundle_path}")
-
-    # Use weights_only=True if you transition to torch.load later for security 🛡️
-    with open(bundle_path, "rb") as handle:
+SRC_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SRC_ROOT))
+
+from components.bundle_io import CompressedBundleReader, is_compressed_bundle  # noqa: E402
+from components.node_features import KIND_TO_BUCKET  # noqa: E402
+
+BUCKET_LABELS = ["Container", "Logic", "Data", "Ref", "Statement", "Other"]
+NUM_BUCKETS = max(KIND_TO_BUCKET.values()) + 1
+DEFAULT_CHUNK_SIZE = 1 << 16
+ROW_SUM_TOLERANCE = 1e-5
+
+
+@dataclass
+class BundleAudit:
+    """Result of auditing one bundle; ``errors`` is empty when it passed."""
+    path: str
+    format: str
+    num_nodes: int = 0
+    num_features: int = 0
+    num_edges: int = 0
+    edge_dtype: str = ""
+    bucket_counts: List[int] = field(default_factory=lambda: [0] * NUM_BUCKETS)
+    orphans: int = 0
+    self_loops: int = 0
+    duplicate_edges: int = 0
+    errors: List[str] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+
+    @property
+    def passed(self) -> bool:
+        return not self.errors
+
+
+def audit_bundle(
+    bundle_path: Union[str, Path],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> BundleAudit:
+    """
+    Check a pickle or compressed bundle in chunks of ``chunk_size`` rows/edges.
+
+    Compressed bundles are streamed frame by frame, so only one chunk of x or
+    edge_index is decoded at a time. Pickles have to be unpickled, but checks
+    still run over fixed-size slices without full-size temporaries. Per-node
+    state is a single int64 degree array. Duplicate edges are counted in the
+    same pass when edges are sorted by (src, dst); otherwise a second pass
+    sorts int64 edge keys.
+    """
+    path = Path(bundle_path)
+    if not path.exists():
+        raise FileNotFoundError(f"Bundle file not found: {path}")
+
+    if is_compressed_bundle(path):
+        with CompressedBundleReader(path) as reader:
+            audit = BundleAudit(path=str(path), format="compressed")
+            num_node_ids = None
+            if reader.meta.get("has_node_ids"):
+                num_node_ids = sum(len(ids) for ids in reader.iter_node_id_chunks())
+            _audit_chunks(
+                audit,
+                num_nodes=reader.num_nodes,
+                num_features=int(reader.meta["num_features"]),
+                num_node_ids=num_node_ids,
+                x_chunks=(chunk.numpy() for chunk in reader.iter_x_chunks()),
+                edge_chunks=lambda: (chunk.numpy() for chunk in reader.iter_edge_chunks()),
+                edge_dtype=reader.edge_dtype,
+            )
+        return audit
+
+    with open(path, "rb") as handle:
         bundle = pickle.load(handle)
+    audit = BundleAudit(path=str(path), format="pickle")
+    missing = {"x", "edge_index", "node_mapping"} - set(bundle)
+    if missing:
+        audit.errors.append(f"missing keys: {sorted(missing)}")
+        return audit
 
     x = bundle["x"]
-    node_mapping = bundle["node_mapping"]
-    
-    # --- NEW: Discovery Logic 🕵️ ---
-    # We need to see what the 'kind' labels actually are.
-    # Note: This assumes your bundle or nodes carry the kind info!
-    # If the bundle only has tensors, we should check the Exporter's input.
-    
-    print("--- Diagnostic: Feature Alignment ---")
-    bucket_labels = ["Container", "Logic", "Data", "Ref", "Statement", "Other"]
-    bucket_counts = x.sum(dim=0).to(torch.int).tolist()
-
-    for label, count in zip(bucket_labels, bucket_counts):
-        print(f"- {label}: {count}")
-
-    if bucket_counts[5] > 0 and sum(bucket_counts[:5]) == 0:
-        print("\n⚠️ ALERT: All nodes are in 'Other'. Mapping failure suspected.")
-        print(f"Expected keys: {list(KIND_TO_BUCKET.keys())[:5]}...")
-    
-    # --- Integrity Checks ---
-    row_sums = x.sum(dim=1)
-    assert torch.allclose(row_sums, torch.ones(x.shape[0])), "Rows must sum to 1"
-    assert x.shape[1] == 6, "Must have 6 columns"
-
-    print("\nStructure audit passed.")
+    edge_index = bundle["edge_index"]
+    if x.dim() != 2 or edge_index.dim() != 2 or edge_index.shape[0] != 2:
+        audit.errors.append(
+            f"bad shapes: x {list(x.shape)}, edge_index {list(edge_index.shape)}"
+        )
+        return audit
+    _audit_chunks(
+        audit,
+        num_nodes=int(x.shape[0]),
+        num_features=int(x.shape[1]),
+        num_node_ids=len(bundle["node_mapping"]),
+        x_chunks=_slices(x, chunk_size, dim=0),
+        edge_chunks=lambda: _slices(edge_index, chunk_size, dim=1),
+        edge_dtype=str(edge_index.dtype).replace("torch.", ""),
+    )
+    return audit
+
+
+def audit_directory(
+    directory: Union[str, Path],
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> List[BundleAudit]:
+    """Audit every bundle in a directory in parallel worker processes."""
+    paths = find_bundles(directory)
+    if not paths:
+        return []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(audit_bundle, path, chunk_size) for path in paths]
+        results = []
+        for path, future in zip(paths, futures):
+            try:
+                results.append(future.result())
+            except Exception as exc:
+                results.append(BundleAudit(path=str(path), format="?", errors=[str(exc)]))
+    return results
+
+
+def find_bundles(directory: Union[str, Path]) -> List[Path]:
+    """Pickled (*.pkl) and compressed bundle files directly inside directory."""
+    return sorted(
+        path
+        for path in Path(directory).iterdir()
+        if path.is_file() and (path.suffix == ".pkl" or is_compressed_bundle(path))
+    )
+
+
+def format_summary(audits: Iterable[BundleAudit]) -> str:
+    """Render one row per bundle."""
+    header = (
+        f"{'bundle':<40} {'format':<10} {'nodes':>10} {'edges':>12} "
+        f"{'orphans':>9} {'loops':>8} {'dups':>9}  status"
+    )
+    lines = [header, "-" * len(header)]
+    for audit in audits:
+        status = "ok" if audit.passed else "FAIL: " + "; ".join(audit.errors)
+        lines.append(
+            f"{Path(audit.path).name[:40]:<40} {audit.format:<10} {audit.num_nodes:>10} "
+            f"{audit.num_edges:>12} {audit.orphans:>9} {audit.self_loops:>8} "
+            f"{audit.duplicate_edges:>9}  {status}"
+        )
+    return "\n".join(lines)
+
+
+def _audit_chunks(
+    audit: BundleAudit,
+    num_nodes: int,
+    num_features: int,
+    num_node_ids: Optional[int],
+    x_chunks: Iterable[np.ndarray],
+    edge_chunks: Callable[[], Iterable[np.ndarray]],
+    edge_dtype: str,
+) -> None:
+    audit.num_nodes = num_nodes
+    audit.num_features = num_features
+    audit.edge_dtype = edge_dtype
+    if num_node_ids is not None and num_node_ids != num_nodes:
+        audit.errors.append(f"node_mapping has {num_node_ids} ids for {num_nodes} rows")
+    if edge_dtype != "int64":
+        audit.errors.append(f"edge_index dtype is {edge_dtype}, expected int64")
+
+    bucket_counts = np.zeros(NUM_BUCKETS, dtype=np.int64)
+    bad_rows = 0
+    if num_features == NUM_BUCKETS:
+        for chunk in x_chunks:
+            bucket_counts += chunk.sum(axis=0, dtype=np.float64).astype(np.int64)
+            row_sums = chunk.sum(axis=1, dtype=np.float64)
+            bad_rows += int((np.abs(row_sums - 1.0) > ROW_SUM_TOLERANCE).sum())
+    else:
+        audit.errors.append(f"x has {num_features} columns, expected {NUM_BUCKETS}")
+    audit.bucket_counts = bucket_counts.tolist()
+    if bad_rows:
+        audit.errors.append(f"{bad_rows} rows do not sum to 1")
+    if bucket_counts[-1] > 0 and bucket_counts[:-1].sum() == 0:
+        audit.warnings.append("all nodes are in 'Other'; kind mapping failure suspected")
+
+    degree = np.zeros(num_nodes, dtype=np.int64)
+    out_of_bounds = 0
+    duplicates = _DuplicateCounter()
+    for chunk in edge_chunks():
+        src, dst = chunk[0], chunk[1]
+        audit.num_edges += int(src.shape[0])
+        in_bounds = (src >= 0) & (src < num_nodes) & (dst >= 0) & (dst < num_nodes)
+        if not in_bounds.all():
+            out_of_bounds += int((~in_bounds).sum())
+            src, dst = src[in_bounds], dst[in_bounds]
+        degree += np.bincount(src, minlength=num_nodes)
+        degree += np.bincount(dst, minlength=num_nodes)
+        audit.self_loops += int((src == dst).sum())
+        duplicates.add(src.astype(np.int64) * num_nodes + dst)
+    if out_of_bounds:
+        audit.errors.append(f"{out_of_bounds} edges reference nodes outside [0, {num_nodes})")
+    audit.orphans = int((degree == 0).sum())
+    if duplicates.sorted:
+        audit.duplicate_edges = duplicates.duplicates
+    else:
+        audit.duplicate_edges = _count_duplicates_unsorted(edge_chunks(), num_nodes)
+
+
+class _DuplicateCounter:
+    """
+    Count repeated (src, dst) keys in one streaming pass over sorted edges.
+
+    Each chunk is compared with the previous key carried over from the last
+    chunk. If the stream turns out not to be sorted, ``sorted`` becomes False
+    and the caller recounts with _count_duplicates_unsorted.
+    """
+
+    def __init__(self):
+        self.sorted = True
+        self.duplicates = 0
+        self.last_key: Optional[int] = None
+
+    def add(self, keys: np.ndarray) -> None:
+        if not self.sorted or keys.size == 0:
+            return
+        if not np.all(keys[1:] >= keys[:-1]) or (
+            self.last_key is not None and keys[0] < self.last_key
+        ):
+            self.sorted = False
+            return
+        self.duplicates += int((keys[1:] == keys[:-1]).sum())
+        if self.last_key is not None and keys[0] == self.last_key:
+            self.duplicates += 1
+        self.last_key = int(keys[-1])
+
+
+def _count_duplicates_unsorted(edge_chunks: Iterable[np.ndarray], num_nodes: int) -> int:
+    """Buffer int64 keys (half the size of edge_index) and count repeats after one sort."""
+    keys = [
+        _edge_keys(chunk[0], chunk[1], num_nodes)
+        for chunk in edge_chunks
+    ]
+    if not keys:
+        return 0
+    merged = np.sort(np.concatenate(keys))
+    return int((merged[1:] == merged[:-1]).sum())
+
+
+def _edge_keys(src: np.ndarray, dst: np.ndarray, num_nodes: int) -> np.ndarray:
+    in_bounds = (src >= 0) & (src < num_nodes) & (dst >= 0) & (dst < num_nodes)
+    return src[in_bounds].astype(np.int64) * num_nodes + dst[in_bounds]
+
+
+def _slices(tensor: torch.Tensor, chunk_size: int, dim: int) -> Iterator[np.ndarray]:
+    for start in range(0, tensor.shape[dim], chunk_size):
+        yield tensor.narrow(dim, start, min(chunk_size, tensor.shape[dim] - start)).numpy()
+
+
+def _print_audit(audit: BundleAudit) -> None:
+    print(f"Bundle audit for: {audit.path} ({audit.format})")
+    print(f"  Feature matrix shape: [{audit.num_nodes}, {audit.num_features}]")
+    print(f"  Edge index shape: [2, {audit.num_edges}] ({audit.edge_dtype})")
+    print("  Node kind distribution:")
+    for label, count in zip(BUCKET_LABELS, audit.bucket_counts):
+        print(f"    - {label}: {count}")
+    print(f"  Orphan nodes: {audit.orphans}")
+    print(f"  Self-loops: {audit.self_loops}")
+    print(f"  Duplicate edges: {audit.duplicate_edges}")
+    for warning in audit.warnings:
+        print(f"  ⚠️ {warning}")
+    for error in audit.errors:
+        print(f"  ✗ {error}")
+    print("Structure audit passed." if audit.passed else "Structure audit FAILED.")
+
 
 def main() -> int:
-    parser = argparse.ArgumentParser()
-    parser.add_argument("bundle_path")
+    parser = argparse.ArgumentParser(description="Audit tensor bundles.")
+    parser.add_argument("bundle_path", help="Bundle file, or a directory of bundles.")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Worker processes for directories."
+    )
     args = parser.parse_args()
-    audit_bundle(Path(args.bundle_path))
-    return 0
+
+    path = Path(args.bundle_path)
+    if path.is_dir():
+        audits = audit_directory(path, workers=args.workers, chunk_size=args.chunk_size)
+        if not audits:
+            print(f"No bundles found in {path}", file=sys.stderr)
+            return 1
+        print(format_summary(audits))
+    else:
+        audits = [audit_bundle(path, chunk_size=args.chunk_size)]
+        _print_audit(audits[0])
+    return 0 if all(audit.passed for audit in audits) else 1
+
 
 if __name__ == "__main__":
-    main()
+    raise SystemExit(main())
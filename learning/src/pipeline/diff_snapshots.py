@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Diff two snapshots (in the database) or two exported bundles.
+
+Env setup (SQL mode):
+  set -a; source learning/.env; set +a
+
+Run:
+  python learning/src/pipeline/diff_snapshots.py --snapshot-a <UUID> --snapshot-b <UUID>
+  python learning/src/pipeline/diff_snapshots.py --bundle-a a_bundle.pkl --bundle-b b_bundle.pkl
+"""
+import argparse
+import json
+import sys
+from dataclasses import asdict
+from pathlib import Path
+
+SRC_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SRC_ROOT))
+
+from components.bundle_io import load_tensor_bundle  # noqa: E402
+from components.snapshot_diff import diff_bundles, diff_snapshots_sql  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Diff two snapshots or bundles.")
+    parser.add_argument("--snapshot-a", default=None, help="Base snapshot UUID (SQL mode).")
+    parser.add_argument("--snapshot-b", default=None, help="New snapshot UUID (SQL mode).")
+    parser.add_argument("--bundle-a", default=None, help="Base bundle path (bundle mode).")
+    parser.add_argument("--bundle-b", default=None, help="New bundle path (bundle mode).")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows per fetch in SQL mode.")
+    parser.add_argument("--top-files", type=int, default=20, help="Files to list in the summary.")
+    parser.add_argument("--json", default=None, help="Write every change to this JSON file.")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    if args.snapshot_a and args.snapshot_b:
+        diff = diff_snapshots_sql(args.snapshot_a, args.snapshot_b, batch_size=args.batch_size)
+    elif args.bundle_a and args.bundle_b:
+        diff = diff_bundles(load_tensor_bundle(args.bundle_a), load_tensor_bundle(args.bundle_b))
+    else:
+        print("Pass --snapshot-a/--snapshot-b or --bundle-a/--bundle-b.", file=sys.stderr)
+        return 1
+
+    for key, count in diff.summary().items():
+        print(f"{key:>15}: {count}")
+    ranked = sorted(diff.files.items(), key=lambda item: (-sum(item[1].values()), item[0]))
+    if ranked:
+        print("\nFiles with the most changes:")
+        for file_path, counts in ranked[: args.top_files]:
+            detail = ", ".join(f"{key} {value}" for key, value in sorted(counts.items()))
+            print(f"  {file_path or '<unknown>'}: {detail}")
+
+    if args.json:
+        payload = {
+            "summary": diff.summary(),
+            "files": diff.files,
+            "nodes": [asdict(change) for change in diff.nodes],
+            "edges": [asdict(change) for change in diff.edges],
+        }
+        Path(args.json).write_text(json.dumps(payload, indent=2))
+        print(f"\nWrote changes to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,15 +1,120 @@
+import hashlib
+import json
+import logging
+from dataclasses import asdict, dataclass
+from typing import Optional, Sequence
+
+import torch
+
+from components.bundle_io import (
+    BUNDLE_METADATA_KEYS,
+    CompressedBundleWriter,
+    load_tensor_bundle,
+    read_bundle_metadata,
+    write_compressed_bundle,
+)
 from components.exporter import (
     TensorBundle,
+    coalesce_edge_index,
     create_edge_index,
+    create_edge_kind_index,
     create_node_mapping,
     export_snapshot,
 )
-from components.materializer import materialize_snapshot
+from components.feature_store import FeatureRef, FeatureStore, get_feature_spec
+from components.fingerprints import SnapshotFingerprint, fetch_snapshot_fingerprint
+from components.graph_stats import compute_graph_stats
+from components.materializer import SnapshotFilter, fetch_snapshot_counts, materialize_snapshot
+from components.memory_planner import COMPRESSED, IN_MEMORY, plan_export
 from components.models import SnapshotGraph
 from components.node_features import create_feature_matrix_v1
+from components.node_index import NodeIdIndex
+from components.partitioning import create_partitions, export_sharded_bundle
+from components.pipelined_export import DEFAULT_BATCH_SIZE, stream_snapshot_tensors
+
+logger = logging.getLogger(__name__)
+
+
+def export_options_digest(
+    output_format: str = "pickle",
+    include_edge_kinds: bool = False,
+    coalesce_edges: bool = False,
+    include_stats: bool = False,
+    features: Optional[Sequence[FeatureRef]] = None,
+) -> str:
+    """
+    Hash the run_export_pipeline options that change a bundle's contents.
+
+    ``features`` are the feature store columns, resolved to (name, version)
+    so a newly registered version changes the digest; None stands for the
+    built-in create_feature_matrix_v1 features.
+    """
+    feature_keys = None
+    if features is not None:
+        feature_keys = []
+        for feature in features:
+            name, version = (feature, None) if isinstance(feature, str) else feature
+            spec = get_feature_spec(name, version)
+            feature_keys.append([spec.name, spec.version])
+    payload = json.dumps(
+        {
+            "output_format": output_format,
+            "include_edge_kinds": include_edge_kinds,
+            "coalesce_edges": coalesce_edges,
+            "include_stats": include_stats,
+            "features": feature_keys,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class OutputOptions:
+    """
+    How the bundle is stored. ``format`` is "pickle" or "compressed" (see
+    ``components.bundle_io``); ``compact_ids`` keeps "node_mapping" as a
+    ``NodeIdIndex``.
+    """
+    format: str = "pickle"
+    compact_ids: bool = False
+
 
+@dataclass(frozen=True)
+class PartitionOptions:
+    """Write ``num_parts`` shards with a ``hops``-deep halo instead of one bundle."""
+    num_parts: int
+    strategy: str = "file"
+    hops: int = 1
 
-def run_export_pipeline(snapshot_id: str, output_path: str) -> TensorBundle:
+
+@dataclass(frozen=True)
+class PlannerOptions:
+    """
+    Memory budget (bytes) for ``components.memory_planner``.
+    ``allow_format_change`` lets it switch the output to "compressed".
+    """
+    memory_budget: int
+    allow_format_change: bool = False
+
+
+def run_export_pipeline(
+    snapshot_id: str,
+    output_path: str,
+    output: Optional[OutputOptions] = None,
+    partitions: Optional[PartitionOptions] = None,
+    planner: Optional[PlannerOptions] = None,
+    snapshot_filter: Optional[SnapshotFilter] = None,
+    include_edge_kinds: bool = False,
+    coalesce_edges: bool = False,
+    include_stats: bool = False,
+    feature_store: Optional[FeatureStore] = None,
+    features: Sequence[FeatureRef] = ("kind_bucket",),
+    skip_if_unchanged: bool = False,
+    pipelined: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> TensorBundle:
     """
     Run the export pipeline for a snapshot and persist the final bundle.
 
@@ -17,18 +122,159 @@ def run_export_pipeline(snapshot_id: str, output_path: str) -> TensorBundle:
     - "x": node feature matrix
     - "edge_index": COO edge index tensor
     - "node_mapping": node-id-to-index mapping
+
+    plus the snapshot "fingerprint", the "export_options" digest and any
+    optional entries requested (edge kinds, edge counts, stats). With
+    ``partitions``, ``output_path`` is a shard directory. ``pipelined``
+    streams rows in ``batch_size`` batches instead of building a NetworkX
+    graph; ``planner`` may switch to it, or fail early, to fit a memory
+    budget. ``snapshot_filter`` is pushed into the SQL of every path.
     """
-    snapshot: SnapshotGraph = materialize_snapshot(snapshot_id=snapshot_id)
-    graph = snapshot.graph
+    output = output or OutputOptions()
+    output_format = output.format
+    if snapshot_filter is not None and snapshot_filter.is_empty:
+        snapshot_filter = None
+    num_partitions = partitions.num_parts if partitions is not None else None
+    options_digest = export_options_digest(
+        output_format=output_format,
+        include_edge_kinds=include_edge_kinds,
+        coalesce_edges=coalesce_edges,
+        include_stats=include_stats,
+        features=features if feature_store is not None else None,
+    )
+    if skip_if_unchanged and not num_partitions and snapshot_filter is None:
+        stored = read_bundle_metadata(output_path)
+        if stored.get("export_options") == options_digest and stored.get("fingerprint"):
+            current = fetch_snapshot_fingerprint(snapshot_id)
+            if current.matches(SnapshotFingerprint.from_dict(stored["fingerprint"])):
+                return load_tensor_bundle(output_path, compact_ids=output.compact_ids)
+
+    keep_nodes = include_stats or feature_store is not None or bool(num_partitions)
+    if planner is not None:
+        plan = plan_export(
+            fetch_snapshot_counts(snapshot_id, snapshot_filter=snapshot_filter),
+            planner.memory_budget,
+            pipelined=pipelined,
+            num_partitions=num_partitions,
+            output_format=output_format,
+            include_edge_kinds=include_edge_kinds,
+            coalesce_edges=coalesce_edges,
+            include_stats=include_stats,
+            keep_nodes=keep_nodes,
+            compact_ids=output.compact_ids,
+            batch_size=batch_size,
+            allow_format_change=planner.allow_format_change,
+        )
+        logger.info("Export plan for snapshot %s: %s", snapshot_id, plan.describe())
+        pipelined = plan.strategy != IN_MEMORY
+        if plan.strategy == COMPRESSED:
+            logger.info("Writing %s in the compressed format to fit the memory budget.", output_path)
+            output_format = "compressed"
+
+    stream_writer: Optional[CompressedBundleWriter] = None
+    if pipelined:
+        if (
+            output_format == "compressed"
+            and not num_partitions
+            and not coalesce_edges
+            and feature_store is None
+        ):
+            # Nothing rewrites x or edge_index later, so chunks go to disk as they arrive.
+            stream_writer = CompressedBundleWriter(output_path)
+        try:
+            streamed = stream_snapshot_tensors(
+                snapshot_id,
+                batch_size=batch_size,
+                keep_nodes=keep_nodes,
+                writer=stream_writer,
+                write_edge_kinds=include_edge_kinds,
+                snapshot_filter=snapshot_filter,
+            )
+        except BaseException:
+            if stream_writer is not None:
+                stream_writer.abort()
+            raise
+        graph = None
+        node_to_idx = streamed.node_mapping
+        edge_index = streamed.edge_index
+        nodes = streamed.nodes
+        fingerprint = streamed.fingerprint
+        x = streamed.x
+        streamed_kinds = (streamed.edge_kind, streamed.edge_kinds)
+    else:
+        filter_options = asdict(snapshot_filter) if snapshot_filter is not None else {}
+        snapshot: SnapshotGraph = materialize_snapshot(snapshot_id=snapshot_id, **filter_options)
+        graph = snapshot.graph
+        node_to_idx = create_node_mapping(graph)
+        edge_index = create_edge_index(graph, node_to_idx)
+        nodes = snapshot.nodes
+        fingerprint = snapshot.fingerprint
+        x = None
+        streamed_kinds = None
 
-    node_to_idx = create_node_mapping(graph)
-    edge_index = create_edge_index(graph, node_to_idx)
-    x = create_feature_matrix_v1(snapshot.nodes, node_to_idx)
+    if feature_store is not None:
+        filter_key = snapshot_filter.digest() if snapshot_filter is not None else None
+        x = feature_store.assemble(snapshot_id, features, node_to_idx, nodes, filter_key=filter_key)
+    elif x is None:
+        x = create_feature_matrix_v1(nodes, node_to_idx)
 
     bundle: TensorBundle = {
         "x": x,
         "edge_index": edge_index,
         "node_mapping": node_to_idx,
     }
-    export_snapshot(bundle, output_path)
+    if fingerprint is not None:
+        bundle["fingerprint"] = fingerprint.to_dict()
+    bundle["export_options"] = options_digest
+    if include_edge_kinds or include_stats:
+        edge_kind, edge_kinds = streamed_kinds or create_edge_kind_index(graph)
+        if include_edge_kinds:
+            bundle["edge_kind"] = edge_kind
+            bundle["edge_kinds"] = edge_kinds
+        if include_stats:
+            bundle["stats"] = compute_graph_stats(
+                edge_index,
+                len(node_to_idx),
+                edge_kind=edge_kind,
+                edge_kinds=edge_kinds,
+                nodes=nodes,
+            )
+    if coalesce_edges:
+        edge_index, edge_count, edge_kind = coalesce_edge_index(
+            edge_index, len(node_to_idx), bundle.get("edge_kind")
+        )
+        bundle["edge_index"] = edge_index
+        bundle["edge_count"] = edge_count
+        bundle["edge_weight"] = edge_count.to(torch.float32)
+        if edge_kind is not None:
+            bundle["edge_kind"] = edge_kind
+    if output.compact_ids:
+        bundle["node_mapping"] = NodeIdIndex.from_mapping(node_to_idx)
+    if partitions is not None:
+        parts = create_partitions(
+            partitions.strategy,
+            partitions.num_parts,
+            node_to_idx,
+            edge_index,
+            nodes=nodes,
+        )
+        export_sharded_bundle(
+            bundle,
+            parts,
+            output_path,
+            partitions.num_parts,
+            num_hops=partitions.hops,
+            strategy=partitions.strategy,
+        )
+    elif stream_writer is not None:
+        extra = {name: bundle[name] for name in BUNDLE_METADATA_KEYS if name in bundle}
+        stream_writer.close(extra=extra or None)
+    elif output_format == "compressed":
+        write_compressed_bundle(bundle, output_path)
+    elif output_format == "pickle":
+        export_snapshot(bundle, output_path)
+    else:
+        raise ValueError(
+            f"output_format must be 'pickle' or 'compressed', got {output_format!r}"
+        )
     return bundle
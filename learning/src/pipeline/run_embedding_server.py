@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Serve node embeddings from resident bundles and models over localhost HTTP.
+
+Run:
+  python learning/src/pipeline/run_embedding_server.py --preload learning/data/<UUID>_bundle.pkl
+
+Requests (JSON bodies; "model" is optional and takes num_layers,
+hidden_channels, out_channels and seed):
+  POST /embed    {"bundle_path": ..., "node_ids": [...], "model": {...}}
+  POST /similar  {"bundle_path": ..., "node_id": ..., "k": 10, "model": {...}}
+  POST /stats    {"bundle_path": ...}   (omit bundle_path for service stats)
+"""
+import argparse
+import json
+import sys
+import time
+import traceback
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict
+
+SRC_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SRC_ROOT))
+
+from components.embedding_service import EmbeddingService, ModelSpec  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the warm embedding server.")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address.")
+    parser.add_argument("--port", type=int, default=8765, help="Bind port.")
+    parser.add_argument(
+        "--preload",
+        action="append",
+        default=[],
+        help="Bundle to load at startup (repeatable).",
+    )
+    parser.add_argument("--max-bundles", type=int, default=4, help="Resident bundle LRU size.")
+    parser.add_argument("--max-models", type=int, default=8, help="Resident model LRU size.")
+    parser.add_argument("--max-batch", type=int, default=64, help="Micro-batch size limit.")
+    parser.add_argument(
+        "--batch-wait-ms",
+        type=float,
+        default=5.0,
+        help="How long the first request in a batch waits for others.",
+    )
+    return parser.parse_args()
+
+
+def make_handler(service: EmbeddingService):
+    class EmbeddingRequestHandler(BaseHTTPRequestHandler):
+        def do_POST(self) -> None:
+            start = time.perf_counter()
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                body = self._dispatch(payload)
+            except (KeyError, FileNotFoundError) as exc:
+                self._send(404, {"error": str(exc)})
+                return
+            except (ValueError, TypeError) as exc:
+                self._send(400, {"error": str(exc)})
+                return
+            except Exception as exc:
+                # Anything else is a server fault; answer instead of dropping the connection.
+                traceback.print_exc()
+                self._send(500, {"error": f"Internal error: {exc}"})
+                return
+            body["latency_ms"] = 1000 * (time.perf_counter() - start)
+            self._send(200, body)
+
+        def _dispatch(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+            spec = ModelSpec(**payload.get("model", {}))
+            if self.path == "/embed":
+                embeddings = service.embed(
+                    payload["bundle_path"], payload["node_ids"], spec
+                )
+                return {"embeddings": embeddings}
+            if self.path == "/similar":
+                neighbours = service.similar(
+                    payload["bundle_path"], payload["node_id"], int(payload.get("k", 10)), spec
+                )
+                return {
+                    "neighbours": [
+                        {"node_id": node_id, "score": score} for node_id, score in neighbours
+                    ]
+                }
+            if self.path == "/stats":
+                return service.stats(payload.get("bundle_path"))
+            raise KeyError(f"Unknown endpoint {self.path}")
+
+        def _send(self, status: int, body: Dict[str, Any]) -> None:
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format: str, *args) -> None:
+            pass
+
+    return EmbeddingRequestHandler
+
+
+def main() -> int:
+    args = parse_args()
+    service = EmbeddingService(
+        max_bundles=args.max_bundles,
+        max_models=args.max_models,
+        max_batch=args.max_batch,
+        max_wait_s=args.batch_wait_ms / 1000,
+    )
+
+    for bundle_path in args.preload:
+        stats = service.stats(bundle_path)
+        print(
+            f"Loaded {bundle_path}: {stats['num_nodes']} nodes, "
+            f"{stats['num_edges']} edges in {stats['load_seconds'] * 1000:.1f} ms"
+        )
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service))
+    print(f"Serving embeddings on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        latency = service.stats()["latency"]
+        print(f"Latency (cold): {latency['cold']}")
+        print(f"Latency (warm): {latency['warm']}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """
-Materialize a snapshot graph and persist it as a pickle.
+Materialize a snapshot graph and persist it as a pickle, or stream it into
+columnar Parquet/Arrow files.
 
 Env setup (choose one):
   set -a; source learning/.env; set +a
@@ -8,16 +9,27 @@ Env setup (choose one):
 
 Run:
   python learning/src/pipeline/run_export.py --snapshot_id <UUID>
+  python learning/src/pipeline/run_export.py --snapshot_id <UUID> --format parquet
+  python learning/src/pipeline/run_export.py --snapshot_id <UUID> --memory_budget 4GiB
+  python learning/src/pipeline/run_export.py --snapshot_id <UUID> --edge_kinds CALL IMPORT
 """
 import argparse
+import logging
 import sys
 from pathlib import Path
 
 SRC_ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(SRC_ROOT))
 
+from components.columnar_export import (  # noqa: E402
+    DEFAULT_ROW_GROUP_SIZE,
+    FORMAT_SUFFIXES,
+    export_snapshot_columnar,
+)
 from components.exporter import export_snapshot  # noqa: E402
 from components.materializer import materialize_snapshot  # noqa: E402
+from components.memory_planner import parse_memory_size  # noqa: E402
+from components.thread_tuning import apply_tuned_config  # noqa: E402
 
 
 def parse_args() -> argparse.Namespace:
@@ -26,22 +38,89 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--output_path",
         default=None,
-        help="Path to write the pickled SnapshotGraph.",
+        help="Path to write the pickled SnapshotGraph (a directory for columnar formats).",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--format",
+        choices=["pickle", *sorted(FORMAT_SUFFIXES)],
+        default="pickle",
+        help="pickle: SnapshotGraph; parquet/arrow: nodes and edges files streamed from the DB.",
+    )
+    parser.add_argument(
+        "--row_group_size",
+        type=int,
+        default=DEFAULT_ROW_GROUP_SIZE,
+        help="Rows per Parquet row group or Arrow record batch.",
+    )
+    parser.add_argument(
+        "--memory_budget",
+        type=parse_memory_size,
+        default=None,
+        help="Memory limit of this worker, e.g. 4GiB. Rows are counted first and fetched in "
+        "batches when fetchall would not fit; the run stops before fetching if nothing fits. "
+        "Only the fetch mode changes: the whole graph is still built and pickled.",
+    )
+    parser.add_argument(
+        "--node_types",
+        nargs="+",
+        default=None,
+        help="Only load nodes of these types (and edges between them).",
+    )
+    parser.add_argument("--edge_kinds", nargs="+", default=None, help="Only load edges of these kinds.")
+    parser.add_argument(
+        "--file_path_prefixes",
+        nargs="+",
+        default=None,
+        help="Only load nodes whose filePath starts with one of these prefixes (and edges between them).",
+    )
+    parser.add_argument(
+        "--no_thread_tuning",
+        action="store_true",
+        help="Ignore the tuned thread config for this host.",
+    )
+    args = parser.parse_args()
+    if args.format != "pickle" and (args.node_types or args.edge_kinds or args.file_path_prefixes):
+        parser.error("--node_types, --edge_kinds and --file_path_prefixes require --format pickle")
+    return args
 
 
 def main() -> int:
     args = parse_args()
+    if not args.no_thread_tuning:
+        apply_tuned_config()
     learning_root = Path(__file__).resolve().parents[2]
 
+    if args.format != "pickle":
+        output_dir = (
+            Path(args.output_path)
+            if args.output_path
+            else (learning_root / "data" / f"{args.snapshot_id}_{args.format}")
+        )
+        result = export_snapshot_columnar(
+            args.snapshot_id,
+            output_dir,
+            output_format=args.format,
+            row_group_size=args.row_group_size,
+        )
+        print(f"Streamed {result.num_nodes} nodes and {result.num_edges} edges.")
+        print(f"Wrote {result.nodes_path} and {result.edges_path}")
+        return 0
+
     output_path = (
         Path(args.output_path)
         if args.output_path
         else (learning_root / "data" / f"{args.snapshot_id}.pkl")
     )
 
-    snapshot = materialize_snapshot(snapshot_id=args.snapshot_id)
+    if args.memory_budget is not None:
+        logging.basicConfig(level=logging.INFO, format="%(message)s")
+    snapshot = materialize_snapshot(
+        snapshot_id=args.snapshot_id,
+        memory_budget=args.memory_budget,
+        node_types=args.node_types,
+        edge_kinds=args.edge_kinds,
+        file_path_prefixes=args.file_path_prefixes,
+    )
     export_snapshot(snapshot, output_path)
 
     print(
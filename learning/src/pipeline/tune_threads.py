@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark CPU thread counts and chunk sizes on a bundle and store the fastest
+configuration for this host. The demo and export entry points apply it on start.
+
+Run:
+  python learning/src/pipeline/tune_threads.py
+  python learning/src/pipeline/tune_threads.py --bundle-path data/snapshot_bundle.pkl --threads 1 2 4
+"""
+import argparse
+import sys
+from pathlib import Path
+
+SRC_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SRC_ROOT))
+
+from components.bundle_io import load_tensor_bundle  # noqa: E402
+from components.gnn_model import create_gnn_model  # noqa: E402
+from components.thread_tuning import (  # noqa: E402
+    autotune,
+    host_key,
+    save_tuned_config,
+    tuning_path,
+)
+
+LEARNING_ROOT = SRC_ROOT.parent
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Autotune CPU threads for inference and t-SNE.")
+    parser.add_argument(
+        "--bundle-path",
+        default=None,
+        help="Bundle to tune on (default: first *_bundle.pkl in learning/data/).",
+    )
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="Tuning file (default: $STRUCTURA_THREAD_TUNING or ~/.cache/structura/thread_tuning.json).",
+    )
+    parser.add_argument("--num-layers", type=int, default=2, choices=[1, 2, 3])
+    parser.add_argument(
+        "--threads",
+        type=int,
+        nargs="+",
+        default=None,
+        help="Thread counts to try (default: powers of two up to the CPU budget).",
+    )
+    parser.add_argument(
+        "--chunk-sizes",
+        type=int,
+        nargs="+",
+        default=[0, 65536, 16384],
+        help="Nodes per in-process partition to try; 0 means the full graph.",
+    )
+    parser.add_argument(
+        "--cpus",
+        type=int,
+        nargs="+",
+        default=None,
+        help="Pin to these CPU ids (default: current affinity).",
+    )
+    parser.add_argument("--tsne-sample", type=int, default=2000)
+    parser.add_argument("--repeats", type=int, default=2, help="Timed repetitions.")
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Print results without saving them."
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    if args.bundle_path:
+        bundle_path = Path(args.bundle_path)
+    else:
+        candidates = sorted((LEARNING_ROOT / "data").glob("*_bundle.pkl"))
+        if not candidates:
+            print("No bundle found in learning/data/; pass --bundle-path.", file=sys.stderr)
+            return 1
+        bundle_path = candidates[0]
+
+    bundle = load_tensor_bundle(bundle_path)
+    x, edge_index = bundle["x"], bundle["edge_index"]
+    print(f"Bundle: {bundle_path}")
+    print(f"  Nodes: {x.shape[0]}, Edges: {edge_index.shape[1]}, Host: {host_key()}")
+
+    result = autotune(
+        x,
+        edge_index,
+        model=create_gnn_model(in_channels=x.shape[1], num_layers=args.num_layers),
+        thread_candidates=args.threads,
+        chunk_candidates=[size or None for size in args.chunk_sizes],
+        tsne_sample=args.tsne_sample,
+        repeats=args.repeats,
+        cpus=args.cpus,
+    )
+
+    print("Embeddings:")
+    for label, seconds in result["embedding_timings"].items():
+        print(f"  {label:>28}: {seconds * 1000:9.2f} ms")
+    print("t-SNE:")
+    for label, seconds in result["tsne_timings"].items():
+        print(f"  {label:>28}: {seconds * 1000:9.2f} ms")
+
+    config = result["config"]
+    print(f"Best: {config}")
+    if args.dry_run:
+        return 0
+
+    details = {key: value for key, value in result.items() if key != "config"}
+    details["bundle_path"] = str(bundle_path)
+    path = save_tuned_config(config, tuning_path(args.output), details=details)
+    print(f"Wrote tuning for {host_key()} to {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,192 @@
+import asyncio
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import networkx as nx
+import pytest
+
+LEARNING_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = LEARNING_ROOT / "src"
+sys.path.insert(0, str(SRC_ROOT))
+
+import components.materializer as materializer  # noqa: E402
+from components.async_materializer import (  # noqa: E402
+    AsyncMaterializer,
+    materialize_snapshot_async,
+)
+
+
+def make_cursor(rows, batch_size):
+    cursor = MagicMock()
+    cursor.__enter__.return_value = cursor
+    cursor.__exit__.return_value = False
+    cursor.fetchall.return_value = rows
+    batches = [rows[i : i + batch_size] for i in range(0, len(rows), batch_size)]
+    cursor.fetchmany.side_effect = batches + [[]]
+    return cursor
+
+
+def make_connection(node_rows, edge_rows, batch_size=1):
+    conn = MagicMock()
+    conn.closed = 0
+    conn.cursor.side_effect = [
+        make_cursor(node_rows, batch_size),
+        make_cursor(edge_rows, batch_size),
+    ]
+    return conn
+
+
+def sample_rows(snapshot_id):
+    created_at = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    node_rows = [
+        {
+            "id": node_id,
+            "type": "Identifier",
+            "originalType": "Identifier",
+            "filePath": f"{node_id}.js",
+            "data": {"b": 2, "a": 1},
+            "location": None,
+            "snapshotId": snapshot_id,
+            "createdAt": created_at,
+            "updatedAt": created_at,
+        }
+        for node_id in ["a", "b", "c"]
+    ]
+    edge_rows = [
+        {
+            "id": f"e{i}",
+            "fromId": src,
+            "toId": dst,
+            "kind": kind,
+            "filePath": f"{src}.js",
+            "snapshotId": snapshot_id,
+            "version": 1,
+            "createdAt": created_at,
+        }
+        for i, (src, dst, kind) in enumerate(
+            [("a", "b", "CALL"), ("a", "b", "CALL"), ("b", "c", "IMPORT")]
+        )
+    ]
+    return node_rows, edge_rows
+
+
+def test_matches_sync_materializer(monkeypatch):
+    """The async path should produce the same records and graph as the sync path."""
+    node_rows, edge_rows = sample_rows("snap")
+    monkeypatch.setattr(
+        materializer, "_connect", lambda dsn=None: make_connection(node_rows, edge_rows)
+    )
+
+    expected = materializer.materialize_snapshot("snap")
+    snapshot = asyncio.run(materialize_snapshot_async("snap", batch_size=2))
+
+    assert snapshot.nodes == expected.nodes
+    assert snapshot.edges == expected.edges
+    assert nx.utils.graphs_equal(snapshot.graph, expected.graph)
+    assert nx.is_frozen(snapshot.graph)
+
+
+def test_filters_are_pushed_into_sql(monkeypatch):
+    """Filter options should reach the queries as they do on the sync path."""
+    node_rows, edge_rows = sample_rows("snap")
+    node_cursor = make_cursor(node_rows, 1)
+    edge_cursor = make_cursor(edge_rows[:2], 1)
+    conn = MagicMock()
+    conn.closed = 0
+    conn.cursor.side_effect = [node_cursor, edge_cursor]
+    monkeypatch.setattr(materializer, "_connect", lambda dsn=None: conn)
+
+    snapshot = asyncio.run(
+        materialize_snapshot_async(
+            "snap", node_types=["Identifier"], edge_kinds=["CALL"], file_path_prefixes=["a"]
+        )
+    )
+
+    node_params = node_cursor.execute.call_args[0][1]
+    edge_params = edge_cursor.execute.call_args[0][1]
+    node_filter = [["Identifier"], ["a%"]]
+    assert node_params == ("snap", *node_filter)
+    assert edge_params == ("snap", ["CALL"], "snap", *node_filter, "snap", *node_filter)
+    assert [edge.kind for edge in snapshot.edges] == ["CALL", "CALL"]
+
+
+def test_stream_batches(monkeypatch):
+    """Nodes should be yielded in batch_size chunks."""
+    node_rows, edge_rows = sample_rows("snap")
+    conn = make_connection(node_rows, edge_rows, batch_size=2)
+    monkeypatch.setattr(materializer, "_connect", lambda dsn=None: conn)
+
+    async def collect():
+        async with AsyncMaterializer(batch_size=2) as loader:
+            return [batch async for batch in loader.stream_nodes("snap")]
+
+    batches = asyncio.run(collect())
+
+    assert [[node.id for node in batch] for batch in batches] == [["a", "b"], ["c"]]
+
+
+def test_connections_are_bounded_and_reused(monkeypatch):
+    """Concurrent materializations should share at most max_connections connections."""
+    node_rows, edge_rows = sample_rows("snap")
+    created = []
+
+    def connect(dsn=None):
+        conn = MagicMock()
+        conn.closed = 0
+        # Each lease opens a node and an edge cursor.
+        conn.cursor.side_effect = lambda *args, **kwargs: make_cursor(
+            node_rows if conn.cursor.call_count % 2 else edge_rows, 2
+        )
+        created.append(conn)
+        return conn
+
+    monkeypatch.setattr(materializer, "_connect", connect)
+
+    async def run_all():
+        async with AsyncMaterializer(max_connections=2) as loader:
+            return await asyncio.gather(
+                *(loader.materialize(f"snap-{i}") for i in range(6))
+            )
+
+    snapshots = asyncio.run(run_all())
+
+    assert len(snapshots) == 6
+    assert all(len(snapshot.nodes) == 3 for snapshot in snapshots)
+    assert 1 <= len(created) <= 2
+    for conn in created:
+        conn.close.assert_called()
+
+
+def test_timeout_cancels_query(monkeypatch):
+    """A timeout should cancel the running query and discard the connection."""
+    release = threading.Event()
+    conn = MagicMock()
+    conn.closed = 0
+    cursor = MagicMock()
+
+    def slow_fetch(size):
+        release.wait(5)
+        return []
+
+    cursor.fetchmany.side_effect = slow_fetch
+    conn.cursor.return_value = cursor
+    conn.cancel.side_effect = lambda: release.set()
+    monkeypatch.setattr(materializer, "_connect", lambda dsn=None: conn)
+
+    start = time.monotonic()
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(materialize_snapshot_async("snap", timeout=0.1))
+
+    assert time.monotonic() - start < 5
+    conn.cancel.assert_called_once()
+    conn.rollback.assert_not_called()
+
+
+def test_missing_snapshot_id_rejected():
+    """Async materialization should require a snapshot id like the sync path."""
+    with pytest.raises(ValueError):
+        asyncio.run(materialize_snapshot_async(None))
@@ -0,0 +1,118 @@
+import pickle
+import sys
+from pathlib import Path
+
+import torch
+
+LEARNING_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = LEARNING_ROOT / "src"
+sys.path.insert(0, str(SRC_ROOT))
+
+from components.bundle_io import write_compressed_bundle  # noqa: E402
+from components.exporter import coalesce_edge_index  # noqa: E402
+from pipeline.audit_bundle import (  # noqa: E402
+    audit_bundle,
+    audit_directory,
+    format_summary,
+)
+
+
+def make_bundle(num_nodes=10):
+    """One-hot bundle with one orphan, one self-loop and one duplicate edge."""
+    x = torch.zeros((num_nodes, 6), dtype=torch.float32)
+    x[torch.arange(num_nodes), torch.arange(num_nodes) % 6] = 1.0
+    edge_index = torch.tensor(
+        [[0, 1, 2, 3, 4, 5, 6, 7, 1, 8], [1, 2, 3, 4, 5, 6, 7, 7, 2, 0]],
+        dtype=torch.long,
+    )
+    node_mapping = {f"node_{i}": i for i in range(num_nodes)}
+    return {"x": x, "edge_index": edge_index, "node_mapping": node_mapping}
+
+
+def write_pickle(bundle, path):
+    with open(path, "wb") as handle:
+        pickle.dump(bundle, handle)
+    return path
+
+
+def test_pickle_audit_reports_edge_checks(tmp_path):
+    """Edge checks should count orphans, self-loops and duplicates."""
+    path = write_pickle(make_bundle(), tmp_path / "a.pkl")
+
+    audit = audit_bundle(path, chunk_size=3)
+
+    assert audit.passed
+    assert audit.num_nodes == 10
+    assert audit.num_edges == 10
+    assert audit.orphans == 1
+    assert audit.self_loops == 1
+    assert audit.duplicate_edges == 1
+    assert sum(audit.bucket_counts) == 10
+
+
+def test_compressed_audit_matches_pickle(tmp_path):
+    """Streaming a compressed bundle should give the same results as the pickle."""
+    bundle = make_bundle()
+    pickled = audit_bundle(write_pickle(bundle, tmp_path / "a.pkl"), chunk_size=4)
+    path = write_compressed_bundle(bundle, tmp_path / "a.bundle", chunk_size=4)
+
+    streamed = audit_bundle(path)
+
+    assert streamed.format == "compressed"
+    for name in ("num_nodes", "num_edges", "orphans", "self_loops", "duplicate_edges"):
+        assert getattr(streamed, name) == getattr(pickled, name)
+    assert streamed.bucket_counts == pickled.bucket_counts
+
+
+def test_compressed_audit_reports_the_written_edge_dtype(tmp_path):
+    """An int32 edge_index should fail the audit after compression as it does in a pickle."""
+    bundle = make_bundle()
+    bundle["edge_index"] = bundle["edge_index"].to(torch.int32)
+    path = write_compressed_bundle(bundle, tmp_path / "a.bundle", chunk_size=4)
+
+    audit = audit_bundle(path)
+
+    assert audit.edge_dtype == "int32"
+    assert not audit.passed
+
+
+def test_sorted_edges_count_duplicates_across_chunks(tmp_path):
+    """Duplicates split across chunk boundaries should still be counted."""
+    bundle = make_bundle()
+    edge_index = bundle["edge_index"]
+    coalesced, edge_count, _ = coalesce_edge_index(edge_index, 10)
+    bundle["edge_index"] = torch.repeat_interleave(coalesced, edge_count, dim=1)
+
+    audit = audit_bundle(write_pickle(bundle, tmp_path / "a.pkl"), chunk_size=2)
+
+    assert audit.duplicate_edges == 1
+
+
+def test_invalid_bundle_fails(tmp_path):
+    """Bad rows, out-of-range edges and int32 indices should be reported."""
+    bundle = make_bundle()
+    bundle["x"][0] = 0.0
+    bundle["edge_index"] = torch.tensor([[0, 12], [1, 2]], dtype=torch.int32)
+
+    audit = audit_bundle(write_pickle(bundle, tmp_path / "a.pkl"))
+
+    assert not audit.passed
+    assert any("rows do not sum to 1" in error for error in audit.errors)
+    assert any("outside" in error for error in audit.errors)
+    assert any("int32" in error for error in audit.errors)
+
+
+def test_directory_audit_summary(tmp_path):
+    """Every bundle in a directory should get a row in the summary."""
+    write_pickle(make_bundle(), tmp_path / "good.pkl")
+    bad = make_bundle()
+    bad["x"] = bad["x"][:, :5]
+    write_pickle(bad, tmp_path / "bad.pkl")
+    (tmp_path / "notes.txt").write_text("not a bundle")
+
+    audits = audit_directory(tmp_path, workers=2)
+    summary = format_summary(audits)
+
+    assert [Path(audit.path).name for audit in audits] == ["bad.pkl", "good.pkl"]
+    assert [audit.passed for audit in audits] == [False, True]
+    assert "good.pkl" in summary and "FAIL" in summary
@@ -0,0 +1,159 @@
+import pickle
+import sys
+from pathlib import Path
+
+import pytest
+import torch
+
+LEARNING_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = LEARNING_ROOT / "src"
+sys.path.insert(0, str(SRC_ROOT))
+
+from components.bundle_io import (  # noqa: E402
+    CompressedBundleReader,
+    CompressedBundleWriter,
+    is_compressed_bundle,
+    load_tensor_bundle,
+    read_compressed_bundle,
+    write_compressed_bundle,
+)
+from components.exporter import export_snapshot  # noqa: E402
+
+
+def make_bundle(num_nodes=50, num_edges=200, sort_edges=True):
+    """Create a bundle resembling exporter output."""
+    torch.manual_seed(0)
+    x = torch.zeros((num_nodes, 6), dtype=torch.float32)
+    x[torch.arange(num_nodes), torch.randint(0, 6, (num_nodes,))] = 1.0
+    edge_index = torch.randint(0, num_nodes, (2, num_edges))
+    if sort_edges:
+        order = torch.argsort(edge_index[0] * num_nodes + edge_index[1])
+        edge_index = edge_index[:, order]
+    node_mapping = {f"node_{i:04d}": i for i in range(num_nodes)}
+    return {"x": x, "edge_index": edge_index, "node_mapping": node_mapping}
+
+
+@pytest.mark.parametrize("codec", ["zlib", None])
+@pytest.mark.parametrize("sort_edges", [True, False])
+def test_round_trip(tmp_path, codec, sort_edges):
+    """Compressed bundles should reload with identical tensors and mapping."""
+    bundle = make_bundle(sort_edges=sort_edges)
+    path = tmp_path / "bundle.sbz"
+
+    write_compressed_bundle(bundle, path, chunk_size=16, codec=codec)
+    loaded = read_compressed_bundle(path)
+
+    assert torch.equal(loaded["x"], bundle["x"])
+    assert torch.equal(loaded["edge_index"], bundle["edge_index"])
+    assert loaded["edge_index"].dtype == torch.long
+    assert loaded["node_mapping"] == bundle["node_mapping"]
+
+
+def test_edge_dtype_round_trip(tmp_path):
+    """edge_index should reload with the dtype it was written with."""
+    bundle = make_bundle()
+    bundle["edge_index"] = bundle["edge_index"].to(torch.int32)
+    path = tmp_path / "bundle.sbz"
+
+    write_compressed_bundle(bundle, path, chunk_size=16)
+
+    with CompressedBundleReader(path) as reader:
+        assert reader.edge_dtype == "int32"
+        assert reader.read()["edge_index"].dtype == torch.int32
+
+
+def test_sorted_edges_flagged(tmp_path):
+    """Sorted edge lists across chunks should be recorded in the metadata."""
+    path = tmp_path / "bundle.sbz"
+    write_compressed_bundle(make_bundle(sort_edges=True), path, chunk_size=16)
+
+    with CompressedBundleReader(path) as reader:
+        assert reader.meta["edges_sorted"] is True
+        assert reader.num_nodes == 50
+        assert reader.num_edges == 200
+
+
+def test_streaming_chunks(tmp_path):
+    """Chunks written incrementally should be readable incrementally."""
+    path = tmp_path / "bundle.sbz"
+    with CompressedBundleWriter(path, codec="zlib") as writer:
+        writer.write_x(torch.ones((3, 6)))
+        writer.write_edges(torch.tensor([[0, 1], [1, 2]]))
+        writer.write_x(torch.zeros((2, 6)))
+        writer.write_edges(torch.tensor([[4], [0]]))
+        writer.write_node_ids(["a", "b", "c"])
+        writer.write_node_ids(["d", "e"])
+
+    with CompressedBundleReader(path) as reader:
+        x_chunks = list(reader.iter_x_chunks())
+        edge_chunks = list(reader.iter_edge_chunks())
+        id_chunks = list(reader.iter_node_id_chunks())
+
+    assert [chunk.shape[0] for chunk in x_chunks] == [3, 2]
+    assert torch.equal(torch.cat(edge_chunks, dim=1), torch.tensor([[0, 1, 4], [1, 2, 0]]))
+    assert id_chunks == [["a", "b", "c"], ["d", "e"]]
+
+
+def test_smaller_than_pickle(tmp_path):
+    """Compressed output should be smaller than the pickle for one-hot features."""
+    bundle = make_bundle(num_nodes=2000, num_edges=8000)
+    pickle_path = export_snapshot(bundle, tmp_path / "bundle.pkl")
+    compressed_path = write_compressed_bundle(bundle, tmp_path / "bundle.sbz")
+
+    assert compressed_path.stat().st_size < pickle_path.stat().st_size
+
+
+def test_load_tensor_bundle_detects_format(tmp_path):
+    """load_tensor_bundle should read both pickles and compressed bundles."""
+    bundle = make_bundle()
+    pickle_path = tmp_path / "bundle.pkl"
+    with open(pickle_path, "wb") as handle:
+        pickle.dump(bundle, handle)
+    compressed_path = write_compressed_bundle(bundle, tmp_path / "bundle.sbz")
+
+    assert not is_compressed_bundle(pickle_path)
+    assert is_compressed_bundle(compressed_path)
+    from_pickle = load_tensor_bundle(pickle_path)
+    from_compressed = load_tensor_bundle(compressed_path)
+    assert torch.equal(from_pickle["edge_index"], from_compressed["edge_index"])
+
+
+def test_mismatched_node_ids_rejected(tmp_path):
+    """Writing fewer node ids than feature rows should fail on close."""
+    writer = CompressedBundleWriter(tmp_path / "bundle.sbz", codec="zlib")
+    writer.write_x(torch.ones((2, 6)))
+    writer.write_node_ids(["only-one"])
+
+    with pytest.raises(ValueError):
+        writer.close()
+    writer.abort()
+
+
+def test_failed_write_removes_file(tmp_path):
+    """Exceptions inside the writer context should not leave partial files."""
+    path = tmp_path / "bundle.sbz"
+    with pytest.raises(RuntimeError):
+        with CompressedBundleWriter(path, codec="zlib") as writer:
+            writer.write_x(torch.ones((2, 6)))
+            raise RuntimeError("boom")
+
+    assert not path.exists()
+
+
+def test_edge_attributes_round_trip(tmp_path):
+    """Optional per-edge tensors and the kind vocabulary should survive a round trip."""
+    bundle = make_bundle()
+    num_edges = bundle["edge_index"].shape[1]
+    bundle["edge_count"] = torch.randint(1, 5, (num_edges,))
+    bundle["edge_weight"] = bundle["edge_count"].to(torch.float32)
+    bundle["edge_kind"] = torch.randint(0, 3, (num_edges,))
+    bundle["edge_kinds"] = ["ASSIGNMENT", "CALL", "IMPORT"]
+    path = tmp_path / "bundle.sbz"
+
+    write_compressed_bundle(bundle, path, chunk_size=32, codec="zlib")
+    loaded = read_compressed_bundle(path)
+
+    for name in ("edge_count", "edge_weight", "edge_kind"):
+        assert loaded[name].dtype == bundle[name].dtype
+        assert torch.equal(loaded[name], bundle[name])
+    assert loaded["edge_kinds"] == bundle["edge_kinds"]
@@ -0,0 +1,194 @@
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import numpy as np  # noqa: E402
+import torch  # noqa: E402
+
+LEARNING_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = LEARNING_ROOT / "src"
+sys.path.insert(0, str(SRC_ROOT))
+
+from components import coarsening  # noqa: E402
+from components.coarsening import (  # noqa: E402
+    NodeHierarchy,
+    coarsen,
+    fetch_node_hierarchy,
+    groups_by_file,
+    groups_by_function,
+    groups_by_kmeans,
+    visualize_coarse_graph,
+)
+
+
+def make_hierarchy():
+    """
+    Two files: a.py holds function f (with a nested function g) and a
+    module-level import; b.py holds function h.
+    """
+    nodes = [
+        # id, kind, parent, file
+        ("a_mod", "Module", None, "a.py"),
+        ("a_imp", "Import", "a_mod", "a.py"),
+        ("f", "Function", "a_mod", "a.py"),
+        ("f_ret", "Return", "f", "a.py"),
+        ("g", "Function", "f", "a.py"),
+        ("g_call", "Call", "g", "a.py"),
+        ("g_arg", "Name", "g_call", "a.py"),
+        ("b_mod", "Module", None, "b.py"),
+        ("h", "Function", "b_mod", "b.py"),
+        ("h_call", "Call", "h", "b.py"),
+    ]
+    hierarchy = NodeHierarchy()
+    for node_id, kind, parent, path in nodes:
+        hierarchy.kind[node_id] = kind
+        hierarchy.parent[node_id] = parent
+        hierarchy.file_path[node_id] = path
+    node_to_idx = {node_id: row for row, (node_id, *_) in enumerate(nodes)}
+    return node_to_idx, hierarchy
+
+
+def group_names(node_to_idx, groups):
+    assignment, names = groups
+    return {node_id: names[int(assignment[row])] for node_id, row in node_to_idx.items()}
+
+
+def test_coarsen_mean_pools_and_counts_members():
+    embeddings = torch.tensor([[0.0, 0.0], [2.0, 4.0], [1.0, 1.0], [3.0, 3.0]])
+    # Group 1 is unused and should be dropped with its name.
+    assignment = torch.tensor([0, 0, 2, 2])
+
+    coarse = coarsen(embeddings, assignment, names=["x", "unused", "y"])
+
+    assert coarse.names == ["x", "y"]
+    assert coarse.sizes.tolist() == [2, 2]
+    assert torch.allclose(coarse.embeddings, torch.tensor([[1.0, 2.0], [2.0, 2.0]]))
+    assert coarse.members(1).tolist() == [2, 3]
+    assert coarse.cluster_of("y") == 1
+
+
+def test_coarsen_builds_weighted_super_edges():
+    embeddings = torch.randn(5, 3)
+    assignment = torch.tensor([0, 0, 1, 1, 2])
+    edge_index = torch.tensor([[0, 1, 0, 2, 3, 4], [2, 3, 1, 4, 4, 0]])
+
+    coarse = coarsen(embeddings, assignment, edge_index=edge_index)
+
+    edges = dict(zip(map(tuple, coarse.edge_index.t().tolist()), coarse.edge_weight.tolist()))
+    # The 0 -> 1 edge stays inside cluster 0 and is dropped.
+    assert edges == {(0, 1): 2.0, (1, 2): 2.0, (2, 0): 1.0}
+
+
+def test_groups_by_file():
+    node_to_idx, hierarchy = make_hierarchy()
+
+    names = group_names(node_to_idx, groups_by_file(node_to_idx, hierarchy))
+
+    assert {node_id for node_id, name in names.items() if name == "b.py"} == {
+        "b_mod",
+        "h",
+        "h_call",
+    }
+
+
+def test_groups_by_function_uses_innermost_function():
+    node_to_idx, hierarchy = make_hierarchy()
+
+    names = group_names(node_to_idx, groups_by_function(node_to_idx, hierarchy))
+
+    assert names["f"] == names["f_ret"] == "a.py#f"
+    assert names["g"] == names["g_call"] == names["g_arg"] == "a.py#g"
+    assert names["h_call"] == "b.py#h"
+    # Module-level nodes fall back to their file.
+    assert names["a_imp"] == names["a_mod"] == "a.py"
+    assert names["b_mod"] == "b.py"
+
+
+def test_groups_by_function_ignores_parent_cycles():
+    node_to_idx, hierarchy = make_hierarchy()
+    hierarchy.parent["a_mod"] = "a_imp"
+
+    names = group_names(node_to_idx, groups_by_function(node_to_idx, hierarchy))
+
+    assert names["a_imp"] == names["a_mod"] == "a.py"
+    assert names["g_arg"] == "a.py#g"
+
+
+def test_kmeans_groups_and_drill_down():
+    generator = torch.Generator().manual_seed(0)
+    centers = torch.tensor([[0.0, 0.0], [10.0, 10.0], [-10.0, 10.0]])
+    embeddings = centers.repeat_interleave(20, dim=0) + torch.randn(60, 2, generator=generator)
+
+    coarse = coarsen(embeddings, *groups_by_kmeans(embeddings, 3))
+
+    assert coarse.num_clusters == 3
+    assert sorted(coarse.sizes.tolist()) == [20, 20, 20]
+    cluster = int(coarse.assignment[0])
+    detail = coarse.drill_down(cluster, embeddings)
+    assert detail.num_clusters == 20
+    assert detail.nodes.tolist() == list(range(20))
+    assert torch.equal(detail.embeddings, embeddings[:20])
+
+
+def test_drill_down_into_finer_groups():
+    node_to_idx, hierarchy = make_hierarchy()
+    embeddings = torch.randn(len(node_to_idx), 4)
+    edge_index = torch.tensor([[2, 4, 1, 8], [4, 5, 9, 9]])
+    files = coarsen(embeddings, *groups_by_file(node_to_idx, hierarchy), edge_index=edge_index)
+
+    functions = files.drill_down(
+        files.cluster_of("a.py"),
+        embeddings,
+        groups=groups_by_function(node_to_idx, hierarchy),
+        edge_index=edge_index,
+    )
+
+    assert functions.names == ["a.py", "a.py#f", "a.py#g"]
+    assert functions.sizes.tolist() == [2, 2, 3]
+    # Only edges between functions of a.py survive.
+    assert functions.edge_index.tolist() == [[1], [2]]
+
+
+def test_pool_labels_takes_majority():
+    coarse = coarsen(torch.randn(5, 2), torch.tensor([0, 0, 0, 1, 1]))
+
+    assert coarse.pool_labels(np.array([2, 1, 2, 0, 0])).tolist() == [2, 0]
+
+
+def test_fetch_node_hierarchy(monkeypatch):
+    rows = [
+        {"id": "n1", "type": "Function", "parentId": None, "filePath": "a.py"},
+        {"id": "n2", "type": "Call", "parentId": "n1", "filePath": "a.py"},
+    ]
+    cursor = MagicMock()
+    cursor.__enter__.return_value = cursor
+    cursor.__exit__.return_value = False
+    cursor.fetchall.return_value = rows
+    conn = MagicMock()
+    conn.cursor.return_value = cursor
+    monkeypatch.setattr(coarsening, "_connect", lambda dsn=None: conn)
+
+    hierarchy = fetch_node_hierarchy("snap-1")
+
+    assert hierarchy.parent == {"n1": None, "n2": "n1"}
+    assert hierarchy.kind["n1"] == "Function"
+    assert hierarchy.file_path["n2"] == "a.py"
+    assert cursor.execute.call_args[0][1] == ("snap-1",)
+    conn.close.assert_called_once()
+
+
+def test_visualize_coarse_graph_saves_plot(tmp_path):
+    embeddings = torch.randn(40, 8, generator=torch.Generator().manual_seed(0))
+    coarse = coarsen(embeddings, torch.arange(40) % 8)
+    save_path = tmp_path / "coarse.png"
+
+    projection, _ = visualize_coarse_graph(
+        coarse, labels=np.arange(40) % 3, save_path=save_path, n_iter=250
+    )
+
+    assert projection.shape == (8, 2)
+    assert save_path.exists()
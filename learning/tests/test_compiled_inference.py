@@ -0,0 +1,110 @@
+import sys
+from pathlib import Path
+
+import pytest
+import torch
+
+LEARNING_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = LEARNING_ROOT / "src"
+sys.path.insert(0, str(SRC_ROOT))
+
+from components.compiled_inference import (  # noqa: E402
+    compile_for_inference,
+    load_compiled,
+    model_fingerprint,
+    to_static_sage,
+)
+from components.exporter import coalesce_edge_index  # noqa: E402
+from components.gnn_model import create_gnn_model, generate_embeddings  # noqa: E402
+from components.parallel_embeddings import (  # noqa: E402
+    generate_embeddings_parallel,
+    infer_num_hops,
+)
+
+
+def make_graph(num_nodes=40, num_edges=160, seed=0):
+    """Create a random one-hot feature matrix and edge index."""
+    generator = torch.Generator().manual_seed(seed)
+    x = torch.zeros((num_nodes, 6), dtype=torch.float32)
+    x[torch.arange(num_nodes), torch.randint(0, 6, (num_nodes,), generator=generator)] = 1.0
+    edge_index = torch.randint(0, num_nodes, (2, num_edges), generator=generator)
+    return x, edge_index
+
+
+@pytest.mark.parametrize("num_layers", [1, 2, 3])
+def test_static_replica_matches_eager(num_layers):
+    """The plain-torch replica should reproduce the eager model."""
+    x, edge_index = make_graph()
+    model = create_gnn_model(num_layers=num_layers, hidden_channels=16)
+
+    expected = generate_embeddings(model, x, edge_index)
+    actual = generate_embeddings(to_static_sage(model), x, edge_index)
+
+    assert torch.allclose(actual, expected, atol=1e-5)
+
+
+@pytest.mark.parametrize("num_layers", [1, 2, 3])
+def test_torchscript_matches_eager(num_layers):
+    """Scripted modules should match eager outputs, with and without edge weights."""
+    x, edge_index = make_graph()
+    model = create_gnn_model(num_layers=num_layers, hidden_channels=16)
+    scripted = create_gnn_model(
+        num_layers=num_layers, hidden_channels=16, compile_backend="torchscript"
+    )
+
+    assert torch.allclose(
+        generate_embeddings(scripted, x, edge_index),
+        generate_embeddings(model, x, edge_index),
+        atol=1e-5,
+    )
+    coalesced, edge_count, _ = coalesce_edge_index(edge_index, x.shape[0])
+    weight = edge_count.to(torch.float32)
+    assert torch.allclose(
+        generate_embeddings(scripted, x, coalesced, weight),
+        generate_embeddings(model, x, coalesced, weight),
+        atol=1e-5,
+    )
+
+
+def test_torchscript_cache_round_trip(tmp_path):
+    """Compiled artifacts should be written once and reloaded from the cache."""
+    x, edge_index = make_graph()
+    model = create_gnn_model(num_layers=2, hidden_channels=16)
+
+    first = compile_for_inference(model, "torchscript", cache_dir=tmp_path)
+    cached = list(tmp_path.glob("sage-*.pt"))
+    second = compile_for_inference(model, "torchscript", cache_dir=tmp_path)
+
+    assert [path.name for path in cached] == [f"sage-{model_fingerprint(model)}.pt"]
+    assert torch.equal(
+        generate_embeddings(first, x, edge_index),
+        generate_embeddings(second, x, edge_index),
+    )
+    assert load_compiled(cached[0]).num_hops == 2
+
+
+def test_fingerprint_tracks_weights():
+    """Different weights should produce different cache keys."""
+    assert model_fingerprint(create_gnn_model(seed=1)) != model_fingerprint(
+        create_gnn_model(seed=2)
+    )
+
+
+def test_compiled_model_in_parallel_embeddings():
+    """Partitioned inference should infer depth from compiled modules."""
+    x, edge_index = make_graph()
+    model = create_gnn_model(num_layers=2, hidden_channels=16)
+    scripted = create_gnn_model(num_layers=2, hidden_channels=16, compile_backend="torchscript")
+
+    embeddings = generate_embeddings_parallel(
+        scripted, x, edge_index, num_partitions=3, num_workers=1
+    )
+
+    assert infer_num_hops(scripted) == 2
+    assert torch.allclose(embeddings, generate_embeddings(model, x, edge_index), atol=1e-5)
+
+
+def test_unknown_backend_rejected():
+    """Unsupported backends should raise ValueError."""
+    with pytest.raises(ValueError):
+        create_gnn_model(compile_backend="tensorrt")
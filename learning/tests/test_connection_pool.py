@@ -0,0 +1,164 @@
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import psycopg2
+import pytest
+
+LEARNING_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = LEARNING_ROOT / "src"
+sys.path.insert(0, str(SRC_ROOT))
+
+import components.materializer as materializer  # noqa: E402
+from components.connection_pool import ConnectionPool, PoolTimeout  # noqa: E402
+
+
+def make_factory():
+    created = []
+
+    def connect():
+        conn = MagicMock()
+        conn.closed = 0
+        created.append(conn)
+        return conn
+
+    return connect, created
+
+
+def test_connections_are_reused():
+    """Sequential leases should reuse one connection and report the reuse ratio."""
+    connect, created = make_factory()
+    pool = ConnectionPool(min_size=0, max_size=2, connect=connect)
+
+    for _ in range(4):
+        with pool.connection() as conn:
+            assert conn is created[0]
+
+    stats = pool.stats()
+    assert len(created) == 1
+    assert stats.acquisitions == 4
+    assert stats.reuse_ratio == pytest.approx(0.75)
+    assert created[0].rollback.call_count == 4
+
+
+def test_min_size_opened_eagerly():
+    """min_size connections should be opened when the pool is created."""
+    connect, created = make_factory()
+    pool = ConnectionPool(min_size=2, max_size=3, connect=connect)
+
+    assert len(created) == 2
+    assert pool.stats().idle == 2
+
+
+def test_acquire_blocks_at_max_size():
+    """Waiters should block until a connection is released and record wait time."""
+    connect, created = make_factory()
+    pool = ConnectionPool(min_size=0, max_size=1, connect=connect)
+    held = pool.acquire()
+
+    with pytest.raises(PoolTimeout):
+        pool.acquire(timeout=0.05)
+
+    timer = threading.Timer(0.1, pool.release, args=(held,))
+    timer.start()
+    conn = pool.acquire(timeout=5)
+    timer.join()
+
+    assert conn is held
+    assert len(created) == 1
+    assert pool.stats().max_wait_s >= 0.05
+
+
+def test_closed_connection_replaced():
+    """Connections that died while idle should be dropped, not handed out."""
+    connect, created = make_factory()
+    pool = ConnectionPool(min_size=0, max_size=2, connect=connect)
+    with pool.connection():
+        pass
+    created[0].closed = 1
+
+    with pool.connection() as conn:
+        assert conn is created[1]
+
+    stats = pool.stats()
+    assert stats.failed_health_checks == 1
+    assert stats.discarded == 1
+
+
+def test_health_check_probe_failure():
+    """A failing SELECT 1 probe should discard the idle connection."""
+    connect, created = make_factory()
+    pool = ConnectionPool(
+        min_size=0, max_size=2, health_check_after=0.0, connect=connect
+    )
+    with pool.connection():
+        pass
+    cursor = created[0].cursor.return_value.__enter__.return_value
+    cursor.execute.side_effect = psycopg2.OperationalError("server closed")
+
+    with pool.connection() as conn:
+        assert conn is created[1]
+    created[0].close.assert_called()
+
+
+def test_connection_being_probed_counts_towards_max_size():
+    """A reused connection under its health check should still occupy a slot."""
+    connect, created = make_factory()
+    pool = ConnectionPool(min_size=0, max_size=1, health_check_after=0.0, connect=connect)
+    with pool.connection():
+        pass
+    probing = threading.Event()
+    finish_probe = threading.Event()
+    cursor = created[0].cursor.return_value.__enter__.return_value
+    cursor.execute.side_effect = lambda query: (probing.set(), finish_probe.wait(5))
+    leased = []
+    worker = threading.Thread(target=lambda: leased.append(pool.acquire()))
+    worker.start()
+    assert probing.wait(5)
+
+    with pytest.raises(PoolTimeout):
+        pool.acquire(timeout=0.05)
+    finish_probe.set()
+    worker.join()
+
+    assert leased == [created[0]]
+    assert len(created) == 1
+
+
+def test_idle_timeout_expires_extra_connections():
+    """Idle connections above min_size should be closed after idle_timeout."""
+    connect, created = make_factory()
+    pool = ConnectionPool(min_size=0, max_size=2, idle_timeout=0.01, connect=connect)
+    with pool.connection():
+        pass
+    time.sleep(0.05)
+
+    with pool.connection() as conn:
+        assert conn is created[1]
+
+    assert pool.stats().expired == 1
+    created[0].close.assert_called()
+
+
+def test_materialize_snapshot_with_pool(monkeypatch):
+    """materialize_snapshot should lease from the pool instead of closing the connection."""
+    conn = MagicMock()
+    conn.closed = 0
+    cursor = conn.cursor.return_value.__enter__.return_value
+    cursor.fetchall.side_effect = [
+        [{"id": "a", "type": "Identifier"}, {"id": "b", "type": "Identifier"}],
+        [{"id": "e1", "fromId": "a", "toId": "b", "kind": "CALL"}],
+    ]
+    pool = ConnectionPool(min_size=0, max_size=1, connect=lambda: conn)
+    monkeypatch.setattr(
+        materializer, "_connect", lambda dsn=None: pytest.fail("pool bypassed")
+    )
+
+    snapshot = materializer.materialize_snapshot("snap", pool=pool)
+
+    assert len(snapshot.nodes) == 2
+    assert len(snapshot.edges) == 1
+    conn.close.assert_not_called()
+    assert pool.stats().idle == 1
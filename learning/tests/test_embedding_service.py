@@ -0,0 +1,203 @@
+import json
+import sys
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+import torch
+import torch.nn.functional as F
+
+LEARNING_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = LEARNING_ROOT / "src"
+sys.path.insert(0, str(SRC_ROOT))
+
+from components.embedding_service import (  # noqa: E402
+    EmbeddingService,
+    MicroBatcher,
+    ModelSpec,
+)
+from components.exporter import export_snapshot  # noqa: E402
+from components.gnn_model import create_gnn_model, generate_embeddings  # noqa: E402
+from pipeline.run_embedding_server import make_handler  # noqa: E402
+
+
+def write_bundle(path, num_nodes=60, num_edges=240, seed=0):
+    """Write a random bundle and return it."""
+    generator = torch.Generator().manual_seed(seed)
+    x = torch.zeros((num_nodes, 6), dtype=torch.float32)
+    x[torch.arange(num_nodes), torch.randint(0, 6, (num_nodes,), generator=generator)] = 1.0
+    bundle = {
+        "x": x,
+        "edge_index": torch.randint(0, num_nodes, (2, num_edges), generator=generator),
+        "node_mapping": {f"node_{i:03d}": i for i in range(num_nodes)},
+    }
+    export_snapshot(bundle, path)
+    return bundle
+
+
+def full_embeddings(bundle, spec):
+    model = create_gnn_model(
+        in_channels=6,
+        out_channels=spec.out_channels,
+        seed=spec.seed,
+        num_layers=spec.num_layers,
+        hidden_channels=spec.hidden_channels,
+    )
+    return generate_embeddings(model, bundle["x"], bundle["edge_index"])
+
+
+@pytest.mark.parametrize("num_layers", [1, 2, 3])
+def test_embed_matches_full_graph(tmp_path, num_layers):
+    """Receptive-field inference should equal full-graph embeddings for requested rows."""
+    path = tmp_path / "bundle.pkl"
+    bundle = write_bundle(path)
+    spec = ModelSpec(num_layers=num_layers, hidden_channels=16)
+    expected = full_embeddings(bundle, spec)
+
+    service = EmbeddingService()
+    result = service.embed(path, ["node_007", "node_003", "node_042"], spec)
+
+    for node_id, row in result.items():
+        index = bundle["node_mapping"][node_id]
+        assert torch.allclose(torch.tensor(row), expected[index], atol=1e-5)
+
+
+def test_concurrent_embeds_are_batched(tmp_path):
+    """Concurrent requests should share forward passes and still get their own rows."""
+    path = tmp_path / "bundle.pkl"
+    bundle = write_bundle(path)
+    spec = ModelSpec(num_layers=2, hidden_channels=16)
+    expected = full_embeddings(bundle, spec)
+    service = EmbeddingService(max_wait_s=0.2)
+    service.embed(path, ["node_000"], spec)
+
+    results = {}
+
+    def request(i):
+        node_id = f"node_{i:03d}"
+        results[node_id] = service.embed(path, [node_id], spec)[node_id]
+
+    threads = [threading.Thread(target=request, args=(i,)) for i in range(1, 9)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for node_id, row in results.items():
+        index = bundle["node_mapping"][node_id]
+        assert torch.allclose(torch.tensor(row), expected[index], atol=1e-5)
+    assert max(service.stats()["mean_batch_size"].values()) > 1
+
+
+def test_model_build_keeps_the_global_rng_state(tmp_path):
+    """Building a model for a request should not reseed the caller's global RNG."""
+    path = tmp_path / "bundle.pkl"
+    write_bundle(path)
+    service = EmbeddingService()
+    torch.manual_seed(1234)
+    expected = torch.rand(3)
+    torch.manual_seed(1234)
+
+    service.embed(path, ["node_000"], ModelSpec(seed=7))
+
+    assert torch.equal(torch.rand(3), expected)
+
+
+def test_similar_matches_brute_force(tmp_path):
+    """Top-k should match a brute-force cosine ranking and exclude the query."""
+    path = tmp_path / "bundle.pkl"
+    bundle = write_bundle(path)
+    spec = ModelSpec()
+    normalized = F.normalize(full_embeddings(bundle, spec), dim=1)
+    query = bundle["node_mapping"]["node_010"]
+
+    neighbours = EmbeddingService().similar(path, "node_010", k=5, spec=spec)
+
+    scores = normalized @ normalized[query]
+    scores[query] = -2.0
+    expected = torch.topk(scores, 5).values
+    assert "node_010" not in [node_id for node_id, _ in neighbours]
+    assert torch.allclose(torch.tensor([score for _, score in neighbours]), expected, atol=1e-5)
+
+
+def test_bundle_lru_and_latency(tmp_path):
+    """Bundles beyond max_bundles should be evicted; cold and warm latency tracked."""
+    paths = [tmp_path / f"bundle_{i}.pkl" for i in range(3)]
+    for i, path in enumerate(paths):
+        write_bundle(path, seed=i)
+    service = EmbeddingService(max_bundles=2)
+
+    for path in paths:
+        service.embed(path, ["node_001"])
+    service.embed(paths[-1], ["node_002"])
+
+    stats = service.stats()
+    assert len(stats["resident_bundles"]) == 2
+    assert str(paths[0].resolve()) not in stats["resident_bundles"]
+    assert stats["latency"]["cold"]["count"] == 3
+    assert stats["latency"]["warm"]["count"] == 1
+    # Per-path load locks only live while a load is in flight.
+    assert service._path_locks == {}
+
+
+def test_bundle_stats(tmp_path):
+    """Bundle stats should describe the resident graph."""
+    path = tmp_path / "bundle.pkl"
+    write_bundle(path, num_nodes=10, num_edges=0)
+
+    stats = EmbeddingService().stats(path)
+
+    assert stats["num_nodes"] == 10
+    assert stats["num_edges"] == 0
+    assert stats["isolated_nodes"] == 10
+
+
+def test_unknown_node_rejected(tmp_path):
+    """Unknown node ids should raise KeyError."""
+    path = tmp_path / "bundle.pkl"
+    write_bundle(path)
+
+    with pytest.raises(KeyError):
+        EmbeddingService().embed(path, ["missing"])
+
+
+def test_micro_batcher_propagates_errors():
+    """A failing batch function should raise in every waiting caller."""
+    def fail(items):
+        raise RuntimeError("boom")
+
+    batcher = MicroBatcher(fail, max_wait_s=0.0)
+
+    with pytest.raises(RuntimeError):
+        batcher.submit(1)
+
+
+@pytest.mark.parametrize(
+    "error, status",
+    [(KeyError("missing"), 404), (ValueError("bad"), 400), (RuntimeError("boom"), 500)],
+)
+def test_server_maps_errors_to_status_codes(error, status):
+    """Unexpected service errors should still get a JSON response."""
+    service = MagicMock()
+    service.embed.side_effect = error
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(service))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{server.server_address[1]}/embed",
+        data=json.dumps({"bundle_path": "b.pkl", "node_ids": ["a"]}).encode("utf-8"),
+        method="POST",
+    )
+    try:
+        with pytest.raises(urllib.error.HTTPError) as caught:
+            urllib.request.urlopen(request, timeout=5)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert caught.value.code == status
+    assert "error" in json.loads(caught.value.read())
@@ -13,8 +13,16 @@ SRC_ROOT = LEARNING_ROOT / "src"
 sys.path.insert(0, str(SRC_ROOT))
 
 import components.materializer as materializer  # noqa: E402
+from components.bundle_io import load_tensor_bundle  # noqa: E402
 from components.exporter import TensorBundle  # noqa: E402
-from pipeline.export_pipeline import run_export_pipeline  # noqa: E402
+from components.feature_store import FeatureStore  # noqa: E402
+from components.fingerprints import SnapshotFingerprint  # noqa: E402
+from components.node_index import NodeIdIndex  # noqa: E402
+from pipeline.export_pipeline import (  # noqa: E402
+    OutputOptions,
+    PartitionOptions,
+    run_export_pipeline,
+)
 
 
 def make_connection(node_rows, edge_rows):
@@ -341,3 +349,157 @@ def test_large_graph(tmp_path, monkeypatch):
     assert bundle["x"].shape == (100, 6)
     assert bundle["edge_index"].shape == (2, 150)
     assert len(bundle["node_mapping"]) == 100
+
+
+def test_sharded_export(tmp_path, monkeypatch):
+    """Partitioned export should write a manifest and one shard per partition."""
+    snapshot_id = "test-sharded"
+    output_dir = tmp_path / "shards"
+    node_rows, edge_rows = make_sample_rows(snapshot_id)
+    conn = make_connection(node_rows, edge_rows)
+    monkeypatch.setattr(materializer, "_connect", lambda dsn=None: conn)
+
+    bundle = run_export_pipeline(
+        snapshot_id,
+        str(output_dir),
+        partitions=PartitionOptions(num_parts=2, strategy="edge_cut"),
+    )
+
+    assert (output_dir / "manifest.json").exists()
+    assert (output_dir / "part-00000.pkl").exists()
+    assert (output_dir / "part-00001.pkl").exists()
+    assert bundle["x"].shape == (len(node_rows), 6)
+
+
+def test_coalesced_export(tmp_path, monkeypatch):
+    """Coalesced export should merge duplicate edges and record multiplicities."""
+    snapshot_id = "test-coalesced"
+    output_path = tmp_path / "bundle.pkl"
+    node_rows, edge_rows = make_sample_rows(snapshot_id)
+    duplicate = dict(edge_rows[1], id="e3")
+    edge_rows = edge_rows + [duplicate]
+    conn = make_connection(node_rows, edge_rows)
+    monkeypatch.setattr(materializer, "_connect", lambda dsn=None: conn)
+
+    bundle = run_export_pipeline(
+        snapshot_id,
+        str(output_path),
+        include_edge_kinds=True,
+        coalesce_edges=True,
+    )
+
+    assert bundle["edge_index"].shape == (2, 2)
+    assert bundle["edge_count"].tolist() == [1, 2]
+    assert bundle["edge_weight"].dtype == torch.float32
+    assert [bundle["edge_kinds"][k] for k in bundle["edge_kind"].tolist()] == [
+        "ASSIGNMENT",
+        "CALL",
+    ]
+
+
+def test_compact_ids_export(tmp_path, monkeypatch):
+    """compact_ids should store a NodeIdIndex equal to the dict mapping."""
+    snapshot_id = "test-compact-ids"
+    output_path = tmp_path / "bundle.pkl"
+    node_rows, edge_rows = make_sample_rows(snapshot_id)
+    conn = make_connection(node_rows, edge_rows)
+    monkeypatch.setattr(materializer, "_connect", lambda dsn=None: conn)
+
+    bundle = run_export_pipeline(
+        snapshot_id, str(output_path), output=OutputOptions(compact_ids=True)
+    )
+
+    with open(output_path, "rb") as f:
+        loaded_bundle = pickle.load(f)
+    assert isinstance(loaded_bundle["node_mapping"], NodeIdIndex)
+    assert loaded_bundle["node_mapping"] == {"a": 0, "b": 1, "c": 2}
+    assert bundle["node_mapping"] == loaded_bundle["node_mapping"]
+
+
+def test_feature_store_matches_default_features(tmp_path, monkeypatch):
+    """x assembled from the feature store should match the direct feature matrix."""
+    snapshot_id = "test-feature-store"
+    node_rows, edge_rows = make_sample_rows(snapshot_id)
+    monkeypatch.setattr(
+        materializer, "_connect", lambda dsn=None: make_connection(node_rows, edge_rows)
+    )
+    store = FeatureStore(tmp_path / "features")
+
+    direct = run_export_pipeline(snapshot_id, str(tmp_path / "direct.pkl"))
+    stored = run_export_pipeline(
+        snapshot_id, str(tmp_path / "stored.pkl"), feature_store=store
+    )
+
+    assert torch.equal(stored["x"], direct["x"])
+    assert store.versions(snapshot_id, "kind_bucket") == [1]
+
+
+def test_include_stats_embeds_graph_summary(tmp_path, monkeypatch):
+    """include_stats should add per-kind and per-file counts to the bundle."""
+    snapshot_id = "test-include-stats"
+    node_rows, edge_rows = make_sample_rows(snapshot_id)
+    conn = make_connection(node_rows, edge_rows)
+    monkeypatch.setattr(materializer, "_connect", lambda dsn=None: conn)
+
+    bundle = run_export_pipeline(
+        snapshot_id, str(tmp_path / "bundle.pkl"), include_stats=True
+    )
+
+    stats = bundle["stats"]
+    assert stats["num_nodes"] == len(node_rows)
+    assert stats["num_edges"] == len(edge_rows)
+    assert stats["edge_kinds"] == {"ASSIGNMENT": 1, "CALL": 1}
+    assert stats["files"] == {"test.js": 3}
+    assert stats["weak_components"]["count"] == 1
+
+
+def test_skip_if_unchanged_reuses_bundle(tmp_path, monkeypatch):
+    """A matching fingerprint root should skip materialization entirely."""
+    import pipeline.export_pipeline as export_pipeline
+
+    snapshot_id = "test-skip-if-unchanged"
+    output_path = tmp_path / "bundle.bin"
+    node_rows, edge_rows = make_sample_rows(snapshot_id)
+    conn = make_connection(node_rows, edge_rows)
+    monkeypatch.setattr(materializer, "_connect", lambda dsn=None: conn)
+    first = run_export_pipeline(snapshot_id, str(output_path), output=OutputOptions("compressed"))
+    stored = SnapshotFingerprint.from_dict(first["fingerprint"])
+    monkeypatch.setattr(export_pipeline, "fetch_snapshot_fingerprint", lambda _: stored)
+    monkeypatch.setattr(
+        export_pipeline, "materialize_snapshot", MagicMock(side_effect=AssertionError)
+    )
+
+    reused = run_export_pipeline(
+        snapshot_id, str(output_path), output=OutputOptions("compressed"), skip_if_unchanged=True
+    )
+
+    assert set(stored.files) == {"test.js"}
+    assert reused["fingerprint"] == first["fingerprint"]
+    assert torch.equal(reused["edge_index"], first["edge_index"])
+
+
+def test_skip_if_unchanged_rebuilds_when_options_change(tmp_path, monkeypatch):
+    """A matching fingerprint is not enough; the export options must match too."""
+    import pipeline.export_pipeline as export_pipeline
+
+    snapshot_id = "test-skip-options"
+    output_path = tmp_path / "bundle.bin"
+    node_rows, edge_rows = make_sample_rows(snapshot_id)
+    monkeypatch.setattr(
+        materializer, "_connect", lambda dsn=None: make_connection(node_rows, edge_rows)
+    )
+    first = run_export_pipeline(snapshot_id, str(output_path), output=OutputOptions("compressed"))
+    stored = SnapshotFingerprint.from_dict(first["fingerprint"])
+    monkeypatch.setattr(export_pipeline, "fetch_snapshot_fingerprint", lambda _: stored)
+
+    rebuilt = run_export_pipeline(
+        snapshot_id,
+        str(output_path),
+        output=OutputOptions("compressed"),
+        include_stats=True,
+        skip_if_unchanged=True,
+    )
+
+    assert "stats" in rebuilt
+    assert rebuilt["export_options"] != first["export_options"]
+    assert "stats" in load_tensor_bundle(output_path)
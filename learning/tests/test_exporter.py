@@ -13,7 +13,9 @@ sys.path.insert(0, str(SRC_ROOT))
 
 from components.exporter import (  # noqa: E402
     TensorBundle,
+    coalesce_edge_index,
     create_edge_index,
+    create_edge_kind_index,
     create_node_mapping,
     export_snapshot,
 )
@@ -252,3 +254,69 @@ def test_export_with_string_path(tmp_path):
 
     assert result.exists()
     assert isinstance(result, Path)
+
+
+def make_multigraph():
+    """Create a multigraph with repeated CALL edges."""
+    g = nx.MultiDiGraph()
+    g.add_edge("a", "b", kind="CALL")
+    g.add_edge("a", "b", kind="CALL")
+    g.add_edge("a", "b", kind="IMPORT")
+    g.add_edge("b", "c", kind="CALL")
+    g.add_edge("a", "b", kind="CALL")
+    return nx.freeze(g)
+
+
+def test_edge_kind_index_aligned():
+    """Edge kinds should line up with create_edge_index columns."""
+    graph = make_multigraph()
+    node_to_idx = create_node_mapping(graph)
+    edge_index = create_edge_index(graph, node_to_idx)
+
+    edge_kind, vocabulary = create_edge_kind_index(graph)
+
+    assert vocabulary == ["CALL", "IMPORT"]
+    assert edge_kind.shape == (edge_index.shape[1],)
+    for i, (_, _, kind) in enumerate(graph.edges(data="kind")):
+        assert vocabulary[edge_kind[i]] == kind
+
+
+def test_coalesce_merges_duplicates():
+    """Duplicate (src, dst) pairs should collapse with their multiplicity."""
+    graph = make_multigraph()
+    node_to_idx = create_node_mapping(graph)
+    edge_index = create_edge_index(graph, node_to_idx)
+
+    coalesced, edge_count, kinds = coalesce_edge_index(edge_index, len(node_to_idx))
+
+    assert kinds is None
+    assert coalesced.tolist() == [[0, 1], [1, 2]]
+    assert edge_count.tolist() == [4, 1]
+
+
+def test_coalesce_by_kind():
+    """Including kinds should keep differently-typed parallel edges apart."""
+    graph = make_multigraph()
+    node_to_idx = create_node_mapping(graph)
+    edge_index = create_edge_index(graph, node_to_idx)
+    edge_kind, _ = create_edge_kind_index(graph)
+
+    coalesced, edge_count, kinds = coalesce_edge_index(
+        edge_index, len(node_to_idx), edge_kind
+    )
+
+    assert coalesced.tolist() == [[0, 0, 1], [1, 1, 2]]
+    assert edge_count.tolist() == [3, 1, 1]
+    assert kinds.tolist() == [0, 1, 0]
+    assert edge_count.sum().item() == edge_index.shape[1]
+
+
+def test_coalesce_empty():
+    """Coalescing an empty edge index should return empty tensors."""
+    edge_index = torch.empty((2, 0), dtype=torch.long)
+
+    coalesced, edge_count, kinds = coalesce_edge_index(edge_index, 3)
+
+    assert coalesced.shape == (2, 0)
+    assert edge_count.numel() == 0
+    assert kinds is None
@@ -0,0 +1,222 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+import torch
+
+LEARNING_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = LEARNING_ROOT / "src"
+sys.path.insert(0, str(SRC_ROOT))
+
+import components.feature_store as feature_store  # noqa: E402
+from components.feature_store import (  # noqa: E402
+    FEATURES,
+    FeatureSpec,
+    FeatureStore,
+    get_feature_spec,
+    register_feature,
+)
+from components.models import SnapshotNode  # noqa: E402
+from components.node_features import create_feature_matrix_v1  # noqa: E402
+
+
+def make_test_nodes():
+    """Create sample nodes with different kinds."""
+    kinds = ["Module", "Function", "Variable", "Call", "Import", None, "Loop"]
+    return [SnapshotNode(id=f"n{i}", kind=kind) for i, kind in enumerate(kinds)]
+
+
+def make_node_mapping(nodes):
+    """Create a mapping whose order differs from the node list order."""
+    ids = sorted((str(node.id) for node in nodes), reverse=True)
+    return {node_id: i for i, node_id in enumerate(ids)}
+
+
+@pytest.fixture
+def counting_feature():
+    """Register a feature that records how often it is computed."""
+    calls = []
+
+    def compute(batch):
+        calls.append(len(batch))
+        return np.array([[float(len(node.id))] for node in batch], dtype=np.float32)
+
+    spec = register_feature(FeatureSpec("id_length", 1, 1, compute))
+    yield spec, calls
+    FEATURES.pop("id_length", None)
+
+
+def test_kind_bucket_matches_feature_matrix_v1(tmp_path):
+    """The stored kind_bucket column should equal create_feature_matrix_v1."""
+    nodes = make_test_nodes()
+    node_to_idx = make_node_mapping(nodes)
+    store = FeatureStore(tmp_path, batch_size=3)
+
+    x = store.assemble("snap", ["kind_bucket"], node_to_idx, nodes)
+
+    assert x.dtype == torch.float32
+    assert torch.equal(x, create_feature_matrix_v1(nodes, node_to_idx))
+
+
+def test_cached_column_is_opened_not_recomputed(tmp_path, counting_feature):
+    """A second request for the same feature version should only open the file."""
+    spec, calls = counting_feature
+    nodes = make_test_nodes()
+    node_to_idx = make_node_mapping(nodes)
+    store = FeatureStore(tmp_path, batch_size=3)
+
+    first = store.get("snap", "id_length", node_to_idx, nodes)
+    second = store.get("snap", "id_length", node_to_idx)
+
+    assert calls == [3, 3, 1]
+    assert isinstance(second, np.memmap)
+    assert np.array_equal(first, second)
+
+
+def test_assemble_concatenates_columns_in_order(tmp_path, counting_feature):
+    """x should be the requested columns side by side, aligned with node_mapping."""
+    nodes = make_test_nodes()
+    node_to_idx = make_node_mapping(nodes)
+    store = FeatureStore(tmp_path)
+
+    x = store.assemble("snap", ["kind_bucket", ("id_length", 1)], node_to_idx, nodes)
+
+    assert x.shape == (len(nodes), 7)
+    assert torch.equal(x[:, :6], create_feature_matrix_v1(nodes, node_to_idx))
+    assert x[node_to_idx["n3"], 6].item() == 2.0
+
+
+def test_assemble_hashes_the_mapping_once(tmp_path, counting_feature, monkeypatch):
+    """Cache hits should reuse one mapping fingerprint instead of rehashing every id."""
+    nodes = make_test_nodes()
+    node_to_idx = make_node_mapping(nodes)
+    store = FeatureStore(tmp_path)
+    features = ["kind_bucket", "id_length"]
+    store.assemble("snap", features, node_to_idx, nodes)
+    hashed = []
+    original = feature_store.mapping_fingerprint
+
+    def counting_fingerprint(mapping):
+        hashed.append(len(mapping))
+        return original(mapping)
+
+    monkeypatch.setattr(feature_store, "mapping_fingerprint", counting_fingerprint)
+    store.assemble("snap", features, node_to_idx)
+
+    assert hashed == [len(nodes)]
+
+
+def test_assemble_reuses_a_passed_mapping_digest(tmp_path, counting_feature, monkeypatch):
+    """A digest from the caller should be used instead of hashing the mapping again."""
+    nodes = make_test_nodes()
+    node_to_idx = make_node_mapping(nodes)
+    store = FeatureStore(tmp_path)
+    digest = feature_store.mapping_fingerprint(node_to_idx)
+    store.assemble("snap", ["id_length"], node_to_idx, nodes)
+
+    def fail(mapping):
+        raise AssertionError("mapping was hashed again")
+
+    monkeypatch.setattr(feature_store, "mapping_fingerprint", fail)
+    x = store.assemble("snap", ["id_length"], node_to_idx, mapping_digest=digest)
+
+    assert x.shape == (len(nodes), 1)
+
+
+def test_mapping_fingerprint_follows_row_order_not_insertion_order():
+    """Two dicts with the same id-to-row pairs should hash alike in any insertion order."""
+    nodes = make_test_nodes()
+    node_to_idx = make_node_mapping(nodes)
+    shuffled = dict(sorted(node_to_idx.items()))
+
+    assert list(shuffled) != list(node_to_idx)
+    assert feature_store.mapping_fingerprint(shuffled) == feature_store.mapping_fingerprint(node_to_idx)
+
+
+def test_recompute_drops_the_old_sidecar_before_replacing_the_column(tmp_path, counting_feature, monkeypatch):
+    """A crash before the new sidecar is written must not leave the old one describing the new column."""
+    nodes = make_test_nodes()
+    store = FeatureStore(tmp_path)
+    old_mapping = make_node_mapping(nodes)
+    store.get("snap", "id_length", old_mapping, nodes)
+    new_mapping = {str(node.id): i for i, node in enumerate(nodes)}
+
+    def crash(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(feature_store.json, "dumps", crash)
+    with pytest.raises(OSError):
+        store.get("snap", "id_length", new_mapping, nodes)
+    monkeypatch.undo()
+
+    assert not store.has("snap", "id_length", old_mapping)
+    assert not store.has("snap", "id_length", new_mapping)
+
+
+def test_filtered_columns_do_not_replace_full_ones(tmp_path, counting_feature):
+    """Columns for a filtered node mapping should be cached beside the full snapshot's."""
+    _, calls = counting_feature
+    nodes = make_test_nodes()
+    node_to_idx = make_node_mapping(nodes)
+    subset = nodes[:3]
+    subset_to_idx = make_node_mapping(subset)
+    store = FeatureStore(tmp_path)
+
+    store.get("snap", "id_length", node_to_idx, nodes)
+    store.get("snap", "id_length", subset_to_idx, subset, filter_key="abc")
+    full = store.get("snap", "id_length", node_to_idx)
+    filtered = store.get("snap", "id_length", subset_to_idx, filter_key="abc")
+
+    assert calls == [len(nodes), len(subset)]
+    assert full.shape == (len(nodes), 1)
+    assert filtered.shape == (len(subset), 1)
+    assert store.versions("snap", "id_length", filter_key="abc") == [1]
+
+
+def test_new_version_is_computed_separately(tmp_path, counting_feature):
+    """Bumping a feature version should not reuse the old column."""
+    nodes = make_test_nodes()
+    node_to_idx = make_node_mapping(nodes)
+    store = FeatureStore(tmp_path)
+    store.get("snap", "id_length", node_to_idx, nodes)
+
+    register_feature(
+        FeatureSpec("id_length", 2, 1, lambda batch: np.full((len(batch), 1), 2.0))
+    )
+
+    assert get_feature_spec("id_length").version == 2
+    assert not store.has("snap", "id_length", node_to_idx)
+    assert store.get("snap", "id_length", node_to_idx, nodes)[0, 0] == 2.0
+    assert store.versions("snap", "id_length") == [1, 2]
+
+
+def test_misaligned_mapping_is_recomputed(tmp_path, counting_feature):
+    """A column cached for a different node order must not be reused."""
+    spec, calls = counting_feature
+    nodes = make_test_nodes()
+    store = FeatureStore(tmp_path)
+    store.get("snap", "id_length", make_node_mapping(nodes), nodes)
+
+    reordered = {str(node.id): i for i, node in enumerate(nodes)}
+
+    assert not store.has("snap", "id_length", reordered)
+    with pytest.raises(KeyError):
+        store.get("snap", "id_length", reordered)
+
+
+def test_unknown_feature_and_bad_width(tmp_path):
+    """Unknown features and wrongly shaped batches should be rejected."""
+    nodes = make_test_nodes()
+    node_to_idx = make_node_mapping(nodes)
+    store = FeatureStore(tmp_path)
+
+    with pytest.raises(KeyError):
+        store.get("snap", "missing", node_to_idx, nodes)
+
+    register_feature(FeatureSpec("bad", 1, 2, lambda batch: np.zeros((len(batch), 1))))
+    try:
+        with pytest.raises(ValueError):
+            store.get("snap", "bad", node_to_idx, nodes)
+    finally:
+        FEATURES.pop("bad", None)
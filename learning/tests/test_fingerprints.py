@@ -0,0 +1,137 @@
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock
+
+LEARNING_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = LEARNING_ROOT / "src"
+sys.path.insert(0, str(SRC_ROOT))
+
+import components.materializer as materializer  # noqa: E402
+from components.fingerprints import (  # noqa: E402
+    SnapshotFingerprint,
+    _jsonb_text,
+    _row_halves,
+    fetch_snapshot_fingerprint,
+    fingerprint_snapshot,
+    merkle_root,
+)
+from components.models import SnapshotEdge, SnapshotNode  # noqa: E402
+
+
+def node(node_id, file_path="a.js", data=None, kind="Identifier"):
+    return SnapshotNode(
+        id=node_id,
+        kind=kind,
+        label=kind,
+        properties={"filePath": file_path, "data": data or {}, "location": None},
+    )
+
+
+def edge(src, dst, kind="CALL", file_path="a.js", edge_id="e"):
+    return SnapshotEdge(
+        source=src,
+        target=dst,
+        kind=kind,
+        properties={"id": edge_id, "filePath": file_path, "snapshotId": "s"},
+    )
+
+
+def sample():
+    nodes = [node("a"), node("b", data={"name": "x"}), node("c", file_path="b.js")]
+    edges = [edge("a", "b"), edge("b", "c", kind="IMPORT", file_path="b.js")]
+    return nodes, edges
+
+
+def make_cursor(rows):
+    cursor = MagicMock()
+    cursor.__enter__.return_value = cursor
+    cursor.__exit__.return_value = False
+    cursor.fetchall.return_value = rows
+    return cursor
+
+
+def aggregate(texts_by_file):
+    """Mimic the GROUP BY query result for canonical row texts."""
+    rows = []
+    for file_path, texts in texts_by_file.items():
+        halves = [_row_halves(text) for text in texts]
+        rows.append(
+            {
+                "file_path": file_path,
+                "rows": len(texts),
+                "high": sum(h for h, _ in halves),
+                "low": sum(low for _, low in halves),
+            }
+        )
+    return rows
+
+
+def test_fingerprint_is_order_independent():
+    """Row order and metadata such as edge ids should not affect the root."""
+    nodes, edges = sample()
+    renamed = [edge(e.source, e.target, e.kind, e.properties["filePath"], "other") for e in edges]
+
+    first = fingerprint_snapshot(nodes, edges)
+    second = fingerprint_snapshot(list(reversed(nodes)), list(reversed(renamed)))
+
+    assert first == second
+    assert set(first.files) == {"a.js", "b.js"}
+
+
+def test_changed_files_pinpoints_edits():
+    """Editing one file should change only its digest and the root."""
+    nodes, edges = sample()
+    base = fingerprint_snapshot(nodes, edges)
+    edited = fingerprint_snapshot(nodes[:1] + [node("b", data={"name": "y"})] + nodes[2:], edges)
+    grown = fingerprint_snapshot(nodes + [node("d", file_path="c.js")], edges)
+
+    assert base.changed_files(edited) == {"a.js"}
+    assert base.changed_files(grown) == {"c.js"}
+    assert not base.matches(edited)
+    assert base.matches(SnapshotFingerprint.from_dict(base.to_dict()))
+
+
+def test_merkle_root_shape():
+    """Empty, single and odd-sized leaf sets should all yield stable roots."""
+    digests = {"a": "1", "b": "2", "c": "3"}
+
+    assert merkle_root({}) == merkle_root({})
+    assert merkle_root(digests) == merkle_root(dict(reversed(list(digests.items()))))
+    assert merkle_root(digests) != merkle_root({"a": "1", "b": "2"})
+    assert merkle_root({"a": "1"}) != merkle_root({"b": "1"})
+
+
+def test_jsonb_text_matches_postgres_rendering():
+    """Keys are ordered by length, then bytes, as jsonb prints them."""
+    assert _jsonb_text({"bb": 1, "a": [True, None], "ab": "é"}) == (
+        '{"a": [true, null], "ab": "é", "bb": 1}'
+    )
+    assert _jsonb_text(None) is None
+
+
+def test_sql_fingerprint_matches_python(monkeypatch):
+    """Aggregates computed in Postgres should reproduce the in-memory fingerprint."""
+    nodes, edges = sample()
+    sep = "\x1f"
+    node_texts = {
+        "a.js": [
+            sep.join(["a", "Identifier", "Identifier", "a.js", "{}", ""]),
+            sep.join(["b", "Identifier", "Identifier", "a.js", '{"name": "x"}', ""]),
+        ],
+        "b.js": [sep.join(["c", "Identifier", "Identifier", "b.js", "{}", ""])],
+    }
+    edge_texts = {
+        "a.js": [sep.join(["a", "b", "CALL", "a.js"])],
+        "b.js": [sep.join(["b", "c", "IMPORT", "b.js"])],
+    }
+    conn = MagicMock()
+    conn.cursor.side_effect = [
+        make_cursor(aggregate(node_texts)),
+        make_cursor(aggregate(edge_texts)),
+    ]
+    monkeypatch.setattr(materializer, "_connect", lambda dsn=None: conn)
+
+    fingerprint = fetch_snapshot_fingerprint("snap")
+
+    assert fingerprint == fingerprint_snapshot(nodes, edges)
+    conn.close.assert_called_once()
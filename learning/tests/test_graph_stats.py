@@ -0,0 +1,118 @@
+import json
+import sys
+from pathlib import Path
+
+import networkx as nx
+import torch
+
+LEARNING_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = LEARNING_ROOT / "src"
+sys.path.insert(0, str(SRC_ROOT))
+
+from components.graph_stats import (  # noqa: E402
+    compute_graph_stats,
+    degree_summary,
+    edge_kind_counts,
+    file_node_counts,
+    strongly_connected_components,
+    weakly_connected_components,
+)
+from components.models import SnapshotNode  # noqa: E402
+
+
+def make_graph(num_nodes=200, num_edges=260, seed=0):
+    """Create a sparse random directed graph with several components."""
+    generator = torch.Generator().manual_seed(seed)
+    return torch.randint(0, num_nodes, (2, num_edges), generator=generator), num_nodes
+
+
+def to_networkx(edge_index, num_nodes):
+    graph = nx.DiGraph()
+    graph.add_nodes_from(range(num_nodes))
+    graph.add_edges_from(edge_index.t().tolist())
+    return graph
+
+
+def partition(labels):
+    """Components as a set of frozensets, independent of label values."""
+    groups = {}
+    for node, label in enumerate(labels.tolist()):
+        groups.setdefault(label, set()).add(node)
+    return {frozenset(group) for group in groups.values()}
+
+
+def test_weak_components_match_networkx():
+    """Label propagation should find the same weak components as NetworkX."""
+    for seed in range(3):
+        edge_index, num_nodes = make_graph(seed=seed)
+        labels = weakly_connected_components(edge_index, num_nodes)
+        expected = {
+            frozenset(c) for c in nx.weakly_connected_components(to_networkx(edge_index, num_nodes))
+        }
+        assert partition(labels) == expected
+        assert all(labels[node] <= node for node in range(num_nodes))
+
+
+def test_strong_components_match_networkx():
+    """Forward-backward colouring should find the same SCCs as NetworkX."""
+    for seed in range(3):
+        edge_index, num_nodes = make_graph(num_nodes=80, num_edges=200, seed=seed)
+        labels = strongly_connected_components(edge_index, num_nodes)
+        expected = {
+            frozenset(c)
+            for c in nx.strongly_connected_components(to_networkx(edge_index, num_nodes))
+        }
+        assert partition(labels) == expected
+
+
+def test_long_chain_and_cycle():
+    """A chain closed into a cycle is one SCC; open, every node is its own."""
+    num_nodes = 50
+    chain = torch.stack([torch.arange(num_nodes - 1), torch.arange(1, num_nodes)])
+    cycle = torch.cat([chain, torch.tensor([[num_nodes - 1], [0]])], dim=1)
+
+    assert len(partition(strongly_connected_components(chain, num_nodes))) == num_nodes
+    assert len(partition(strongly_connected_components(cycle, num_nodes))) == 1
+    assert torch.equal(
+        weakly_connected_components(chain, num_nodes), torch.zeros(num_nodes, dtype=torch.long)
+    )
+
+
+def test_degree_summary_histogram():
+    """Degrees should land in power-of-two buckets."""
+    summary = degree_summary(torch.tensor([0, 1, 2, 3, 4, 8]))
+
+    assert summary["min"] == 0 and summary["max"] == 8
+    assert summary["histogram"] == [1, 1, 2, 1, 1]
+    assert summary["percentiles"]["p50"] in (2.0, 3.0)
+
+
+def test_kind_and_file_counts():
+    """Per-kind counts should honour multiplicities; files sort by size."""
+    counts = edge_kind_counts(
+        torch.tensor([0, 1, 1]), ["CALL", "IMPORT"], edge_count=torch.tensor([2, 1, 3])
+    )
+    nodes = [
+        SnapshotNode(id="a", properties={"filePath": "a.js"}),
+        SnapshotNode(id="b", properties={"filePath": "b.js"}),
+        SnapshotNode(id="c", properties={"filePath": "b.js"}),
+    ]
+
+    assert counts == {"CALL": 2, "IMPORT": 4}
+    assert list(file_node_counts(nodes).items()) == [("b.js", 2), ("a.js", 1)]
+
+
+def test_compute_graph_stats_is_json_serializable():
+    """The summary should round-trip through JSON for bundle metadata."""
+    edge_index = torch.tensor([[0, 1, 2, 2], [1, 0, 2, 3]])
+
+    stats = compute_graph_stats(
+        edge_index, 5, edge_kind=torch.tensor([0, 0, 1, 1]), edge_kinds=["A", "B"]
+    )
+
+    assert json.loads(json.dumps(stats)) == stats
+    assert stats["orphans"] == 1
+    assert stats["self_loops"] == 1
+    assert stats["weak_components"]["count"] == 3
+    assert stats["strong_components"]["count"] == 4
+    assert stats["edge_kinds"] == {"A": 2, "B": 2}
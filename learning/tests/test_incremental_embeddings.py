@@ -0,0 +1,125 @@
+import sys
+from pathlib import Path
+
+import pytest
+import torch
+
+LEARNING_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = LEARNING_ROOT / "src"
+sys.path.insert(0, str(SRC_ROOT))
+
+from components.exporter import coalesce_edge_index  # noqa: E402
+from components.gnn_model import create_gnn_model, generate_embeddings  # noqa: E402
+from components.incremental_embeddings import (  # noqa: E402
+    affected_node_mask,
+    refresh_embeddings,
+)
+
+
+def make_bundle(ids, x, edges):
+    """Bundle with sorted node ids; edges are (source id, target id) pairs."""
+    order = sorted(range(len(ids)), key=lambda i: ids[i])
+    node_mapping = {ids[i]: row for row, i in enumerate(order)}
+    edge_index = torch.tensor(
+        [[node_mapping[src] for src, _ in edges], [node_mapping[dst] for _, dst in edges]],
+        dtype=torch.long,
+    ).view(2, -1)
+    return {"x": x[order], "edge_index": edge_index, "node_mapping": node_mapping}
+
+
+def make_snapshots(num_nodes=200, num_edges=300, seed=0):
+    """A sparse random graph and a successor with a few local edits."""
+    generator = torch.Generator().manual_seed(seed)
+    ids = [f"n{i:04d}" for i in range(num_nodes)]
+    x = torch.zeros((num_nodes, 6))
+    x[torch.arange(num_nodes), torch.randint(0, 6, (num_nodes,), generator=generator)] = 1.0
+    pairs = torch.randint(0, num_nodes, (num_edges, 2), generator=generator).tolist()
+    edges = [(ids[src], ids[dst]) for src, dst in pairs]
+    old = make_bundle(ids, x, edges)
+
+    new_x = x.clone()
+    new_x[5] = torch.roll(new_x[5], 1)  # changed features
+    new_edges = [edge for edge in edges if "n0010" not in edge]  # removed node
+    new_edges = new_edges[3:] + [(ids[20], ids[30]), ("n9999", ids[40])]  # edge edits
+    keep = [i for i in range(num_nodes) if ids[i] != "n0010"]
+    new = make_bundle(
+        [ids[i] for i in keep] + ["n9999"],
+        torch.cat([new_x[keep], torch.eye(6)[:1]]),
+        new_edges,
+    )
+    return old, new
+
+
+@pytest.mark.parametrize("num_layers", [1, 2, 3])
+def test_refresh_matches_full_recompute(num_layers):
+    old, new = make_snapshots()
+    model = create_gnn_model(num_layers=num_layers, hidden_channels=16)
+    old_embeddings = generate_embeddings(model, old["x"], old["edge_index"])
+
+    refreshed = refresh_embeddings(model, old_embeddings, old, new)
+
+    expected = generate_embeddings(model, new["x"], new["edge_index"])
+    assert refreshed.shape == expected.shape
+    assert torch.allclose(refreshed, expected, atol=1e-5)
+
+
+def test_only_receptive_field_is_recomputed():
+    old, new = make_snapshots()
+
+    affected = affected_node_mask(old, new, num_hops=2)
+
+    assert 0 < int(affected.sum()) < len(new["node_mapping"]) // 2
+    assert bool(affected[new["node_mapping"]["n9999"]])
+    assert bool(affected[new["node_mapping"]["n0005"]])
+
+
+def test_changed_id_set_matches_full_recompute():
+    """Node ids of changed files are enough; removed edges are found via the old graph."""
+    old, new = make_snapshots()
+    model = create_gnn_model(num_layers=2, hidden_channels=16)
+    old_embeddings = generate_embeddings(model, old["x"], old["edge_index"])
+    old_index_to_id = sorted(old["node_mapping"], key=old["node_mapping"].get)
+    changed = {"n0005", "n0010", "n0020", "n9999"}
+    changed |= {old_index_to_id[int(src)] for src in old["edge_index"][0, :3]}
+
+    refreshed = refresh_embeddings(model, old_embeddings, old, new, changed=changed)
+
+    expected = generate_embeddings(model, new["x"], new["edge_index"])
+    assert torch.allclose(refreshed, expected, atol=1e-5)
+
+
+def test_coalesced_bundles_use_edge_weight():
+    old, new = make_snapshots()
+    for bundle in (old, new):
+        num_nodes = bundle["x"].shape[0]
+        edge_index, edge_count, _ = coalesce_edge_index(bundle["edge_index"], num_nodes)
+        bundle.update(
+            edge_index=edge_index,
+            edge_count=edge_count,
+            edge_weight=edge_count.to(torch.float32),
+        )
+    model = create_gnn_model(num_layers=2, hidden_channels=16)
+    old_embeddings = generate_embeddings(model, old["x"], old["edge_index"], old["edge_weight"])
+
+    refreshed = refresh_embeddings(model, old_embeddings, old, new)
+
+    expected = generate_embeddings(model, new["x"], new["edge_index"], new["edge_weight"])
+    assert torch.allclose(refreshed, expected, atol=1e-5)
+
+
+def test_unchanged_snapshot_copies_rows():
+    old, _ = make_snapshots()
+    model = create_gnn_model(num_layers=2, hidden_channels=16)
+    old_embeddings = generate_embeddings(model, old["x"], old["edge_index"])
+
+    refreshed = refresh_embeddings(model, old_embeddings, old, old)
+
+    assert torch.equal(refreshed, old_embeddings)
+
+
+def test_mismatched_old_embeddings_are_rejected():
+    old, new = make_snapshots()
+    model = create_gnn_model(num_layers=1)
+
+    with pytest.raises(ValueError, match="rows"):
+        refresh_embeddings(model, torch.zeros((3, 64)), old, new)
@@ -27,6 +27,7 @@ def make_connection(node_rows, edge_rows):
     nodes_cursor.fetchall.return_value = node_rows
     edges_cursor.fetchall.return_value = edge_rows
     conn.cursor.side_effect = [nodes_cursor, edges_cursor]
+    conn.cursors = [nodes_cursor, edges_cursor]
     return conn
 
 
@@ -175,3 +176,58 @@ def test_serialization_round_trip(monkeypatch):
     assert nx.is_frozen(loaded.graph)
     assert loaded.nodes == snapshot.nodes
     assert loaded.edges == snapshot.edges
+
+
+def test_filters_are_pushed_into_sql(monkeypatch):
+    snapshot_id = "snap-filter"
+    node_rows, edge_rows = sample_rows(snapshot_id)
+    conn = make_connection(node_rows, edge_rows[1:])
+    monkeypatch.setattr(materializer, "_connect", lambda dsn=None: conn)
+
+    snapshot = materializer.materialize_snapshot(
+        snapshot_id=snapshot_id,
+        node_types=["Identifier"],
+        edge_kinds=["CALL"],
+        file_path_prefixes=["src/my_pkg/"],
+    )
+
+    nodes_cursor, edges_cursor = conn.cursors
+    node_query, node_params = nodes_cursor.execute.call_args[0]
+    edge_query, edge_params = edges_cursor.execute.call_args[0]
+    node_filter = [["Identifier"], ["src/my\\_pkg/%"]]
+    assert node_params == (snapshot_id, *node_filter)
+    assert edge_params == (snapshot_id, ["CALL"], snapshot_id, *node_filter, snapshot_id, *node_filter)
+    assert "Identifier('type')" in repr(node_query) and "LIKE ANY(%s)" in repr(node_query)
+    assert "Identifier('kind')" in repr(edge_query) and "Identifier('fromId'), SQL(' IN (" in repr(edge_query)
+    assert [edge.kind for edge in snapshot.edges] == ["CALL"]
+
+
+def test_unfiltered_queries_take_only_the_snapshot_id(monkeypatch):
+    snapshot_id = "snap-unfiltered"
+    node_rows, edge_rows = sample_rows(snapshot_id)
+    conn = make_connection(node_rows, edge_rows)
+    monkeypatch.setattr(materializer, "_connect", lambda dsn=None: conn)
+
+    materializer.materialize_snapshot(snapshot_id=snapshot_id, node_types=[], edge_kinds=None)
+
+    for cursor in conn.cursors:
+        assert cursor.execute.call_args[0][1] == (snapshot_id,)
+
+
+def test_snapshot_filter_normalizes_options():
+    assert materializer.SnapshotFilter.from_options() is None
+    assert materializer.SnapshotFilter.from_options(node_types=[]) is None
+
+    snapshot_filter = materializer.SnapshotFilter.from_options(node_types="Function", edge_kinds=["CALL"])
+    assert snapshot_filter.node_types == ("Function",)
+    assert snapshot_filter.edge_kinds == ("CALL",)
+    assert snapshot_filter.filters_nodes
+    assert not materializer.SnapshotFilter(edge_kinds=("CALL",)).filters_nodes
+
+
+def test_snapshot_filter_digest_ignores_option_order():
+    SnapshotFilter = materializer.SnapshotFilter
+    digest = SnapshotFilter(node_types=("Call", "Function")).digest()
+
+    assert SnapshotFilter(node_types=("Function", "Call")).digest() == digest
+    assert SnapshotFilter(edge_kinds=("Call", "Function")).digest() != digest
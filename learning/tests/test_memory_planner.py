@@ -0,0 +1,193 @@
+import logging
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+import torch
+
+LEARNING_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = LEARNING_ROOT / "src"
+sys.path.insert(0, str(SRC_ROOT))
+
+import components.materializer as materializer  # noqa: E402
+import components.pipelined_export as pipelined_export  # noqa: E402
+import pipeline.export_pipeline as export_pipeline  # noqa: E402
+from components.bundle_io import is_compressed_bundle, load_tensor_bundle  # noqa: E402
+from components.materializer import SnapshotFilter, fetch_snapshot_counts  # noqa: E402
+from components.memory_planner import (  # noqa: E402
+    COMPRESSED,
+    GiB,
+    IN_MEMORY,
+    MiB,
+    SHARDED,
+    STREAMING,
+    MemoryBudgetExceeded,
+    SnapshotCounts,
+    estimate_export,
+    parse_memory_size,
+    plan_export,
+    plan_materialize,
+)
+
+LARGE = SnapshotCounts(num_nodes=2_000_000, num_edges=6_000_000)
+
+
+def cursor_returning(**methods):
+    cursor = MagicMock()
+    cursor.__enter__.return_value = cursor
+    cursor.__exit__.return_value = False
+    for name, value in methods.items():
+        getattr(cursor, name).side_effect = value
+    return cursor
+
+
+def make_rows(num_nodes=12):
+    ids = [f"n{i:02d}" for i in range(num_nodes)]
+    node_rows = [
+        {"id": node_id, "type": "Function", "originalType": "Function", "filePath": "a.js", "data": {"i": i}}
+        for i, node_id in enumerate(ids)
+    ]
+    edge_rows = [
+        {"id": f"e{i}", "fromId": ids[i], "toId": ids[i + 1], "kind": "CALL", "filePath": "a.js", "version": 1}
+        for i in range(num_nodes - 1)
+    ]
+    return node_rows, edge_rows
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [("4GiB", 4 * GiB), ("512M", 512 * MiB), ("1.5 gb", int(1.5 * GiB)), ("1000", 1000), (2048, 2048)],
+)
+def test_parse_memory_size(text, expected):
+    assert parse_memory_size(text) == expected
+
+
+def test_parse_memory_size_rejects_garbage():
+    with pytest.raises(ValueError, match="memory size"):
+        parse_memory_size("lots")
+
+
+def test_export_strategies_are_chosen_in_order_of_preference():
+    estimates = estimate_export(LARGE)
+    peaks = {name: max(stages.values()) for name, stages in estimates.items()}
+
+    assert list(estimates) == [IN_MEMORY, STREAMING, COMPRESSED]
+    assert peaks[IN_MEMORY] > peaks[STREAMING] > peaks[COMPRESSED]
+    assert plan_export(LARGE, peaks[IN_MEMORY]).strategy == IN_MEMORY
+    assert plan_export(LARGE, peaks[IN_MEMORY] - 1).strategy == STREAMING
+    assert plan_export(LARGE, peaks[STREAMING] - 1, allow_format_change=True).strategy == COMPRESSED
+    with pytest.raises(MemoryBudgetExceeded, match="compressed"):
+        plan_export(LARGE, peaks[COMPRESSED] - 1, allow_format_change=True)
+
+
+def test_format_change_needs_opt_in():
+    peaks = {name: max(stages.values()) for name, stages in estimate_export(LARGE).items()}
+
+    with pytest.raises(MemoryBudgetExceeded, match="allow_format_change"):
+        plan_export(LARGE, peaks[STREAMING] - 1)
+    with pytest.raises(MemoryBudgetExceeded) as caught:
+        plan_export(LARGE, peaks[COMPRESSED] - 1)
+    assert "would fit" not in str(caught.value)
+
+
+def test_export_plan_respects_requested_layout():
+    assert list(estimate_export(LARGE, num_partitions=8)) == [IN_MEMORY, SHARDED]
+    assert list(estimate_export(LARGE, output_format="compressed")) == [IN_MEMORY, STREAMING]
+
+    plan = plan_export(LARGE, 64 * GiB, pipelined=True)
+    assert plan.strategy == STREAMING
+    assert IN_MEMORY not in plan.estimates
+
+
+def test_kept_nodes_and_extra_outputs_raise_estimates():
+    base = estimate_export(LARGE)[STREAMING]
+    heavier = estimate_export(LARGE, keep_nodes=True, include_stats=True, coalesce_edges=True)[STREAMING]
+
+    assert all(heavier[stage] > base[stage] for stage in base)
+
+
+def test_materialize_plan_falls_back_to_batched_fetching():
+    plan = plan_materialize(LARGE, 64 * GiB)
+    assert plan.strategy == IN_MEMORY
+
+    streaming_peak = plan.peak(STREAMING)
+    assert streaming_peak < plan.peak(IN_MEMORY)
+    assert plan_materialize(LARGE, streaming_peak).strategy == STREAMING
+    with pytest.raises(MemoryBudgetExceeded):
+        plan_materialize(LARGE, streaming_peak - 1)
+
+
+def test_fetch_snapshot_counts_uses_one_query(monkeypatch):
+    conn = MagicMock()
+    cursor = cursor_returning(fetchone=[{"nodes": 12, "edges": 34}])
+    conn.cursor.return_value = cursor
+    monkeypatch.setattr(materializer, "_connect", lambda dsn=None: conn)
+
+    assert fetch_snapshot_counts("snap") == SnapshotCounts(12, 34)
+    params = cursor.execute.call_args[0][1]
+    assert params == ("snap", "snap")
+    conn.close.assert_called_once()
+
+
+def test_fetch_snapshot_counts_applies_the_snapshot_filter(monkeypatch):
+    conn = MagicMock()
+    cursor = cursor_returning(fetchone=[{"nodes": 5, "edges": 2}])
+    conn.cursor.return_value = cursor
+    monkeypatch.setattr(materializer, "_connect", lambda dsn=None: conn)
+
+    counts = fetch_snapshot_counts("snap", snapshot_filter=SnapshotFilter(node_types=("Call",), edge_kinds=("CALL",)))
+
+    assert counts == SnapshotCounts(5, 2)
+    params = cursor.execute.call_args[0][1]
+    assert params == ("snap", ["Call"], "snap", ["CALL"], "snap", ["Call"], "snap", ["Call"])
+
+
+def test_materialize_snapshot_streams_rows_when_fetchall_does_not_fit(monkeypatch, caplog):
+    node_rows, edge_rows = make_rows()
+    # The counts decide the plan; the rows only need to make a valid graph.
+    counts = {"nodes": LARGE.num_nodes, "edges": LARGE.num_edges}
+    conn = MagicMock()
+    conn.cursor.side_effect = [
+        cursor_returning(fetchone=[counts]),
+        cursor_returning(fetchmany=[node_rows[:5], node_rows[5:], []]),
+        cursor_returning(fetchmany=[edge_rows, []]),
+    ]
+    monkeypatch.setattr(materializer, "_connect", lambda dsn=None: conn)
+    budget = plan_materialize(LARGE, 64 * GiB).peak(STREAMING)
+
+    with caplog.at_level(logging.INFO, logger="components.materializer"):
+        snapshot = materializer.materialize_snapshot("snap", memory_budget=budget)
+
+    assert len(snapshot.nodes) == len(node_rows)
+    assert snapshot.graph.number_of_edges() == len(edge_rows)
+    # Both tables were read through named (server-side) cursors.
+    assert [bool(call.kwargs.get("name")) for call in conn.cursor.call_args_list] == [False, True, True]
+    assert "streaming" in caplog.text
+
+
+def test_run_export_pipeline_switches_to_compressed_output_when_allowed(tmp_path, monkeypatch):
+    node_rows, edge_rows = make_rows()
+    conn = MagicMock()
+    conn.cursor.side_effect = [
+        cursor_returning(fetchmany=[node_rows, []]),
+        cursor_returning(fetchmany=[edge_rows, []]),
+    ]
+    monkeypatch.setattr(export_pipeline, "fetch_snapshot_counts", lambda snapshot_id, snapshot_filter=None: LARGE)
+    monkeypatch.setattr(pipelined_export, "_connect", lambda dsn=None: conn)
+    budget = max(estimate_export(LARGE)[COMPRESSED].values())
+
+    output_path = tmp_path / "bundle.pkl"
+    with pytest.raises(MemoryBudgetExceeded):
+        export_pipeline.run_export_pipeline(
+            "snap", str(output_path), planner=export_pipeline.PlannerOptions(budget)
+        )
+    assert not output_path.exists()
+    bundle = export_pipeline.run_export_pipeline(
+        "snap", str(output_path), planner=export_pipeline.PlannerOptions(budget, allow_format_change=True)
+    )
+
+    assert is_compressed_bundle(output_path)
+    loaded = load_tensor_bundle(output_path)
+    assert torch.equal(loaded["edge_index"], bundle["edge_index"])
+    assert loaded["x"].shape == (len(node_rows), 6)
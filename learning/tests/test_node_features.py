@@ -12,7 +12,7 @@ from components.models import SnapshotNode  # noqa: E402
 from components.node_features import (  # noqa: E402
     KIND_TO_BUCKET,
     create_feature_matrix_v1,
-    _validate_node_set,
+    validate_node_set,
 )
 
 
@@ -155,7 +155,7 @@ def test_validate_node_set_valid():
     node_to_idx = make_node_mapping(nodes)
 
     # Should not raise
-    _validate_node_set(nodes, node_to_idx)
+    validate_node_set(nodes, node_to_idx)
 
 
 def test_validate_node_set_missing_nodes():
@@ -171,7 +171,7 @@ def test_validate_node_set_missing_nodes():
     }
 
     with pytest.raises(ValueError) as exc_info:
-        _validate_node_set(nodes, node_to_idx)
+        validate_node_set(nodes, node_to_idx)
 
     error_msg = str(exc_info.value)
     assert "missing" in error_msg.lower()
@@ -192,7 +192,7 @@ def test_validate_node_set_extra_nodes():
     }
 
     with pytest.raises(ValueError) as exc_info:
-        _validate_node_set(nodes, node_to_idx)
+        validate_node_set(nodes, node_to_idx)
 
     error_msg = str(exc_info.value)
     assert "found" in error_msg.lower()
@@ -211,7 +211,7 @@ def test_validate_node_set_both_missing_and_extra():
     }
 
     with pytest.raises(ValueError) as exc_info:
-        _validate_node_set(nodes, node_to_idx)
+        validate_node_set(nodes, node_to_idx)
 
     error_msg = str(exc_info.value)
     assert "missing" in error_msg.lower()
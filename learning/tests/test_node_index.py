@@ -0,0 +1,144 @@
+import pickle
+import sys
+import uuid
+from pathlib import Path
+
+import numpy as np
+import pytest
+import torch
+
+LEARNING_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = LEARNING_ROOT / "src"
+sys.path.insert(0, str(SRC_ROOT))
+
+from components.bundle_io import (  # noqa: E402
+    load_tensor_bundle,
+    read_compressed_bundle,
+    write_compressed_bundle,
+)
+from components.exporter import export_snapshot  # noqa: E402
+from components.node_index import UTF8, UUID, NodeIdIndex, split_id_lines  # noqa: E402
+from components.snapshot_diff import diff_bundles  # noqa: E402
+
+
+def make_ids(count=64, seed=0):
+    generator = np.random.default_rng(seed)
+    # Low bytes of zero exercise the trailing-NUL handling of S16 keys.
+    ids = [str(uuid.UUID(int=int(value) << 64)) for value in generator.integers(0, 2**62, count)]
+    return sorted(ids)
+
+
+def make_bundle(ids):
+    num_nodes = len(ids)
+    return {
+        "x": torch.arange(num_nodes * 6, dtype=torch.float32).view(num_nodes, 6),
+        "edge_index": torch.randint(0, num_nodes, (2, 3 * num_nodes)),
+        "node_mapping": {node_id: i for i, node_id in enumerate(ids)},
+    }
+
+
+@pytest.mark.parametrize("shuffle", [False, True])
+def test_uuid_index_matches_dict(shuffle):
+    ids = make_ids()
+    if shuffle:
+        ids = [ids[i] for i in np.random.default_rng(1).permutation(len(ids))]
+    mapping = {node_id: i for i, node_id in enumerate(ids)}
+
+    index = NodeIdIndex.from_ids(ids)
+
+    assert index.kind == UUID
+    assert len(index) == len(mapping)
+    assert all(index[node_id] == row for node_id, row in mapping.items())
+    assert list(index) == ids
+    assert dict(index.items()) == mapping
+    assert index == mapping and mapping == index
+    assert index.ids_at([3, 0]) == [ids[3], ids[0]]
+    assert "not-a-uuid" not in index
+    assert str(uuid.UUID(int=1)) not in index
+    with pytest.raises(KeyError):
+        index[str(uuid.UUID(int=1))]
+
+
+def test_index_stores_sixteen_bytes_per_sorted_uuid():
+    index = NodeIdIndex.from_ids(make_ids(1000))
+
+    assert index.nbytes == 16 * 1000
+
+
+def test_non_uuid_ids_fall_back_to_utf8_keys():
+    ids = ["node_10", "node_2", "ü", make_ids(1)[0]]
+
+    index = NodeIdIndex.from_ids(ids)
+
+    assert index.kind == UTF8
+    assert [index[node_id] for node_id in ids] == [0, 1, 2, 3]
+    assert index.ids() == ids
+    assert "node_1" not in index
+
+
+def test_vectorized_lookup():
+    ids = make_ids()
+    index = NodeIdIndex.from_ids(ids)
+    queries = [ids[5], "missing", ids[0], ids[5].upper()]
+
+    assert index.lookup(queries, default=-1).tolist() == [5, -1, 0, -1]
+    assert index.lookup(np.array(ids[:3])).tolist() == [0, 1, 2]
+    with pytest.raises(KeyError, match="missing"):
+        index.lookup(queries)
+
+
+def test_duplicate_ids_are_rejected():
+    with pytest.raises(ValueError, match="Duplicate"):
+        NodeIdIndex.from_ids(["b", "a", "b"])
+
+
+def test_split_id_lines_handles_fixed_and_variable_width():
+    ids = make_ids(5)
+    fixed = split_id_lines("\n".join(ids).encode(), len(ids))
+    ragged = split_id_lines("a\nbcd\nef".encode(), 3)
+
+    assert fixed.dtype == np.dtype("S36")
+    assert fixed.tolist() == [node_id.encode() for node_id in ids]
+    assert ragged.tolist() == [b"a", b"bcd", b"ef"]
+
+
+def test_compressed_bundle_loads_compact_ids(tmp_path):
+    bundle = make_bundle(make_ids(100))
+    path = tmp_path / "bundle.sbz"
+    write_compressed_bundle(bundle, path, chunk_size=16)
+
+    loaded = read_compressed_bundle(path, compact_ids=True)
+
+    assert isinstance(loaded["node_mapping"], NodeIdIndex)
+    assert loaded["node_mapping"] == bundle["node_mapping"]
+    assert torch.equal(loaded["x"], bundle["x"])
+
+
+def test_pickled_index_round_trips(tmp_path):
+    bundle = make_bundle(make_ids(100))
+    bundle["node_mapping"] = NodeIdIndex.from_mapping(bundle["node_mapping"])
+    pickle_path = tmp_path / "bundle.pkl"
+    export_snapshot(bundle, pickle_path)
+
+    loaded = load_tensor_bundle(pickle_path)
+    rewritten = tmp_path / "bundle.sbz"
+    write_compressed_bundle(loaded, rewritten)
+
+    assert isinstance(loaded["node_mapping"], NodeIdIndex)
+    assert loaded["node_mapping"] == bundle["node_mapping"]
+    assert read_compressed_bundle(rewritten)["node_mapping"] == bundle["node_mapping"]
+    assert len(pickle.dumps(loaded["node_mapping"])) < len(pickle.dumps(dict(bundle["node_mapping"])))
+
+
+def test_diff_bundles_accepts_compact_ids():
+    ids = make_ids(40)
+    bundle_a = make_bundle(ids)
+    bundle_b = make_bundle(ids[1:])
+    compact_a = dict(bundle_a, node_mapping=NodeIdIndex.from_mapping(bundle_a["node_mapping"]))
+    compact_b = dict(bundle_b, node_mapping=NodeIdIndex.from_mapping(bundle_b["node_mapping"]))
+
+    expected = diff_bundles(bundle_a, bundle_b)
+    actual = diff_bundles(compact_a, compact_b)
+
+    assert actual.nodes == expected.nodes
+    assert actual.edges == expected.edges
@@ -0,0 +1,151 @@
+import sys
+from pathlib import Path
+
+import pytest
+import torch
+
+LEARNING_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = LEARNING_ROOT / "src"
+sys.path.insert(0, str(SRC_ROOT))
+
+from components.exporter import coalesce_edge_index  # noqa: E402
+from components.gnn_model import create_gnn_model, generate_embeddings  # noqa: E402
+import components.parallel_embeddings as parallel_embeddings  # noqa: E402
+from components.parallel_embeddings import (  # noqa: E402
+    generate_embeddings_from_shards,
+    generate_embeddings_parallel,
+    infer_num_hops,
+)
+from components.partitioning import (  # noqa: E402
+    export_sharded_bundle,
+    partition_edge_cut,
+)
+
+
+def make_graph(num_nodes=40, num_edges=120, seed=0):
+    """Create a random one-hot feature matrix and edge index."""
+    generator = torch.Generator().manual_seed(seed)
+    x = torch.zeros((num_nodes, 6), dtype=torch.float32)
+    categories = torch.randint(0, 6, (num_nodes,), generator=generator)
+    x[torch.arange(num_nodes), categories] = 1.0
+    edge_index = torch.randint(0, num_nodes, (2, num_edges), generator=generator)
+    return x, edge_index
+
+
+@pytest.mark.parametrize("num_layers", [1, 2, 3])
+def test_infer_num_hops(num_layers):
+    """Receptive field should equal the number of SAGEConv layers."""
+    model = create_gnn_model(num_layers=num_layers)
+    assert infer_num_hops(model) == num_layers
+
+
+@pytest.mark.parametrize("num_layers", [1, 2, 3])
+def test_inline_partitions_match_full_graph(num_layers):
+    """Single-worker partitioned inference should match full-graph embeddings."""
+    x, edge_index = make_graph()
+    model = create_gnn_model(num_layers=num_layers, hidden_channels=16)
+    expected = generate_embeddings(model, x, edge_index)
+
+    embeddings = generate_embeddings_parallel(
+        model, x, edge_index, num_partitions=4, num_workers=1
+    )
+
+    assert embeddings.shape == expected.shape
+    assert torch.allclose(embeddings, expected, atol=1e-5)
+
+
+def test_inline_path_leaves_worker_globals_alone():
+    """The single-worker path should not install the caller's model as the worker model."""
+    x, edge_index = make_graph()
+    model = create_gnn_model(num_layers=2, hidden_channels=16)
+    previous_threads = torch.get_num_threads()
+
+    generate_embeddings_parallel(
+        model, x, edge_index, num_partitions=4, num_workers=1, threads_per_worker=1
+    )
+
+    assert parallel_embeddings._WORKER_MODEL is None
+    assert torch.get_num_threads() == previous_threads
+
+
+def test_process_pool_matches_full_graph():
+    """Multi-process inference should stitch rows back in global order."""
+    x, edge_index = make_graph()
+    model = create_gnn_model(num_layers=2, hidden_channels=16)
+    expected = generate_embeddings(model, x, edge_index)
+
+    embeddings = generate_embeddings_parallel(
+        model,
+        x,
+        edge_index,
+        num_partitions=3,
+        num_workers=2,
+        threads_per_worker=1,
+    )
+
+    assert torch.allclose(embeddings, expected, atol=1e-5)
+
+
+def test_sharded_bundle_embeddings(tmp_path):
+    """Embeddings computed from shards on disk should match the full graph."""
+    x, edge_index = make_graph()
+    model = create_gnn_model(num_layers=2, hidden_channels=16)
+    expected = generate_embeddings(model, x, edge_index)
+    bundle = {
+        "x": x,
+        "edge_index": edge_index,
+        "node_mapping": {f"n{i:03d}": i for i in range(x.shape[0])},
+    }
+    parts = partition_edge_cut(edge_index, x.shape[0], num_parts=3)
+    export_sharded_bundle(bundle, parts, tmp_path, 3, num_hops=2)
+
+    embeddings = generate_embeddings_from_shards(model, tmp_path, num_workers=1)
+
+    assert torch.allclose(embeddings, expected, atol=1e-5)
+
+
+def test_shallow_halo_is_rejected(tmp_path):
+    """Shards with a halo shallower than the model depth should be refused."""
+    x, edge_index = make_graph()
+    bundle = {
+        "x": x,
+        "edge_index": edge_index,
+        "node_mapping": {f"n{i:03d}": i for i in range(x.shape[0])},
+    }
+    parts = partition_edge_cut(edge_index, x.shape[0], num_parts=2)
+    export_sharded_bundle(bundle, parts, tmp_path, 2, num_hops=1)
+
+    with pytest.raises(ValueError):
+        generate_embeddings_from_shards(create_gnn_model(num_layers=3), tmp_path)
+
+
+@pytest.mark.parametrize("num_layers", [1, 2, 3])
+def test_coalesced_weights_match_multigraph(num_layers):
+    """Weighted embeddings on a coalesced graph should equal multigraph embeddings."""
+    x, edge_index = make_graph(num_edges=300)
+    edge_index = torch.cat([edge_index, edge_index[:, :100]], dim=1)
+    model = create_gnn_model(num_layers=num_layers, hidden_channels=16)
+    expected = generate_embeddings(model, x, edge_index)
+
+    coalesced, edge_count, _ = coalesce_edge_index(edge_index, x.shape[0])
+    embeddings = generate_embeddings(
+        model, x, coalesced, edge_count.to(torch.float32)
+    )
+
+    assert coalesced.shape[1] < edge_index.shape[1]
+    assert torch.allclose(embeddings, expected, atol=1e-5)
+
+
+def test_weighted_partitions_match_full_graph():
+    """Edge weights should be carried into partition halos."""
+    x, edge_index = make_graph(num_edges=300)
+    coalesced, edge_count, _ = coalesce_edge_index(edge_index, x.shape[0])
+    edge_weight = edge_count.to(torch.float32)
+    model = create_gnn_model(num_layers=2, hidden_channels=16)
+    expected = generate_embeddings(model, x, coalesced, edge_weight)
+
+    embeddings = generate_embeddings_parallel(
+        model, x, coalesced, edge_weight=edge_weight, num_partitions=3, num_workers=1
+    )
+
+    assert torch.allclose(embeddings, expected, atol=1e-5)
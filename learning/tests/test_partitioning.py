@@ -0,0 +1,218 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+import torch
+
+LEARNING_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = LEARNING_ROOT / "src"
+sys.path.insert(0, str(SRC_ROOT))
+
+from components.models import SnapshotNode  # noqa: E402
+from components.partitioning import (  # noqa: E402
+    MANIFEST_FILENAME,
+    create_partitions,
+    export_sharded_bundle,
+    extract_partition,
+    iter_shards,
+    load_shard,
+    load_shard_manifest,
+    load_shard_node_mapping,
+    partition_by_file,
+    partition_edge_cut,
+)
+
+
+def make_nodes():
+    """Create nodes spread over three files of different sizes."""
+    layout = {"a.js": 4, "b.js": 3, "c.js": 1}
+    nodes = []
+    for file_path, count in layout.items():
+        for i in range(count):
+            nodes.append(
+                SnapshotNode(
+                    id=f"{file_path}-{i}",
+                    kind="Identifier",
+                    properties={"filePath": file_path},
+                )
+            )
+    return nodes
+
+
+def make_mapping(nodes):
+    ids = sorted(str(node.id) for node in nodes)
+    return {node_id: i for i, node_id in enumerate(ids)}
+
+
+def make_chain_graph(num_nodes=12):
+    """Two chains joined by a single bridge edge."""
+    half = num_nodes // 2
+    src = list(range(half - 1)) + list(range(half, num_nodes - 1)) + [half - 1]
+    dst = list(range(1, half)) + list(range(half + 1, num_nodes)) + [half]
+    return torch.tensor([src, dst], dtype=torch.long)
+
+
+def sum_aggregate(x, edge_index, num_layers):
+    """Reference message passing: add incoming neighbour features each layer."""
+    for _ in range(num_layers):
+        out = x.clone()
+        out.index_add_(0, edge_index[1], x[edge_index[0]])
+        x = out
+    return x
+
+
+def test_partition_by_file_keeps_files_together():
+    """Every node of a file should land in the same partition."""
+    nodes = make_nodes()
+    node_to_idx = make_mapping(nodes)
+
+    parts = partition_by_file(nodes, node_to_idx, num_parts=2)
+
+    for file_path in ("a.js", "b.js", "c.js"):
+        members = [node_to_idx[n.id] for n in nodes if n.properties["filePath"] == file_path]
+        assert len(set(parts[members].tolist())) == 1
+
+
+def test_partition_by_file_balances_load():
+    """Largest file should be isolated from the two smaller ones."""
+    nodes = make_nodes()
+    node_to_idx = make_mapping(nodes)
+
+    parts = partition_by_file(nodes, node_to_idx, num_parts=2)
+    sizes = torch.bincount(parts, minlength=2).tolist()
+
+    assert sorted(sizes) == [4, 4]
+
+
+def test_partition_edge_cut_covers_all_nodes():
+    """Edge-cut partitioning should assign every node within capacity."""
+    edge_index = make_chain_graph(12)
+
+    parts = partition_edge_cut(edge_index, num_nodes=12, num_parts=2)
+
+    assert parts.shape == (12,)
+    assert set(parts.tolist()) == {0, 1}
+    assert torch.bincount(parts).max().item() <= 7
+
+
+def test_partition_edge_cut_cuts_bridge_only():
+    """Two chains joined by one edge should be split at the bridge."""
+    edge_index = make_chain_graph(12)
+
+    parts = partition_edge_cut(edge_index, num_nodes=12, num_parts=2)
+    cut = (parts[edge_index[0]] != parts[edge_index[1]]).sum().item()
+
+    assert cut == 1
+
+
+def test_invalid_strategy_raises():
+    """Unknown strategies should be rejected."""
+    with pytest.raises(ValueError):
+        create_partitions("random", 2, {}, torch.empty((2, 0), dtype=torch.long))
+
+
+def test_extract_partition_orders_owned_first():
+    """Owned nodes should occupy the first local ids."""
+    edge_index = make_chain_graph(12)
+    x = torch.arange(12, dtype=torch.float32).view(-1, 1)
+    parts = torch.tensor([0] * 6 + [1] * 6)
+
+    shard = extract_partition(x, edge_index, parts, part=1, num_hops=1)
+
+    assert shard["num_owned"] == 6
+    assert shard["global_ids"][:6].tolist() == list(range(6, 12))
+    assert shard["halo_nodes"].tolist() == [5]
+    assert torch.equal(shard["x"], x[shard["global_ids"]])
+
+
+@pytest.mark.parametrize("num_hops", [1, 2, 3])
+def test_halo_gives_exact_owned_outputs(num_hops):
+    """A num_hops halo should reproduce full-graph aggregation for owned nodes."""
+    torch.manual_seed(0)
+    num_nodes = 30
+    edge_index = torch.randint(0, num_nodes, (2, 80))
+    x = torch.rand(num_nodes, 3)
+    parts = partition_edge_cut(edge_index, num_nodes, num_parts=3)
+    expected = sum_aggregate(x, edge_index, num_hops)
+
+    for part in range(3):
+        shard = extract_partition(x, edge_index, parts, part, num_hops)
+        local = sum_aggregate(shard["x"], shard["edge_index"], num_hops)
+        owned = shard["global_ids"][: shard["num_owned"]]
+        assert torch.allclose(local[: shard["num_owned"]], expected[owned])
+
+
+def test_sharded_bundle_round_trip(tmp_path):
+    """Shards should be loadable one at a time and cover every node once."""
+    edge_index = make_chain_graph(12)
+    x = torch.rand(12, 6)
+    node_mapping = {f"n{i:02d}": i for i in range(12)}
+    bundle = {"x": x, "edge_index": edge_index, "node_mapping": node_mapping}
+    parts = partition_edge_cut(edge_index, 12, num_parts=3)
+
+    export_sharded_bundle(bundle, parts, tmp_path / "shards", 3, num_hops=2)
+
+    manifest = load_shard_manifest(tmp_path / "shards")
+    assert manifest["num_parts"] == 3
+    assert manifest["num_hops"] == 2
+    assert manifest["num_nodes"] == 12
+
+    owned = []
+    for part, shard in iter_shards(tmp_path / "shards"):
+        owned.extend(shard["global_ids"][: shard["num_owned"]].tolist())
+        assert torch.equal(shard["x"], x[shard["global_ids"]])
+    assert sorted(owned) == list(range(12))
+
+    single = load_shard(tmp_path / "shards", 1)
+    assert single["num_owned"] == (parts == 1).sum().item()
+    assert load_shard_node_mapping(tmp_path / "shards") == node_mapping
+
+
+def test_manifest_is_json(tmp_path):
+    """The manifest should be plain JSON for non-Python tooling."""
+    edge_index = make_chain_graph(6)
+    bundle = {
+        "x": torch.rand(6, 6),
+        "edge_index": edge_index,
+        "node_mapping": {str(i): i for i in range(6)},
+    }
+    parts = torch.tensor([0, 0, 0, 1, 1, 1])
+
+    export_sharded_bundle(bundle, parts, tmp_path, 2, strategy="edge_cut")
+
+    with open(tmp_path / MANIFEST_FILENAME, "r", encoding="utf-8") as handle:
+        manifest = json.load(handle)
+    assert manifest["strategy"] == "edge_cut"
+    assert manifest["edge_cut"] == 1
+    assert [entry["file"] for entry in manifest["shards"]] == [
+        "part-00000.pkl",
+        "part-00001.pkl",
+    ]
+
+
+def test_trailing_empty_partitions_keep_their_shards(tmp_path):
+    """The manifest should list every requested partition, even empty trailing ones."""
+    edge_index = make_chain_graph(4)
+    bundle = {
+        "x": torch.rand(4, 6),
+        "edge_index": edge_index,
+        "node_mapping": {str(i): i for i in range(4)},
+    }
+    parts = torch.tensor([0, 0, 1, 1])
+
+    export_sharded_bundle(bundle, parts, tmp_path, 4)
+
+    manifest = load_shard_manifest(tmp_path)
+    assert manifest["num_parts"] == 4
+    assert [entry["num_owned"] for entry in manifest["shards"]] == [2, 2, 0, 0]
+    assert load_shard(tmp_path, 3)["global_ids"].numel() == 0
+
+
+def test_sharded_bundle_rejects_parts_beyond_num_parts(tmp_path):
+    """Partition ids must stay below the requested partition count."""
+    edge_index = make_chain_graph(4)
+    bundle = {"x": torch.rand(4, 6), "edge_index": edge_index, "node_mapping": {}}
+
+    with pytest.raises(ValueError):
+        export_sharded_bundle(bundle, torch.tensor([0, 1, 2, 2]), tmp_path, 2)
@@ -0,0 +1,226 @@
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+import torch
+
+LEARNING_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = LEARNING_ROOT / "src"
+sys.path.insert(0, str(SRC_ROOT))
+
+import components.materializer as materializer  # noqa: E402
+import components.pipelined_export as pipelined_export  # noqa: E402
+from components.bundle_io import load_tensor_bundle  # noqa: E402
+from components.pipelined_export import stream_snapshot_tensors  # noqa: E402
+from pipeline.export_pipeline import OutputOptions, run_export_pipeline  # noqa: E402
+
+KINDS = ["Function", "Variable", "Call", "Import", "Block", None]
+
+
+def make_rows(num_nodes=23, seed=0):
+    """Random nodes and a multigraph of edges, with rows already in DB order."""
+    generator = torch.Generator().manual_seed(seed)
+    ids = sorted(f"n{i:03d}" for i in range(num_nodes))
+    node_rows = [
+        {
+            "id": node_id,
+            "type": KINDS[i % len(KINDS)],
+            "originalType": KINDS[i % len(KINDS)],
+            "filePath": f"f{i % 3}.js",
+            "data": {"i": i},
+            "location": None,
+        }
+        for i, node_id in enumerate(ids)
+    ]
+    pairs = torch.randint(0, num_nodes, (2, 60), generator=generator).t().tolist()
+    edge_rows = [
+        {
+            "id": f"e{i}",
+            "fromId": ids[src],
+            "toId": ids[dst],
+            "kind": ["CALL", "IMPORT", None][i % 3],
+            "filePath": f"f{src % 3}.js",
+            "version": 1,
+        }
+        for i, (src, dst) in enumerate(pairs)
+    ]
+    edge_rows.sort(key=lambda row: (row["fromId"], row["toId"], row["kind"] or ""))
+    return node_rows, edge_rows
+
+
+def sequential_connection(node_rows, edge_rows):
+    conn = MagicMock()
+    cursors = []
+    for rows in (node_rows, edge_rows):
+        cursor = MagicMock()
+        cursor.__enter__.return_value = cursor
+        cursor.__exit__.return_value = False
+        cursor.fetchall.return_value = list(reversed(rows))
+        cursors.append(cursor)
+    conn.cursor.side_effect = cursors
+    return conn
+
+
+def streaming_connection(node_rows, edge_rows, batch_size):
+    conn = MagicMock()
+    cursors = []
+    for rows in (node_rows, edge_rows):
+        cursor = MagicMock()
+        batches = [rows[i : i + batch_size] for i in range(0, len(rows), batch_size)]
+        cursor.fetchmany.side_effect = batches + [[]]
+        cursors.append(cursor)
+    conn.cursor.side_effect = cursors
+    conn.cursors = cursors
+    return conn
+
+
+def patch_connections(monkeypatch, node_rows, edge_rows, batch_size=4):
+    monkeypatch.setattr(
+        materializer, "_connect", lambda dsn=None: sequential_connection(node_rows, edge_rows)
+    )
+    monkeypatch.setattr(
+        pipelined_export,
+        "_connect",
+        lambda dsn=None: streaming_connection(node_rows, edge_rows, batch_size),
+    )
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_pipelined_bundle_matches_sequential(tmp_path, monkeypatch, seed):
+    """Streaming stages should reproduce the graph-based bundle exactly."""
+    node_rows, edge_rows = make_rows(seed=seed)
+    patch_connections(monkeypatch, node_rows, edge_rows)
+    options = dict(include_edge_kinds=True, include_stats=True)
+
+    expected = run_export_pipeline("snap", str(tmp_path / "seq.pkl"), **options)
+    actual = run_export_pipeline(
+        "snap", str(tmp_path / "pipe.pkl"), pipelined=True, batch_size=4, **options
+    )
+
+    assert actual["node_mapping"] == expected["node_mapping"]
+    assert torch.equal(actual["x"], expected["x"])
+    assert torch.equal(actual["edge_index"], expected["edge_index"])
+    assert torch.equal(actual["edge_kind"], expected["edge_kind"])
+    assert actual["edge_kinds"] == expected["edge_kinds"]
+    assert actual["stats"] == expected["stats"]
+    assert actual["fingerprint"] == expected["fingerprint"]
+
+
+def test_filtered_export_matches_sequential(tmp_path, monkeypatch):
+    """Both paths push the filter into SQL and build the same induced subgraph."""
+    node_rows, edge_rows = make_rows()
+    # What the database returns for the filter below.
+    kept_nodes = [row for row in node_rows if row["type"] in ("Function", "Call")]
+    kept_ids = {row["id"] for row in kept_nodes}
+    kept_edges = [
+        row
+        for row in edge_rows
+        if row["kind"] == "CALL" and row["fromId"] in kept_ids and row["toId"] in kept_ids
+    ]
+    connections = []
+
+    def connect(dsn=None):
+        connections.append(streaming_connection(kept_nodes, kept_edges, 4))
+        return connections[-1]
+
+    patch_connections(monkeypatch, kept_nodes, kept_edges)
+    monkeypatch.setattr(pipelined_export, "_connect", connect)
+    snapshot_filter = materializer.SnapshotFilter(node_types=("Function", "Call"), edge_kinds=("CALL",))
+    options = dict(snapshot_filter=snapshot_filter, include_stats=True)
+
+    expected = run_export_pipeline("snap", str(tmp_path / "seq.pkl"), **options)
+    actual = run_export_pipeline("snap", str(tmp_path / "pipe.pkl"), pipelined=True, batch_size=4, **options)
+
+    assert len(actual["node_mapping"]) == len(kept_nodes)
+    assert actual["edge_index"].shape[1] == len(kept_edges) > 0
+    assert actual["node_mapping"] == expected["node_mapping"]
+    assert torch.equal(actual["x"], expected["x"])
+    assert torch.equal(actual["edge_index"], expected["edge_index"])
+    assert actual["stats"] == expected["stats"]
+    assert actual["fingerprint"] == expected["fingerprint"]
+    node_call, edge_call = (cursor.execute.call_args for cursor in connections[0].cursors)
+    assert node_call[0][1] == ("snap", ["Function", "Call"])
+    assert edge_call[0][1] == ("snap", ["CALL"], "snap", ["Function", "Call"], "snap", ["Function", "Call"])
+
+
+def flatten(query):
+    for part in query.seq:
+        if hasattr(part, "seq"):
+            yield from flatten(part)
+        else:
+            yield part
+
+
+def test_queries_do_not_collate_uuid_columns():
+    """Postgres rejects COLLATE on uuid; ids are cast to text before collating."""
+    snapshot_filter = materializer.SnapshotFilter(node_types=("Call",), edge_kinds=("CALL",))
+    node_where, _ = materializer._node_filter(snapshot_filter)
+    edge_where, _ = materializer._edge_filter(snapshot_filter, "nodes", "snap")
+
+    for query in (
+        pipelined_export._pipelined_node_query("nodes", node_where),
+        pipelined_export._pipelined_edge_query("edges", edge_where),
+    ):
+        parts = list(flatten(query))
+        collated = [
+            part.strings[0]
+            for part, following in zip(parts, parts[1:])
+            if hasattr(part, "strings") and following.string.lstrip().startswith("COLLATE")
+        ]
+        assert collated in ([], ["kind"])
+        assert "::text COLLATE" in repr(query)
+
+
+def test_compressed_output_is_streamed(tmp_path, monkeypatch):
+    """The compressed writer should be fed during the stream and load back intact."""
+    node_rows, edge_rows = make_rows()
+    patch_connections(monkeypatch, node_rows, edge_rows)
+    output_path = tmp_path / "bundle.bin"
+
+    bundle = run_export_pipeline(
+        "snap", str(output_path), output=OutputOptions("compressed"),
+        include_edge_kinds=True, pipelined=True, batch_size=4,
+    )
+    loaded = load_tensor_bundle(output_path)
+
+    assert torch.equal(loaded["x"], bundle["x"])
+    assert torch.equal(loaded["edge_index"], bundle["edge_index"])
+    assert torch.equal(loaded["edge_kind"], bundle["edge_kind"])
+    assert loaded["edge_kinds"] == bundle["edge_kinds"]
+    assert loaded["fingerprint"] == bundle["fingerprint"]
+
+
+def test_stage_errors_propagate_and_remove_partial_output(tmp_path, monkeypatch):
+    """A dangling edge should fail the export without leaving a partial file."""
+    node_rows, edge_rows = make_rows()
+    edge_rows.append(dict(edge_rows[-1], fromId="zzz"))
+    patch_connections(monkeypatch, node_rows, edge_rows)
+    output_path = tmp_path / "bundle.bin"
+
+    with pytest.raises(ValueError, match="zzz"):
+        run_export_pipeline(
+            "snap", str(output_path), output=OutputOptions("compressed"), pipelined=True, batch_size=4
+        )
+    assert not output_path.exists()
+
+
+def test_unsorted_nodes_are_rejected(monkeypatch):
+    """Row position is only the node index when ids arrive in byte order."""
+    node_rows, edge_rows = make_rows()
+    node_rows[0], node_rows[1] = node_rows[1], node_rows[0]
+    patch_connections(monkeypatch, node_rows, edge_rows)
+
+    with pytest.raises(ValueError, match="sorted"):
+        stream_snapshot_tensors("snap", batch_size=4, queue_size=1)
+
+
+def test_stage_timings_are_recorded(monkeypatch):
+    node_rows, edge_rows = make_rows()
+    patch_connections(monkeypatch, node_rows, edge_rows)
+
+    streamed = stream_snapshot_tensors("snap", batch_size=4, queue_size=1)
+
+    assert set(streamed.stage_seconds) == {"fetch", "transform", "collect"}
+    assert streamed.x.shape == (len(node_rows), 6)
+    assert streamed.edge_index.shape == (2, len(edge_rows))
@@ -0,0 +1,128 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+from sklearn.manifold import TSNE
+
+LEARNING_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = LEARNING_ROOT / "src"
+sys.path.insert(0, str(SRC_ROOT))
+
+from components.projection_session import ProjectionSession, align_layout  # noqa: E402
+from components.tsne_viz import _TSNE_ITER_ARG  # noqa: E402
+
+
+NUM_CLUSTERS = 6
+
+
+def make_embeddings(num_nodes=180, dims=16, seed=0):
+    """
+    Well separated, roughly equidistant clusters (so their 2D arrangement is
+    arbitrary), with a block of duplicate rows.
+    """
+    generator = np.random.default_rng(seed)
+    centers = generator.normal(scale=8.0, size=(NUM_CLUSTERS, dims))
+    data = centers[np.arange(num_nodes) % NUM_CLUSTERS] + generator.normal(size=(num_nodes, dims))
+    data[:10] = data[0]
+    return data.astype(np.float32)
+
+
+def perturb(data, seed):
+    noise = np.random.default_rng(seed).normal(scale=0.3, size=data.shape)
+    return (data + noise).astype(np.float32)
+
+
+def centroid_shift(layout, reference):
+    """Mean distance between cluster centroids, relative to the reference spread."""
+    clusters = np.arange(len(reference)) % NUM_CLUSTERS
+    shift = [
+        np.linalg.norm(layout[clusters == c].mean(axis=0) - reference[clusters == c].mean(axis=0))
+        for c in range(NUM_CLUSTERS)
+    ]
+    return np.mean(shift) / np.abs(reference - reference.mean(axis=0)).mean()
+
+
+def test_cold_projection_reproduces_sklearn_tsne():
+    data = make_embeddings()
+    expected = TSNE(
+        perplexity=20, init="pca", random_state=0, **{_TSNE_ITER_ARG: 300}
+    ).fit_transform(data)
+
+    session = ProjectionSession(perplexity=20, n_iter=300, random_state=0)
+    actual = session.project(data)
+
+    np.testing.assert_allclose(actual, expected, rtol=1e-4, atol=1e-4)
+
+
+def test_neighbor_graphs_are_cached_by_content():
+    data = make_embeddings()
+    session = ProjectionSession(perplexity=20)
+
+    graph = session.neighbor_graph(data)
+    assert session.neighbor_graph(data.copy()) is graph
+    session.perplexity = 10
+    assert session.neighbor_graph(data) is graph
+    session.perplexity = 30
+    assert session.neighbor_graph(data) is not graph
+    assert session.neighbor_graph(data + 1.0) is not graph
+    assert (session.graph_hits, session.graph_misses) == (2, 3)
+
+
+def test_warm_projection_starts_from_reference():
+    data = make_embeddings()
+    variant = perturb(data, seed=1)
+    session = ProjectionSession(perplexity=20, n_iter=500, warm_n_iter=300)
+
+    reference = session.project(data, name="first")
+    warm = session.project(variant, name="variant")
+    cold = align_layout(session.project(variant, name="cold", init="pca"), reference)
+
+    assert session.reference is reference
+    assert set(session.layouts) == {"first", "variant", "cold"}
+    # Starting from the reference keeps every cluster where it was; a cold
+    # start rearranges them in a way no rotation can undo.
+    assert centroid_shift(warm, reference) < 0.1
+    assert centroid_shift(cold, reference) > 0.2
+    # ... and converges in fewer iterations.
+    assert session.kl_divergences["variant"] < 1.05 * session.kl_divergences["cold"]
+
+
+def test_align_layout_undoes_rotation_reflection_and_scale():
+    layout = np.random.default_rng(0).normal(size=(50, 2)).astype(np.float32)
+    angle = 0.7
+    rotation = np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]])
+    moved = 2.5 * (layout @ rotation) * np.array([1.0, -1.0]) + 3.0
+
+    np.testing.assert_allclose(align_layout(moved, layout), layout, atol=1e-5)
+
+
+@pytest.mark.parametrize("num_workers", [1, 2])
+def test_project_many_aligns_variants(num_workers):
+    base = make_embeddings()
+    variants = {"1layer": base, "2layer": perturb(base, seed=2), "3layer": perturb(base, seed=3)}
+    session = ProjectionSession(perplexity=20, n_iter=500, warm_n_iter=300)
+
+    layouts = session.project_many(variants, num_workers=num_workers)
+
+    assert list(layouts) == ["1layer", "2layer", "3layer"]
+    assert layouts["1layer"] is session.reference
+    assert set(session.kl_divergences) == set(session.seconds) == set(variants)
+    for name in ("2layer", "3layer"):
+        assert centroid_shift(layouts[name], session.reference) < 0.1
+    # Graphs built in workers are cached in the session.
+    session.reset()
+    session.project_many(variants, num_workers=1)
+    assert session.graph_hits == 3
+
+
+def test_invalid_init_is_rejected():
+    data = make_embeddings()
+    session = ProjectionSession()
+
+    with pytest.raises(ValueError, match="init"):
+        session.project(data, init="random")
+    with pytest.raises(ValueError, match="shape"):
+        session.project(data, init=np.zeros((3, 2)))
+    with pytest.raises(ValueError, match="iterations"):
+        ProjectionSession(warm_n_iter=100)
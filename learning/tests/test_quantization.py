@@ -0,0 +1,73 @@
+import sys
+from pathlib import Path
+
+import pytest
+import torch
+
+LEARNING_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = LEARNING_ROOT / "src"
+sys.path.insert(0, str(SRC_ROOT))
+
+from components.gnn_model import create_gnn_model, generate_embeddings  # noqa: E402
+from components.parallel_embeddings import infer_num_hops  # noqa: E402
+from components.quantization import (  # noqa: E402
+    compare_embeddings,
+    model_size_bytes,
+    quantization_report,
+)
+
+
+def make_graph(num_nodes=80, num_edges=320, seed=0):
+    """Create a random one-hot feature matrix and edge index."""
+    generator = torch.Generator().manual_seed(seed)
+    x = torch.zeros((num_nodes, 6), dtype=torch.float32)
+    x[torch.arange(num_nodes), torch.randint(0, 6, (num_nodes,), generator=generator)] = 1.0
+    edge_index = torch.randint(0, num_nodes, (2, num_edges), generator=generator)
+    return x, edge_index
+
+
+@pytest.mark.parametrize("mode", ["int8", "bf16"])
+@pytest.mark.parametrize("num_layers", [1, 2, 3])
+def test_quantized_embeddings_close_to_float32(mode, num_layers):
+    """Reduced-precision embeddings should stay close in cosine similarity."""
+    x, edge_index = make_graph()
+    reference = generate_embeddings(
+        create_gnn_model(num_layers=num_layers), x, edge_index
+    )
+    quantized = create_gnn_model(num_layers=num_layers, quantization=mode)
+
+    embeddings = generate_embeddings(quantized, x, edge_index)
+    accuracy = compare_embeddings(reference, embeddings)
+
+    assert embeddings.dtype == torch.float32
+    assert embeddings.shape == reference.shape
+    assert accuracy["cosine_mean"] > 0.99
+    assert infer_num_hops(quantized) == num_layers
+
+
+def test_int8_model_is_smaller():
+    """Dynamic int8 weights should shrink the serialized model."""
+    model = create_gnn_model(num_layers=2, hidden_channels=128)
+    quantized = create_gnn_model(num_layers=2, hidden_channels=128, quantization="int8")
+
+    assert model_size_bytes(quantized) < model_size_bytes(model)
+
+
+def test_quantization_report_modes():
+    """The report should list float32 first with perfect self-similarity."""
+    x, edge_index = make_graph()
+    model = create_gnn_model(num_layers=2, hidden_channels=32)
+
+    reports = quantization_report(model, x, edge_index, repeats=1)
+
+    assert [report.mode for report in reports] == ["float32", "int8", "bf16"]
+    assert reports[0].cosine_min == pytest.approx(1.0)
+    assert all(report.nodes_per_second > 0 for report in reports)
+
+
+def test_invalid_quantization_options():
+    """Unknown modes and compile+quantize combinations should be rejected."""
+    with pytest.raises(ValueError):
+        create_gnn_model(quantization="int4")
+    with pytest.raises(ValueError):
+        create_gnn_model(quantization="int8", compile_backend="torchscript")
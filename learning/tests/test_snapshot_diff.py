@@ -0,0 +1,156 @@
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+import torch
+
+LEARNING_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = LEARNING_ROOT / "src"
+sys.path.insert(0, str(SRC_ROOT))
+
+import components.snapshot_diff as snapshot_diff  # noqa: E402
+from components.exporter import coalesce_edge_index  # noqa: E402
+from components.snapshot_diff import (  # noqa: E402
+    ADDED,
+    CHANGED,
+    REMOVED,
+    diff_bundles,
+    diff_snapshots_sql,
+    merge_join,
+)
+
+
+def make_bundle(ids, kinds, edges, edge_kind_names=None):
+    """Build a bundle from node ids, one-hot kind columns and (src, dst, kind) id edges."""
+    node_mapping = {node_id: i for i, node_id in enumerate(sorted(ids))}
+    x = torch.zeros((len(ids), 6), dtype=torch.float32)
+    for node_id, kind in zip(ids, kinds):
+        x[node_mapping[node_id], kind] = 1.0
+    edge_index = torch.tensor(
+        [[node_mapping[s] for s, _, _ in edges], [node_mapping[d] for _, d, _ in edges]],
+        dtype=torch.long,
+    ).reshape(2, -1)
+    bundle = {"x": x, "edge_index": edge_index, "node_mapping": node_mapping}
+    if edge_kind_names is not None:
+        bundle["edge_kinds"] = edge_kind_names
+        bundle["edge_kind"] = torch.tensor(
+            [edge_kind_names.index(k) for _, _, k in edges], dtype=torch.long
+        )
+    return bundle
+
+
+def make_cursor(rows, batch_size=2):
+    cursor = MagicMock()
+    batches = [rows[i : i + batch_size] for i in range(0, len(rows), batch_size)]
+    cursor.fetchmany.side_effect = batches + [[]]
+    return cursor
+
+
+def node_row(node_id, kind="Identifier", file_path="a.js", data=None):
+    return {
+        "id": node_id,
+        "type": kind,
+        "originalType": kind,
+        "filePath": file_path,
+        "data": data or {},
+        "location": None,
+    }
+
+
+def edge_row(src, dst, kind, count=1, file_path="a.js"):
+    return {"src": src, "dst": dst, "kind": kind, "file_path": file_path, "count": count}
+
+
+def test_merge_join_outer_join():
+    """Keys from both sides should be joined in order with None on the missing side."""
+    left = [(1, "a"), (3, "c"), (4, "d")]
+    right = [(2, "B"), (3, "C")]
+
+    assert list(merge_join(left, right)) == [
+        (1, "a", None),
+        (2, None, "B"),
+        (3, "c", "C"),
+        (4, "d", None),
+    ]
+
+
+def test_merge_join_rejects_unsorted_input():
+    """Unsorted streams would silently produce a wrong diff."""
+    with pytest.raises(ValueError):
+        list(merge_join([(2, "b"), (1, "a")], []))
+
+
+def test_diff_bundles_nodes_and_edges():
+    """Added, removed and changed nodes and edges should be reported."""
+    kinds = ["CALL", "IMPORT"]
+    before = make_bundle(
+        ["a", "b", "c"], [1, 2, 3],
+        [("a", "b", "CALL"), ("b", "c", "IMPORT"), ("a", "c", "CALL")],
+        kinds,
+    )
+    after = make_bundle(
+        ["a", "b", "d"], [1, 5, 3],
+        [("a", "b", "CALL"), ("a", "b", "CALL"), ("a", "d", "CALL")],
+        ["CALL"],
+    )
+
+    diff = diff_bundles(before, after, node_files={"a": "a.js", "b": "b.js"})
+
+    nodes = {change.node_id: change.status for change in diff.nodes}
+    edges = {(c.source, c.target, c.kind): (c.status, c.before, c.after) for c in diff.edges}
+    assert nodes == {"b": CHANGED, "c": REMOVED, "d": ADDED}
+    assert edges == {
+        ("a", "b", "CALL"): (CHANGED, 1, 2),
+        ("a", "c", "CALL"): (REMOVED, 1, 0),
+        ("a", "d", "CALL"): (ADDED, 0, 1),
+        ("b", "c", "IMPORT"): (REMOVED, 1, 0),
+    }
+    assert diff.files["a.js"] == {"edges_changed": 1, "edges_removed": 1, "edges_added": 1}
+    assert diff.summary()["nodes_changed"] == 1
+
+
+def test_diff_bundles_identical_and_coalesced():
+    """A bundle should equal its coalesced form and itself."""
+    bundle = make_bundle(["a", "b"], [0, 1], [("a", "b", "X"), ("a", "b", "X")])
+    edge_index, edge_count, _ = coalesce_edge_index(bundle["edge_index"], 2)
+    coalesced = dict(bundle, edge_index=edge_index, edge_count=edge_count)
+
+    assert diff_bundles(bundle, bundle).is_empty
+    assert diff_bundles(bundle, coalesced).is_empty
+
+
+@pytest.mark.parametrize("query", [snapshot_diff._diff_node_query("n"), snapshot_diff._diff_edge_query("e")])
+def test_diff_queries_do_not_collate_uuid_columns(query):
+    """Postgres rejects COLLATE on uuid; ids are cast to text before collating."""
+    parts = query.seq
+    for part, following in zip(parts, parts[1:]):
+        if getattr(part, "strings", None) in (("id",), ("fromId",), ("toId",)):
+            assert not following.string.lstrip().startswith("COLLATE")
+
+
+def test_diff_snapshots_sql_streams_both_snapshots(monkeypatch):
+    """The SQL diff should merge-join four server-side cursors in batches."""
+    conn = MagicMock()
+    conn.cursor.side_effect = [
+        make_cursor([node_row("a"), node_row("b"), node_row("c")]),
+        make_cursor([node_row("a"), node_row("b", data={"name": "x"}), node_row("d", file_path="d.js")]),
+        make_cursor([edge_row("a", "b", "CALL"), edge_row("b", "c", "")]),
+        make_cursor([edge_row("a", "b", "CALL", count=3)]),
+    ]
+    monkeypatch.setattr(snapshot_diff, "_connect", lambda dsn=None: conn)
+
+    diff = diff_snapshots_sql("snap-a", "snap-b", batch_size=2)
+
+    assert [(c.node_id, c.status) for c in diff.nodes] == [
+        ("b", CHANGED),
+        ("c", REMOVED),
+        ("d", ADDED),
+    ]
+    assert [(c.source, c.target, c.status, c.after) for c in diff.edges] == [
+        ("a", "b", CHANGED, 3),
+        ("b", "c", REMOVED, 0),
+    ]
+    assert diff.files["d.js"] == {"nodes_added": 1}
+    assert all(call.kwargs["name"].startswith("snapshot_diff_") for call in conn.cursor.call_args_list)
+    conn.close.assert_called_once()
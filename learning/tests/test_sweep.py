@@ -0,0 +1,104 @@
+import json
+import sys
+from pathlib import Path
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import pytest  # noqa: E402
+import torch  # noqa: E402
+
+LEARNING_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = LEARNING_ROOT / "src"
+sys.path.insert(0, str(SRC_ROOT))
+
+from components.gnn_model import create_gnn_model, generate_embeddings  # noqa: E402
+from components.sweep import (  # noqa: E402
+    EmbeddingCache,
+    SweepConfig,
+    bundle_digest,
+    embed_with_adjacency,
+    mean_adjacency,
+    run_sweep,
+    sweep_grid,
+    write_sweep_report,
+)
+
+
+def make_graph(num_nodes=60, num_edges=180, seed=0):
+    generator = torch.Generator().manual_seed(seed)
+    x = torch.zeros((num_nodes, 6))
+    x[torch.arange(num_nodes), torch.randint(0, 6, (num_nodes,), generator=generator)] = 1.0
+    # Duplicate edges and orphans are both present.
+    edge_index = torch.randint(0, num_nodes - 5, (2, num_edges), generator=generator)
+    return x, edge_index
+
+
+@pytest.mark.parametrize("num_layers", [1, 2, 3])
+@pytest.mark.parametrize("weighted", [False, True])
+def test_shared_adjacency_matches_eager_model(num_layers, weighted):
+    x, edge_index = make_graph()
+    edge_weight = torch.rand(edge_index.shape[1]) + 0.5 if weighted else None
+    model = create_gnn_model(num_layers=num_layers, hidden_channels=32)
+
+    adjacency = mean_adjacency(edge_index, x.shape[0], edge_weight)
+
+    torch.testing.assert_close(
+        embed_with_adjacency(model, x, adjacency),
+        generate_embeddings(model, x, edge_index, edge_weight),
+        rtol=1e-5,
+        atol=1e-5,
+    )
+
+
+def test_sweep_grid_ignores_hidden_channels_for_one_layer():
+    configs = sweep_grid(num_layers=[1, 2], hidden_channels=[64, 128], seeds=[0])
+
+    assert [config.label for config in configs] == [
+        "1layer-s0",
+        "2layer-h64-s0",
+        "2layer-h128-s0",
+    ]
+
+
+def test_embedding_cache_is_keyed_by_bundle_and_config(tmp_path):
+    x, edge_index = make_graph()
+    digest = bundle_digest(x, edge_index)
+    config = SweepConfig(num_layers=2)
+    key = config.config_hash(digest)
+    embeddings = torch.randn(4, 3)
+
+    EmbeddingCache(tmp_path).put(key, embeddings)
+
+    assert torch.equal(EmbeddingCache(tmp_path).get(key), embeddings)
+    assert SweepConfig(num_layers=3).config_hash(digest) != key
+    assert config.config_hash(bundle_digest(x, edge_index.flip(0))) != key
+    assert EmbeddingCache(tmp_path).get("missing") is None
+
+
+def test_run_sweep_reuses_cached_embeddings_and_writes_report(tmp_path):
+    x, edge_index = make_graph()
+    configs = sweep_grid(num_layers=[1, 2], hidden_channels=[32])
+    cache = EmbeddingCache(tmp_path / "cache")
+    settings = dict(perplexities=[5, 10], n_iter=250, warm_n_iter=250, num_workers=1)
+
+    first = run_sweep(x, edge_index, configs, cache=cache, **settings)
+    second = run_sweep(x, edge_index, configs, cache=EmbeddingCache(tmp_path / "cache"), **settings)
+
+    assert [(run.config.label, run.perplexity) for run in first.runs] == [
+        ("1layer-s42", 10),
+        ("2layer-h32-s42", 10),
+        ("1layer-s42", 5),
+        ("2layer-h32-s42", 5),
+    ]
+    assert not any(run.embeddings_cached for run in first.runs)
+    assert all(run.embeddings_cached for run in second.runs)
+    assert all(layout.shape == (60, 2) for layout in first.layouts.values())
+
+    paths = write_sweep_report(first, tmp_path / "report", labels=x.argmax(dim=1).numpy())
+    payload = json.loads(paths["json"].read_text())
+    assert len(payload["runs"]) == 4
+    assert payload["runs"][0]["projection_seconds"] > 0
+    assert "| 2layer-h32-s42 | 5 |" in paths["markdown"].read_text()
+    assert paths["figure"].exists()
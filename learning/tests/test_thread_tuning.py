@@ -0,0 +1,155 @@
+import json
+import sys
+from pathlib import Path
+
+import torch
+
+LEARNING_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = LEARNING_ROOT / "src"
+sys.path.insert(0, str(SRC_ROOT))
+
+from components import thread_tuning  # noqa: E402
+from components.gnn_model import create_gnn_model, generate_embeddings  # noqa: E402
+from components.thread_tuning import (  # noqa: E402
+    ThreadConfig,
+    apply_tuned_config,
+    autotune,
+    generate_embeddings_tuned,
+    load_tuned_config,
+    save_tuned_config,
+)
+
+
+def make_graph(num_nodes=60, num_edges=240, seed=0):
+    """Create a random one-hot feature matrix and edge index."""
+    generator = torch.Generator().manual_seed(seed)
+    x = torch.zeros((num_nodes, 6), dtype=torch.float32)
+    x[torch.arange(num_nodes), torch.randint(0, 6, (num_nodes,), generator=generator)] = 1.0
+    edge_index = torch.randint(0, num_nodes, (2, num_edges), generator=generator)
+    return x, edge_index
+
+
+def test_save_and_load_round_trip(tmp_path):
+    """Saved configs should load back unchanged for the same host."""
+    path = tmp_path / "tuning.json"
+    config = ThreadConfig(intra_op_threads=2, inter_op_threads=1, tsne_n_jobs=2, chunk_size=1024)
+
+    save_tuned_config(config, path, details={"num_nodes": 10})
+
+    assert load_tuned_config(path) == config
+
+
+def test_configs_are_kept_per_host(tmp_path, monkeypatch):
+    """Tuning on one host should not overwrite or leak into another."""
+    path = tmp_path / "tuning.json"
+    monkeypatch.setattr(thread_tuning, "host_key", lambda: "host-a:8:8")
+    save_tuned_config(ThreadConfig(4, 1, 4), path)
+    monkeypatch.setattr(thread_tuning, "host_key", lambda: "host-b:2:2")
+
+    assert load_tuned_config(path) is None
+    save_tuned_config(ThreadConfig(2, 1, 1), path)
+    assert set(json.loads(path.read_text())) == {"host-a:8:8", "host-b:2:2"}
+
+
+def test_missing_or_corrupt_file_means_untuned(tmp_path):
+    """Entry points should run with defaults when there is nothing to apply."""
+    path = tmp_path / "tuning.json"
+    assert apply_tuned_config(path) is None
+    path.write_text("{not json")
+    assert load_tuned_config(path) is None
+
+
+def test_apply_sets_torch_threads(tmp_path):
+    """Applying a stored config should cap torch intra-op threads."""
+    path = tmp_path / "tuning.json"
+    previous = torch.get_num_threads()
+    save_tuned_config(ThreadConfig(intra_op_threads=1, inter_op_threads=1, tsne_n_jobs=1), path)
+    try:
+        config = apply_tuned_config(path)
+        assert config.intra_op_threads == 1
+        assert torch.get_num_threads() == 1
+    finally:
+        torch.set_num_threads(previous)
+
+
+def test_autotune_picks_a_timed_candidate():
+    """The chosen config should come from the timed candidates and restore threads."""
+    x, edge_index = make_graph()
+    previous = torch.get_num_threads()
+
+    result = autotune(
+        x,
+        edge_index,
+        thread_candidates=[1],
+        chunk_candidates=[None, 20],
+        tsne_sample=40,
+        repeats=1,
+    )
+
+    config = result["config"]
+    assert f"threads=1,chunk={config.chunk_size}" in result["embedding_timings"]
+    assert set(result["tsne_timings"]) == {"n_jobs=1"}
+    assert config.tsne_n_jobs == 1
+    assert torch.get_num_threads() == previous
+
+
+def test_autotune_times_the_full_graph_when_chunks_exceed_it():
+    """Chunk sizes at or above the node count fall back to the full-graph pass."""
+    x, edge_index = make_graph()
+
+    result = autotune(
+        x,
+        edge_index,
+        thread_candidates=[1],
+        chunk_candidates=[65536],
+        tsne_sample=40,
+        repeats=1,
+    )
+
+    assert set(result["embedding_timings"]) == {"threads=1,chunk=None"}
+    assert result["config"].chunk_size is None
+
+
+def test_autotune_benchmarks_on_the_pinned_cpus(monkeypatch):
+    """Requested cpus are pinned while timing, then the old affinity comes back."""
+    x, edge_index = make_graph()
+    affinity = [[0, 1, 2, 3]]
+    monkeypatch.setattr(thread_tuning, "available_cpus", lambda: list(affinity[-1]))
+    monkeypatch.setattr(
+        thread_tuning.os, "sched_setaffinity", lambda pid, cpus: affinity.append(list(cpus))
+    )
+    seen = []
+    original_embed = thread_tuning._embed
+
+    def recording_embed(*args):
+        seen.append(list(affinity[-1]))
+        return original_embed(*args)
+
+    monkeypatch.setattr(thread_tuning, "_embed", recording_embed)
+
+    result = autotune(
+        x,
+        edge_index,
+        thread_candidates=[1],
+        chunk_candidates=[None],
+        tsne_sample=40,
+        repeats=1,
+        cpus=[2, 1],
+    )
+
+    assert seen and all(cpus == [1, 2] for cpus in seen)
+    assert affinity[-1] == [0, 1, 2, 3]
+    assert result["config"].cpus == [1, 2]
+
+
+def test_chunked_embeddings_match_full_graph():
+    """A tuned chunk size should not change the embeddings."""
+    x, edge_index = make_graph()
+    model = create_gnn_model(num_layers=2, hidden_channels=16)
+    config = ThreadConfig(intra_op_threads=1, inter_op_threads=1, tsne_n_jobs=1, chunk_size=20)
+
+    assert torch.allclose(
+        generate_embeddings_tuned(model, x, edge_index, config=config),
+        generate_embeddings(model, x, edge_index),
+        atol=1e-5,
+    )
@@ -0,0 +1,110 @@
+import sys
+from pathlib import Path
+
+import pytest
+import torch
+import torch.nn.functional as F
+
+LEARNING_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = LEARNING_ROOT / "src"
+sys.path.insert(0, str(SRC_ROOT))
+
+import components.walk_embeddings as walk_embeddings  # noqa: E402
+from components.exporter import coalesce_edge_index  # noqa: E402
+from components.walk_embeddings import (  # noqa: E402
+    WalkConfig,
+    build_csr,
+    generate_walk_embeddings,
+    random_walks,
+)
+
+
+def two_cliques(size=8):
+    """Two disjoint directed cliques plus one isolated node."""
+    edges = []
+    for offset in (0, size):
+        edges += [(offset + i, offset + j) for i in range(size) for j in range(size) if i != j]
+    return torch.tensor(edges).t(), 2 * size + 1
+
+
+def test_walks_follow_edges():
+    """Every step should traverse an edge; isolated nodes stay put."""
+    edge_index, num_nodes = two_cliques()
+    rowptr, col = build_csr(edge_index, num_nodes)
+    generator = torch.Generator().manual_seed(0)
+
+    walks = random_walks(rowptr, col, torch.arange(num_nodes), 12, generator=generator)
+
+    edges = set(map(tuple, edge_index.t().tolist()))
+    assert walks.shape == (num_nodes, 13)
+    for walk in walks[:-1].tolist():
+        assert all((a, b) in edges for a, b in zip(walk, walk[1:]))
+    assert walks[-1].tolist() == [num_nodes - 1] * 13
+
+
+def test_csr_expands_coalesced_multiplicities():
+    """Coalesced weights should rebuild the multigraph's neighbour lists."""
+    edge_index = torch.tensor([[0, 0, 0, 1, 2], [1, 1, 2, 2, 0]])
+    coalesced, edge_count, _ = coalesce_edge_index(edge_index, 3)
+
+    multigraph = build_csr(edge_index, 3)
+    weighted = build_csr(coalesced, 3, edge_weight=edge_count.to(torch.float32))
+
+    assert torch.equal(multigraph[0], weighted[0])
+    assert torch.equal(multigraph[1], weighted[1])
+
+
+def test_embeddings_match_generate_embeddings_format():
+    """Output should be a float32 [N, 64] tensor, deterministic per seed."""
+    edge_index, num_nodes = two_cliques()
+    x = torch.zeros((num_nodes, 6))
+    config = WalkConfig(walk_length=8, context_size=4, walks_per_node=4, epochs=2)
+
+    first = generate_walk_embeddings(x, edge_index, config=config, seed=3)
+    second = generate_walk_embeddings(x, edge_index, config=config, seed=3)
+
+    assert first.shape == (num_nodes, 64)
+    assert first.dtype == torch.float32
+    assert torch.equal(first, second)
+
+
+def test_embeddings_separate_communities():
+    """Nodes of the same clique should be closer than nodes of different cliques."""
+    edge_index, num_nodes = two_cliques()
+    x = torch.zeros((num_nodes, 6))
+    config = WalkConfig(walk_length=10, context_size=5, walks_per_node=20, epochs=20, lr=0.05)
+
+    embeddings = F.normalize(generate_walk_embeddings(x, edge_index, config=config), dim=1)
+
+    similarity = embeddings[:16] @ embeddings[:16].t()
+    same = torch.block_diag(torch.ones(8, 8), torch.ones(8, 8)).bool() & ~torch.eye(16).bool()
+    different = ~torch.block_diag(torch.ones(8, 8), torch.ones(8, 8)).bool()
+    assert similarity[same].mean() > similarity[different].mean() + 0.1
+
+
+def assert_embedding_keeps_global_rng():
+    edge_index, num_nodes = two_cliques()
+    x = torch.zeros((num_nodes, 6))
+    config = WalkConfig(embedding_dim=8, walk_length=6, context_size=3, walks_per_node=1)
+    torch.manual_seed(123)
+    expected = torch.rand(4)
+
+    torch.manual_seed(123)
+    first = generate_walk_embeddings(x, edge_index, config=config, seed=7)
+    after = torch.rand(4)
+    second = generate_walk_embeddings(x, edge_index, config=config, seed=7)
+
+    assert torch.equal(after, expected)
+    assert torch.equal(first, second)
+
+
+def test_embeddings_leave_the_global_rng_alone():
+    """Seeding the walks must not reset the caller's torch RNG."""
+    assert_embedding_keeps_global_rng()
+
+
+def test_torch_cluster_walks_leave_the_global_rng_alone():
+    """torch_cluster samples from the global RNG; its state is restored afterwards."""
+    pytest.importorskip("torch_cluster")
+    assert walk_embeddings._cluster_random_walk is not None
+    assert_embedding_keeps_global_rng()